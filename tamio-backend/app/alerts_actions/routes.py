@@ -5,11 +5,15 @@ API endpoints for the refactored Alerts & Actions page.
 Transforms DetectionAlerts into Risks and PreparedActions into Controls.
 """
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple
+import base64
+import hashlib
+import json
 import math
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func, and_, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, func, and_, or_, tuple_, cast, literal_column, DateTime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -227,35 +231,6 @@ def _extract_context_bullets(context_data: dict) -> List[str]:
     return bullets if bullets else ["Review alert details"]
 
 
-async def _compute_buffer_impact(
-    db: AsyncSession, user_id: str, cash_impact: Optional[float]
-) -> Optional[float]:
-    """Compute buffer impact as percentage."""
-    if not cash_impact:
-        return None
-
-    # Get current cash
-    result = await db.execute(
-        select(func.sum(CashAccount.balance))
-        .where(CashAccount.user_id == user_id)
-    )
-    current_cash = float(result.scalar() or 0)
-
-    if current_cash <= 0:
-        return None
-
-    # Get buffer threshold from user config
-    config = await get_or_create_config(db, user_id)
-    buffer_amount = float(config.obligations_buffer_amount or 0)
-
-    if buffer_amount <= 0:
-        # Use 10% of current cash as default buffer
-        buffer_amount = current_cash * 0.1
-
-    # Calculate impact as percentage of buffer
-    return round((abs(cash_impact) / buffer_amount) * 100, 1)
-
-
 def _format_compact_amount(amount: float) -> str:
     """Format amount in compact form (e.g., $53K, $1.2M).
 
@@ -567,24 +542,53 @@ def _build_action_steps(action: PreparedAction) -> List[ActionStepResponse]:
     return steps
 
 
-async def _alert_to_risk(db: AsyncSession, alert: DetectionAlert) -> RiskResponse:
-    """Transform DetectionAlert to RiskResponse."""
-    # Get linked control IDs
-    linked_control_ids = [a.id for a in (alert.prepared_actions or [])]
+@dataclass
+class RiskContext:
+    """Per-user figures shared by every risk in a response."""
+    current_cash: float
+    buffer_amount: float
 
-    # Get current cash position
+
+async def _load_risk_context(db: AsyncSession, user_id: str) -> RiskContext:
+    """Load current cash and the buffer threshold once for a user's risks."""
     result = await db.execute(
         select(func.sum(CashAccount.balance))
-        .where(CashAccount.user_id == alert.user_id)
+        .where(CashAccount.user_id == user_id)
     )
     current_cash = float(result.scalar() or 0)
 
     # Get buffer threshold from user config
-    config = await get_or_create_config(db, alert.user_id)
+    config = await get_or_create_config(db, user_id)
     buffer_amount = float(config.obligations_buffer_amount or 0)
     if buffer_amount <= 0:
         buffer_amount = current_cash * 0.2  # Default to 20% of current cash
 
+    return RiskContext(current_cash=current_cash, buffer_amount=buffer_amount)
+
+
+async def build_risks(
+    db: AsyncSession, user_id: str, alerts: Sequence[DetectionAlert]
+) -> List[RiskResponse]:
+    """
+    Transform a user's alerts into risks.
+
+    Cash and config are loaded once for the whole list; alerts should have
+    prepared_actions eager-loaded.
+    """
+    if not alerts:
+        return []
+    context = await _load_risk_context(db, user_id)
+    return [_alert_to_risk(alert, context) for alert in alerts]
+
+
+def _alert_to_risk(alert: DetectionAlert, context: RiskContext) -> RiskResponse:
+    """Transform DetectionAlert to RiskResponse."""
+    # Get linked control IDs
+    linked_control_ids = [a.id for a in (alert.prepared_actions or [])]
+
+    current_cash = context.current_cash
+    buffer_amount = context.buffer_amount
+
     # Compute buffer impact percentage
     buffer_impact = None
     if alert.cash_impact and buffer_amount > 0:
@@ -650,23 +654,76 @@ def _action_to_control(action: PreparedAction) -> ControlResponse:
     )
 
 
+# ============================================================================
+# Risk Ordering, Pagination and ETags
+# ============================================================================
+
+# Deadline sort key: nulls sort last, as with deadline.asc().nullslast()
+_DEADLINE_SORT = func.coalesce(DetectionAlert.deadline, literal_column("'infinity'::timestamp"))
+
+# Risks are ordered by severity ('emergency' < 'this_week' < 'upcoming'),
+# then deadline, with id as the tiebreaker that makes the order total
+RISK_ORDER = (DetectionAlert.severity.asc(), _DEADLINE_SORT.asc(), DetectionAlert.id.asc())
+
+
+def _encode_risk_cursor(alert: DetectionAlert) -> str:
+    """Opaque keyset cursor pointing just after alert."""
+    key = [alert.severity, alert.deadline.isoformat() if alert.deadline else None, alert.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_risk_cursor(cursor: str) -> Tuple[str, Optional[datetime], str]:
+    try:
+        severity, deadline, alert_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return severity, datetime.fromisoformat(deadline) if deadline else None, alert_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after_risk_cursor(cursor: str):
+    """WHERE clause selecting risks ordered after cursor."""
+    severity, deadline, alert_id = _decode_risk_cursor(cursor)
+    deadline_key = cast(deadline, DateTime) if deadline else literal_column("'infinity'::timestamp")
+    return tuple_(DetectionAlert.severity, _DEADLINE_SORT, DetectionAlert.id) > tuple_(
+        severity, deadline_key, alert_id
+    )
+
+
+def _etag_for(body: RisksListResponse) -> str:
+    return '"' + hashlib.sha256(body.model_dump_json().encode()).hexdigest()[:32] + '"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+
 # ============================================================================
 # Risk Endpoints
 # ============================================================================
 
 @router.get("/risks", response_model=RisksListResponse)
 async def get_risks(
+    request: Request,
+    response: Response,
     severity: Optional[str] = Query(None, description="Filter by severity: urgent, high, normal"),
     timing: Optional[str] = Query(None, description="Filter by timing: today, this_week, next_two_weeks"),
     status: Optional[str] = Query(None, description="Filter by status: active, acknowledged, etc."),
     category: Optional[str] = Query(None, description="Filter by category: obligations, receivables"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size (all risks when omitted)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get all active risks with computed labels.
 
-    Returns risks ordered by severity and deadline.
+    Returns risks ordered by severity and deadline. With limit, returns one
+    page plus next_cursor (keyset pagination; total_count still counts all
+    matching risks). Responses carry an ETag; send it back in If-None-Match
+    to get a 304 when the page is unchanged.
     """
     query = (
         select(DetectionAlert)
@@ -724,23 +781,43 @@ async def get_risks(
                 )
             )
 
+    total_count = None
+    next_cursor = None
+    if limit is not None:
+        count_result = await db.execute(
+            select(func.count()).select_from(query.with_only_columns(DetectionAlert.id).subquery())
+        )
+        total_count = count_result.scalar() or 0
+    if cursor:
+        query = query.where(_after_risk_cursor(cursor))
+
     # Order by severity (emergency first) then deadline
-    query = query.order_by(
-        # Custom ordering for severity
-        DetectionAlert.severity.asc(),  # 'emergency' < 'this_week' < 'upcoming'
-        DetectionAlert.deadline.asc().nullslast(),
-    )
+    query = query.order_by(*RISK_ORDER)
+    if limit is not None:
+        query = query.limit(limit + 1)
 
     result = await db.execute(query)
-    alerts = result.scalars().all()
+    alerts = list(result.scalars().all())
 
-    risks = [await _alert_to_risk(db, alert) for alert in alerts]
+    if limit is not None and len(alerts) > limit:
+        alerts = alerts[:limit]
+        next_cursor = _encode_risk_cursor(alerts[-1])
 
-    return RisksListResponse(
+    risks = await build_risks(db, user.id, alerts)
+
+    body = RisksListResponse(
         risks=risks,
-        total_count=len(risks),
+        total_count=len(risks) if total_count is None else total_count,
+        next_cursor=next_cursor,
     )
 
+    etag = _etag_for(body)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return body
+
 
 @router.get("/risks/{risk_id}", response_model=RiskResponse)
 async def get_risk(
@@ -760,7 +837,8 @@ async def get_risk(
     if not alert:
         raise HTTPException(status_code=404, detail="Risk not found")
 
-    return await _alert_to_risk(db, alert)
+    risks = await build_risks(db, user.id, [alert])
+    return risks[0]
 
 
 @router.post("/risks/{risk_id}/dismiss", response_model=SuccessResponse)
@@ -821,6 +899,7 @@ async def get_controls_for_risk(
     result = await db.execute(
         select(PreparedAction)
         .options(selectinload(PreparedAction.options))
+        .options(selectinload(PreparedAction.alert))
         .where(PreparedAction.alert_id == risk_id)
         .where(PreparedAction.user_id == user.id)
     )
@@ -1118,5 +1197,4 @@ async def get_risks_for_control(
     if not alert:
         return RisksForControlResponse(risks=[])
 
-    risk = await _alert_to_risk(db, alert)
-    return RisksForControlResponse(risks=[risk])
+    return RisksForControlResponse(risks=await build_risks(db, user.id, [alert]))
@@ -0,0 +1,146 @@
+"""
+Audit log retention.
+
+audit_logs is partitioned by month. Partitions older than
+AUDIT_RETENTION_MONTHS are detached from the parent, exported to a
+zstd-compressed Parquet file under AUDIT_ARCHIVE_DIR, and then dropped.
+
+Each step is idempotent: a partition that was detached but failed to
+export is picked up again on the next run, and an existing archive file is
+only replaced once a new export has completed.
+
+Requires pyarrow.
+"""
+import json
+import logging
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.partitions import add_months, list_monthly_partitions, month_start
+
+logger = logging.getLogger(__name__)
+
+AUDIT_TABLE = "audit_logs"
+
+# Rows fetched from the server-side cursor per Parquet row group
+EXPORT_CHUNK_SIZE = 10000
+
+EXPORT_COLUMNS = [
+    "id",
+    "entity_type",
+    "entity_id",
+    "action",
+    "field_name",
+    "old_value",
+    "new_value",
+    "user_id",
+    "source",
+    "extra_data",
+    "notes",
+    "created_at",
+]
+
+# JSONB columns are exported as JSON text
+JSON_COLUMNS = {"old_value", "new_value", "extra_data"}
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    fields = []
+    for column in EXPORT_COLUMNS:
+        if column == "created_at":
+            fields.append(pa.field(column, pa.timestamp("us", tz="UTC")))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def _select_sql(partition: str) -> str:
+    columns = ", ".join(
+        f"{c}::text AS {c}" if c in JSON_COLUMNS else c
+        for c in EXPORT_COLUMNS
+    )
+    return f"SELECT {columns} FROM {partition} ORDER BY created_at"
+
+
+def _row_to_dict(row: Any) -> Dict[str, Any]:
+    data = dict(row._mapping)
+    for column in JSON_COLUMNS:
+        value = data.get(column)
+        if value is not None and not isinstance(value, str):
+            data[column] = json.dumps(value)
+    return data
+
+
+async def export_partition(db: AsyncSession, partition: str, archive_dir: str) -> Dict[str, Any]:
+    """
+    Stream a partition into <archive_dir>/<partition>.parquet.
+
+    Writes to a temporary file and renames on success.
+    Returns the archive path and row count.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{partition}.parquet")
+    tmp_path = f"{path}.tmp"
+    schema = _arrow_schema()
+
+    rows_written = 0
+    result = await db.stream(
+        text(_select_sql(partition)),
+        execution_options={"yield_per": EXPORT_CHUNK_SIZE},
+    )
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        async for chunk in result.partitions(EXPORT_CHUNK_SIZE):
+            records = [_row_to_dict(row) for row in chunk]
+            writer.write_table(pa.Table.from_pylist(records, schema=schema))
+            rows_written += len(records)
+
+    os.replace(tmp_path, path)
+    return {"partition": partition, "path": path, "rows": rows_written}
+
+
+async def archive_expired_partitions(
+    db: AsyncSession,
+    retention_months: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    today: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Detach, export and drop audit_logs partitions past retention.
+
+    A partition is expired when its whole month is older than
+    retention_months before the current month. Commits after each step so
+    a failure leaves every partition either attached, detached-but-kept,
+    or archived and dropped.
+    """
+    retention_months = retention_months or settings.AUDIT_RETENTION_MONTHS
+    archive_dir = archive_dir or settings.AUDIT_ARCHIVE_DIR
+    cutoff = add_months(month_start(today or date.today()), -retention_months)
+
+    archived = []
+    for name, month, attached in await list_monthly_partitions(db, AUDIT_TABLE):
+        if month >= cutoff:
+            break
+
+        if attached:
+            await db.execute(text(f"ALTER TABLE {AUDIT_TABLE} DETACH PARTITION {name}"))
+            await db.commit()
+            logger.info(f"Detached audit partition {name}")
+
+        export = await export_partition(db, name, archive_dir)
+        await db.execute(text(f"DROP TABLE {name}"))
+        await db.commit()
+
+        logger.info(f"Archived audit partition {name}: {export['rows']} rows -> {export['path']}")
+        archived.append(export)
+
+    return archived
@@ -7,9 +7,13 @@ making it easy to add audit logging to any part of the application.
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List, Literal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc
+from sqlalchemy import select, and_, desc, insert
 
+from app.config import settings
 from app.audit.models import AuditLog
+from app.audit.sink import audit_sink
+from app.models.base import generate_id
+from app.partitions import add_months, month_start
 
 
 # Type aliases
@@ -22,6 +26,13 @@ ActionType = Literal[
     "sync_error", "reconcile", "archive"
 ]
 SourceType = Literal["api", "xero_sync", "quickbooks_sync", "system", "migration", "admin"]
+Durability = Literal["sync", "async"]
+
+# Telemetry events written through the buffered sink by default.
+# Everything else (data edits, reconciliation) is written in the caller's
+# transaction so it commits or rolls back with the change it describes.
+ASYNC_ENTITY_TYPES = {"pipeline", "detection_scheduler", "forecast"}
+ASYNC_ACTIONS = {"sync_push", "sync_pull", "sync_error"}
 
 
 class AuditService:
@@ -33,12 +44,37 @@ class AuditService:
         await audit.log_create("client", client.id, {"name": "Acme"})
         await audit.log_update("client", client.id, {"name": ("Old", "New")})
         await audit.log_sync("client", client.id, "xero", "push", {"contact_id": "abc"})
+
+    Pass durability="sync" or "async" to override the default per-event
+    policy (see ASYNC_ENTITY_TYPES / ASYNC_ACTIONS).
     """
 
-    def __init__(self, db: AsyncSession, user_id: Optional[str] = None, source: SourceType = "api"):
+    def __init__(
+        self,
+        db: AsyncSession,
+        user_id: Optional[str] = None,
+        source: SourceType = "api",
+        durability: Optional[Durability] = None,
+    ):
         self.db = db
         self.user_id = user_id
         self.source = source
+        self.durability = durability
+
+    def _resolve_durability(
+        self,
+        entity_type: str,
+        action: str,
+        durability: Optional[Durability],
+    ) -> Durability:
+        if not settings.AUDIT_SINK_ENABLED or not audit_sink.running:
+            return "sync"
+        resolved = durability or self.durability
+        if resolved:
+            return resolved
+        if entity_type in ASYNC_ENTITY_TYPES or action in ASYNC_ACTIONS:
+            return "async"
+        return "sync"
 
     # ==========================================================================
     # Core Logging Methods
@@ -54,6 +90,7 @@ class AuditService:
         new_value: Optional[Any] = None,
         metadata: Optional[Dict[str, Any]] = None,
         notes: Optional[str] = None,
+        durability: Optional[Durability] = None,
     ) -> AuditLog:
         """
         Log an audit event.
@@ -67,27 +104,82 @@ class AuditService:
             new_value: New value (for creates/updates)
             metadata: Additional context
             notes: Human-readable notes
+            durability: "sync" (caller's transaction) or "async" (buffered sink)
 
         Returns:
-            Created AuditLog
+            Created AuditLog (transient when written asynchronously)
         """
-        log = AuditLog(
-            entity_type=entity_type,
-            entity_id=entity_id,
-            action=action,
-            field_name=field_name,
-            old_value=old_value,
-            new_value=new_value,
-            user_id=self.user_id,
-            source=self.source,
-            metadata=metadata,
-            notes=notes,
-        )
+        row = self._row(entity_type, entity_id, action, field_name, old_value, new_value, metadata, notes)
+        log = AuditLog(**row)
+
+        if self._resolve_durability(entity_type, action, durability) == "async":
+            await audit_sink.enqueue(row)
+            return log
 
         self.db.add(log)
         # Don't commit here - let caller manage transaction
         return log
 
+    async def log_many(
+        self,
+        events: List[Dict[str, Any]],
+        durability: Optional[Durability] = None,
+    ) -> int:
+        """
+        Log several events at once.
+
+        Each event is a dict of log() arguments (entity_type, entity_id,
+        action and optionally field_name, old_value, new_value, metadata,
+        notes). Synchronous events are written with one multi-row INSERT in
+        the caller's transaction. Returns the number of events logged.
+        """
+        sync_rows = []
+        for event in events:
+            row = self._row(
+                event["entity_type"],
+                event["entity_id"],
+                event["action"],
+                event.get("field_name"),
+                event.get("old_value"),
+                event.get("new_value"),
+                event.get("metadata"),
+                event.get("notes"),
+            )
+            if self._resolve_durability(row["entity_type"], row["action"], durability) == "async":
+                await audit_sink.enqueue(row)
+            else:
+                sync_rows.append(row)
+
+        if sync_rows:
+            await self.db.execute(insert(AuditLog), sync_rows)
+        return len(events)
+
+    def _row(
+        self,
+        entity_type: str,
+        entity_id: str,
+        action: str,
+        field_name: Optional[str],
+        old_value: Optional[Any],
+        new_value: Optional[Any],
+        metadata: Optional[Dict[str, Any]],
+        notes: Optional[str],
+    ) -> Dict[str, Any]:
+        return {
+            "id": generate_id("audit"),
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "action": action,
+            "field_name": field_name,
+            "old_value": old_value,
+            "new_value": new_value,
+            "user_id": self.user_id,
+            "source": self.source,
+            "extra_data": metadata,
+            "notes": notes,
+            "created_at": datetime.now(timezone.utc),
+        }
+
     # ==========================================================================
     # Convenience Methods
     # ==========================================================================
@@ -196,27 +288,52 @@ class AuditService:
     # Query Methods
     # ==========================================================================
 
-    async def get_entity_history(
+    async def _query_recent(
         self,
-        entity_type: EntityType,
-        entity_id: str,
-        limit: int = 100,
+        conditions: list,
+        since: Optional[datetime],
+        limit: int,
     ) -> List[AuditLog]:
-        """Get audit history for an entity."""
+        """
+        Newest-first audit rows created at or after since.
+
+        since defaults to the start of the retention window. The query
+        carries it as a literal created_at lower bound, so Postgres prunes
+        older monthly partitions and merges the rest newest-first.
+        """
+        if since is None:
+            now = datetime.now(timezone.utc)
+            since = datetime.combine(
+                add_months(month_start(now.date()), -settings.AUDIT_RETENTION_MONTHS),
+                datetime.min.time(),
+                tzinfo=timezone.utc,
+            )
+        elif since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+
         query = (
             select(AuditLog)
-            .where(
-                and_(
-                    AuditLog.entity_type == entity_type,
-                    AuditLog.entity_id == entity_id,
-                )
-            )
+            .where(and_(*conditions, AuditLog.created_at >= since))
             .order_by(desc(AuditLog.created_at))
             .limit(limit)
         )
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def get_entity_history(
+        self,
+        entity_type: EntityType,
+        entity_id: str,
+        limit: int = 100,
+        since: Optional[datetime] = None,
+    ) -> List[AuditLog]:
+        """Get audit history for an entity."""
+        conditions = [
+            AuditLog.entity_type == entity_type,
+            AuditLog.entity_id == entity_id,
+        ]
+        return await self._query_recent(conditions, since, limit)
+
     async def get_user_activity(
         self,
         user_id: str,
@@ -225,17 +342,7 @@ class AuditService:
     ) -> List[AuditLog]:
         """Get recent activity for a user."""
         conditions = [AuditLog.user_id == user_id]
-        if since:
-            conditions.append(AuditLog.created_at >= since)
-
-        query = (
-            select(AuditLog)
-            .where(and_(*conditions))
-            .order_by(desc(AuditLog.created_at))
-            .limit(limit)
-        )
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return await self._query_recent(conditions, since, limit)
 
     async def get_sync_history(
         self,
@@ -245,25 +352,10 @@ class AuditService:
     ) -> List[AuditLog]:
         """Get sync history for an integration."""
         conditions = [
-            AuditLog.action.in_(["sync_push", "sync_pull", "sync_error"])
-        ]
-        if since:
-            conditions.append(AuditLog.created_at >= since)
-
-        query = (
-            select(AuditLog)
-            .where(and_(*conditions))
-            .order_by(desc(AuditLog.created_at))
-            .limit(limit)
-        )
-        result = await self.db.execute(query)
-
-        # Filter by integration_type in metadata
-        logs = result.scalars().all()
-        return [
-            log for log in logs
-            if log.metadata and log.metadata.get("integration_type") == integration_type
+            AuditLog.action.in_(["sync_push", "sync_pull", "sync_error"]),
+            AuditLog.extra_data["integration_type"].astext == integration_type,
         ]
+        return await self._query_recent(conditions, since, limit)
 
 
 def create_audit_service(
@@ -0,0 +1,200 @@
+"""
+Buffered audit sink for asynchronous audit log writes.
+
+Telemetry-style audit events (pipeline runs, scheduler summaries, sync
+bookkeeping) don't need to be written in the caller's transaction. The sink
+keeps them in a bounded in-memory buffer and a background task writes them
+with multi-row INSERTs in its own session.
+
+Durability:
+- "sync":  written through the caller's session (commits with the change).
+           Used for compliance-critical data edits.
+- "async": buffered and written by the background flusher. The caller never
+           pays the flush cost for large JSONB payloads.
+
+Backpressure: when the buffer is full, log callers wait (up to
+AUDIT_SINK_BACKPRESSURE_TIMEOUT seconds) for the flusher to make room.
+Events that still don't fit are dropped and counted in stats["dropped"].
+
+If the sink hasn't been started (scripts, tests), async events fall back to
+the caller's session so nothing is lost.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditSink:
+    """
+    Bounded ring buffer of pending audit rows plus a background flusher.
+
+    Usage:
+        await audit_sink.start()        # application startup
+        await audit_sink.enqueue(row)   # row = dict of AuditLog column values
+        await audit_sink.stop()         # shutdown, drains the buffer
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        backpressure_timeout: Optional[float] = None,
+        session_factory: Optional[Callable] = None,
+    ):
+        self.capacity = capacity or settings.AUDIT_SINK_CAPACITY
+        self.batch_size = batch_size or settings.AUDIT_SINK_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.AUDIT_SINK_FLUSH_INTERVAL
+        self.backpressure_timeout = (
+            backpressure_timeout if backpressure_timeout is not None
+            else settings.AUDIT_SINK_BACKPRESSURE_TIMEOUT
+        )
+        self._session_factory = session_factory
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._has_items: Optional[asyncio.Event] = None
+        self._has_space: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped": 0,
+            "write_errors": 0,
+            "backpressure_waits": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    # ==========================================================================
+    # Lifecycle
+    # ==========================================================================
+
+    async def start(self) -> None:
+        """Start the background flusher on the running event loop."""
+        if self.running:
+            return
+        self._has_items = asyncio.Event()
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="audit-sink-flusher")
+        logger.info("Audit sink started")
+
+    async def stop(self) -> None:
+        """Stop the flusher after draining everything buffered."""
+        if not self.running:
+            return
+        self._stopping = True
+        self._has_items.set()
+        await self._task
+        self._task = None
+        logger.info(f"Audit sink stopped: {self.stats}")
+
+    # ==========================================================================
+    # Producer side
+    # ==========================================================================
+
+    async def enqueue(self, row: Dict[str, Any]) -> bool:
+        """
+        Buffer one audit row for background writing.
+
+        Waits for space when the buffer is full. Returns False if the row
+        was dropped after the backpressure timeout.
+        """
+        if len(self._buffer) >= self.capacity:
+            self.stats["backpressure_waits"] += 1
+            self._has_items.set()
+            deadline = time.monotonic() + self.backpressure_timeout
+            while len(self._buffer) >= self.capacity:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats["dropped"] += 1
+                    logger.warning("Audit sink full; dropping audit event")
+                    return False
+                self._has_space.clear()
+                try:
+                    await asyncio.wait_for(self._has_space.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+        self._buffer.append(row)
+        self.stats["enqueued"] += 1
+        if len(self._buffer) >= self.batch_size:
+            self._has_items.set()
+        return True
+
+    # ==========================================================================
+    # Consumer side
+    # ==========================================================================
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._has_items.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._has_items.clear()
+
+            while self._buffer:
+                await self.flush_once()
+
+            if self._stopping:
+                return
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        while self._buffer and len(batch) < self.batch_size:
+            batch.append(self._buffer.popleft())
+        self._has_space.set()
+        return batch
+
+    async def flush_once(self) -> int:
+        """Write up to batch_size buffered rows. Returns rows written."""
+        batch = self._take_batch()
+        if not batch:
+            return 0
+
+        try:
+            await self._write(batch)
+        except Exception as e:
+            # Audit telemetry must never take down the flusher
+            self.stats["write_errors"] += 1
+            self.stats["dropped"] += len(batch)
+            logger.error(f"Audit sink failed to write {len(batch)} rows: {e}")
+            return 0
+
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        return len(batch)
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        """Multi-row INSERT of a batch in a dedicated session."""
+        session_factory = self._session_factory
+        if session_factory is None:
+            from app.database import async_session_maker
+            session_factory = async_session_maker
+
+        async with session_factory() as session:
+            await session.execute(insert(AuditLog), rows)
+            await session.commit()
+
+
+# Singleton used by AuditService and started in the app lifespan
+audit_sink = AuditSink()
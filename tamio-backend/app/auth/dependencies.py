@@ -3,10 +3,10 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.database import get_db
 from app.data.models import User
+from app.auth.principal import get_user_by_id
 from app.auth.utils import decode_access_token
 
 # HTTP Bearer token security scheme
@@ -21,6 +21,7 @@ async def get_current_user(
     Dependency to get the current authenticated user.
 
     Raises 401 if not authenticated or token is invalid.
+    The user comes from the principal cache when recently seen.
     """
     if not credentials:
         raise HTTPException(
@@ -40,8 +41,7 @@ async def get_current_user(
         )
 
     user_id = payload.get("sub")
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await get_user_by_id(db, user_id) if user_id else None
 
     if not user:
         raise HTTPException(
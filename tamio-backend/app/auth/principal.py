@@ -0,0 +1,122 @@
+"""
+Authenticated principal cache.
+
+A dashboard page fans out into many API calls, and each one used to load
+the User row again (and mutations loaded it a second time in the demo
+guard). The column values of recently seen users are kept in a small
+per-process cache with a short TTL. On a hit, get_current_user attaches a
+User rebuilt from the cached values to the request's session without a
+query, so routes can still modify and commit it.
+
+Any ORM update or delete of a User evicts its entry. Other workers see
+the change once their own entry expires (AUTH_PRINCIPAL_CACHE_TTL_SECONDS).
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import User
+
+
+_COLUMN_KEYS = [attr.key for attr in inspect(User).column_attrs]
+
+
+class PrincipalCache:
+    """LRU cache of User column values keyed by user ID, with a TTL."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    @property
+    def ttl_seconds(self) -> float:
+        return settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS if self._ttl_seconds is None else self._ttl_seconds
+
+    @property
+    def max_entries(self) -> int:
+        return settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES if self._max_entries is None else self._max_entries
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, values = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return values
+
+    def put(self, user: User) -> Dict[str, Any]:
+        values = {key: getattr(user, key) for key in _COLUMN_KEYS}
+        if self.ttl_seconds <= 0:
+            return values
+        self._entries[user.id] = (time.monotonic() + self.ttl_seconds, values)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return values
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide cache
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_changed_user(mapper, connection, target: User) -> None:
+    principal_cache.invalidate(target.id)
+
+
+async def _query_user(db: AsyncSession, user_id: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is not None:
+        principal_cache.put(user)
+    return user
+
+
+async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+    """
+    Load a user for the current request, from the cache when possible.
+
+    The returned User is attached to db either way.
+    """
+    values = principal_cache.get(user_id)
+    if values is None:
+        return await _query_user(db, user_id)
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+async def is_demo_user(user_id: str) -> Optional[bool]:
+    """
+    Whether a user is a demo account, or None if the user does not exist.
+
+    For callers outside a request session (the demo guard middleware).
+    """
+    values = principal_cache.get(user_id)
+    if values is not None:
+        return bool(values["is_demo"])
+
+    async with AsyncSessionLocal() as db:
+        user = await _query_user(db, user_id)
+        return None if user is None else bool(user.is_demo)
@@ -38,7 +38,7 @@ async def signup(data: schemas.SignupRequest, db: AsyncSession = Depends(get_db)
             await db.commit()
             await db.refresh(existing_user)
 
-            token = create_access_token(existing_user.id, existing_user.email)
+            token = create_access_token(existing_user.id, existing_user.email, existing_user.is_demo)
             return schemas.AuthResponse(
                 access_token=token,
                 user=schemas.UserAuthInfo.model_validate(existing_user)
@@ -60,7 +60,7 @@ async def signup(data: schemas.SignupRequest, db: AsyncSession = Depends(get_db)
     await db.commit()
     await db.refresh(user)
 
-    token = create_access_token(user.id, user.email)
+    token = create_access_token(user.id, user.email, user.is_demo)
     return schemas.AuthResponse(
         access_token=token,
         user=schemas.UserAuthInfo.model_validate(user)
@@ -88,7 +88,7 @@ async def login(data: schemas.LoginRequest, db: AsyncSession = Depends(get_db)):
             detail="Invalid email or password"
         )
 
-    token = create_access_token(user.id, user.email)
+    token = create_access_token(user.id, user.email, user.is_demo)
     return schemas.AuthResponse(
         access_token=token,
         user=schemas.UserAuthInfo.model_validate(user)
@@ -126,7 +126,7 @@ async def demo_login(data: schemas.DemoLoginRequest, db: AsyncSession = Depends(
         await db.commit()
         await db.refresh(user)
 
-    token = create_access_token(user.id, user.email)
+    token = create_access_token(user.id, user.email, user.is_demo)
     return schemas.AuthResponse(
         access_token=token,
         user=schemas.UserAuthInfo.model_validate(user)
@@ -142,7 +142,7 @@ async def get_me(current_user: User = Depends(get_current_user)):
 @router.post("/refresh", response_model=schemas.AuthResponse)
 async def refresh_token(current_user: User = Depends(get_current_user)):
     """Refresh the access token (extends session)."""
-    token = create_access_token(current_user.id, current_user.email)
+    token = create_access_token(current_user.id, current_user.email, current_user.is_demo)
     return schemas.AuthResponse(
         access_token=token,
         user=schemas.UserAuthInfo.model_validate(current_user)
@@ -29,12 +29,19 @@ def get_password_hash(password: str) -> str:
     return hashed.decode('utf-8')
 
 
-def create_access_token(user_id: str, email: str) -> str:
-    """Create a JWT access token."""
+def create_access_token(user_id: str, email: str, is_demo: bool = False) -> str:
+    """
+    Create a JWT access token.
+
+    The "demo" claim lets the demo guard reject demo mutations without a
+    lookup. Profile fields that users can edit are not embedded, since a
+    token outlives changes to them.
+    """
     expire = datetime.now(timezone.utc) + timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS)
     to_encode = {
         "sub": user_id,
         "email": email,
+        "demo": bool(is_demo),
         "exp": expire,
         "iat": datetime.now(timezone.utc)
     }
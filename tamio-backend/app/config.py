@@ -1,6 +1,6 @@
 """Application configuration."""
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -8,6 +8,15 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    DATABASE_READ_URL: str = ""  # Optional read replica for get_read_db (falls back to DATABASE_URL)
+
+    # Connection pool (see app/database.py, app/db_pool.py)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0             # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800               # Reconnect connections older than this (seconds)
+    DB_STATEMENT_CACHE_SIZE: int = 100        # asyncpg statement cache; 0 behind PgBouncer (transaction mode)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # SQLAlchemy prepared statement cache per connection
 
     # Application
     APP_ENV: str = "development"
@@ -36,6 +45,45 @@ class Settings(BaseSettings):
     DEMO_TOKEN: str = "DEMO_TOKEN_2026"
     DEMO_ACCOUNT_EMAIL: str = "demo@agencyco.com"
 
+    # Authenticated principal cache (see app/auth/principal.py)
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0  # 0 disables the cache
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # ==========================================================================
+    # Query Instrumentation (see app/query_metrics.py)
+    # ==========================================================================
+    QUERY_METRICS_ENABLED: bool = True
+    QUERY_METRICS_DEBUG: bool = False             # X-DB-* response headers and the /metrics endpoint
+    QUERY_BUDGET_DEFAULT: int = 50                # Statements per request/job before warning
+    QUERY_BUDGETS: Dict[str, int] = {}            # Per-scope overrides, e.g. {"GET /api/forecast": 20}
+    QUERY_SLOW_STATEMENTS: int = 5                # Slowest statements reported when over budget
+
+    # ==========================================================================
+    # AI Drafting (see app/preparation/ai_drafting.py)
+    # ==========================================================================
+    AI_DRAFTING_ENABLED: bool = False             # Queue prepared emails for background AI enhancement
+    AI_DRAFTING_CONCURRENCY: int = 4              # Concurrent model requests per process
+    AI_DRAFTING_CACHE_TTL_SECONDS: int = 86400    # Reuse a draft for the same template and context
+    AI_DRAFTING_CACHE_MAX_ENTRIES: int = 2000
+    AI_DRAFTING_BATCH_SIZE: int = 50              # Pending options enhanced per batch
+    AI_DRAFTING_MAX_ATTEMPTS: int = 3             # Claims that expire this often are marked failed
+    AI_DRAFTING_CLAIM_TIMEOUT_MINUTES: int = 10   # Claimed drafts still processing after this are re-queued
+
+    # ==========================================================================
+    # Background Xero Sync (see app/xero/sync_scheduler.py)
+    # ==========================================================================
+    XERO_SYNC_CONCURRENCY: int = 4                # Tenants synced at once
+    XERO_SYNC_FRESH_MINUTES: int = 15             # Skip connections synced this recently (e.g. by the user)
+    XERO_SYNC_ACTIVE_USER_MINUTES: int = 60       # API activity this recent raises a tenant's priority
+    XERO_SYNC_START_JITTER_SECONDS: float = 5.0   # Random delay before each tenant's sync starts
+    XERO_TENANT_CALLS_PER_MINUTE: int = 60        # Xero's per-tenant call limit, charged by every sync (app/xero/budget.py)
+
+    # Webhooks (see app/xero/webhooks.py)
+    XERO_WEBHOOK_KEY: str = ""                    # Signing key from the Xero app; empty rejects all deliveries
+    XERO_WEBHOOK_BATCH_SIZE: int = 500            # Pending change events claimed per batch
+    XERO_WEBHOOK_MAX_ATTEMPTS: int = 3            # Targeted sync retries before an event stays failed
+    XERO_WEBHOOK_CLAIM_TIMEOUT_MINUTES: int = 15  # Claimed events still processing after this are re-queued
+
     # ==========================================================================
     # Email Notifications (Resend)
     # ==========================================================================
@@ -43,6 +91,30 @@ class Settings(BaseSettings):
     RESEND_API_KEY: str = ""
     NOTIFICATION_FROM_EMAIL: str = "Tamio <notifications@tamio.app>"
 
+    # Outbox dispatcher (see app/notifications/dispatcher.py)
+    NOTIFICATION_DISPATCH_BATCH_SIZE: int = 200   # Outbox rows claimed per batch
+    NOTIFICATION_DISPATCH_CONCURRENCY: int = 8    # Concurrent provider requests
+    NOTIFICATION_MAX_ATTEMPTS: int = 3            # Retries before marking failed
+
+    # ==========================================================================
+    # Audit Log Sink (see app/audit/sink.py)
+    # ==========================================================================
+    AUDIT_SINK_ENABLED: bool = True
+    AUDIT_SINK_CAPACITY: int = 10000              # Max buffered audit rows
+    AUDIT_SINK_BATCH_SIZE: int = 500              # Rows per multi-row INSERT
+    AUDIT_SINK_FLUSH_INTERVAL: float = 1.0        # Seconds between flushes
+    AUDIT_SINK_BACKPRESSURE_TIMEOUT: float = 2.0  # Wait for space before dropping
+
+    # Retention (see app/audit/retention.py)
+    AUDIT_RETENTION_MONTHS: int = 13              # Monthly partitions kept online
+    AUDIT_ARCHIVE_DIR: str = "archive/audit_logs" # Parquet exports of dropped partitions
+
+    # ==========================================================================
+    # Exchange Rates (see app/services/fx_rates.py)
+    # ==========================================================================
+    FX_RATE_TABLE_TTL_SECONDS: int = 3600         # Reload in-process rate table after this
+    FX_RATE_REFRESH_HOUR: int = 17                # UTC hour for daily ECB refresh (published ~16:00 CET)
+
     # ==========================================================================
     # Slack Notifications
     # ==========================================================================
@@ -56,6 +128,15 @@ class Settings(BaseSettings):
     RATE_LIMIT_DEFAULT: str = "100/minute"  # General API endpoints
     RATE_LIMIT_TAMI: str = "20/minute"       # Claude/TAMI calls (expensive)
     RATE_LIMIT_XERO: str = "30/minute"       # Xero API calls
+    RATE_LIMIT_FORECAST: str = "60/minute"   # Forecast and scenario forecast reads
+    RATE_LIMIT_SCENARIO_BUILD: str = "20/minute"  # Scenario build/iterate
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE: str = "postgres"    # "postgres" (shared by all workers) or "memory" (single worker only)
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = 10000  # LRU bound for in-process buckets
+    RATE_LIMIT_BUCKET_IDLE_SECONDS: int = 3600  # Shared buckets idle this long are deleted
+    RATE_LIMIT_DB_POOL_SIZE: int = 2         # Dedicated connections per worker for the shared buckets
+    RATE_LIMIT_DB_TIMEOUT: float = 0.5       # Seconds a bucket update may wait for a connection, connect or run
+    RATE_LIMIT_BREAKER_COOLDOWN: float = 30.0  # Seconds on in-process buckets after the shared store fails
 
     # Sentry (error tracking)
     SENTRY_DSN: str = ""
@@ -14,6 +14,7 @@ from app.data.balances.schemas import (
     CashPositionResponse,
 )
 from app.auth.dependencies import get_current_user
+from app.detection import changes
 
 router = APIRouter()
 
@@ -38,6 +39,7 @@ async def create_cash_position(
         db.add(account)
         accounts.append(account)
 
+    await changes.mark_changed(db, current_user.id, changes.CASH_ACCOUNT)
     await db.commit()
     for acc in accounts:
         await db.refresh(acc)
@@ -94,6 +96,7 @@ async def update_cash_accounts(
         db.add(account)
         accounts.append(account)
 
+    await changes.mark_changed(db, current_user.id, changes.CASH_ACCOUNT)
     await db.commit()
     for acc in accounts:
         await db.refresh(acc)
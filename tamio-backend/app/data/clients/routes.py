@@ -14,6 +14,7 @@ from app.data.clients.schemas import (
     ClientWithEventsResponse,
 )
 from app.auth.dependencies import get_current_user
+from app.detection import changes
 
 if TYPE_CHECKING:
     from app.services.obligations import ObligationService
@@ -125,6 +126,7 @@ async def create_client(
         sync_status="pending_push" if sync_to_xero else None,
     )
     db.add(client)
+    await changes.mark_changed(db, current_user.id, changes.CLIENT, changes.OBLIGATION)
     await db.commit()
     await db.refresh(client)
 
@@ -215,6 +217,7 @@ async def update_client(
     if client.xero_contact_id and sync_to_xero:
         client.sync_status = "pending_push"
 
+    await changes.mark_changed(db, current_user.id, changes.CLIENT, changes.OBLIGATION)
     await db.commit()
     await db.refresh(client)
 
@@ -272,6 +275,7 @@ async def delete_client(
     await obligation_svc.delete_obligations_for_client(client_id)
 
     client.status = "deleted"
+    await changes.mark_changed(db, current_user.id, changes.CLIENT, changes.OBLIGATION)
     await db.commit()
 
     return {"message": "Client deleted successfully"}
@@ -14,6 +14,7 @@ from app.data.expenses.schemas import (
     ExpenseBucketWithEventsResponse,
 )
 from app.auth.dependencies import get_current_user
+from app.detection import changes
 
 if TYPE_CHECKING:
     from app.services.obligations import ObligationService
@@ -62,6 +63,7 @@ async def create_expense_bucket(
         sync_status="pending_push" if sync_to_xero else None,
     )
     db.add(bucket)
+    await changes.mark_changed(db, current_user.id, changes.EXPENSE_BUCKET, changes.OBLIGATION)
     await db.commit()
     await db.refresh(bucket)
 
@@ -138,6 +140,7 @@ async def update_expense_bucket(
     if bucket.xero_contact_id and sync_to_xero:
         bucket.sync_status = "pending_push"
 
+    await changes.mark_changed(db, current_user.id, changes.EXPENSE_BUCKET, changes.OBLIGATION)
     await db.commit()
     await db.refresh(bucket)
 
@@ -195,6 +198,7 @@ async def delete_expense_bucket(
     await obligation_svc.delete_obligations_for_expense(bucket_id)
 
     await db.delete(bucket)
+    await changes.mark_changed(db, current_user.id, changes.EXPENSE_BUCKET, changes.OBLIGATION)
     await db.commit()
 
     return {"message": "Expense bucket deleted successfully"}
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.data.models import Client
 from app.data.client_utils import ensure_client_has_canonical_structure
+from app.detection import changes
 
 
 async def backfill_client_canonical_structure(
@@ -45,6 +46,7 @@ async def backfill_client_canonical_structure(
         stats["total_clients"] = len(clients)
 
         # Update each client
+        updated_user_ids = set()
         for client in clients:
             try:
                 # Check if client needs updates
@@ -59,10 +61,14 @@ async def backfill_client_canonical_structure(
                 if needs_update:
                     ensure_client_has_canonical_structure(client)
                     stats["clients_updated"] += 1
+                    updated_user_ids.add(client.user_id)
 
             except Exception as e:
                 stats["errors"].append(f"Client {client.id}: {str(e)}")
 
+        for updated_user_id in sorted(updated_user_ids):
+            await changes.mark_changed(db, updated_user_id, changes.CLIENT)
+
         # Commit changes
         await db.commit()
 
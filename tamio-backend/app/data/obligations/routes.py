@@ -6,15 +6,21 @@ Endpoints for managing the 3-layer expense/obligation architecture:
 - ObligationSchedule (WHEN)
 - PaymentEvent (REALITY)
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import base64
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import DateTime, select, and_, or_, tuple_
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, Optional, Type
 from datetime import date, datetime, timedelta
+from pydantic import BaseModel
 
-from app.database import get_db
+from app.database import ReadSessionLocal, get_db
 from app.data import models
+from app.detection import changes
 from app.data.obligations.schemas import (
     ObligationAgreementCreate,
     ObligationAgreementUpdate,
@@ -44,10 +50,108 @@ from app.schemas.reconciliation import (
     ReconciliationQueueSummary,
 )
 from app.auth.dependencies import get_current_user
+from app.services.reconciliation import bulk_reconcile
 
 router = APIRouter()
 
 
+# ============================================
+# Listing: Keyset Pages and NDJSON Streaming
+# ============================================
+
+# Rows fetched per round trip from the server-side cursor when streaming
+STREAM_CHUNK_SIZE = 500
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+LIMIT_QUERY = Query(None, ge=1, le=1000, description="Page size (all rows when omitted)")
+CURSOR_QUERY = Query(None, description="X-Next-Cursor from the previous page")
+STREAM_QUERY = Query(False, description="Stream rows as NDJSON (one JSON object per line)")
+
+
+def _encode_cursor(sort_value, row_id: str) -> str:
+    """Opaque keyset cursor pointing just after a row."""
+    key = [sort_value.isoformat(), row_id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort_column) -> tuple:
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        parse = datetime.fromisoformat if isinstance(sort_column.type, DateTime) else date.fromisoformat
+        return parse(sort_value), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _keyset(query, sort_column, id_column, descending: bool = False, cursor: Optional[str] = None):
+    """Order query by (sort_column, id_column) and start it just after cursor."""
+    if cursor:
+        key = tuple_(sort_column, id_column)
+        after = tuple_(*_decode_cursor(cursor, sort_column))
+        query = query.where(key < after if descending else key > after)
+    if descending:
+        return query.order_by(sort_column.desc(), id_column.desc())
+    return query.order_by(sort_column.asc(), id_column.asc())
+
+
+def _stream_ndjson(query, schema: Type[BaseModel]) -> StreamingResponse:
+    """
+    Stream query's rows as NDJSON from a server-side cursor.
+
+    The request's session is closed before the body is sent, so the stream
+    opens its own read session. Rows are fetched STREAM_CHUNK_SIZE at a time
+    and serialised one by one, keeping memory flat for any result size.
+    """
+    async def lines():
+        async with ReadSessionLocal() as session:
+            result = await session.stream_scalars(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+            async for row in result:
+                yield schema.model_validate(row).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def _list_rows(
+    db: AsyncSession,
+    response: Response,
+    query,
+    schema: Type[BaseModel],
+    sort_column,
+    id_column,
+    descending: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+):
+    """
+    Run a listing query as a full list, a keyset page or an NDJSON stream.
+
+    Rows are ordered by (sort_column, id_column) and start after cursor.
+    With limit, at most limit rows are returned and X-Next-Cursor is set
+    when more follow. With stream, rows (up to limit) are streamed instead
+    of being built into one response list.
+    """
+    query = _keyset(query, sort_column, id_column, descending, cursor)
+
+    if stream:
+        return _stream_ndjson(query.limit(limit) if limit else query, schema)
+
+    if limit is None:
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    result = await db.execute(query.limit(limit + 1))
+    rows = list(result.scalars().all())
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(getattr(rows[-1], sort_column.key), rows[-1].id)
+    return rows
+
+
 # ============================================
 # ObligationAgreement Endpoints (Layer 1)
 # ============================================
@@ -69,6 +173,7 @@ async def create_obligation_agreement(
     db_obligation = models.ObligationAgreement(**obligation_data)
 
     db.add(db_obligation)
+    await changes.mark_changed(db, current_user.id, changes.OBLIGATION)
     await db.commit()
     await db.refresh(db_obligation)
 
@@ -77,19 +182,26 @@ async def create_obligation_agreement(
 
 @router.get("/obligations", response_model=List[ObligationAgreementResponse])
 async def list_obligation_agreements(
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     category: Optional[str] = None,
     obligation_type: Optional[str] = None,
     active_only: bool = True,
+    limit: Optional[int] = LIMIT_QUERY,
+    cursor: Optional[str] = CURSOR_QUERY,
+    stream: bool = STREAM_QUERY,
     db: AsyncSession = Depends(get_db)
 ):
     """
-    List all obligation agreements for the authenticated user.
+    List all obligation agreements for the authenticated user, newest first.
 
     Filters:
     - category: Filter by expense category (payroll, rent, etc.)
     - obligation_type: Filter by type (subscription, vendor_bill, etc.)
     - active_only: Only show active obligations (end_date is null or in future)
+
+    Pass limit for keyset pages (follow X-Next-Cursor with cursor) or
+    stream=true for NDJSON.
     """
     query = select(models.ObligationAgreement).where(
         models.ObligationAgreement.user_id == current_user.id
@@ -110,12 +222,11 @@ async def list_obligation_agreements(
             )
         )
 
-    query = query.order_by(models.ObligationAgreement.created_at.desc())
-
-    result = await db.execute(query)
-    obligations = result.scalars().all()
-
-    return obligations
+    return await _list_rows(
+        db, response, query, ObligationAgreementResponse,
+        models.ObligationAgreement.created_at, models.ObligationAgreement.id,
+        descending=True, limit=limit, cursor=cursor, stream=stream,
+    )
 
 
 @router.get("/obligations/{obligation_id}", response_model=ObligationFull)
@@ -188,6 +299,7 @@ async def update_obligation_agreement(
     for field, value in update_data.items():
         setattr(obligation, field, value)
 
+    await changes.mark_changed(db, current_user.id, changes.OBLIGATION)
     await db.commit()
     await db.refresh(obligation)
 
@@ -224,6 +336,7 @@ async def delete_obligation_agreement(
         )
 
     await db.delete(obligation)
+    await changes.mark_changed(db, current_user.id, changes.OBLIGATION)
     await db.commit()
 
 
@@ -262,9 +375,10 @@ async def create_obligation_schedule(
         )
 
     # Create schedule
-    db_schedule = models.ObligationSchedule(**schedule.model_dump())
+    db_schedule = models.ObligationSchedule(**schedule.model_dump(), user_id=obligation.user_id)
 
     db.add(db_schedule)
+    await changes.mark_changed(db, current_user.id, changes.OBLIGATION)
     await db.commit()
     await db.refresh(db_schedule)
 
@@ -273,24 +387,31 @@ async def create_obligation_schedule(
 
 @router.get("/schedules", response_model=List[ObligationScheduleResponse])
 async def list_obligation_schedules(
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     obligation_id: Optional[str] = None,
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     schedule_status: Optional[str] = None,
+    limit: Optional[int] = LIMIT_QUERY,
+    cursor: Optional[str] = CURSOR_QUERY,
+    stream: bool = STREAM_QUERY,
     db: AsyncSession = Depends(get_db)
 ):
     """
-    List scheduled payments for the authenticated user.
+    List scheduled payments for the authenticated user by due date.
 
     Filters:
     - obligation_id: Get schedules for specific obligation
     - from_date / to_date: Filter by due date range
     - schedule_status: Filter by status (scheduled, due, paid, overdue, cancelled)
+
+    Pass limit for keyset pages (follow X-Next-Cursor with cursor) or
+    stream=true for NDJSON.
     """
-    # Join with ObligationAgreement to filter by user
-    query = select(models.ObligationSchedule).join(models.ObligationAgreement).where(
-        models.ObligationAgreement.user_id == current_user.id
+    # Schedules carry user_id (no join needed)
+    query = select(models.ObligationSchedule).where(
+        models.ObligationSchedule.user_id == current_user.id
     )
 
     if obligation_id:
@@ -305,12 +426,11 @@ async def list_obligation_schedules(
     if schedule_status:
         query = query.where(models.ObligationSchedule.status == schedule_status)
 
-    query = query.order_by(models.ObligationSchedule.due_date.asc())
-
-    result = await db.execute(query)
-    schedules = result.scalars().all()
-
-    return schedules
+    return await _list_rows(
+        db, response, query, ObligationScheduleResponse,
+        models.ObligationSchedule.due_date, models.ObligationSchedule.id,
+        limit=limit, cursor=cursor, stream=stream,
+    )
 
 
 @router.get("/schedules/{schedule_id}", response_model=ObligationScheduleResponse)
@@ -392,6 +512,7 @@ async def update_obligation_schedule(
     for field, value in update_data.items():
         setattr(schedule, field, value)
 
+    await changes.mark_changed(db, current_user.id, changes.OBLIGATION)
     await db.commit()
     await db.refresh(schedule)
 
@@ -434,6 +555,7 @@ async def delete_obligation_schedule(
         )
 
     await db.delete(schedule)
+    await changes.mark_changed(db, current_user.id, changes.OBLIGATION)
     await db.commit()
 
 
@@ -487,6 +609,7 @@ async def create_payment_event(
             db_payment.reconciled_at = datetime.utcnow()
 
     db.add(db_payment)
+    await changes.mark_changed(db, current_user.id, changes.PAYMENT, changes.OBLIGATION)
     await db.commit()
     await db.refresh(db_payment)
 
@@ -495,22 +618,29 @@ async def create_payment_event(
 
 @router.get("/payments", response_model=List[PaymentEventResponse])
 async def list_payment_events(
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     obligation_id: Optional[str] = None,
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     payment_status: Optional[str] = None,
     reconciled_only: bool = False,
+    limit: Optional[int] = LIMIT_QUERY,
+    cursor: Optional[str] = CURSOR_QUERY,
+    stream: bool = STREAM_QUERY,
     db: AsyncSession = Depends(get_db)
 ):
     """
-    List actual payment events for the authenticated user.
+    List actual payment events for the authenticated user, latest first.
 
     Filters:
     - obligation_id: Filter by specific obligation
     - from_date / to_date: Filter by payment date range
     - payment_status: Filter by status (pending, completed, failed, reversed)
     - reconciled_only: Only show reconciled payments
+
+    Pass limit for keyset pages (follow X-Next-Cursor with cursor) or
+    stream=true for NDJSON.
     """
     query = select(models.PaymentEvent).where(
         models.PaymentEvent.user_id == current_user.id
@@ -531,12 +661,11 @@ async def list_payment_events(
     if reconciled_only:
         query = query.where(models.PaymentEvent.is_reconciled == True)
 
-    query = query.order_by(models.PaymentEvent.payment_date.desc())
-
-    result = await db.execute(query)
-    payments = result.scalars().all()
-
-    return payments
+    return await _list_rows(
+        db, response, query, PaymentEventResponse,
+        models.PaymentEvent.payment_date, models.PaymentEvent.id,
+        descending=True, limit=limit, cursor=cursor, stream=stream,
+    )
 
 
 @router.get("/payments/{payment_id}", response_model=PaymentEventResponse)
@@ -610,6 +739,7 @@ async def update_payment_event(
     if updates.is_reconciled and not payment.reconciled_at:
         payment.reconciled_at = datetime.utcnow()
 
+    await changes.mark_changed(db, current_user.id, changes.PAYMENT, changes.OBLIGATION)
     await db.commit()
     await db.refresh(payment)
 
@@ -646,6 +776,7 @@ async def delete_payment_event(
         )
 
     await db.delete(payment)
+    await changes.mark_changed(db, current_user.id, changes.PAYMENT, changes.OBLIGATION)
     await db.commit()
 
 
@@ -719,6 +850,7 @@ async def reconcile_payment_to_schedule(
     # Mark schedule as paid
     schedule.status = "paid"
 
+    await changes.mark_changed(db, current_user.id, changes.PAYMENT, changes.OBLIGATION)
     await db.commit()
     await db.refresh(payment)
 
@@ -727,41 +859,52 @@ async def reconcile_payment_to_schedule(
 
 @router.get("/reconciliation/unreconciled-payments", response_model=List[PaymentEventResponse])
 async def list_unreconciled_payments(
+    response: Response,
     current_user: models.User = Depends(get_current_user),
+    limit: Optional[int] = LIMIT_QUERY,
+    cursor: Optional[str] = CURSOR_QUERY,
+    stream: bool = STREAM_QUERY,
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all payments that haven't been reconciled to a schedule.
+    Get all payments that haven't been reconciled to a schedule, latest first.
+
+    Pass limit for keyset pages (follow X-Next-Cursor with cursor) or
+    stream=true for NDJSON.
     """
     query = select(models.PaymentEvent).where(
         and_(
             models.PaymentEvent.user_id == current_user.id,
             models.PaymentEvent.is_reconciled == False
         )
-    ).order_by(models.PaymentEvent.payment_date.desc())
-
-    result = await db.execute(query)
-    payments = result.scalars().all()
+    )
 
-    return payments
+    return await _list_rows(
+        db, response, query, PaymentEventResponse,
+        models.PaymentEvent.payment_date, models.PaymentEvent.id,
+        descending=True, limit=limit, cursor=cursor, stream=stream,
+    )
 
 
 @router.get("/reconciliation/unpaid-schedules", response_model=List[ObligationScheduleResponse])
 async def list_unpaid_schedules(
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     overdue_only: bool = False,
+    limit: Optional[int] = LIMIT_QUERY,
+    cursor: Optional[str] = CURSOR_QUERY,
+    stream: bool = STREAM_QUERY,
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all scheduled payments that haven't been paid yet.
+    Get all scheduled payments that haven't been paid yet, by due date.
 
-    Use overdue_only=true to only see overdue payments.
+    Use overdue_only=true to only see overdue payments. Pass limit for
+    keyset pages (follow X-Next-Cursor with cursor) or stream=true for NDJSON.
     """
-    query = select(models.ObligationSchedule).join(
-        models.ObligationAgreement
-    ).where(
+    query = select(models.ObligationSchedule).where(
         and_(
-            models.ObligationAgreement.user_id == current_user.id,
+            models.ObligationSchedule.user_id == current_user.id,
             models.ObligationSchedule.status.in_(["scheduled", "due", "overdue"])
         )
     )
@@ -775,12 +918,11 @@ async def list_unpaid_schedules(
             )
         )
 
-    query = query.order_by(models.ObligationSchedule.due_date.asc())
-
-    result = await db.execute(query)
-    schedules = result.scalars().all()
-
-    return schedules
+    return await _list_rows(
+        db, response, query, ObligationScheduleResponse,
+        models.ObligationSchedule.due_date, models.ObligationSchedule.id,
+        limit=limit, cursor=cursor, stream=stream,
+    )
 
 
 # ============================================
@@ -887,11 +1029,9 @@ async def get_reconciliation_suggestions(
     unreconciled_payments = payments_result.scalars().all()
 
     # Get unpaid schedules with their obligations
-    schedules_query = select(models.ObligationSchedule).join(
-        models.ObligationAgreement
-    ).where(
+    schedules_query = select(models.ObligationSchedule).where(
         and_(
-            models.ObligationAgreement.user_id == current_user.id,
+            models.ObligationSchedule.user_id == current_user.id,
             models.ObligationSchedule.status.in_(["scheduled", "due", "overdue"])
         )
     ).options(
@@ -1043,6 +1183,7 @@ async def approve_reconciliation(
 
     schedule.status = "paid"
 
+    await changes.mark_changed(db, current_user.id, changes.PAYMENT, changes.OBLIGATION)
     await db.commit()
     await db.refresh(payment)
 
@@ -1059,68 +1200,19 @@ async def approve_bulk_reconciliation(
     Approve multiple reconciliation matches at once.
 
     Useful for quickly processing AI suggestions that have been reviewed.
+    All matches are validated and applied together (see
+    app.services.reconciliation); results lists the outcome of each match.
     """
-    successful = 0
-    failed = 0
-    errors = []
-
-    for match in request.matches:
-        try:
-            # Get payment
-            payment_query = select(models.PaymentEvent).where(
-                and_(
-                    models.PaymentEvent.id == match.payment_id,
-                    models.PaymentEvent.user_id == current_user.id
-                )
-            )
-            result = await db.execute(payment_query)
-            payment = result.scalar_one_or_none()
-
-            if not payment:
-                failed += 1
-                errors.append(f"Payment {match.payment_id} not found or not authorized")
-                continue
-
-            # Get schedule with obligation
-            schedule_query = select(models.ObligationSchedule).join(
-                models.ObligationAgreement
-            ).where(
-                and_(
-                    models.ObligationSchedule.id == match.schedule_id,
-                    models.ObligationAgreement.user_id == current_user.id
-                )
-            )
-            result = await db.execute(schedule_query)
-            schedule = result.scalar_one_or_none()
-
-            if not schedule:
-                failed += 1
-                errors.append(f"Schedule {match.schedule_id} not found or not authorized")
-                continue
-
-            # Calculate variance
-            if payment.amount and schedule.estimated_amount:
-                payment.variance_vs_expected = payment.amount - schedule.estimated_amount
-
-            # Link and reconcile
-            payment.schedule_id = match.schedule_id
-            payment.obligation_id = schedule.obligation_id
-            payment.is_reconciled = True
-            payment.reconciled_at = datetime.utcnow()
-
-            schedule.status = "paid"
-            successful += 1
-
-        except Exception as e:
-            failed += 1
-            errors.append(f"Error processing {match.payment_id}: {str(e)}")
-
+    results = await bulk_reconcile(db, current_user.id, request.matches)
+    await changes.mark_changed(db, current_user.id, changes.PAYMENT, changes.OBLIGATION)
     await db.commit()
 
+    failures = [r for r in results if not r.success]
     return BulkReconciliationResult(
-        successful=successful,
-        failed=failed,
-        errors=errors
+        successful=len(results) - len(failures),
+        failed=len(failures),
+        errors=[r.error for r in failures],
+        results=results,
     )
 
 
@@ -1160,6 +1252,7 @@ async def reject_reconciliation(
         existing_notes = payment.notes or ""
         payment.notes = f"{existing_notes}\n[Reconciliation rejected: {request.reason}]".strip()
 
+    await changes.mark_changed(db, current_user.id, changes.PAYMENT, changes.OBLIGATION)
     await db.commit()
     await db.refresh(payment)
 
@@ -1232,6 +1325,7 @@ async def revert_reconciliation(
     payment.reconciled_at = None
     payment.variance_vs_expected = None
 
+    await changes.mark_changed(db, current_user.id, changes.PAYMENT, changes.OBLIGATION)
     await db.commit()
     await db.refresh(payment)
 
@@ -10,6 +10,7 @@ from app.data.onboarding import OnboardingCreate, OnboardingResponse
 from app.data.balances.schemas import CashPositionResponse
 from app.data.migration import backfill_client_canonical_structure
 from app.services.obligations import ObligationService
+from app.detection import changes
 
 router = APIRouter()
 
@@ -132,6 +133,9 @@ async def complete_onboarding(
         db.add(obligation)
         obligations.append(obligation)
 
+    await changes.mark_changed(
+        db, user.id, changes.CASH_ACCOUNT, changes.CLIENT, changes.EXPENSE_BUCKET, changes.OBLIGATION
+    )
     await db.commit()
 
     # Refresh all objects
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.data.users.models import User
+from app.detection import changes
 from .models import UserConfiguration, SafetyMode
 from .schemas import (
     UserConfigurationCreate,
@@ -84,6 +85,7 @@ async def create_user_configuration(
 
     db.add(config)
     await db.flush()
+    await changes.mark_changed(db, data.user_id, changes.CONFIG)
 
     return config
 
@@ -117,6 +119,7 @@ async def update_user_configuration(
         setattr(config, field, value)
 
     await db.flush()
+    await changes.mark_changed(db, user_id, changes.CONFIG)
 
     return config
 
@@ -142,6 +145,7 @@ async def delete_user_configuration(
 
     await db.delete(config)
     await db.flush()
+    await changes.mark_changed(db, user_id, changes.CONFIG)
 
     return {"status": "deleted", "user_id": user_id}
 
@@ -2,21 +2,77 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import settings
+from app.db_pool import InstrumentedQueuePool, pool_stats
+from app.query_metrics import instrument_engine
+
+
+def _async_url(url: str) -> str:
+    # Railway (and most providers) give postgresql:// but asyncpg needs postgresql+asyncpg://
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+def _create_engine(url: str):
+    url = _async_url(url)
+    kwargs = {}
+    if url.startswith("postgresql+asyncpg://"):
+        kwargs["connect_args"] = {
+            # asyncpg's own per-connection statement cache; 0 behind PgBouncer transaction pooling
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            # SQLAlchemy's per-connection cache of prepared statements
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    async_engine = create_async_engine(
+        url,
+        echo=settings.APP_ENV == "development",
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        **kwargs,
+    )
+    instrument_engine(async_engine)
+    return async_engine
+
+
+def create_rate_limit_engine():
+    """
+    Small engine for the shared rate limit buckets.
+
+    Kept apart from the request pool, with short pool, connect and
+    statement timeouts, so a slow or unreachable database fails a limiter
+    check within RATE_LIMIT_DB_TIMEOUT instead of stalling every request
+    on DB_POOL_TIMEOUT.
+    """
+    url = _async_url(settings.DATABASE_URL)
+    kwargs = {}
+    if url.startswith("postgresql+asyncpg://"):
+        kwargs["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "timeout": settings.RATE_LIMIT_DB_TIMEOUT,          # Connect
+            "command_timeout": settings.RATE_LIMIT_DB_TIMEOUT,  # Each statement
+        }
+    return create_async_engine(
+        url,
+        future=True,
+        pool_size=settings.RATE_LIMIT_DB_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=settings.RATE_LIMIT_DB_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        **kwargs,
+    )
 
-# Railway (and most providers) give postgresql:// but asyncpg needs postgresql+asyncpg://
-_db_url = settings.DATABASE_URL
-if _db_url.startswith("postgresql://"):
-    _db_url = _db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
 
 # Create async engine
-engine = create_async_engine(
-    _db_url,
-    echo=settings.APP_ENV == "development",
-    future=True,
-    pool_pre_ping=True,
-    pool_size=getattr(settings, "DB_POOL_SIZE", 5),
-    max_overflow=getattr(settings, "DB_MAX_OVERFLOW", 10),
-)
+engine = _create_engine(settings.DATABASE_URL)
+
+# Read replica for read-only sessions; the primary when none is configured
+read_engine = _create_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -27,6 +83,15 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Session factory for read-only work (see get_read_db)
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 # Alias for backward compatibility
 async_session_maker = AsyncSessionLocal
 
@@ -54,6 +119,30 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_read_db() -> AsyncSession:
+    """
+    Dependency for read-only endpoints.
+
+    Uses the read replica when DATABASE_READ_URL is set and never commits;
+    the transaction is rolled back when the session closes. Replicas may lag
+    the primary slightly, so only use this where that is acceptable.
+
+    Usage in FastAPI endpoints:
+        @app.get("/endpoint")
+        async def endpoint(db: AsyncSession = Depends(get_read_db)):
+            ...
+    """
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+def get_pool_stats() -> dict:
+    """Pool usage and checkout latency for the primary and read engines."""
+    stats = {"primary": pool_stats(engine.pool)}
+    stats["replica"] = pool_stats(read_engine.pool) if read_engine is not engine else None
+    return stats
+
+
 async def init_db():
     """Initialize database tables (for development only)."""
     async with engine.begin() as conn:
@@ -0,0 +1,100 @@
+"""
+Connection pool instrumentation.
+
+Engines in app/database.py use InstrumentedQueuePool, which times every
+checkout (waiting for a free connection, opening a new one, and the
+pre-ping) and counts pool timeouts. Together with the pool's own
+checked-out count this shows whether requests queue on the pool and how
+close it is to its size + max_overflow limit.
+"""
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Recent checkout latencies kept for percentiles
+LATENCY_WINDOW = 1000
+
+
+class PoolMetrics:
+    """Checkout latency and timeout counters for one pool."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+        self._recent.append(seconds)
+
+    def record_timeout(self) -> None:
+        self.timeouts += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout latency in self.metrics."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def pool_stats(pool) -> Dict:
+    """Snapshot of a pool's size, usage and checkout latency."""
+    stats = {"pool_class": type(pool).__name__}
+    if not hasattr(pool, "checkedout"):
+        return stats
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    stats.update({
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+    })
+
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update({
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "checkout_avg_ms": _ms(metrics.total_wait / metrics.checkouts) if metrics.checkouts else None,
+            "checkout_p95_ms": _ms(metrics.percentile(0.95)),
+            "checkout_max_ms": _ms(metrics.max_wait) if metrics.checkouts else None,
+        })
+    return stats
@@ -0,0 +1,165 @@
+"""
+Detection change tracking - the per-tenant dirty set.
+
+Code that changes detection inputs calls mark_changed in the same
+transaction, naming the kind of data that changed. The scheduled sweeps
+read the changes since their last run and run only the detectors those
+entity types can affect (AFFECTED_DETECTIONS); tenants with no changes
+are skipped.
+
+One row per (user, entity type) holds the latest change time, so the
+table stays small however often data changes.
+
+Sweeps read changes by writing transaction, not by time: changed_at is
+stamped when mark_changed runs, and a long writer can commit after a
+sweep that started later has already read the table. Each row records
+its writer's transaction id (change_xid). A sweep first reads
+change_watermark - the oldest transaction still running - then the
+changes; the next sweep reads every row with change_xid at or above that
+watermark, which includes any writer that had not committed yet.
+"""
+
+from datetime import datetime
+from typing import Collection, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import BigInteger, Text, cast, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import DetectionChange, DetectionType
+
+# Entity types
+CLIENT = "client"
+EXPENSE_BUCKET = "expense_bucket"
+OBLIGATION = "obligation"          # Agreements and schedules
+PAYMENT = "payment"                # Payment events and reconciliation
+CASH_ACCOUNT = "cash_account"      # Cash position
+CONFIG = "config"                  # Detection settings (UserConfiguration)
+
+# Detectors whose inputs include each entity type
+AFFECTED_DETECTIONS: Dict[str, Set[DetectionType]] = {
+    CLIENT: {
+        DetectionType.CLIENT_CHURN,
+        DetectionType.LATE_PAYMENT,
+    },
+    EXPENSE_BUCKET: {
+        DetectionType.UNEXPECTED_EXPENSE,
+        DetectionType.VENDOR_TERMS_EXPIRING,
+        DetectionType.PAYROLL_SAFETY,
+        DetectionType.HEADCOUNT_CHANGE,
+    },
+    OBLIGATION: {
+        DetectionType.LATE_PAYMENT,
+        DetectionType.UNEXPECTED_REVENUE,
+        DetectionType.REVENUE_VARIANCE,
+        DetectionType.PAYMENT_TIMING_CONFLICT,
+        DetectionType.VENDOR_TERMS_EXPIRING,
+        DetectionType.STATUTORY_DEADLINE,
+        DetectionType.BUFFER_BREACH,
+        DetectionType.RUNWAY_THRESHOLD,
+        DetectionType.PAYROLL_SAFETY,
+    },
+    PAYMENT: {
+        DetectionType.UNEXPECTED_REVENUE,
+        DetectionType.UNEXPECTED_EXPENSE,
+        DetectionType.REVENUE_VARIANCE,
+    },
+    CASH_ACCOUNT: {
+        DetectionType.LATE_PAYMENT,
+        DetectionType.PAYMENT_TIMING_CONFLICT,
+        DetectionType.BUFFER_BREACH,
+        DetectionType.RUNWAY_THRESHOLD,
+        DetectionType.PAYROLL_SAFETY,
+    },
+    CONFIG: {
+        DetectionType.LATE_PAYMENT,
+        DetectionType.UNEXPECTED_EXPENSE,
+        DetectionType.PAYMENT_TIMING_CONFLICT,
+        DetectionType.BUFFER_BREACH,
+        DetectionType.PAYROLL_SAFETY,
+    },
+}
+
+
+# Current transaction's id, and the oldest transaction id still running
+# (every lower id has committed or aborted), as 64-bit integers
+_CURRENT_XID = cast(cast(func.pg_current_xact_id(), Text), BigInteger)
+_RUNNING_XMIN = cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+
+def affected_detections(
+    entity_types: Iterable[str],
+    within: Optional[Collection[DetectionType]] = None,
+) -> List[DetectionType]:
+    """
+    Detection types affected by changes to the given entity types.
+
+    Unknown entity types affect every detector. The result is in
+    DetectionType order, limited to `within` if given.
+    """
+    affected: Set[DetectionType] = set()
+    for entity_type in entity_types:
+        affected |= AFFECTED_DETECTIONS.get(entity_type, set(DetectionType))
+    return [t for t in DetectionType if t in affected and (within is None or t in within)]
+
+
+async def mark_changed(db: AsyncSession, user_id: str, *entity_types: str) -> None:
+    """
+    Record that the user's data of the given entity types changed.
+
+    Runs in the caller's transaction and does not commit. The rows stay
+    locked until then, so other writers marking the same user and entity
+    type wait; long transactions should mark near their end.
+    """
+    if not entity_types:
+        return
+    now = datetime.utcnow()
+    stmt = pg_insert(DetectionChange).values([
+        {"user_id": user_id, "entity_type": entity_type, "changed_at": now, "change_xid": _CURRENT_XID}
+        for entity_type in sorted(set(entity_types))
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DetectionChange.user_id, DetectionChange.entity_type],
+        set_={"changed_at": stmt.excluded.changed_at, "change_xid": stmt.excluded.change_xid},
+    )
+    await db.execute(stmt)
+
+
+async def change_watermark(db: AsyncSession) -> int:
+    """
+    Watermark for the next load_changes(since_xid=...).
+
+    Read before loading changes: transactions below it had finished, so
+    their changes are visible to the load that follows.
+    """
+    result = await db.execute(select(_RUNNING_XMIN))
+    return result.scalar_one()
+
+
+async def load_changes(
+    db: AsyncSession,
+    since: Optional[datetime] = None,
+    user_ids: Optional[Collection[str]] = None,
+    since_xid: Optional[int] = None,
+) -> Dict[str, Set[str]]:
+    """
+    Entity types changed, keyed by user id.
+
+    since_xid (a change_watermark) selects changes from transactions that
+    had not finished when it was read. since (naive UTC) selects by
+    mark_changed time; only use it for writers known to have committed,
+    such as a sync the caller just ran.
+    """
+    query = select(DetectionChange.user_id, DetectionChange.entity_type)
+    if since_xid is not None:
+        query = query.where(DetectionChange.change_xid >= since_xid)
+    if since is not None:
+        query = query.where(DetectionChange.changed_at >= since)
+    if user_ids is not None:
+        query = query.where(DetectionChange.user_id.in_(set(user_ids)))
+    result = await db.execute(query)
+
+    changes: Dict[str, Set[str]] = {}
+    for row in result.all():
+        changes.setdefault(row.user_id, set()).add(row.entity_type)
+    return changes
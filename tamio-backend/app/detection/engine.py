@@ -21,7 +21,7 @@ This engine implements all 12 detection types:
 
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Set
 import logging
 
 from sqlalchemy import select, func, and_, or_
@@ -49,6 +49,9 @@ class DetectionEngine:
         self.db = db
         self.user_id = user_id
         self._config: Optional[UserConfiguration] = None
+        # Detection types whose rule raised in this engine's runs; the
+        # other rules still run, so callers check this to retry them
+        self.failed_types: Set[DetectionType] = set()
 
     async def get_config(self) -> UserConfiguration:
         """Get user configuration, caching for performance."""
@@ -77,6 +80,7 @@ class DetectionEngine:
                 new_alerts.extend(alerts)
             except Exception as e:
                 logger.error(f"Detection {rule.detection_type} failed for user {self.user_id}: {e}")
+                self.failed_types.add(rule.detection_type)
                 # Continue with other detections
 
         return new_alerts
@@ -104,16 +108,26 @@ class DetectionEngine:
 
     async def run_critical_detections(self) -> List[DetectionAlert]:
         """Run only critical detections (payroll_safety, buffer_breach)."""
-        config = await self.get_config()
-        critical_types = [
+        return await self.run_detection_types([
             DetectionType.PAYROLL_SAFETY,
             DetectionType.BUFFER_BREACH,
-        ]
+        ])
+
+    async def run_detection_types(self, detection_types: Sequence[DetectionType]) -> List[DetectionAlert]:
+        """
+        Run the enabled rules of the given detection types.
+
+        A failing rule does not stop the others; its type is added to
+        failed_types.
+        """
+        if not detection_types:
+            return []
+        config = await self.get_config()
 
         result = await self.db.execute(
             select(DetectionRule)
             .where(DetectionRule.user_id == self.user_id)
-            .where(DetectionRule.detection_type.in_(critical_types))
+            .where(DetectionRule.detection_type.in_(list(detection_types)))
             .where(DetectionRule.enabled == True)
         )
         rules = result.scalars().all()
@@ -126,7 +140,8 @@ class DetectionEngine:
                     self.db.add(alert)
                 new_alerts.extend(alerts)
             except Exception as e:
-                logger.error(f"Critical detection {rule.detection_type} failed: {e}")
+                logger.error(f"Detection {rule.detection_type} failed for user {self.user_id}: {e}")
+                self.failed_types.add(rule.detection_type)
 
         return new_alerts
 
@@ -198,7 +213,7 @@ class DetectionEngine:
         result = await self.db.execute(
             select(ObligationSchedule)
             .join(ObligationAgreement)
-            .where(ObligationAgreement.user_id == self.user_id)
+            .where(ObligationSchedule.user_id == self.user_id)
             .where(ObligationAgreement.obligation_type == "revenue")
             .where(ObligationSchedule.status.in_(["scheduled", "due"]))
             .where(ObligationSchedule.due_date <= cutoff_date)
@@ -222,7 +237,7 @@ class DetectionEngine:
             select(ObligationSchedule)
             .join(ObligationAgreement)
             .outerjoin(ExpenseBucket, ObligationAgreement.expense_bucket_id == ExpenseBucket.id)
-            .where(ObligationAgreement.user_id == self.user_id)
+            .where(ObligationSchedule.user_id == self.user_id)
             .where(ObligationAgreement.obligation_type != "revenue")
             .where(ObligationSchedule.due_date >= today)
             .where(ObligationSchedule.due_date <= today + timedelta(days=14))
@@ -648,7 +663,7 @@ class DetectionEngine:
         expected_result = await self.db.execute(
             select(func.sum(ObligationSchedule.estimated_amount))
             .join(ObligationAgreement)
-            .where(ObligationAgreement.user_id == self.user_id)
+            .where(ObligationSchedule.user_id == self.user_id)
             .where(ObligationAgreement.obligation_type == "revenue")
             .where(ObligationSchedule.due_date >= month_start)
             .where(ObligationSchedule.due_date <= month_end)
@@ -742,7 +757,7 @@ class DetectionEngine:
             result = await self.db.execute(
                 select(func.sum(ObligationSchedule.estimated_amount))
                 .join(ObligationAgreement)
-                .where(ObligationAgreement.user_id == self.user_id)
+                .where(ObligationSchedule.user_id == self.user_id)
                 .where(ObligationAgreement.obligation_type != "revenue")
                 .where(ObligationSchedule.due_date >= week_start)
                 .where(ObligationSchedule.due_date <= week_end)
@@ -808,7 +823,7 @@ class DetectionEngine:
         result = await self.db.execute(
             select(ObligationSchedule)
             .join(ObligationAgreement)
-            .where(ObligationAgreement.user_id == self.user_id)
+            .where(ObligationSchedule.user_id == self.user_id)
             .where(ObligationAgreement.obligation_type != "revenue")
             .where(ObligationSchedule.due_date >= today)
             .where(ObligationSchedule.due_date <= cutoff)
@@ -892,7 +907,7 @@ class DetectionEngine:
         result = await self.db.execute(
             select(ObligationSchedule)
             .join(ObligationAgreement)
-            .where(ObligationAgreement.user_id == self.user_id)
+            .where(ObligationSchedule.user_id == self.user_id)
             .where(ObligationAgreement.obligation_type == "tax_obligation")
             .where(ObligationSchedule.due_date >= today)
             .where(ObligationSchedule.due_date <= cutoff)
@@ -976,7 +991,7 @@ class DetectionEngine:
         burn_result = await self.db.execute(
             select(func.sum(ObligationSchedule.estimated_amount))
             .join(ObligationAgreement)
-            .where(ObligationAgreement.user_id == self.user_id)
+            .where(ObligationSchedule.user_id == self.user_id)
             .where(ObligationAgreement.obligation_type != "revenue")
             .where(ObligationSchedule.due_date >= month_start)
             .where(ObligationSchedule.due_date <= month_end)
@@ -1079,7 +1094,7 @@ class DetectionEngine:
         expense_result = await self.db.execute(
             select(func.sum(ObligationSchedule.estimated_amount))
             .join(ObligationAgreement)
-            .where(ObligationAgreement.user_id == self.user_id)
+            .where(ObligationSchedule.user_id == self.user_id)
             .where(ObligationAgreement.obligation_type != "revenue")
             .where(ObligationSchedule.due_date >= lookback_start)
             .where(ObligationSchedule.due_date <= today)
@@ -1090,7 +1105,7 @@ class DetectionEngine:
         revenue_result = await self.db.execute(
             select(func.sum(ObligationSchedule.estimated_amount))
             .join(ObligationAgreement)
-            .where(ObligationAgreement.user_id == self.user_id)
+            .where(ObligationSchedule.user_id == self.user_id)
             .where(ObligationAgreement.obligation_type == "revenue")
             .where(ObligationSchedule.due_date >= lookback_start)
             .where(ObligationSchedule.due_date <= today)
@@ -1189,7 +1204,7 @@ class DetectionEngine:
             select(ObligationSchedule)
             .join(ObligationAgreement)
             .join(ExpenseBucket, ObligationAgreement.expense_bucket_id == ExpenseBucket.id)
-            .where(ObligationAgreement.user_id == self.user_id)
+            .where(ObligationSchedule.user_id == self.user_id)
             .where(ExpenseBucket.category == "payroll")
             .where(ObligationSchedule.due_date >= today)
             .where(ObligationSchedule.due_date <= check_window)
@@ -1217,8 +1232,7 @@ class DetectionEngine:
             # Get obligations due before this payroll
             obligations_result = await self.db.execute(
                 select(func.sum(ObligationSchedule.estimated_amount))
-                .join(ObligationAgreement)
-                .where(ObligationAgreement.user_id == self.user_id)
+                .where(ObligationSchedule.user_id == self.user_id)
                 .where(ObligationSchedule.due_date >= today)
                 .where(ObligationSchedule.due_date < payroll_date)
                 .where(ObligationSchedule.status.in_(["scheduled", "due"]))
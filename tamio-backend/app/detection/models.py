@@ -8,6 +8,7 @@ from app.models.detection import (
     AlertStatus,
     DetectionRule,
     DetectionAlert,
+    DetectionChange,
 )
 
 __all__ = [
@@ -16,4 +17,5 @@ __all__ = [
     "AlertStatus",
     "DetectionRule",
     "DetectionAlert",
+    "DetectionChange",
 ]
@@ -6,59 +6,47 @@ Background job scheduler that runs detection at appropriate intervals:
 - Routine rules (late_payments, unexpected_expenses): every hour
 - Scheduled rules (statutory_deadlines): daily at 6am
 
+Critical and routine runs only check users whose data changed since the
+previous run, for the detectors those changes affect (app/detection/changes.py).
+
 Uses APScheduler for job scheduling.
-Sends email notifications when alerts are created.
+Queues alert notifications in the outbox; a separate job delivers them.
 """
 
 import logging
 from datetime import datetime
-from typing import Optional, List, Callable, Awaitable
+from typing import Optional, Dict, List, Set, Callable, Awaitable, Sequence, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import async_session_maker
 from app.data.users.models import User
 from app.audit.services import AuditService
+from app.query_metrics import tracked_job
+from .changes import affected_detections, change_watermark, load_changes
 from .engine import DetectionEngine
 from .models import DetectionType, DetectionAlert
 
 logger = logging.getLogger(__name__)
 
 
-async def _send_alert_notifications(db: AsyncSession, alerts: List[DetectionAlert]) -> dict:
+async def _enqueue_alert_notifications(db: AsyncSession, alerts: List[DetectionAlert]) -> int:
     """
-    Send notifications for newly created alerts via all channels (email + Slack).
+    Queue notifications for newly created alerts in the caller's transaction.
 
-    Returns dict with counts for each channel.
-    """
-    results = {
-        "email_sent": 0,
-        "slack_sent": 0,
-        "total": 0,
-    }
+    Delivery happens in the separate notification dispatch job, so detection
+    runs never wait on email/Slack providers.
 
+    Returns number of outbox rows queued.
+    """
     if not alerts:
-        return results
-
-    from app.notifications.service import get_notification_service
+        return 0
 
-    notification_service = get_notification_service(db)
+    from app.notifications.dispatcher import enqueue_alert_notifications
 
-    for alert in alerts:
-        try:
-            # Send to all configured channels
-            channel_results = await notification_service.notify_alert_created_all_channels(alert)
-            if channel_results.get("email"):
-                results["email_sent"] += 1
-            if channel_results.get("slack"):
-                results["slack_sent"] += 1
-            if channel_results.get("email") or channel_results.get("slack"):
-                results["total"] += 1
-        except Exception as e:
-            logger.error(f"Failed to send notification for alert {alert.id}: {e}")
-
-    return results
+    return await enqueue_alert_notifications(db, alerts)
 
 
 # Detection type categories for scheduling
@@ -97,49 +85,122 @@ class DetectionScheduler:
         self._last_critical_run: Optional[datetime] = None
         self._last_routine_run: Optional[datetime] = None
         self._last_daily_run: Optional[datetime] = None
+        # change_watermark read by each sweep's last plan (app/detection/changes.py)
+        self._watermarks: Dict[str, Optional[int]] = {"critical": None, "routine": None}
+        # Users whose last targeted sweep failed get a full sweep next run
+        self._retry_users: Dict[str, Set[str]] = {"critical": set(), "routine": set()}
+
+    async def _plan_sweep(
+        self,
+        db: AsyncSession,
+        sweep: str,
+        since: Optional[datetime],
+        now: datetime,
+        detection_types: List[DetectionType],
+    ) -> Tuple[Optional[Dict[str, List[DetectionType]]], int]:
+        """
+        Detection types to run per user, from changes since the last run.
+
+        Returns (plan, watermark). The plan is None for a full sweep: on
+        the first run, and on the first run of a new day, since due-date
+        windows move with the date. The sweep's state is left alone; see
+        _advance_sweep.
+        """
+        watermark = await change_watermark(db)
+        since_xid = self._watermarks[sweep]
+        if since is None or since_xid is None or since.date() != now.date():
+            return None, watermark
+
+        changes = await load_changes(db, since_xid=since_xid)
+        plan = {}
+        for user_id, entity_types in changes.items():
+            types = affected_detections(entity_types, within=detection_types)
+            if types:
+                plan[user_id] = types
+        for user_id in self._retry_users[sweep]:
+            plan[user_id] = list(detection_types)
+        return plan, watermark
+
+    def _advance_sweep(self, sweep: str, now: datetime, watermark: int) -> Tuple[Optional[datetime], Optional[int], Set[str]]:
+        """
+        Move the sweep's last run and watermark on and take its retry users.
+
+        Called once the plan has loaded. Returns the previous state, to
+        hand back to _rewind_sweep if the run then fails.
+        """
+        previous = (getattr(self, f"_last_{sweep}_run"), self._watermarks[sweep], self._retry_users[sweep])
+        setattr(self, f"_last_{sweep}_run", now)
+        self._watermarks[sweep] = watermark
+        self._retry_users[sweep] = set()
+        return previous
+
+    def _rewind_sweep(self, sweep: str, previous: Tuple[Optional[datetime], Optional[int], Set[str]]) -> None:
+        """Undo _advance_sweep after a failed run, so the next run reads the same changes."""
+        last_run, watermark, retried = previous
+        setattr(self, f"_last_{sweep}_run", last_run)
+        self._watermarks[sweep] = watermark
+        self._retry_users[sweep] |= retried
 
     async def run_critical_detections(self) -> dict:
         """
-        Run critical detections for all users.
+        Run critical detections for users whose data changed.
 
         Should be scheduled every 5 minutes.
         Critical detections: payroll_safety, buffer_breach
 
+        Only users with changes since the last run are checked, for the
+        critical types those changes affect (see app/detection/changes.py).
+        The first run of each day checks everyone.
+
         Returns summary of alerts created.
         """
         logger.info("Starting critical detection run")
-        self._last_critical_run = datetime.utcnow()
+        since = self._last_critical_run
+        started = datetime.utcnow()
+        previous = None
 
         summary = {
             "run_type": "critical",
-            "started_at": self._last_critical_run.isoformat(),
+            "started_at": started.isoformat(),
+            "sweep": "full",
             "users_processed": 0,
             "alerts_created": 0,
-            "notifications_sent": 0,
+            "notifications_queued": 0,
             "errors": [],
         }
 
         async with async_session_maker() as db:
             try:
-                # Get all active users
-                result = await db.execute(select(User.id))
-                user_ids = [row[0] for row in result.fetchall()]
-
-                for user_id in user_ids:
+                plan, watermark = await self._plan_sweep(db, "critical", since, started, CRITICAL_DETECTIONS)
+                previous = self._advance_sweep("critical", started, watermark)
+                if plan is None:
+                    # Get all active users
+                    result = await db.execute(select(User.id))
+                    plan = {row[0]: CRITICAL_DETECTIONS for row in result.fetchall()}
+                else:
+                    summary["sweep"] = "targeted"
+
+                for user_id, detection_types in plan.items():
                     try:
                         engine = DetectionEngine(db, user_id)
-                        alerts = await engine.run_critical_detections()
+                        alerts = await engine.run_detection_types(detection_types)
                         summary["alerts_created"] += len(alerts)
                         summary["users_processed"] += 1
-
-                        # Send notifications for new alerts
+                        if engine.failed_types:
+                            self._retry_users["critical"].add(user_id)
+                            summary["errors"].append({
+                                "user_id": user_id,
+                                "error": f"detections failed: {sorted(t.value for t in engine.failed_types)}",
+                            })
+
+                        # Queue notifications with the alerts
                         if alerts:
-                            await db.commit()  # Commit alerts first so they have IDs
-                            notif_results = await _send_alert_notifications(db, alerts)
-                            summary["notifications_sent"] += notif_results["total"]
+                            summary["notifications_queued"] += await _enqueue_alert_notifications(db, alerts)
+                            await db.commit()
 
                     except Exception as e:
                         logger.error(f"Critical detection failed for user {user_id}: {e}")
+                        self._retry_users["critical"].add(user_id)
                         summary["errors"].append({
                             "user_id": user_id,
                             "error": str(e),
@@ -159,36 +220,51 @@ class DetectionScheduler:
 
             except Exception as e:
                 logger.error(f"Critical detection run failed: {e}")
+                if previous is not None:
+                    self._rewind_sweep("critical", previous)
                 summary["errors"].append({"error": str(e)})
 
         summary["completed_at"] = datetime.utcnow().isoformat()
-        logger.info(f"Critical detection run completed: {summary['alerts_created']} alerts, {summary['notifications_sent']} notifications")
+        logger.info(f"Critical detection run completed: {summary['alerts_created']} alerts, {summary['notifications_queued']} notifications queued")
         return summary
 
     async def run_routine_detections(self) -> dict:
         """
-        Run routine detections for all users.
+        Run routine detections and alert escalation for all users.
 
         Should be scheduled every hour.
         Routine detections: late_payments, unexpected_expenses, etc.
 
+        Detectors only run for users with changes since the last run, and
+        only those the changes affect; the first run of each day runs them
+        all. Escalation always runs, since it depends on elapsed time.
+
         Returns summary of alerts created.
         """
         logger.info("Starting routine detection run")
-        self._last_routine_run = datetime.utcnow()
+        since = self._last_routine_run
+        started = datetime.utcnow()
+        previous = None
 
         summary = {
             "run_type": "routine",
-            "started_at": self._last_routine_run.isoformat(),
+            "started_at": started.isoformat(),
+            "sweep": "full",
             "users_processed": 0,
+            "users_skipped": 0,
             "alerts_created": 0,
             "escalations": 0,
-            "notifications_sent": 0,
+            "notifications_queued": 0,
             "errors": [],
         }
 
         async with async_session_maker() as db:
             try:
+                plan, watermark = await self._plan_sweep(db, "routine", since, started, ROUTINE_DETECTIONS)
+                previous = self._advance_sweep("routine", started, watermark)
+                if plan is not None:
+                    summary["sweep"] = "targeted"
+
                 # Get all active users
                 result = await db.execute(select(User.id))
                 user_ids = [row[0] for row in result.fetchall()]
@@ -198,14 +274,23 @@ class DetectionScheduler:
                         engine = DetectionEngine(db, user_id)
                         all_alerts = []
 
+                        detection_types = ROUTINE_DETECTIONS if plan is None else plan.get(user_id, [])
+                        if not detection_types:
+                            summary["users_skipped"] += 1
+
                         # Run each routine detection type
-                        for detection_type in ROUTINE_DETECTIONS:
+                        for detection_type in detection_types:
                             try:
                                 alerts = await engine.run_detection_type(detection_type)
                                 all_alerts.extend(alerts)
                                 summary["alerts_created"] += len(alerts)
                             except Exception as e:
                                 logger.error(f"Detection {detection_type} failed for user {user_id}: {e}")
+                                self._retry_users["routine"].add(user_id)
+                                summary["errors"].append({
+                                    "user_id": user_id,
+                                    "error": f"{detection_type.value}: {e}",
+                                })
 
                         # Also run escalation check
                         escalated = await engine.escalate_alerts()
@@ -213,14 +298,14 @@ class DetectionScheduler:
 
                         summary["users_processed"] += 1
 
-                        # Send notifications for new alerts
+                        # Queue notifications with the alerts
                         if all_alerts:
-                            await db.commit()  # Commit alerts first so they have IDs
-                            notif_results = await _send_alert_notifications(db, all_alerts)
-                            summary["notifications_sent"] += notif_results["total"]
+                            summary["notifications_queued"] += await _enqueue_alert_notifications(db, all_alerts)
+                            await db.commit()
 
                     except Exception as e:
                         logger.error(f"Routine detection failed for user {user_id}: {e}")
+                        self._retry_users["routine"].add(user_id)
                         summary["errors"].append({
                             "user_id": user_id,
                             "error": str(e),
@@ -230,10 +315,12 @@ class DetectionScheduler:
 
             except Exception as e:
                 logger.error(f"Routine detection run failed: {e}")
+                if previous is not None:
+                    self._rewind_sweep("routine", previous)
                 summary["errors"].append({"error": str(e)})
 
         summary["completed_at"] = datetime.utcnow().isoformat()
-        logger.info(f"Routine detection run completed: {summary['alerts_created']} alerts, {summary['escalations']} escalations, {summary['notifications_sent']} notifications")
+        logger.info(f"Routine detection run completed: {summary['alerts_created']} alerts, {summary['escalations']} escalations, {summary['notifications_queued']} notifications queued")
         return summary
 
     async def run_daily_detections(self) -> dict:
@@ -253,7 +340,7 @@ class DetectionScheduler:
             "started_at": self._last_daily_run.isoformat(),
             "users_processed": 0,
             "alerts_created": 0,
-            "notifications_sent": 0,
+            "notifications_queued": 0,
             "digests_sent": 0,
             "errors": [],
         }
@@ -280,23 +367,10 @@ class DetectionScheduler:
 
                         summary["users_processed"] += 1
 
-                        # Commit alerts first
-                        await db.commit()
-
-                        # Send notifications for new alerts
+                        # Queue notifications and commit with the alerts
                         if all_alerts:
-                            notif_results = await _send_alert_notifications(db, all_alerts)
-                            summary["notifications_sent"] += notif_results["total"]
-
-                        # Send daily digest (per-user email)
-                        try:
-                            from app.notifications.service import get_notification_service
-                            notification_service = get_notification_service(db)
-                            digest_sent = await notification_service.send_daily_digest(user_id)
-                            if digest_sent:
-                                summary["digests_sent"] += 1
-                        except Exception as e:
-                            logger.error(f"Daily digest failed for user {user_id}: {e}")
+                            summary["notifications_queued"] += await _enqueue_alert_notifications(db, all_alerts)
+                        await db.commit()
 
                     except Exception as e:
                         logger.error(f"Daily detection failed for user {user_id}: {e}")
@@ -307,6 +381,16 @@ class DetectionScheduler:
 
                 await db.commit()
 
+                # Send email digests for all eligible users in one batch
+                try:
+                    from app.notifications.service import get_notification_service
+                    notification_service = get_notification_service(db)
+                    digest_summary = await notification_service.send_all_daily_digests()
+                    summary["digests_sent"] = digest_summary["sent"]
+                except Exception as e:
+                    logger.error(f"Daily digests failed: {e}")
+                    summary["errors"].append({"error": f"digests: {e}"})
+
                 # Send Slack daily digest (company-wide, once per day)
                 try:
                     from app.notifications.service import get_notification_service
@@ -325,11 +409,20 @@ class DetectionScheduler:
         logger.info(f"Daily detection run completed: {summary['alerts_created']} alerts, {summary['digests_sent']} digests sent")
         return summary
 
-    async def run_all_detections_for_user(self, user_id: str) -> dict:
+    async def run_all_detections_for_user(
+        self,
+        user_id: str,
+        detection_types: Optional[Sequence[DetectionType]] = None,
+        changed_since: Optional[datetime] = None,
+    ) -> dict:
         """
         Run all detections for a single user.
 
         Called on-demand when user opens dashboard or after data sync.
+        detection_types limits the run to those types (e.g. after a
+        targeted sync that only changed some data). Otherwise, with
+        changed_since, only the detectors affected by the user's changes
+        since then run.
 
         Returns summary of alerts created.
         """
@@ -341,7 +434,7 @@ class DetectionScheduler:
             "started_at": datetime.utcnow().isoformat(),
             "alerts_created": 0,
             "escalations": 0,
-            "notifications_sent": 0,
+            "notifications_queued": 0,
             "errors": [],
         }
 
@@ -349,21 +442,27 @@ class DetectionScheduler:
             try:
                 engine = DetectionEngine(db, user_id)
 
-                # Run all detections
-                alerts = await engine.run_all_detections()
+                if detection_types is None and changed_since is not None:
+                    # The sync has committed, so its changes are all visible by time
+                    changes = await load_changes(db, changed_since, user_ids=[user_id])
+                    detection_types = affected_detections(changes.get(user_id, ()))
+
+                # Run all detections, or just the requested types
+                if detection_types is None:
+                    alerts = await engine.run_all_detections()
+                else:
+                    alerts = await engine.run_detection_types(detection_types)
                 summary["alerts_created"] = len(alerts)
 
                 # Run escalation check
                 escalated = await engine.escalate_alerts()
                 summary["escalations"] = len(escalated)
 
-                await db.commit()
-
-                # Send notifications for new alerts
+                # Queue notifications with the alerts
                 if alerts:
-                    notif_results = await _send_alert_notifications(db, alerts)
-                    summary["notifications_sent"] = notif_results["total"]
-                    await db.commit()
+                    summary["notifications_queued"] = await _enqueue_alert_notifications(db, alerts)
+
+                await db.commit()
 
             except Exception as e:
                 logger.error(f"On-demand detection failed for user {user_id}: {e}")
@@ -401,7 +500,7 @@ def setup_apscheduler(scheduler):
     """
     # Critical detections every 5 minutes
     scheduler.add_job(
-        detection_scheduler.run_critical_detections,
+        tracked_job(detection_scheduler.run_critical_detections),
         'interval',
         minutes=5,
         id='critical_detections',
@@ -411,7 +510,7 @@ def setup_apscheduler(scheduler):
 
     # Routine detections every hour
     scheduler.add_job(
-        detection_scheduler.run_routine_detections,
+        tracked_job(detection_scheduler.run_routine_detections),
         'interval',
         hours=1,
         id='routine_detections',
@@ -421,7 +520,7 @@ def setup_apscheduler(scheduler):
 
     # Daily detections at 6am
     scheduler.add_job(
-        detection_scheduler.run_daily_detections,
+        tracked_job(detection_scheduler.run_daily_detections),
         'cron',
         hour=6,
         minute=0,
@@ -430,9 +529,19 @@ def setup_apscheduler(scheduler):
         replace_existing=True,
     )
 
+    # Deliver queued alert notifications every minute
+    scheduler.add_job(
+        tracked_job(dispatch_notification_outbox),
+        'interval',
+        minutes=1,
+        id='notification_dispatch',
+        name='Notification Outbox Dispatch',
+        replace_existing=True,
+    )
+
     # Background Xero sync every 30 minutes (fixes stale data issue)
     scheduler.add_job(
-        run_xero_background_sync,
+        tracked_job(run_xero_background_sync),
         'interval',
         minutes=30,
         id='xero_background_sync',
@@ -440,9 +549,53 @@ def setup_apscheduler(scheduler):
         replace_existing=True,
     )
 
+    # Apply Xero webhook changes every minute (the receiver also kicks this off)
+    scheduler.add_job(
+        tracked_job(process_xero_webhook_events),
+        'interval',
+        minutes=1,
+        id='xero_webhook_events',
+        name='Xero Webhook Events',
+        replace_existing=True,
+    )
+
+    # Create upcoming monthly partitions daily at 3am
+    scheduler.add_job(
+        tracked_job(maintain_partitions),
+        'cron',
+        hour=3,
+        minute=0,
+        id='partition_maintenance',
+        name='Partition Maintenance',
+        replace_existing=True,
+    )
+
+    # Archive audit log partitions past retention, monthly
+    scheduler.add_job(
+        tracked_job(archive_audit_logs),
+        'cron',
+        day=1,
+        hour=4,
+        minute=0,
+        id='audit_log_archive',
+        name='Audit Log Archive',
+        replace_existing=True,
+    )
+
+    # Refresh ECB exchange rates daily, after publication
+    scheduler.add_job(
+        tracked_job(refresh_fx_rates),
+        'cron',
+        hour=settings.FX_RATE_REFRESH_HOUR,
+        minute=0,
+        id='fx_rate_refresh',
+        name='Exchange Rate Refresh',
+        replace_existing=True,
+    )
+
     # OAuth state cleanup every hour
     scheduler.add_job(
-        cleanup_expired_oauth_states,
+        tracked_job(cleanup_expired_oauth_states),
         'interval',
         hours=1,
         id='oauth_state_cleanup',
@@ -450,10 +603,36 @@ def setup_apscheduler(scheduler):
         replace_existing=True,
     )
 
+    # Delete idle shared rate limit buckets every hour
+    scheduler.add_job(
+        tracked_job(cleanup_rate_limit_buckets),
+        'interval',
+        hours=1,
+        id='rate_limit_bucket_cleanup',
+        name='Rate Limit Bucket Cleanup',
+        replace_existing=True,
+    )
+
+    # Enhance queued email drafts every minute
+    if settings.AI_DRAFTING_ENABLED:
+        scheduler.add_job(
+            tracked_job(process_ai_drafts),
+            'interval',
+            minutes=1,
+            id='ai_draft_enhancement',
+            name='AI Draft Enhancement',
+            replace_existing=True,
+        )
+
     logger.info("Detection scheduler jobs configured")
 
 
-async def run_detections_after_sync(user_id: str, sync_type: str = "xero") -> dict:
+async def run_detections_after_sync(
+    user_id: str,
+    sync_type: str = "xero",
+    detection_types: Optional[Sequence[DetectionType]] = None,
+    changed_since: Optional[datetime] = None,
+) -> dict:
     """
     Trigger detection run after a data sync completes.
 
@@ -461,13 +640,68 @@ async def run_detections_after_sync(user_id: str, sync_type: str = "xero") -> di
 
     Args:
         user_id: User whose data was synced
-        sync_type: Type of sync ("xero", "quickbooks", "bank_feed")
+        sync_type: Type of sync ("xero", "xero_webhook", "quickbooks", "bank_feed")
+        detection_types: Only run these types (default: all)
+        changed_since: Sync start (naive UTC); only run the detectors
+            affected by what the sync changed
 
     Returns:
         Detection summary
     """
     logger.info(f"Running post-sync detections for user {user_id} after {sync_type} sync")
-    return await detection_scheduler.run_all_detections_for_user(user_id)
+    return await detection_scheduler.run_all_detections_for_user(user_id, detection_types, changed_since)
+
+
+# =============================================================================
+# NOTIFICATION DISPATCH
+# =============================================================================
+
+# Upper bound on batches per run so one job can't monopolise the loop
+MAX_DISPATCH_BATCHES_PER_RUN = 10
+
+
+async def dispatch_notification_outbox() -> dict:
+    """
+    Deliver queued alert notifications.
+
+    Runs every minute. Drains the outbox in batches until it is empty or
+    MAX_DISPATCH_BATCHES_PER_RUN is reached; the rest waits for the next run.
+    """
+    from app.notifications.dispatcher import NotificationDispatcher
+
+    summary = {
+        "started_at": datetime.utcnow().isoformat(),
+        "batches": 0,
+        "email_sent": 0,
+        "slack_sent": 0,
+        "skipped": 0,
+        "failed": 0,
+    }
+
+    async with async_session_maker() as db:
+        try:
+            dispatcher = NotificationDispatcher(db)
+            for _ in range(MAX_DISPATCH_BATCHES_PER_RUN):
+                batch = await dispatcher.dispatch_pending()
+                if not batch["claimed"]:
+                    break
+                summary["batches"] += 1
+                for key in ("email_sent", "slack_sent", "skipped", "failed"):
+                    summary[key] += batch[key]
+                if batch["claimed"] < dispatcher.batch_size:
+                    break
+        except Exception as e:
+            logger.error(f"Notification dispatch failed: {e}")
+            summary["error"] = str(e)
+            await db.rollback()
+
+    summary["completed_at"] = datetime.utcnow().isoformat()
+    if summary["batches"]:
+        logger.info(
+            f"Notification dispatch completed: {summary['email_sent']} emails, "
+            f"{summary['slack_sent']} Slack messages, {summary['failed']} failed"
+        )
+    return summary
 
 
 # =============================================================================
@@ -480,55 +714,70 @@ async def run_xero_background_sync() -> dict:
 
     Runs every 30 minutes to ensure data freshness.
     This fixes the "stale data" issue where users only see updated data
-    after manually triggering a sync.
+    after manually triggering a sync. Tenants sync concurrently, stalest
+    first (see app/xero/sync_scheduler.py).
+    """
+    from app.xero.sync_scheduler import run_background_sync
+
+    try:
+        return await run_background_sync()
+    except Exception as e:
+        logger.error(f"Background Xero sync run failed: {e}")
+        return {
+            "started_at": datetime.utcnow().isoformat(),
+            "users_synced": 0,
+            "sync_errors": 0,
+            "errors": [{"error": str(e)}],
+            "completed_at": datetime.utcnow().isoformat(),
+        }
+
+
+# Upper bound on batches per run; the rest waits for the next run
+MAX_WEBHOOK_BATCHES_PER_RUN = 5
+
+
+async def process_xero_webhook_events() -> dict:
+    """
+    Apply queued Xero webhook change events.
+
+    Each batch fetches only the changed invoices and contacts and runs the
+    detections they can affect (see app/xero/webhooks.py). Events a previous
+    run left processing past the claim timeout are re-queued first.
     """
-    logger.info("Starting background Xero sync for all active connections")
+    from app.xero.webhooks import process_pending_events, release_stale_claims
 
     summary = {
         "started_at": datetime.utcnow().isoformat(),
-        "users_synced": 0,
-        "sync_errors": 0,
-        "errors": [],
+        "released": 0,
+        "claimed": 0,
+        "done": 0,
+        "failed": 0,
+        "deferred": 0,
     }
 
     async with async_session_maker() as db:
         try:
-            from app.xero.models import XeroConnection
-            from app.xero.sync import sync_xero_data
-
-            # Get all active Xero connections
-            result = await db.execute(
-                select(XeroConnection).where(XeroConnection.is_active == True)
-            )
-            connections = result.scalars().all()
-
-            logger.info(f"Found {len(connections)} active Xero connections to sync")
-
-            for connection in connections:
-                try:
-                    # Run incremental sync for each user
-                    await sync_xero_data(
-                        db=db,
-                        user_id=connection.user_id,
-                        sync_type="incremental"
-                    )
-                    summary["users_synced"] += 1
-                    logger.info(f"Background sync completed for user {connection.user_id}")
-
-                except Exception as e:
-                    summary["sync_errors"] += 1
-                    summary["errors"].append({
-                        "user_id": connection.user_id,
-                        "error": str(e),
-                    })
-                    logger.error(f"Background sync failed for user {connection.user_id}: {e}")
+            # Events a crashed or cancelled run left processing
+            summary["released"] = await release_stale_claims(db)
+            await db.commit()
 
+            for _ in range(MAX_WEBHOOK_BATCHES_PER_RUN):
+                batch = await process_pending_events(db)
+                summary["claimed"] += batch["claimed"]
+                summary["done"] += batch["done"]
+                summary["failed"] += batch["failed"]
+                summary["deferred"] += batch["deferred"]
+                # Deferred events are pending again; leave them for the next run
+                if batch["deferred"] or batch["claimed"] < settings.XERO_WEBHOOK_BATCH_SIZE:
+                    break
         except Exception as e:
-            logger.error(f"Background Xero sync run failed: {e}")
-            summary["errors"].append({"error": str(e)})
+            logger.error(f"Xero webhook processing failed: {e}")
+            summary["error"] = str(e)
+            await db.rollback()
 
     summary["completed_at"] = datetime.utcnow().isoformat()
-    logger.info(f"Background Xero sync completed: {summary['users_synced']} users synced, {summary['sync_errors']} errors")
+    if summary["claimed"]:
+        logger.info(f"Xero webhook processing completed: {summary['done']} done, {summary['failed']} failed")
     return summary
 
 
@@ -563,3 +812,158 @@ async def cleanup_expired_oauth_states() -> dict:
     summary["completed_at"] = datetime.utcnow().isoformat()
     logger.info(f"OAuth state cleanup completed: {summary['states_removed']} states removed")
     return summary
+
+
+async def maintain_partitions() -> dict:
+    """
+    Ensure upcoming monthly partitions exist for partitioned tables.
+
+    Runs daily; creating a partition that already exists is a no-op.
+    """
+    summary = {
+        "started_at": datetime.utcnow().isoformat(),
+        "partitions": [],
+    }
+
+    async with async_session_maker() as db:
+        try:
+            from app.partitions import ensure_all_partitions
+
+            summary["partitions"] = await ensure_all_partitions(db)
+            await db.commit()
+
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {e}")
+            summary["error"] = str(e)
+
+    summary["completed_at"] = datetime.utcnow().isoformat()
+    logger.info(f"Partition maintenance completed: {len(summary['partitions'])} partitions ensured")
+    return summary
+
+
+async def archive_audit_logs() -> dict:
+    """
+    Export and drop audit_logs partitions older than the retention window.
+
+    Runs monthly, after the month rolls over.
+    """
+    summary = {
+        "started_at": datetime.utcnow().isoformat(),
+        "archived": [],
+    }
+
+    async with async_session_maker() as db:
+        try:
+            from app.audit.retention import archive_expired_partitions
+
+            summary["archived"] = await archive_expired_partitions(db)
+
+        except Exception as e:
+            logger.error(f"Audit log archive failed: {e}")
+            summary["error"] = str(e)
+
+    summary["completed_at"] = datetime.utcnow().isoformat()
+    logger.info(f"Audit log archive completed: {len(summary['archived'])} partitions archived")
+    return summary
+
+
+async def refresh_fx_rates() -> dict:
+    """
+    Fetch today's ECB rates, store them and reload the in-process rate table.
+
+    Runs daily; re-storing a day's rates is an upsert.
+    """
+    summary = {
+        "started_at": datetime.utcnow().isoformat(),
+        "rates_stored": 0,
+    }
+
+    async with async_session_maker() as db:
+        try:
+            from app.services.exchange_rates import refresh_exchange_rates
+
+            summary["rates_stored"] = await refresh_exchange_rates(db)
+
+        except Exception as e:
+            logger.error(f"Exchange rate refresh failed: {e}")
+            summary["error"] = str(e)
+
+    summary["completed_at"] = datetime.utcnow().isoformat()
+    logger.info(f"Exchange rate refresh completed: {summary['rates_stored']} rates stored")
+    return summary
+
+
+async def cleanup_rate_limit_buckets() -> dict:
+    """
+    Delete shared rate limit buckets that have been idle long enough to refill.
+
+    Runs every hour; the rate_limit_buckets table is only written when
+    RATE_LIMIT_STORAGE="postgres".
+    """
+    summary = {
+        "started_at": datetime.utcnow().isoformat(),
+        "buckets_removed": 0,
+    }
+
+    async with async_session_maker() as db:
+        try:
+            from app.middleware.rate_limit import cleanup_rate_limit_buckets as delete_idle_buckets
+
+            summary["buckets_removed"] = await delete_idle_buckets(db, settings.RATE_LIMIT_BUCKET_IDLE_SECONDS)
+            await db.commit()
+
+        except Exception as e:
+            logger.error(f"Rate limit bucket cleanup failed: {e}")
+            summary["error"] = str(e)
+
+    summary["completed_at"] = datetime.utcnow().isoformat()
+    logger.info(f"Rate limit bucket cleanup completed: {summary['buckets_removed']} buckets removed")
+    return summary
+
+
+# =============================================================================
+# AI DRAFT ENHANCEMENT
+# =============================================================================
+
+# Upper bound on batches per run; the rest waits for the next run
+MAX_DRAFT_BATCHES_PER_RUN = 5
+
+
+async def process_ai_drafts() -> dict:
+    """
+    Enhance email drafts queued by preparation (AI_DRAFTING_ENABLED).
+
+    Runs every minute. Stale claims are re-queued first. Each batch
+    commits its claim and its results on its own, so finished drafts
+    become visible while later batches are still running.
+    """
+    from app.preparation.ai_drafting import enhance_pending_drafts, release_stale_drafts
+
+    summary = {
+        "started_at": datetime.utcnow().isoformat(),
+        "released": 0,
+        "enhanced": 0,
+        "failed": 0,
+    }
+
+    async with async_session_maker() as db:
+        try:
+            # Drafts a crashed or cancelled run left processing
+            summary["released"] = await release_stale_drafts(db)
+            await db.commit()
+
+            for _ in range(MAX_DRAFT_BATCHES_PER_RUN):
+                batch = await enhance_pending_drafts(db)
+                summary["enhanced"] += batch["enhanced"]
+                summary["failed"] += batch["failed"]
+                if batch["claimed"] < settings.AI_DRAFTING_BATCH_SIZE:
+                    break
+        except Exception as e:
+            logger.error(f"AI draft enhancement failed: {e}")
+            summary["error"] = str(e)
+            await db.rollback()
+
+    summary["completed_at"] = datetime.utcnow().isoformat()
+    if summary["enhanced"] or summary["failed"]:
+        logger.info(f"AI draft enhancement completed: {summary['enhanced']} enhanced, {summary['failed']} failed")
+    return summary
@@ -62,6 +62,8 @@ class PipelineResult:
     # Performance
     detection_duration_ms: int = 0
     preparation_duration_ms: int = 0
+    preparation_context_ms: int = 0  # Part of preparation spent loading shared context
+    linking_duration_ms: int = 0
     escalation_duration_ms: int = 0
     total_duration_ms: int = 0
 
@@ -91,6 +93,8 @@ class PipelineResult:
             "performance": {
                 "detection_ms": self.detection_duration_ms,
                 "preparation_ms": self.preparation_duration_ms,
+                "preparation_context_ms": self.preparation_context_ms,
+                "linking_ms": self.linking_duration_ms,
                 "escalation_ms": self.escalation_duration_ms,
                 "total_ms": self.total_duration_ms,
             },
@@ -165,14 +169,14 @@ async def run_detection_preparation_cycle(
         severity = alert.severity.value if hasattr(alert.severity, 'value') else str(alert.severity)
         result.alerts_by_severity[severity] = result.alerts_by_severity.get(severity, 0) + 1
 
-        alert_type = alert.type.value if hasattr(alert.type, 'value') else str(alert.type)
+        alert_type = alert.detection_type.value if hasattr(alert.detection_type, 'value') else str(alert.detection_type)
         result.alerts_by_type[alert_type] = result.alerts_by_type.get(alert_type, 0) + 1
 
     # ==========================================================================
     # Phase 2: Filter & Prioritize Alerts
     # ==========================================================================
     if not config.include_low_severity:
-        alerts = [a for a in alerts if a.severity.value != "upcoming"]
+        alerts = [a for a in alerts if str(getattr(a.severity, "value", a.severity)) != "upcoming"]
 
     # Limit alerts for preparation
     alerts = alerts[:config.max_alerts_to_prepare]
@@ -198,6 +202,7 @@ async def run_detection_preparation_cycle(
     result.preparation_duration_ms = int(
         (preparation_end - preparation_start).total_seconds() * 1000
     )
+    result.preparation_context_ms = preparation_engine.context_load_ms
 
     # Aggregate preparation metrics
     result.actions_prepared = len(actions)
@@ -208,11 +213,18 @@ async def run_detection_preparation_cycle(
     # ==========================================================================
     # Phase 4: Detect Linked Actions
     # ==========================================================================
+    linking_start = datetime.utcnow()
+
     try:
-        result.linked_action_groups = await preparation_engine._detect_linked_actions(actions)
+        links = await preparation_engine._detect_linked_actions(actions)
+        result.linked_action_groups = len(links)
     except Exception as e:
         result.errors.append(f"Linking error: {str(e)}")
 
+    result.linking_duration_ms = int(
+        (datetime.utcnow() - linking_start).total_seconds() * 1000
+    )
+
     # ==========================================================================
     # Phase 5: Escalation Check
     # ==========================================================================
@@ -323,11 +335,97 @@ async def run_full_pipeline(
 # Pipeline Status & History
 # =============================================================================
 
+from datetime import timedelta, timezone
+
 from sqlalchemy import select, func, and_, desc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
 from app.audit.models import AuditLog
+from app.audit.services import AuditService
+from app.models.pipeline_metrics import (
+    PipelineRunMetric,
+    PipelineDailyRollup,
+    PipelineDailyTypeCount,
+)
 from app.preparation.models import PreparedAction, ActionStatus
 
 
+def _run_id(result: PipelineResult) -> str:
+    return f"run_{result.run_at.strftime('%Y%m%d_%H%M%S')}"
+
+
+async def _record_pipeline_metrics(
+    db: AsyncSession,
+    user_id: str,
+    result: PipelineResult,
+) -> None:
+    """
+    Write the typed metrics row and bump the daily rollups for a run.
+
+    Rollups are maintained with INSERT ... ON CONFLICT DO UPDATE, so
+    concurrent runs for the same user and day add up correctly.
+    """
+    run_at = result.run_at if result.run_at.tzinfo else result.run_at.replace(tzinfo=timezone.utc)
+    day = run_at.date()
+    has_errors = len(result.errors) > 0
+
+    db.add(PipelineRunMetric(
+        run_at=run_at,
+        user_id=user_id,
+        run_id=_run_id(result),
+        mode=result.mode.value,
+        alerts_detected=result.alerts_detected,
+        actions_prepared=result.actions_prepared,
+        escalations_applied=result.escalations_applied,
+        detection_ms=result.detection_duration_ms,
+        preparation_ms=result.preparation_duration_ms,
+        escalation_ms=result.escalation_duration_ms,
+        total_ms=result.total_duration_ms,
+        has_errors=has_errors,
+    ))
+
+    rollup = pg_insert(PipelineDailyRollup).values(
+        user_id=user_id,
+        day=day,
+        runs=1,
+        successful_runs=0 if has_errors else 1,
+        total_duration_ms=result.total_duration_ms,
+        max_duration_ms=result.total_duration_ms,
+        alerts_detected=result.alerts_detected,
+        actions_prepared=result.actions_prepared,
+        escalations_applied=result.escalations_applied,
+    )
+    table = PipelineDailyRollup.__table__
+    await db.execute(rollup.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={
+            "runs": table.c.runs + rollup.excluded.runs,
+            "successful_runs": table.c.successful_runs + rollup.excluded.successful_runs,
+            "total_duration_ms": table.c.total_duration_ms + rollup.excluded.total_duration_ms,
+            "max_duration_ms": func.greatest(table.c.max_duration_ms, rollup.excluded.max_duration_ms),
+            "alerts_detected": table.c.alerts_detected + rollup.excluded.alerts_detected,
+            "actions_prepared": table.c.actions_prepared + rollup.excluded.actions_prepared,
+            "escalations_applied": table.c.escalations_applied + rollup.excluded.escalations_applied,
+            "updated_at": func.now(),
+        },
+    ))
+
+    type_rows = [
+        {"user_id": user_id, "day": day, "kind": "alert", "type": t, "count": c}
+        for t, c in result.alerts_by_type.items() if c
+    ] + [
+        {"user_id": user_id, "day": day, "kind": "action", "type": t, "count": c}
+        for t, c in result.actions_by_type.items() if c
+    ]
+    if type_rows:
+        counts = pg_insert(PipelineDailyTypeCount).values(type_rows)
+        type_table = PipelineDailyTypeCount.__table__
+        await db.execute(counts.on_conflict_do_update(
+            index_elements=[type_table.c.user_id, type_table.c.day, type_table.c.kind, type_table.c.type],
+            set_={"count": type_table.c.count + counts.excluded.count},
+        ))
+
+
 async def log_pipeline_run(
     db: AsyncSession,
     user_id: str,
@@ -337,13 +435,17 @@ async def log_pipeline_run(
     Log a pipeline run to the audit system.
 
     This creates an audit log entry for tracking pipeline execution history.
+    Pipeline runs are telemetry, so the entry goes through the buffered
+    audit sink rather than the caller's transaction. Typed metrics and
+    daily rollups are written alongside (see _record_pipeline_metrics).
     """
-    log = AuditLog(
+    await _record_pipeline_metrics(db, user_id, result)
+
+    audit = AuditService(db, user_id=user_id, source="system")
+    await audit.log(
         entity_type="pipeline",
-        entity_id=f"run_{result.run_at.strftime('%Y%m%d_%H%M%S')}",
+        entity_id=_run_id(result),
         action="create",
-        user_id=user_id,
-        source="system",
         new_value=result.to_dict(),
         metadata={
             "mode": result.mode.value,
@@ -355,7 +457,6 @@ async def log_pipeline_run(
         },
         notes=f"Pipeline run: {result.alerts_detected} alerts, {result.actions_prepared} actions, {result.escalations_applied} escalations" if not result.errors else f"Pipeline run with errors: {result.errors}",
     )
-    db.add(log)
 
 
 async def get_last_pipeline_run(
@@ -389,7 +490,7 @@ async def get_last_pipeline_run(
         "run_id": log.entity_id,
         "run_at": log.created_at.isoformat() if log.created_at else None,
         "result": log.new_value,
-        "metadata": log.metadata,
+        "metadata": log.extra_data,
         "notes": log.notes,
     }
 
@@ -405,32 +506,26 @@ async def get_pipeline_history(
     Returns the last N pipeline runs with summary info.
     """
     query = (
-        select(AuditLog)
-        .where(
-            and_(
-                AuditLog.entity_type == "pipeline",
-                AuditLog.user_id == user_id,
-                AuditLog.action == "create",
-            )
-        )
-        .order_by(desc(AuditLog.created_at))
+        select(PipelineRunMetric)
+        .where(PipelineRunMetric.user_id == user_id)
+        .order_by(desc(PipelineRunMetric.run_at))
         .limit(limit)
     )
     result = await db.execute(query)
-    logs = result.scalars().all()
+    runs = result.scalars().all()
 
     return [
         {
-            "run_id": log.entity_id,
-            "run_at": log.created_at.isoformat() if log.created_at else None,
-            "mode": log.metadata.get("mode") if log.metadata else None,
-            "alerts_detected": log.metadata.get("alerts_detected", 0) if log.metadata else 0,
-            "actions_prepared": log.metadata.get("actions_prepared", 0) if log.metadata else 0,
-            "escalations_applied": log.metadata.get("escalations_applied", 0) if log.metadata else 0,
-            "duration_ms": log.metadata.get("total_duration_ms", 0) if log.metadata else 0,
-            "has_errors": log.metadata.get("has_errors", False) if log.metadata else False,
+            "run_id": run.run_id,
+            "run_at": run.run_at.isoformat() if run.run_at else None,
+            "mode": run.mode,
+            "alerts_detected": run.alerts_detected,
+            "actions_prepared": run.actions_prepared,
+            "escalations_applied": run.escalations_applied,
+            "duration_ms": run.total_ms,
+            "has_errors": run.has_errors,
         }
-        for log in logs
+        for run in runs
     ]
 
 
@@ -443,79 +538,62 @@ async def get_pipeline_health(
 
     Returns stats about recent pipeline runs, success rate,
     average processing time, and pending actions.
-    """
-    # Get recent pipeline runs (last 7 days)
-    from datetime import datetime, timedelta
 
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-
-    query = (
-        select(AuditLog)
-        .where(
-            and_(
-                AuditLog.entity_type == "pipeline",
-                AuditLog.user_id == user_id,
-                AuditLog.action == "create",
-                AuditLog.created_at >= seven_days_ago,
-            )
+    Run totals come from the daily rollups for the last 7 calendar days
+    (UTC), so this reads at most 7 rollup rows plus the latest run.
+    """
+    since = (datetime.now(timezone.utc) - timedelta(days=6)).date()
+
+    totals_query = (
+        select(
+            func.coalesce(func.sum(PipelineDailyRollup.runs), 0),
+            func.coalesce(func.sum(PipelineDailyRollup.successful_runs), 0),
+            func.coalesce(func.sum(PipelineDailyRollup.total_duration_ms), 0),
+            func.coalesce(func.sum(PipelineDailyRollup.alerts_detected), 0),
+            func.coalesce(func.sum(PipelineDailyRollup.actions_prepared), 0),
+            func.coalesce(func.sum(PipelineDailyRollup.escalations_applied), 0),
         )
-        .order_by(desc(AuditLog.created_at))
-    )
-    result = await db.execute(query)
-    recent_runs = result.scalars().all()
-
-    # Calculate metrics
-    total_runs = len(recent_runs)
-    successful_runs = sum(
-        1 for run in recent_runs
-        if run.metadata and not run.metadata.get("has_errors", False)
-    )
-    total_duration = sum(
-        run.metadata.get("total_duration_ms", 0)
-        for run in recent_runs
-        if run.metadata
-    )
-    total_alerts = sum(
-        run.metadata.get("alerts_detected", 0)
-        for run in recent_runs
-        if run.metadata
-    )
-    total_actions = sum(
-        run.metadata.get("actions_prepared", 0)
-        for run in recent_runs
-        if run.metadata
-    )
-    total_escalations = sum(
-        run.metadata.get("escalations_applied", 0)
-        for run in recent_runs
-        if run.metadata
-    )
-
-    # Get pending actions count
-    pending_query = (
-        select(func.count(PreparedAction.id))
         .where(
             and_(
-                PreparedAction.user_id == user_id,
-                PreparedAction.status == ActionStatus.PENDING_APPROVAL,
+                PipelineDailyRollup.user_id == user_id,
+                PipelineDailyRollup.day >= since,
             )
         )
     )
-    pending_result = await db.execute(pending_query)
-    pending_actions = pending_result.scalar() or 0
+    totals_result = await db.execute(totals_query)
+    (
+        total_runs,
+        successful_runs,
+        total_duration,
+        total_alerts,
+        total_actions,
+        total_escalations,
+    ) = totals_result.one()
+
+    last_run_query = (
+        select(PipelineRunMetric)
+        .where(PipelineRunMetric.user_id == user_id)
+        .order_by(desc(PipelineRunMetric.run_at))
+        .limit(1)
+    )
+    last_run_result = await db.execute(last_run_query)
+    last_run = last_run_result.scalar_one_or_none()
 
-    # Get approved but not executed actions
-    approved_query = (
-        select(func.count(PreparedAction.id))
+    # Action queue counts in one grouped query
+    queue_query = (
+        select(PreparedAction.status, func.count(PreparedAction.id))
         .where(
             and_(
                 PreparedAction.user_id == user_id,
-                PreparedAction.status == ActionStatus.APPROVED,
+                PreparedAction.status.in_([ActionStatus.PENDING_APPROVAL, ActionStatus.APPROVED]),
             )
         )
+        .group_by(PreparedAction.status)
     )
-    approved_result = await db.execute(approved_query)
-    approved_actions = approved_result.scalar() or 0
+    queue_result = await db.execute(queue_query)
+    queue_counts = dict(queue_result.all())
+    pending_actions = queue_counts.get(ActionStatus.PENDING_APPROVAL.value, 0)
+    approved_actions = queue_counts.get(ActionStatus.APPROVED.value, 0)
 
     # Determine health status
     success_rate = successful_runs / total_runs if total_runs > 0 else 1.0
@@ -528,17 +606,14 @@ async def get_pipeline_health(
     else:
         status = "degraded"
 
-    # Get last run info
-    last_run = recent_runs[0] if recent_runs else None
-
     return {
         "status": status,
         "last_run": {
-            "run_id": last_run.entity_id if last_run else None,
-            "run_at": last_run.created_at.isoformat() if last_run and last_run.created_at else None,
-            "alerts_detected": last_run.metadata.get("alerts_detected", 0) if last_run and last_run.metadata else 0,
-            "actions_prepared": last_run.metadata.get("actions_prepared", 0) if last_run and last_run.metadata else 0,
-            "had_errors": last_run.metadata.get("has_errors", False) if last_run and last_run.metadata else False,
+            "run_id": last_run.run_id,
+            "run_at": last_run.run_at.isoformat() if last_run.run_at else None,
+            "alerts_detected": last_run.alerts_detected,
+            "actions_prepared": last_run.actions_prepared,
+            "had_errors": last_run.has_errors,
         } if last_run else None,
         "metrics": {
             "runs_last_7_days": total_runs,
@@ -565,47 +640,47 @@ async def get_pipeline_stats_by_type(
 
     Useful for understanding what types of issues are being detected most.
     """
-    from datetime import datetime, timedelta
-
-    since = datetime.utcnow() - timedelta(days=days)
+    since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).date()
 
-    query = (
-        select(AuditLog)
+    runs_query = (
+        select(func.coalesce(func.sum(PipelineDailyRollup.runs), 0))
         .where(
             and_(
-                AuditLog.entity_type == "pipeline",
-                AuditLog.user_id == user_id,
-                AuditLog.action == "create",
-                AuditLog.created_at >= since,
+                PipelineDailyRollup.user_id == user_id,
+                PipelineDailyRollup.day >= since,
             )
         )
     )
-    result = await db.execute(query)
-    runs = result.scalars().all()
+    runs_result = await db.execute(runs_query)
+    total_runs = runs_result.scalar() or 0
+
+    counts_query = (
+        select(
+            PipelineDailyTypeCount.kind,
+            PipelineDailyTypeCount.type,
+            func.sum(PipelineDailyTypeCount.count),
+        )
+        .where(
+            and_(
+                PipelineDailyTypeCount.user_id == user_id,
+                PipelineDailyTypeCount.day >= since,
+            )
+        )
+        .group_by(PipelineDailyTypeCount.kind, PipelineDailyTypeCount.type)
+    )
+    counts_result = await db.execute(counts_query)
 
-    # Aggregate by detection type
     alerts_by_type: Dict[str, int] = {}
     actions_by_type: Dict[str, int] = {}
-
-    for run in runs:
-        if not run.new_value:
-            continue
-
-        run_data = run.new_value
-        detection = run_data.get("detection", {})
-        preparation = run_data.get("preparation", {})
-
-        # Aggregate alerts by type
-        for alert_type, count in detection.get("by_type", {}).items():
-            alerts_by_type[alert_type] = alerts_by_type.get(alert_type, 0) + count
-
-        # Aggregate actions by type
-        for action_type, count in preparation.get("by_type", {}).items():
-            actions_by_type[action_type] = actions_by_type.get(action_type, 0) + count
+    for kind, type_name, count in counts_result.all():
+        if kind == "alert":
+            alerts_by_type[type_name] = count
+        elif kind == "action":
+            actions_by_type[type_name] = count
 
     return {
         "period_days": days,
-        "total_runs": len(runs),
+        "total_runs": total_runs,
         "alerts_by_type": dict(sorted(alerts_by_type.items(), key=lambda x: -x[1])),
         "actions_by_type": dict(sorted(actions_by_type.items(), key=lambda x: -x[1])),
     }
@@ -11,8 +11,10 @@ Features:
 - Includes confidence scoring based on integration status
 - Single source of truth: ObligationSchedules
 - Supports scenario modifications (exclusions, deltas, payment delays)
+- Normalises multi-currency balances and amounts to the user's base currency
 - Ready for QuickBooks integration
 """
+import logging
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal
@@ -26,6 +28,8 @@ from app.data.clients.models import Client
 from app.data.expenses.models import ExpenseBucket
 from app.data.balances.models import CashAccount
 from app.data.obligations.models import ObligationAgreement, ObligationSchedule, PaymentEvent
+from app.data.users.models import User
+from app.services.fx_rates import get_fx_rates
 from app.integrations.confidence import (
     ConfidenceLevel,
     ConfidenceScore,
@@ -35,6 +39,10 @@ from app.integrations.confidence import (
     ForecastConfidenceSummary,
 )
 
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+
 
 @dataclass
 class ForecastEvent:
@@ -56,6 +64,59 @@ class ForecastEvent:
     source_type: str  # "client" | "expense"
     is_recurring: bool
     recurrence_pattern: Optional[str]
+    # Set when the source amount was in another currency: amount is then in
+    # the base currency and original_amount in original_currency
+    original_amount: Optional[Decimal] = None
+    original_currency: Optional[str] = None
+
+
+async def _amounts_in_base_currency(
+    db: AsyncSession,
+    amounts: List[Decimal],
+    currencies: List[str],
+    dates: List[Optional[date]],
+    base_currency: str,
+) -> List[Decimal]:
+    """
+    Convert amounts to the base currency in one batch.
+
+    Uses the in-process rate table, so the only possible query is its
+    (periodic) load, and none at all when everything is already in the base
+    currency. Amounts with no known rate are kept unconverted and logged.
+    """
+    if all(c == base_currency for c in currencies):
+        return list(amounts)
+
+    table = await get_fx_rates(db)
+    convertible = [
+        i for i, currency in enumerate(currencies)
+        if currency == base_currency or table.rate(currency, base_currency, dates[i]) is not None
+    ]
+    converted = table.convert_many(
+        [amounts[i] for i in convertible],
+        [currencies[i] for i in convertible],
+        base_currency,
+        [dates[i] for i in convertible],
+    )
+
+    result = list(amounts)
+    for i, amount in zip(convertible, converted):
+        result[i] = amount.quantize(CENT)
+
+    missing = {currencies[i] for i in set(range(len(amounts))) - set(convertible)}
+    if missing:
+        logger.warning(
+            f"No exchange rate to {base_currency} for {', '.join(sorted(missing))}; "
+            f"amounts left unconverted"
+        )
+    return result
+
+
+def _original_amount(amount: Decimal, currency: Optional[str], base_currency: str) -> Dict[str, Any]:
+    """ForecastEvent original_* fields for an amount in the given currency."""
+    if not currency or currency == base_currency:
+        return {}
+    return {"original_amount": amount, "original_currency": currency}
 
 
 def _compute_client_events(
@@ -586,7 +647,8 @@ async def _compute_events_from_obligations(
     user_id: str,
     start_date: date,
     end_date: date,
-    scenario_context: Optional['ScenarioContext'] = None
+    scenario_context: Optional['ScenarioContext'] = None,
+    base_currency: str = "USD",
 ) -> tuple[List[ForecastEvent], List[tuple], List[tuple]]:
     """
     Compute forecast events from ObligationSchedules (canonical approach).
@@ -600,6 +662,7 @@ async def _compute_events_from_obligations(
         start_date: Forecast start date
         end_date: Forecast end date
         scenario_context: Optional context for scenario modifications
+        base_currency: Currency every returned amount is expressed in
 
     Returns:
         Tuple of (events, client_confidence_data, expense_confidence_data)
@@ -612,11 +675,10 @@ async def _compute_events_from_obligations(
     # Use selectinload to eagerly load the obligation relationship (required for async)
     query = (
         select(ObligationSchedule)
-        .join(ObligationAgreement)
         .options(selectinload(ObligationSchedule.obligation))
         .where(
             and_(
-                ObligationAgreement.user_id == user_id,
+                ObligationSchedule.user_id == user_id,
                 ObligationSchedule.due_date >= start_date,
                 ObligationSchedule.due_date <= end_date,
                 ObligationSchedule.status.in_(["scheduled", "due"])
@@ -627,6 +689,33 @@ async def _compute_events_from_obligations(
     result = await db.execute(query)
     schedules = result.scalars().all()
 
+    # Confirmed PaymentEvents are included as high-confidence actuals
+    payment_query = (
+        select(PaymentEvent)
+        .where(
+            and_(
+                PaymentEvent.user_id == user_id,
+                PaymentEvent.payment_date >= start_date,
+                PaymentEvent.payment_date <= end_date,
+                PaymentEvent.status == "completed"
+            )
+        )
+    )
+    payment_result = await db.execute(payment_query)
+    payment_events = payment_result.scalars().all()
+
+    # Normalise every schedule and payment amount to the base currency in one
+    # batch; scenario deltas are applied to the base amounts
+    base_amounts = await _amounts_in_base_currency(
+        db,
+        [s.estimated_amount for s in schedules] + [p.amount for p in payment_events],
+        [s.obligation.currency or base_currency for s in schedules] + [p.currency or base_currency for p in payment_events],
+        [s.due_date for s in schedules] + [p.payment_date for p in payment_events],
+        base_currency,
+    )
+    schedule_amounts = {s.id: base_amounts[i] for i, s in enumerate(schedules)}
+    payment_amounts = {p.id: base_amounts[len(schedules) + i] for i, p in enumerate(payment_events)}
+
     # Group schedules by obligation for confidence calculation
     obligation_schedules: Dict[str, List[ObligationSchedule]] = {}
     for schedule in schedules:
@@ -692,7 +781,7 @@ async def _compute_events_from_obligations(
 
         # Apply scenario modifications
         event_date = schedule.due_date
-        event_amount = schedule.estimated_amount
+        event_amount = schedule_amounts[schedule.id]
         event_reason = f"From obligation schedule ({schedule.estimate_source})"
 
         if scenario_context:
@@ -739,31 +828,17 @@ async def _compute_events_from_obligations(
             source_name=source_name,
             source_type=source_type,
             is_recurring=is_recurring,
-            recurrence_pattern=recurrence_pattern
+            recurrence_pattern=recurrence_pattern,
+            **_original_amount(schedule.estimated_amount, obligation.currency, base_currency),
         )
         events.append(event)
 
-    # Also include confirmed PaymentEvents as high-confidence actuals
-    payment_query = (
-        select(PaymentEvent)
-        .where(
-            and_(
-                PaymentEvent.user_id == user_id,
-                PaymentEvent.payment_date >= start_date,
-                PaymentEvent.payment_date <= end_date,
-                PaymentEvent.status == "completed"
-            )
-        )
-    )
-    payment_result = await db.execute(payment_query)
-    payment_events = payment_result.scalars().all()
-
     for payment in payment_events:
         # Confirmed payments get HIGH confidence
         event = ForecastEvent(
             id=f"payment_{payment.id}_{payment.payment_date.isoformat()}",
             date=payment.payment_date,
-            amount=payment.amount,
+            amount=payment_amounts[payment.id],
             direction="out",  # PaymentEvents are always outflows
             event_type="confirmed_expense",
             category="payment",
@@ -773,7 +848,8 @@ async def _compute_events_from_obligations(
             source_name=payment.vendor_name or "Payment",
             source_type="payment",
             is_recurring=False,
-            recurrence_pattern=None
+            recurrence_pattern=None,
+            **_original_amount(payment.amount, payment.currency, base_currency),
         )
         events.append(event)
 
@@ -796,7 +872,7 @@ async def _compute_events_from_obligations(
     # Build confidence data for summary calculation
     # Group by original source (client/expense)
     for obligation_id, sched_list in obligation_schedules.items():
-        total_amount = sum(s.estimated_amount for s in sched_list)
+        total_amount = sum(schedule_amounts[s.id] for s in sched_list)
         obligation = sched_list[0].obligation
 
         # Skip excluded entities when building confidence data
@@ -1125,6 +1201,7 @@ async def calculate_forecast_v2(
     3. Includes confidence scoring based on integration status
     4. Supports scenario modifications (exclusions, deltas, payment delays)
     5. Returns comprehensive confidence breakdown
+    6. Expresses every amount in the user's base currency
 
     Args:
         db: Database session
@@ -1135,12 +1212,26 @@ async def calculate_forecast_v2(
     Returns:
         Dictionary containing forecast data with confidence metrics
     """
-    # Get starting cash
+    result = await db.execute(select(User.base_currency).where(User.id == user_id))
+    base_currency = result.scalar() or "USD"
+
+    # Get starting cash: balances summed per currency, then normalised
     result = await db.execute(
-        select(func.sum(CashAccount.balance))
+        select(CashAccount.currency, func.sum(CashAccount.balance))
         .where(CashAccount.user_id == user_id)
+        .group_by(CashAccount.currency)
+    )
+    balances_by_currency = result.all()
+    starting_cash = sum(
+        await _amounts_in_base_currency(
+            db,
+            [balance for _, balance in balances_by_currency],
+            [currency or base_currency for currency, _ in balances_by_currency],
+            [None] * len(balances_by_currency),
+            base_currency,
+        ),
+        Decimal("0"),
     )
-    starting_cash = result.scalar() or Decimal("0")
 
     # Get forecast date range
     forecast_start = date.today()
@@ -1148,7 +1239,7 @@ async def calculate_forecast_v2(
 
     # Compute events from ObligationSchedules (canonical source)
     all_events, client_confidence_data, expense_confidence_data = await _compute_events_from_obligations(
-        db, user_id, forecast_start, forecast_end, scenario_context
+        db, user_id, forecast_start, forecast_end, scenario_context, base_currency
     )
 
     # Sort events by date
@@ -1231,6 +1322,8 @@ async def calculate_forecast_v2(
                     "source_id": e.source_id,
                     "source_name": e.source_name,
                     "source_type": e.source_type,
+                    "original_amount": str(e.original_amount) if e.original_amount is not None else None,
+                    "original_currency": e.original_currency,
                 }
                 for e in sorted(week_events, key=lambda x: x.amount, reverse=True)[:10]
             ]
@@ -1263,6 +1356,7 @@ async def calculate_forecast_v2(
 
     return {
         "starting_cash": str(starting_cash),
+        "base_currency": base_currency,
         "forecast_start_date": forecast_start.isoformat(),
         "weeks": week_forecasts,
         "summary": {
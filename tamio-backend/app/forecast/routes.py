@@ -5,7 +5,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-from app.database import get_db
+from app.database import get_read_db
 from app.forecast.engine_v2 import calculate_forecast_v2
 from app.forecast.schemas import (
     ForecastResponse,
@@ -27,7 +27,7 @@ router = APIRouter()
 async def get_forecast(
     current_user: User = Depends(get_current_user),
     weeks: int = Query(13, description="Number of weeks to forecast", ge=1, le=52),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get cash flow forecast for the authenticated user.
@@ -57,7 +57,7 @@ async def get_forecast(
 @router.get("/confidence")
 async def get_forecast_confidence(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed confidence breakdown for the authenticated user's forecast.
@@ -92,7 +92,7 @@ async def get_scenario_bar_metrics(
     current_user: User = Depends(get_current_user),
     scenario_id: Optional[str] = Query(None, description="Optional scenario ID for scenario metrics"),
     time_range: str = Query("13w", description="Time range: 13w, 26w, or 52w"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get metrics for the scenario bar (runway, payroll safety, VAT reserve).
@@ -237,7 +237,7 @@ async def get_forecast_transactions(
     current_user: User = Depends(get_current_user),
     type: str = Query(..., description="Transaction type: 'inflows' or 'outflows'"),
     time_range: str = Query("13w", description="Time range: 13w, 26w, or 52w"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get forecast transactions (inflows or outflows) for display in tables.
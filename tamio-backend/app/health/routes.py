@@ -7,6 +7,8 @@ Metrics:
 - Runway: Weeks of operation remaining at current burn rate
 - Liquidity: Working capital ratio = (Cash + 30d AR) / (30d Liabilities)
 - Cash Velocity: Cash conversion cycle in days = DSO - DPO
+
+Also exposes database connection pool metrics (GET /health/database).
 """
 
 from datetime import datetime, timezone, date, timedelta
@@ -17,19 +19,22 @@ from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
+from app.database import get_db, get_pool_stats
 from app.auth.dependencies import get_current_user
 from app.data.users.models import User
 from app.data.balances.models import CashAccount
 from app.data.clients.models import Client
 from app.data.obligations.models import ObligationAgreement, ObligationSchedule, PaymentEvent
 from app.data.user_config.routes import get_or_create_config
+from app.services.cash_windows import get_cash_windows
+from app.services.receivables import sum_receivables_due, summarize_receivables
 from app.detection.models import DetectionAlert
 from app.forecast.engine_v2 import calculate_forecast_v2
-from app.alerts_actions.routes import _alert_to_risk
+from app.alerts_actions.routes import build_risks
 from app.alerts_actions.schemas import RiskResponse
 
 from .schemas import (
+    DatabasePoolResponse,
     HealthMetricsResponse,
     HealthRingData,
     ObligationsHealthData,
@@ -127,58 +132,21 @@ async def _calculate_30day_ar(db: AsyncSession, user_id: str) -> Decimal:
     """
     Calculate 30-day Accounts Receivable from outstanding invoices.
 
-    Queries all active clients and sums outstanding invoices expected within 30 days.
+    Sums active clients' receivables expected within 30 days.
     """
-    result = await db.execute(
-        select(Client)
-        .where(Client.user_id == user_id)
-        .where(Client.status == "active")
-    )
-    clients = result.scalars().all()
-
-    today = date.today()
-    thirty_days_out = today + timedelta(days=30)
-    total_ar = Decimal("0")
-
-    for client in clients:
-        config = client.billing_config or {}
-        outstanding = config.get("outstanding_invoices", [])
-        for invoice in outstanding:
-            expected_date_str = invoice.get("expected_date")
-            if expected_date_str:
-                try:
-                    expected_date = date.fromisoformat(expected_date_str)
-                    # Include if expected within 30 days
-                    if today <= expected_date <= thirty_days_out:
-                        total_ar += Decimal(str(invoice.get("amount", 0)))
-                except (ValueError, TypeError):
-                    pass
-
-    return total_ar
+    due = await sum_receivables_due(db, user_id, horizons=(30,))
+    return due[30]
 
 
 async def _calculate_30day_liabilities(db: AsyncSession, user_id: str) -> Decimal:
     """
     Calculate 30-day liabilities from obligation schedules.
 
-    Queries all scheduled/due obligations with due dates in the next 30 days.
+    Sums all scheduled/due obligations with due dates in the next 30 days,
+    using the shared windowed cash aggregates.
     """
-    today = date.today()
-    thirty_days_out = today + timedelta(days=30)
-
-    result = await db.execute(
-        select(func.sum(ObligationSchedule.estimated_amount))
-        .join(ObligationAgreement)
-        .where(
-            and_(
-                ObligationAgreement.user_id == user_id,
-                ObligationSchedule.due_date >= today,
-                ObligationSchedule.due_date <= thirty_days_out,
-                ObligationSchedule.status.in_(["scheduled", "due"]),
-            )
-        )
-    )
-    return result.scalar() or Decimal("0")
+    windows = await get_cash_windows(db, user_id)
+    return Decimal(str(windows.total[30]))
 
 
 async def _calculate_cash_velocity_days(db: AsyncSession, user_id: str) -> float:
@@ -257,31 +225,8 @@ async def _calculate_14day_ar(db: AsyncSession, user_id: str) -> Decimal:
     """
     Calculate expected AR within 14 days from outstanding invoices.
     """
-    result = await db.execute(
-        select(Client)
-        .where(Client.user_id == user_id)
-        .where(Client.status == "active")
-    )
-    clients = result.scalars().all()
-
-    today = date.today()
-    fourteen_days_out = today + timedelta(days=14)
-    total_ar = Decimal("0")
-
-    for client in clients:
-        config = client.billing_config or {}
-        outstanding = config.get("outstanding_invoices", [])
-        for invoice in outstanding:
-            expected_date_str = invoice.get("expected_date") or invoice.get("due_date")
-            if expected_date_str:
-                try:
-                    expected_date = date.fromisoformat(expected_date_str)
-                    if today <= expected_date <= fourteen_days_out:
-                        total_ar += Decimal(str(invoice.get("amount", 0)))
-                except (ValueError, TypeError):
-                    pass
-
-    return total_ar
+    due = await sum_receivables_due(db, user_id, horizons=(14,))
+    return due[14]
 
 
 def _get_obligation_type_label(obligation_type: str) -> str:
@@ -321,7 +266,7 @@ async def _calculate_obligations_health(
         .join(ObligationAgreement)
         .where(
             and_(
-                ObligationAgreement.user_id == user_id,
+                ObligationSchedule.user_id == user_id,
                 ObligationSchedule.due_date >= today,
                 ObligationSchedule.due_date <= fourteen_days_out,
                 ObligationSchedule.status.in_(["scheduled", "due"]),
@@ -406,46 +351,27 @@ async def _calculate_receivables_health(
     """
     today = date.today()
 
-    # Query all active clients with their outstanding invoices
+    # Outstanding invoices (from Xero sync) in one aggregate
+    summary = await summarize_receivables(db, user_id, today)
+    total_outstanding_amount = summary.total_amount
+    total_outstanding_count = summary.total_count
+    overdue_amount = summary.overdue_amount
+    overdue_count = summary.overdue_count
+    total_days_late = summary.total_days_late
+
+    # Milestones (from manual entry / seed data) are still read from
+    # billing_config, for the clients that have any
     result = await db.execute(
         select(Client)
         .where(Client.user_id == user_id)
         .where(Client.status == "active")
+        .where(Client.billing_config.has_key("milestones"))
     )
     clients = result.scalars().all()
 
-    # Aggregate invoice data
-    total_outstanding_amount = Decimal("0")
-    total_outstanding_count = 0
-    overdue_amount = Decimal("0")
-    overdue_count = 0
-    total_days_late = 0
-
     for client in clients:
         config = client.billing_config or {}
 
-        # Process outstanding_invoices (from Xero sync)
-        outstanding = config.get("outstanding_invoices", [])
-        for invoice in outstanding:
-            amount = Decimal(str(invoice.get("amount", 0)))
-            total_outstanding_amount += amount
-            total_outstanding_count += 1
-
-            # Check if overdue - use due_date first, fall back to expected_date
-            due_date_str = invoice.get("due_date") or invoice.get("expected_date")
-            if due_date_str:
-                try:
-                    due_date = date.fromisoformat(due_date_str)
-                    if due_date < today:
-                        # Invoice is overdue
-                        overdue_amount += amount
-                        overdue_count += 1
-                        days_late = (today - due_date).days
-                        total_days_late += days_late
-                except (ValueError, TypeError):
-                    pass
-
-        # Process milestones (from manual entry / seed data)
         # "completed" status = work delivered, awaiting payment (outstanding)
         # "paid" = already paid, "pending" = work not yet delivered
         milestones = config.get("milestones", [])
@@ -626,10 +552,7 @@ async def get_health_metrics(
         alerts = alerts_result.scalars().all()
 
         # Transform alerts to RiskResponse
-        critical_alerts: List[RiskResponse] = []
-        for alert in alerts:
-            risk = await _alert_to_risk(db, alert)
-            critical_alerts.append(risk)
+        critical_alerts: List[RiskResponse] = await build_risks(db, user.id, alerts)
 
         # =====================================================================
         # BUILD RESPONSE
@@ -646,3 +569,17 @@ async def get_health_metrics(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating health metrics: {str(e)}")
+
+
+@router.get("/database", response_model=DatabasePoolResponse)
+async def get_database_pool_metrics(
+    user: User = Depends(get_current_user),
+):
+    """
+    Get connection pool metrics for this process.
+
+    Returns pool size and usage, saturation (checked out / size + overflow)
+    and checkout latency for the primary engine and, when configured, the
+    read replica. Counters cover this worker process only.
+    """
+    return DatabasePoolResponse(**get_pool_stats())
@@ -9,6 +9,8 @@ from app.schemas.health import (
     ObligationsHealthData,
     ReceivablesHealthData,
     HealthMetricsResponse,
+    DatabasePoolStats,
+    DatabasePoolResponse,
 )
 
 # Re-export RiskResponse for backward compatibility (was imported from alerts_actions.schemas)
@@ -21,5 +23,7 @@ __all__ = [
     "ObligationsHealthData",
     "ReceivablesHealthData",
     "HealthMetricsResponse",
+    "DatabasePoolStats",
+    "DatabasePoolResponse",
     "RiskResponse",
 ]
@@ -15,8 +15,9 @@ from fastapi.responses import JSONResponse
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from app.config import settings
-from app.middleware import DemoGuardMiddleware, setup_rate_limiting
+from app.middleware import DemoGuardMiddleware, QueryMetricsMiddleware, setup_rate_limiting
 from app.detection.scheduler import setup_apscheduler
+from app.audit.sink import audit_sink
 from app.database import get_db
 
 
@@ -104,6 +105,9 @@ async def lifespan(app: FastAPI):
 
     # Startup
     if settings.APP_ENV != "test":
+        if settings.AUDIT_SINK_ENABLED:
+            await audit_sink.start()
+
         logger.info("Starting detection scheduler...")
         _scheduler = AsyncIOScheduler()
         setup_apscheduler(_scheduler)
@@ -112,8 +116,15 @@ async def lifespan(app: FastAPI):
         logger.info("  - Critical detections: every 5 minutes")
         logger.info("  - Routine detections: every hour")
         logger.info("  - Daily detections: 6:00 AM")
+        logger.info("  - Notification dispatch: every minute")
         logger.info("  - Xero background sync: every 30 minutes")
+        logger.info("  - Partition maintenance: 3:00 AM")
+        logger.info("  - Audit log archive: monthly")
+        logger.info(f"  - Exchange rate refresh: {settings.FX_RATE_REFRESH_HOUR}:00 UTC")
         logger.info("  - OAuth state cleanup: every hour")
+        logger.info("  - Rate limit bucket cleanup: every hour")
+        if settings.AI_DRAFTING_ENABLED:
+            logger.info("  - AI draft enhancement: every minute")
 
     yield
 
@@ -123,6 +134,15 @@ async def lifespan(app: FastAPI):
         _scheduler.shutdown(wait=False)
         logger.info("Detection scheduler shut down")
 
+    # Drain buffered audit events before the engine goes away
+    await audit_sink.stop()
+
+    from app.notifications.email_provider import close_http_client
+    await close_http_client()
+
+    from app.preparation.ai_drafting import close_llm_client
+    await close_llm_client()
+
 # Core routes
 from app.auth import routes as auth_routes
 from app.data import routes as data_routes
@@ -205,6 +225,9 @@ app.add_middleware(DemoGuardMiddleware)
 # Rate limiting
 setup_rate_limiting(app)
 
+# Per-route SQL query counts (outermost, so middleware queries are included)
+app.add_middleware(QueryMetricsMiddleware)
+
 # Include routers
 app.include_router(auth_routes.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["Auth"])
 app.include_router(data_routes.router, prefix=f"{settings.API_V1_PREFIX}/data", tags=["Data"])
@@ -262,6 +285,19 @@ async def health_check():
         )
 
 
+@app.get("/metrics")
+async def query_metrics():
+    """SQL query counts per route and scheduler job, and Xero sync lag (Prometheus text format)."""
+    from fastapi.responses import PlainTextResponse
+    from app.query_metrics import query_registry
+    from app.xero.sync_scheduler import xero_sync_metrics
+
+    if not settings.QUERY_METRICS_DEBUG:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    body = query_registry.render_prometheus() + xero_sync_metrics.render_prometheus()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
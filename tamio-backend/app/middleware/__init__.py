@@ -1,5 +1,6 @@
 """Middleware package."""
 from app.middleware.demo_guard import DemoGuardMiddleware
-from app.middleware.rate_limit import limiter, setup_rate_limiting
+from app.middleware.query_metrics import QueryMetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware, rate_limiter, setup_rate_limiting
 
-__all__ = ["DemoGuardMiddleware", "limiter", "setup_rate_limiting"]
+__all__ = ["DemoGuardMiddleware", "QueryMetricsMiddleware", "RateLimitMiddleware", "rate_limiter", "setup_rate_limiting"]
@@ -1,11 +1,10 @@
 """Middleware to block mutations from demo accounts."""
-from fastapi import Request
+from typing import Optional
+
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from sqlalchemy import select
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.database import AsyncSessionLocal
-from app.data.models import User
+from app.auth.principal import is_demo_user
 from app.auth.utils import decode_access_token
 
 
@@ -36,7 +35,34 @@ ALLOWED_POST_PREFIXES = (
 )
 
 
-class DemoGuardMiddleware(BaseHTTPMiddleware):
+def _is_allowed(method: str, path: str) -> bool:
+    """Whether a request is allowed without checking for a demo account."""
+    # Allow all GET, OPTIONS, HEAD requests
+    if method in ALLOWED_METHODS:
+        return True
+
+    # Check if this is an allowed POST endpoint
+    if path in ALLOWED_POST_ENDPOINTS:
+        return True
+
+    # Check allowed POST prefixes (e.g. scenario build/save operations)
+    if method == "POST" and path.startswith(ALLOWED_POST_PREFIXES):
+        return True
+
+    return False
+
+
+def _bearer_token(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            auth_header = value.decode("latin-1")
+            if auth_header.startswith("Bearer "):
+                return auth_header.split(" ")[1]
+            return None
+    return None
+
+
+class DemoGuardMiddleware:
     """
     Middleware that blocks mutation operations for demo accounts.
 
@@ -51,58 +77,41 @@ class DemoGuardMiddleware(BaseHTTPMiddleware):
     - Modify settings
     - Create/modify scenarios
     - Any other data mutation
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        # Allow all GET, OPTIONS, HEAD requests
-        if request.method in ALLOWED_METHODS:
-            return await call_next(request)
-
-        # Check if this is an allowed POST endpoint
-        path = request.url.path
-        if path in ALLOWED_POST_ENDPOINTS:
-            return await call_next(request)
-
-        # Check allowed POST prefixes (e.g. scenario build/save operations)
-        if request.method == "POST" and path.startswith(ALLOWED_POST_PREFIXES):
-            return await call_next(request)
 
-        # Check for allowed endpoint prefixes (like /api/scenarios/*/forecast which is read-only)
-        if "/forecast" in path and request.method == "GET":
-            return await call_next(request)
-
-        # Extract token from Authorization header
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            # No auth header, let the actual endpoint handle authentication
-            return await call_next(request)
+    Pure ASGI: allowed requests are passed straight through, and the body
+    and response stream are never touched.
+    """
 
-        token = auth_header.split(" ")[1]
-        payload = decode_access_token(token)
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        if not payload:
-            # Invalid token, let the actual endpoint handle it
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or _is_allowed(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
-        user_id = payload.get("sub")
+        # No or invalid auth: let the actual endpoint handle authentication
+        token = _bearer_token(scope)
+        payload = decode_access_token(token) if token else None
+        user_id = payload.get("sub") if payload else None
         if not user_id:
-            return await call_next(request)
-
-        # Check if user is a demo account
-        async with AsyncSessionLocal() as db:
-            result = await db.execute(
-                select(User.is_demo).where(User.id == user_id)
+            await self.app(scope, receive, send)
+            return
+
+        # Demo tokens carry a "demo" claim; otherwise use the shared principal
+        # cache (tokens issued before the claim, or a stale non-demo claim)
+        is_demo = payload.get("demo") or await is_demo_user(user_id)
+
+        if is_demo:
+            response = JSONResponse(
+                status_code=403,
+                content={
+                    "detail": "Demo account is read-only. Sign up to save your changes.",
+                    "is_demo": True
+                },
+                headers={"X-Demo-Account": "true"}
             )
-            is_demo = result.scalar_one_or_none()
-
-            if is_demo:
-                return JSONResponse(
-                    status_code=403,
-                    content={
-                        "detail": "Demo account is read-only. Sign up to save your changes.",
-                        "is_demo": True
-                    },
-                    headers={"X-Demo-Account": "true"}
-                )
-
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,47 @@
+"""
+Per-request SQL query instrumentation.
+
+Binds a QueryStats (app/query_metrics.py) to each HTTP request and labels
+it "<METHOD> <route path template>" once routing has matched. With
+QUERY_METRICS_DEBUG, responses carry X-DB-Query-Count and X-DB-Time-Ms;
+the counts reflect statements run before the response started, so for
+streaming responses they exclude anything executed while streaming.
+"""
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.query_metrics import track_queries
+
+
+def route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "<unmatched>"
+    return f"{scope['method']} {path}"
+
+
+class QueryMetricsMiddleware:
+    """Pure ASGI middleware recording query counts per route."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.QUERY_METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} <unmatched>") as stats:
+
+            async def send_with_metrics(message: Message):
+                if message["type"] == "http.response.start" and settings.QUERY_METRICS_DEBUG:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(stats.count).encode("latin-1")),
+                        (b"x-db-time-ms", f"{stats.db_time * 1000:.1f}".encode("latin-1")),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_metrics)
+            finally:
+                # Routing has matched by now; label with the path template
+                stats.label = route_label(scope)
@@ -1,22 +1,389 @@
-"""Rate limiting middleware using slowapi."""
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+"""
+Token-bucket rate limiting.
 
+Each principal (the authenticated user, else the client IP) has one bucket
+holding up to the RATE_LIMIT_DEFAULT request count, refilled continuously
+over its period. A request takes tokens according to its endpoint class:
+a cheap call costs 1, while TAMI chat, forecasts, scenario builds and Xero
+calls cost RATE_LIMIT_DEFAULT / their own limit. Used alone, an expensive
+class therefore allows its configured rate, and it draws on the same
+budget as everything else.
+
+Buckets live in a pluggable store (RATE_LIMIT_STORAGE):
+- "postgres" (default): an UNLOGGED table shared by every worker, updated
+  with a single atomic upsert per request over a small dedicated pool with
+  short timeouts (RATE_LIMIT_DB_*). If the database fails, the in-memory
+  store takes over for RATE_LIMIT_BREAKER_COOLDOWN before the shared
+  store is tried again, so limits stay bounded and requests don't wait on
+  a failing database.
+- "memory": per-process, LRU-bounded to RATE_LIMIT_MEMORY_MAX_KEYS. Each
+  worker has its own buckets, so only use it with a single worker.
+"""
+import logging
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.utils import decode_access_token
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# API paths (below API_V1_PREFIX) that are never limited. Xero webhook
+# deliveries are authenticated by their HMAC signature and all come from
+# Xero, so keyed by IP they would share one bucket.
+EXEMPT_PATHS = ("/xero/webhooks",)
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """Parse "100/minute" into (count, period_seconds)."""
+    count, _, period = rate.partition("/")
+    period = period.strip().rstrip("s")
+    if period not in _PERIODS:
+        raise ValueError(f"Unsupported rate limit period: {rate}")
+    return int(count), _PERIODS[period]
+
+
+@dataclass
+class BucketResult:
+    """Outcome of taking tokens from a bucket."""
+    allowed: bool
+    remaining: float
+    retry_after: float  # Seconds until the request would be allowed (0 if allowed)
+
+
+class RateLimitStore(ABC):
+    """Token bucket storage. take() must update a bucket atomically."""
+
+    @abstractmethod
+    async def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> BucketResult:
+        """Take cost tokens from the key's bucket if it holds enough."""
+
+    @abstractmethod
+    async def charge(self, key: str, cost: float, capacity: float, refill_per_second: float) -> float:
+        """
+        Take cost tokens from the key's bucket even if it holds fewer.
+
+        For work whose cost is only known once done. The bucket may go
+        negative, so later takes wait until it has refilled. Returns the
+        tokens left.
+        """
+
+
+def _retry_after(tokens: float, cost: float, refill_per_second: float) -> float:
+    return max(0.0, (cost - tokens) / refill_per_second)
+
 
-# Create limiter with IP-based key function
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=[settings.RATE_LIMIT_DEFAULT],
-    storage_uri=None,  # Use in-memory storage (Redis can be added later)
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Per-process buckets, least recently used evicted past max_keys.
+
+    take() has no await points, so each update is atomic on the event loop.
+    An evicted bucket simply starts full again.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None):
+        self.max_keys = max_keys or settings.RATE_LIMIT_MEMORY_MAX_KEYS
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> BucketResult:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        retry_after = 0.0 if allowed else _retry_after(tokens, cost, refill_per_second)
+        return BucketResult(allowed=allowed, remaining=tokens, retry_after=retry_after)
+
+    async def charge(self, key: str, cost: float, capacity: float, refill_per_second: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second) - cost
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return tokens
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Refilled token count for the existing row; every SET expression sees the old row
+_REFILLED = (
+    "LEAST(CAST(:capacity AS double precision), "
+    "b.tokens + EXTRACT(EPOCH FROM now() - b.updated_at) * CAST(:rate AS double precision))"
 )
 
+_TAKE_SQL = text(f"""
+    INSERT INTO rate_limit_buckets AS b (key, tokens, allowed, updated_at)
+    VALUES (
+        :key,
+        CASE WHEN CAST(:capacity AS double precision) >= CAST(:cost AS double precision)
+             THEN CAST(:capacity AS double precision) - CAST(:cost AS double precision)
+             ELSE CAST(:capacity AS double precision) END,
+        CAST(:capacity AS double precision) >= CAST(:cost AS double precision),
+        now()
+    )
+    ON CONFLICT (key) DO UPDATE SET
+        allowed = {_REFILLED} >= CAST(:cost AS double precision),
+        tokens = {_REFILLED} - CASE WHEN {_REFILLED} >= CAST(:cost AS double precision)
+                                    THEN CAST(:cost AS double precision) ELSE 0 END,
+        updated_at = now()
+    RETURNING tokens, allowed
+""")
+
+_CHARGE_SQL = text(f"""
+    INSERT INTO rate_limit_buckets AS b (key, tokens, allowed, updated_at)
+    VALUES (:key, CAST(:capacity AS double precision) - CAST(:cost AS double precision), true, now())
+    ON CONFLICT (key) DO UPDATE SET
+        allowed = true,
+        tokens = {_REFILLED} - CAST(:cost AS double precision),
+        updated_at = now()
+    RETURNING tokens
+""")
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """
+    Buckets shared by every worker in the rate_limit_buckets table.
+
+    Each take is one INSERT ... ON CONFLICT DO UPDATE, so concurrent
+    requests for a key serialise on its row lock. Uses its own small
+    engine (create_rate_limit_engine) unless one is given.
+
+    A failure opens a circuit breaker: for `cooldown` seconds every call
+    goes straight to the in-memory fallback, then the next call tries the
+    database again. The outage is logged once, and again when it ends.
+    """
+
+    def __init__(self, engine=None, fallback: Optional[RateLimitStore] = None, cooldown: Optional[float] = None):
+        if engine is None:
+            from app.database import create_rate_limit_engine
+            engine = create_rate_limit_engine()
+        self.engine = engine
+        self.fallback = fallback if fallback is not None else MemoryRateLimitStore()
+        self.cooldown = settings.RATE_LIMIT_BREAKER_COOLDOWN if cooldown is None else cooldown
+        self._open_until = 0.0
+        self._failing = False
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._open_until
+
+    def _failed(self, error: Exception) -> None:
+        self._open_until = time.monotonic() + self.cooldown
+        if not self._failing:
+            self._failing = True
+            logger.warning(
+                f"Shared rate limit store unavailable, using in-process buckets for {self.cooldown:.0f}s at a time: {error}"
+            )
+
+    def _succeeded(self) -> None:
+        if self._failing:
+            self._failing = False
+            logger.info("Shared rate limit store available again")
+
+    async def _execute(self, statement, key: str, cost: float, capacity: float, refill_per_second: float):
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                statement,
+                {"key": key, "cost": cost, "capacity": capacity, "rate": refill_per_second},
+            )
+            return result.one()
+
+    async def take(self, key: str, cost: float, capacity: float, refill_per_second: float) -> BucketResult:
+        if not self._available():
+            return await self.fallback.take(key, cost, capacity, refill_per_second)
+        try:
+            tokens, allowed = await self._execute(_TAKE_SQL, key, cost, capacity, refill_per_second)
+        except Exception as e:
+            self._failed(e)
+            return await self.fallback.take(key, cost, capacity, refill_per_second)
+        self._succeeded()
+
+        retry_after = 0.0 if allowed else _retry_after(tokens, cost, refill_per_second)
+        return BucketResult(allowed=allowed, remaining=tokens, retry_after=retry_after)
+
+    async def charge(self, key: str, cost: float, capacity: float, refill_per_second: float) -> float:
+        if not self._available():
+            return await self.fallback.charge(key, cost, capacity, refill_per_second)
+        try:
+            (tokens,) = await self._execute(_CHARGE_SQL, key, cost, capacity, refill_per_second)
+        except Exception as e:
+            self._failed(e)
+            return await self.fallback.charge(key, cost, capacity, refill_per_second)
+        self._succeeded()
+        return tokens
+
+
+async def cleanup_rate_limit_buckets(db, idle_seconds: int) -> int:
+    """Delete shared buckets idle long enough to have refilled completely."""
+    result = await db.execute(
+        text("DELETE FROM rate_limit_buckets WHERE updated_at < now() - make_interval(secs => :idle)"),
+        {"idle": idle_seconds},
+    )
+    return result.rowcount or 0
+
+
+@dataclass(frozen=True)
+class EndpointClass:
+    """Requests matching methods and pattern cost capacity / limit tokens."""
+    name: str
+    methods: FrozenSet[str]
+    pattern: "re.Pattern[str]"
+    limit: str
+
+
+def _endpoint_classes() -> List[EndpointClass]:
+    api = re.escape(settings.API_V1_PREFIX)
+    return [
+        EndpointClass("tami", frozenset({"POST"}), re.compile(rf"^{api}/tami/"), settings.RATE_LIMIT_TAMI),
+        EndpointClass(
+            "scenario_build",
+            frozenset({"POST"}),
+            re.compile(rf"^{api}/scenarios/(scenarios/[^/]+/(build|add-layer)|custom|[^/]+/iterate)$"),
+            settings.RATE_LIMIT_SCENARIO_BUILD,
+        ),
+        EndpointClass(
+            "forecast",
+            frozenset({"GET"}),
+            re.compile(rf"^{api}/(forecast(/|$)|scenarios/(.+/forecast|evaluate/base)$)"),
+            settings.RATE_LIMIT_FORECAST,
+        ),
+        EndpointClass("xero", frozenset({"GET", "POST", "PUT", "DELETE"}), re.compile(rf"^{api}/xero/"), settings.RATE_LIMIT_XERO),
+    ]
+
+
+class RateLimiter:
+    """Works out the bucket key and cost of a request and takes from the store."""
+
+    def __init__(self, store: RateLimitStore, default_limit: Optional[str] = None, classes: Optional[List[EndpointClass]] = None):
+        self.store = store
+        count, period = parse_rate(default_limit or settings.RATE_LIMIT_DEFAULT)
+        self.capacity = float(count)
+        self.refill_per_second = count / period
+        self.classes = _endpoint_classes() if classes is None else classes
+        self._costs = {}
+        for endpoint_class in self.classes:
+            class_count, class_period = parse_rate(endpoint_class.limit)
+            # Cost that allows class_count per class_period from this bucket
+            self._costs[endpoint_class.name] = self.refill_per_second * class_period / class_count
+
+    def classify(self, method: str, path: str) -> Optional[str]:
+        for endpoint_class in self.classes:
+            if method in endpoint_class.methods and endpoint_class.pattern.search(path):
+                return endpoint_class.name
+        return None
+
+    def cost(self, method: str, path: str) -> float:
+        name = self.classify(method, path)
+        return self._costs[name] if name else 1.0
+
+    @staticmethod
+    def key_for(scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                if auth_header.startswith("Bearer "):
+                    payload = decode_access_token(auth_header.split(" ")[1])
+                    if payload and payload.get("sub"):
+                        return f"user:{payload['sub']}"
+                break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def check(self, scope: Scope) -> BucketResult:
+        return await self.store.take(
+            self.key_for(scope),
+            self.cost(scope["method"], scope["path"]),
+            self.capacity,
+            self.refill_per_second,
+        )
+
+
+def create_rate_limit_store(storage: Optional[str] = None) -> RateLimitStore:
+    storage = storage or settings.RATE_LIMIT_STORAGE
+    if storage == "postgres":
+        return PostgresRateLimitStore()
+    if storage == "memory":
+        return MemoryRateLimitStore()
+    raise ValueError(f"Unknown RATE_LIMIT_STORAGE: {storage}")
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI token-bucket rate limiting for API requests.
+
+    CORS preflights, paths outside the API prefix (health checks) and
+    EXEMPT_PATHS are not limited. Responses carry X-RateLimit-Limit / X-RateLimit-Remaining;
+    rejected requests get a 429 with Retry-After.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional["RateLimiter"] = None):
+        self.app = app
+        self.limiter = limiter if limiter is not None else rate_limiter
+        self.exempt_paths = frozenset(f"{settings.API_V1_PREFIX}{path}" for path in EXEMPT_PATHS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith(settings.API_V1_PREFIX)
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        result = await self.limiter.check(scope)
+        headers = {
+            "X-RateLimit-Limit": str(int(self.limiter.capacity)),
+            "X-RateLimit-Remaining": str(max(0, math.floor(result.remaining))),
+        }
+
+        if not result.allowed:
+            headers["Retry-After"] = str(math.ceil(result.retry_after))
+            response = JSONResponse(
+                status_code=429,
+                content={"error": "Rate limit exceeded", "retry_after": math.ceil(result.retry_after)},
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        raw_headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + raw_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+# Process-wide limiter (the store is chosen by RATE_LIMIT_STORAGE)
+rate_limiter = RateLimiter(create_rate_limit_store())
+
 
 def setup_rate_limiting(app):
     """Configure rate limiting for the FastAPI app."""
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-    app.add_middleware(SlowAPIMiddleware)
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
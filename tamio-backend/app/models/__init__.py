@@ -11,8 +11,8 @@ from app.models.base import generate_id
 # User model
 from app.models.user import User
 
-# Treasury models (Client, Expense, CashAccount, ExchangeRate)
-from app.models.treasury import Client, ExpenseBucket, CashAccount, ExchangeRate
+# Treasury models (Client, Receivable, Expense, CashAccount, ExchangeRate)
+from app.models.treasury import Client, Receivable, ExpenseBucket, CashAccount, ExchangeRate
 
 # Obligation models
 from app.models.obligation import ObligationAgreement, ObligationSchedule, PaymentEvent
@@ -24,6 +24,7 @@ from app.models.detection import (
     AlertStatus,
     DetectionRule,
     DetectionAlert,
+    DetectionChange,
 )
 
 # Action models
@@ -51,10 +52,12 @@ from app.models.notification import (
     NotificationChannel,
     NotificationPreference,
     NotificationLog,
+    OutboxStatus,
+    NotificationOutbox,
 )
 
 # Xero models
-from app.models.xero import XeroConnection, OAuthState, XeroSyncLog
+from app.models.xero import XeroConnection, OAuthState, XeroSyncLog, XeroWebhookEvent
 
 # TAMI models
 from app.models.tami import (
@@ -67,6 +70,16 @@ from app.models.tami import (
 # Audit models
 from app.models.audit import AuditLog
 
+# Pipeline metrics models
+from app.models.pipeline_metrics import (
+    PipelineRunMetric,
+    PipelineDailyRollup,
+    PipelineDailyTypeCount,
+)
+
+# Rate limit models
+from app.models.rate_limit import RateLimitBucket
+
 # Scenario models
 from app.models.scenario import (
     RuleType,
@@ -91,6 +104,7 @@ __all__ = [
     "User",
     # Treasury
     "Client",
+    "Receivable",
     "ExpenseBucket",
     "CashAccount",
     "ExchangeRate",
@@ -104,6 +118,7 @@ __all__ = [
     "AlertStatus",
     "DetectionRule",
     "DetectionAlert",
+    "DetectionChange",
     # Action
     "ActionType",
     "ActionStatus",
@@ -122,10 +137,13 @@ __all__ = [
     "NotificationChannel",
     "NotificationPreference",
     "NotificationLog",
+    "OutboxStatus",
+    "NotificationOutbox",
     # Xero
     "XeroConnection",
     "OAuthState",
     "XeroSyncLog",
+    "XeroWebhookEvent",
     # TAMI
     "ConversationSession",
     "ConversationMessage",
@@ -133,6 +151,12 @@ __all__ = [
     "UserActivity",
     # Audit
     "AuditLog",
+    # Pipeline Metrics
+    "PipelineRunMetric",
+    "PipelineDailyRollup",
+    "PipelineDailyTypeCount",
+    # Rate Limit
+    "RateLimitBucket",
     # Scenario
     "RuleType",
     "RuleSeverity",
@@ -9,7 +9,7 @@ from datetime import datetime
 from enum import Enum
 from uuid import uuid4
 
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, JSON, Text, Integer
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, JSON, Text, Integer, Index, text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -138,6 +138,11 @@ class ActionOption(Base):
     # - payment_batch: {"payments": [...], "total": 47000, "csv_data": "..."}
     # - vendor_delay: {"email_subject": "...", "email_body": "...", "new_date": "2024-01-20"}
 
+    # Background AI enhancement of email drafts (see app/preparation/ai_drafting.py)
+    ai_draft_status = Column(String, nullable=True)  # None | "pending" | "processing" | "enhanced" | "failed"
+    ai_draft_claimed_at = Column(DateTime, nullable=True)  # When a worker claimed it (status "processing")
+    ai_draft_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Success probability (for uncertain actions)
     success_probability = Column(Float, nullable=True)  # 0-1
 
@@ -150,6 +155,19 @@ class ActionOption(Base):
     # Relationships
     action = relationship("PreparedAction", back_populates="options")
 
+    __table_args__ = (
+        Index(
+            "ix_action_options_ai_draft_pending",
+            "created_at",
+            postgresql_where=text("ai_draft_status = 'pending'"),
+        ),
+        Index(
+            "ix_action_options_ai_draft_processing",
+            "ai_draft_claimed_at",
+            postgresql_where=text("ai_draft_status = 'processing'"),
+        ),
+    )
+
 
 class LinkedAction(Base):
     """
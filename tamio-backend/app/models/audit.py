@@ -3,8 +3,13 @@ Audit Log model for tracking all data changes.
 
 This provides a comprehensive audit trail for debugging, compliance, and
 understanding data flow through the system.
+
+audit_logs is range-partitioned by month on created_at. Old partitions are
+exported to Parquet and dropped by app/audit/retention.py.
 """
-from sqlalchemy import Column, String, DateTime, Text, Index
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, String, DateTime, Text, Index, PrimaryKeyConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
@@ -26,16 +31,16 @@ class AuditLog(Base):
 
     __tablename__ = "audit_logs"
 
-    id = Column(String, primary_key=True, default=lambda: generate_id("audit"))
+    id = Column(String, nullable=False, default=lambda: generate_id("audit"))
 
     # What changed?
-    entity_type = Column(String, nullable=False, index=True)
+    entity_type = Column(String, nullable=False)
     # Options: "client", "expense_bucket", "obligation", "schedule", "payment", "cash_event", etc.
 
-    entity_id = Column(String, nullable=False, index=True)
+    entity_id = Column(String, nullable=False)
 
     # What kind of change?
-    action = Column(String, nullable=False, index=True)
+    action = Column(String, nullable=False)
     # Options:
     # - "create": New record created
     # - "update": Record updated
@@ -54,7 +59,7 @@ class AuditLog(Base):
     new_value = Column(JSONB, nullable=True)
 
     # Who made the change?
-    user_id = Column(String, nullable=True, index=True)
+    user_id = Column(String, nullable=True)
 
     # What triggered the change?
     source = Column(String, nullable=False, default="api")
@@ -79,15 +84,24 @@ class AuditLog(Base):
 
     notes = Column(Text, nullable=True)
 
-    # When?
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    # When? (partition key, so part of the primary key)
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
 
-    # Indexes for common queries
+    # Indexes for common queries (created on each partition)
     __table_args__ = (
-        Index("ix_audit_log_entity", "entity_type", "entity_id"),
+        PrimaryKeyConstraint("id", "created_at"),
+        Index("ix_audit_log_entity", "entity_type", "entity_id", "created_at"),
         Index("ix_audit_log_entity_action", "entity_type", "action"),
         Index("ix_audit_log_user_time", "user_id", "created_at"),
+        Index("ix_audit_log_action_time", "action", "created_at"),
         Index("ix_audit_log_source", "source"),
+        Index("ix_audit_log_created_at", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
     def __repr__(self):
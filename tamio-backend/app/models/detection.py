@@ -8,7 +8,7 @@ from datetime import datetime
 from enum import Enum
 from uuid import uuid4
 
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Float, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, BigInteger, Float, ForeignKey, JSON, Index, text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -134,3 +134,24 @@ class DetectionAlert(Base):
     user = relationship("User", back_populates="detection_alerts")
     rule = relationship("DetectionRule", back_populates="alerts")
     prepared_actions = relationship("PreparedAction", back_populates="alert", cascade="all, delete-orphan")
+
+
+class DetectionChange(Base):
+    """
+    Latest data change per user and entity type - the detection dirty set.
+
+    Written in the same transaction as the change (see
+    app/detection/changes.py). Scheduled sweeps only run the detectors
+    affected by entity types changed since their last run, by change_xid.
+    """
+    __tablename__ = "detection_changes"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    entity_type = Column(String, primary_key=True)  # "client" | "expense_bucket" | "obligation" | "payment" | "cash_account" | "config"
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    change_xid = Column(BigInteger, nullable=False, server_default=text("0"))  # Writing transaction's id
+
+    __table_args__ = (
+        Index("ix_detection_changes_changed_at", "changed_at"),
+        Index("ix_detection_changes_change_xid", "change_xid"),
+    )
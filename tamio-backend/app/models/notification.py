@@ -7,7 +7,7 @@ Database models for notification preferences and history.
 from enum import Enum
 from uuid import uuid4
 
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey, Index
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -38,7 +38,16 @@ class NotificationType(str, Enum):
 class NotificationChannel(str, Enum):
     """Delivery channels for notifications."""
     EMAIL = "email"
-    # Future: SMS = "sms", PUSH = "push", SLACK = "slack"
+    SLACK = "slack"
+    # Future: SMS = "sms", PUSH = "push"
+
+
+class OutboxStatus(str, Enum):
+    """Delivery status of a queued notification."""
+    PENDING = "pending"      # Waiting for the dispatcher
+    SENT = "sent"            # Delivered by the provider
+    SKIPPED = "skipped"      # Suppressed by preferences or cooldown
+    FAILED = "failed"        # Gave up after max attempts
 
 
 class NotificationPreference(Base):
@@ -114,3 +123,38 @@ class NotificationLog(Base):
     user = relationship("User", backref="notification_logs")
     alert = relationship("DetectionAlert", backref="notifications")
     action = relationship("PreparedAction", backref="notifications")
+
+
+class NotificationOutbox(Base):
+    """
+    Queued alert notifications awaiting dispatch.
+
+    Detection runs enqueue one row per (alert, channel) in the same
+    transaction that creates the alert. The dispatcher claims pending rows
+    in batches, coalesces them per user and channel, and records the
+    outcome in NotificationLog.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    alert_id = Column(String, ForeignKey("detection_alerts.id", ondelete="CASCADE"), nullable=False)
+
+    notification_type = Column(SQLEnum(NotificationType), nullable=False)
+    channel = Column(SQLEnum(NotificationChannel), nullable=False)
+
+    # Delivery state
+    status = Column(String, nullable=False, default=OutboxStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    error_message = Column(String, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    alert = relationship("DetectionAlert")
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_created", "status", "created_at"),
+    )
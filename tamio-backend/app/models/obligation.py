@@ -137,6 +137,10 @@ class ObligationSchedule(Base):
     id = Column(String, primary_key=True, default=lambda: generate_id("sched"))
     obligation_id = Column(String, ForeignKey("obligation_agreements.id", ondelete="CASCADE"), nullable=False, index=True)
 
+    # Denormalised from the obligation so tenant queries don't need the join.
+    # Set by whoever creates the schedule (always obligation.user_id).
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
     # When is payment due?
     due_date = Column(Date, nullable=False, index=True)
 
@@ -186,6 +190,14 @@ class ObligationSchedule(Base):
         Index("ix_obligation_schedules_obligation_id", "obligation_id"),
         Index("ix_obligation_schedules_due_date", "due_date"),
         Index("ix_obligation_schedules_status", "status"),
+        # Tenant range scans: open schedules by status, and all schedules by date
+        Index("ix_obligation_schedules_user_status_due", "user_id", "status", "due_date"),
+        Index(
+            "ix_obligation_schedules_user_due",
+            "user_id",
+            "due_date",
+            postgresql_include=["estimated_amount"],
+        ),
     )
 
 
@@ -263,4 +275,6 @@ class PaymentEvent(Base):
         Index("ix_payment_events_obligation_id", "obligation_id"),
         Index("ix_payment_events_schedule_id", "schedule_id"),
         Index("ix_payment_events_account_id", "account_id"),
+        # Keyset order of the payment listings
+        Index("ix_payment_events_user_date_id", "user_id", "payment_date", "id"),
     )
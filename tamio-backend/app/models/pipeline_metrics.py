@@ -0,0 +1,105 @@
+"""
+Pipeline Metrics models.
+
+Typed per-run metrics and daily rollups for the detection → preparation
+pipeline. The health endpoints read these instead of scanning audit logs
+and summing fields out of JSON.
+
+pipeline_run_metrics is range-partitioned by month on run_at (see
+app/partitions.py); the rollup tables are small and unpartitioned.
+"""
+from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime, Index, PrimaryKeyConstraint
+from sqlalchemy.sql import func
+
+from app.database import Base
+from app.models.base import generate_id
+
+
+class PipelineRunMetric(Base):
+    """
+    One row per pipeline run.
+
+    Partitioned by month on run_at, so the primary key includes run_at.
+    """
+
+    __tablename__ = "pipeline_run_metrics"
+
+    id = Column(String, nullable=False, default=lambda: generate_id("prm"))
+    run_at = Column(DateTime(timezone=True), nullable=False)
+    user_id = Column(String, nullable=False)
+    run_id = Column(String, nullable=False)
+    mode = Column(String, nullable=False)
+
+    alerts_detected = Column(Integer, nullable=False, default=0)
+    actions_prepared = Column(Integer, nullable=False, default=0)
+    escalations_applied = Column(Integer, nullable=False, default=0)
+
+    detection_ms = Column(Integer, nullable=False, default=0)
+    preparation_ms = Column(Integer, nullable=False, default=0)
+    escalation_ms = Column(Integer, nullable=False, default=0)
+    total_ms = Column(Integer, nullable=False, default=0)
+
+    has_errors = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "run_at"),
+        Index("ix_pipeline_run_metrics_user_run_at", "user_id", "run_at"),
+        {"postgresql_partition_by": "RANGE (run_at)"},
+    )
+
+    def __repr__(self):
+        return f"<PipelineRunMetric {self.run_id} user={self.user_id} total_ms={self.total_ms}>"
+
+
+class PipelineDailyRollup(Base):
+    """
+    Per-user, per-day pipeline totals.
+
+    Upserted on every run, so a 7-day health check reads at most 7 rows.
+    """
+
+    __tablename__ = "pipeline_daily_rollups"
+
+    user_id = Column(String, nullable=False)
+    day = Column(Date, nullable=False)
+
+    runs = Column(Integer, nullable=False, default=0)
+    successful_runs = Column(Integer, nullable=False, default=0)
+    total_duration_ms = Column(Integer, nullable=False, default=0)
+    max_duration_ms = Column(Integer, nullable=False, default=0)
+
+    alerts_detected = Column(Integer, nullable=False, default=0)
+    actions_prepared = Column(Integer, nullable=False, default=0)
+    escalations_applied = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "day"),
+    )
+
+    def __repr__(self):
+        return f"<PipelineDailyRollup {self.user_id} {self.day}: {self.runs} runs>"
+
+
+class PipelineDailyTypeCount(Base):
+    """
+    Per-user, per-day counts of alerts and actions by type.
+
+    kind is "alert" (detection type) or "action" (action type).
+    """
+
+    __tablename__ = "pipeline_daily_type_counts"
+
+    user_id = Column(String, nullable=False)
+    day = Column(Date, nullable=False)
+    kind = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "day", "kind", "type"),
+    )
+
+    def __repr__(self):
+        return f"<PipelineDailyTypeCount {self.user_id} {self.day} {self.kind}/{self.type}={self.count}>"
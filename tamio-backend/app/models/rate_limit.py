@@ -0,0 +1,23 @@
+"""
+Rate Limit models.
+
+Token buckets shared by every worker when RATE_LIMIT_STORAGE="postgres"
+(see app/middleware/rate_limit.py). The table is UNLOGGED: buckets are
+cheap to lose on a crash and are written on nearly every request.
+"""
+from sqlalchemy import Column, String, Float, Boolean, DateTime
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class RateLimitBucket(Base):
+    """One token bucket, keyed by principal (user or client IP)."""
+
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key = Column(String, primary_key=True)  # "user:<id>" | "ip:<address>"
+    tokens = Column(Float, nullable=False)
+    allowed = Column(Boolean, nullable=False, default=True)  # Outcome of the last take
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
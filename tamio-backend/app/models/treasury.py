@@ -1,5 +1,5 @@
-"""Treasury models: Client, ExpenseBucket, CashAccount, ExchangeRate."""
-from sqlalchemy import Column, String, DateTime, Date, Numeric, Boolean, Integer, Text, ForeignKey, UniqueConstraint
+"""Treasury models: Client, Receivable, ExpenseBucket, CashAccount, ExchangeRate."""
+from sqlalchemy import Column, String, DateTime, Date, Numeric, Boolean, Integer, Text, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -82,6 +82,55 @@ class Client(Base):
         foreign_keys="[ObligationAgreement.client_id]"
     )
 
+    # One-to-Many: Client -> Receivable (outstanding invoices)
+    receivables = relationship(
+        "Receivable",
+        back_populates="client",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class Receivable(Base):
+    """
+    Receivable model - one outstanding customer invoice.
+
+    Normalised copy of billing_config["outstanding_invoices"], maintained by
+    the Xero invoice sync, so AR within N days is a range aggregate on
+    (user_id, expected_date) rather than a scan of every client's JSON.
+    """
+
+    __tablename__ = "receivables"
+
+    id = Column(String, primary_key=True, default=lambda: generate_id("recv"))
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    client_id = Column(String, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Origin of the invoice and its id there
+    source = Column(String, nullable=False, default="xero")  # "xero" | "manual"
+    external_id = Column(String, nullable=True)  # Xero InvoiceID
+
+    invoice_number = Column(String, nullable=True)
+    name = Column(String, nullable=True)
+    amount = Column(Numeric(precision=15, scale=2), nullable=False)  # Amount still due
+    currency = Column(String, nullable=False, default="USD")
+
+    # expected_date is when cash is expected; due_date is the invoice due date
+    expected_date = Column(Date, nullable=False)
+    due_date = Column(Date, nullable=True)
+    payment_terms = Column(String, nullable=True)
+
+    synced_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Relationships
+    client = relationship("Client", back_populates="receivables")
+
+    __table_args__ = (
+        Index("ix_receivables_user_expected", "user_id", "expected_date"),
+        UniqueConstraint("user_id", "source", "external_id", name="uq_receivables_user_source_external"),
+    )
+
 
 class ExpenseBucket(Base):
     """Expense Bucket model - Page 3: Cash Out."""
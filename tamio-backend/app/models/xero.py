@@ -1,5 +1,5 @@
 """Database models for Xero integration."""
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Boolean, Integer, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
@@ -67,7 +67,7 @@ class XeroSyncLog(Base):
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Sync details
-    sync_type = Column(String, nullable=False)  # "full" | "incremental" | "invoices" | "contacts"
+    sync_type = Column(String, nullable=False)  # "full" | "invoices" | "contacts" | "webhook"
     status = Column(String, nullable=False)  # "started" | "completed" | "failed"
 
     # Results
@@ -79,3 +79,44 @@ class XeroSyncLog(Base):
     # Timing
     started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    stage_durations_ms = Column(JSONB, nullable=True)  # {"fetch": 812.4, "contacts": 35.1, ...}
+
+
+class XeroWebhookEvent(Base):
+    """Intake queue for Xero webhook change events.
+
+    Pending events coalesce per (tenant, resource type, resource): a burst
+    of updates to one invoice is one row with event_count > 1, fetched once.
+    """
+
+    __tablename__ = "xero_webhook_events"
+
+    id = Column(String, primary_key=True, default=lambda: generate_id("xwh"))
+    tenant_id = Column(String, nullable=False)  # Xero organisation ID
+    resource_type = Column(String, nullable=False)  # "INVOICE" | "CONTACT"
+    resource_id = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)  # Latest event: "CREATE" | "UPDATE"
+
+    event_count = Column(Integer, nullable=False, default=1)
+    first_event_at = Column(DateTime(timezone=True), nullable=True)
+    last_event_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Processing
+    status = Column(String, nullable=False, default="pending")  # "pending" | "processing" | "done" | "failed"
+    attempts = Column(Integer, nullable=False, default=0)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # One pending row per entity; new events for it coalesce into that row
+        Index(
+            "uq_xero_webhook_events_pending",
+            "tenant_id", "resource_type", "resource_id",
+            unique=True,
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index("ix_xero_webhook_events_status_received", "status", "received_at"),
+    )
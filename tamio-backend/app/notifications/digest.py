@@ -0,0 +1,242 @@
+"""
+Daily Digest Builder - V4 Architecture
+
+Set-based daily digest generation.
+
+Instead of five-plus queries per user, the builder loads everything for a
+chunk of users with a fixed number of grouped queries:
+1. Eligible recipients (digest enabled + email)
+2. Active alert counts grouped by (user, severity)
+3. Pending action counts grouped by user
+4. Top-N recent active alerts per user (window function)
+
+Digests are then rendered in memory and sent through the email provider's
+batch API.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import (
+    User,
+    DetectionAlert,
+    AlertSeverity,
+    AlertStatus,
+    PreparedAction,
+    ActionStatus,
+)
+
+from .models import (
+    NotificationPreference,
+    NotificationType,
+    NotificationChannel,
+    NotificationLog,
+)
+from .templates import build_daily_digest_email
+from .email_provider import EmailProvider, EmailMessage
+
+logger = logging.getLogger(__name__)
+
+# Users processed per round of grouped queries
+DIGEST_CHUNK_SIZE = 500
+
+# Alerts listed in each digest
+DIGEST_ALERT_LIMIT = 10
+
+
+@dataclass
+class DigestData:
+    """Everything needed to render one user's digest."""
+    user_id: str
+    email: str
+    emergency_count: int = 0
+    this_week_count: int = 0
+    upcoming_count: int = 0
+    actions_pending: int = 0
+    alerts_summary: List[dict] = field(default_factory=list)
+
+
+class DailyDigestBuilder:
+    """Builds and sends daily digests for many users at once."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        email_provider: EmailProvider,
+        chunk_size: int = DIGEST_CHUNK_SIZE,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.db = db
+        self.email_provider = email_provider
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency or settings.NOTIFICATION_DISPATCH_CONCURRENCY
+
+    # =========================================================================
+    # LOADING
+    # =========================================================================
+
+    async def _load_recipients(self, user_ids: Optional[List[str]]) -> Dict[str, str]:
+        """
+        Users who opted into the digest and have an email.
+
+        DAILY_DIGEST is off by default, so only an explicit enabled
+        preference makes a user eligible.
+        """
+        query = (
+            select(User.id, User.email)
+            .join(
+                NotificationPreference,
+                (NotificationPreference.user_id == User.id)
+                & (NotificationPreference.notification_type == NotificationType.DAILY_DIGEST),
+            )
+            .where(NotificationPreference.email_enabled == True)
+            .where(User.email.isnot(None))
+        )
+        if user_ids is not None:
+            query = query.where(User.id.in_(user_ids))
+
+        result = await self.db.execute(query)
+        return {row.id: row.email for row in result.all()}
+
+    async def _load_alert_counts(self, digests: Dict[str, DigestData]) -> None:
+        result = await self.db.execute(
+            select(DetectionAlert.user_id, DetectionAlert.severity, func.count(DetectionAlert.id))
+            .where(DetectionAlert.user_id.in_(list(digests)))
+            .where(DetectionAlert.status == AlertStatus.ACTIVE)
+            .group_by(DetectionAlert.user_id, DetectionAlert.severity)
+        )
+        for user_id, severity, count in result.all():
+            digest = digests[user_id]
+            if severity == AlertSeverity.EMERGENCY:
+                digest.emergency_count = count
+            elif severity == AlertSeverity.THIS_WEEK:
+                digest.this_week_count = count
+            elif severity == AlertSeverity.UPCOMING:
+                digest.upcoming_count = count
+
+    async def _load_pending_actions(self, digests: Dict[str, DigestData]) -> None:
+        result = await self.db.execute(
+            select(PreparedAction.user_id, func.count(PreparedAction.id))
+            .where(PreparedAction.user_id.in_(list(digests)))
+            .where(PreparedAction.status == ActionStatus.PENDING_APPROVAL)
+            .group_by(PreparedAction.user_id)
+        )
+        for user_id, count in result.all():
+            digests[user_id].actions_pending = count
+
+    async def _load_recent_alerts(self, digests: Dict[str, DigestData]) -> None:
+        """Top DIGEST_ALERT_LIMIT active alerts per user, emergency first."""
+        ranked = (
+            select(
+                DetectionAlert.user_id,
+                DetectionAlert.title,
+                DetectionAlert.description,
+                DetectionAlert.severity,
+                DetectionAlert.detection_type,
+                func.row_number().over(
+                    partition_by=DetectionAlert.user_id,
+                    order_by=(DetectionAlert.severity.asc(), DetectionAlert.detected_at.desc()),
+                ).label("rank"),
+            )
+            .where(DetectionAlert.user_id.in_(list(digests)))
+            .where(DetectionAlert.status == AlertStatus.ACTIVE)
+            .subquery()
+        )
+        result = await self.db.execute(
+            select(ranked)
+            .where(ranked.c.rank <= DIGEST_ALERT_LIMIT)
+            .order_by(ranked.c.user_id, ranked.c.rank)
+        )
+        for row in result.all():
+            digests[row.user_id].alerts_summary.append({
+                "title": row.title,
+                "description": row.description,
+                "severity": row.severity,
+                "detection_type": row.detection_type,
+            })
+
+    async def build(self, user_ids: Optional[List[str]] = None) -> List[DigestData]:
+        """
+        Load digest data for the given users (or every eligible user).
+
+        Issues four grouped queries per chunk of DIGEST_CHUNK_SIZE users.
+        """
+        recipients = await self._load_recipients(user_ids)
+        ordered = list(recipients.items())
+        built: List[DigestData] = []
+
+        for start in range(0, len(ordered), self.chunk_size):
+            digests = {
+                user_id: DigestData(user_id=user_id, email=email)
+                for user_id, email in ordered[start:start + self.chunk_size]
+            }
+            await self._load_alert_counts(digests)
+            await self._load_pending_actions(digests)
+            await self._load_recent_alerts(digests)
+            built.extend(digests.values())
+
+        return built
+
+    # =========================================================================
+    # SENDING
+    # =========================================================================
+
+    def _render(self, digest: DigestData) -> EmailMessage:
+        subject, html_body, plain_text = build_daily_digest_email(
+            emergency_count=digest.emergency_count,
+            this_week_count=digest.this_week_count,
+            upcoming_count=digest.upcoming_count,
+            actions_pending=digest.actions_pending,
+            alerts_summary=digest.alerts_summary,
+            dashboard_url=f"{settings.FRONTEND_URL}/dashboard",
+            settings_url=f"{settings.FRONTEND_URL}/settings",
+        )
+        return EmailMessage(
+            to=digest.email,
+            subject=subject,
+            html_body=html_body,
+            plain_text_body=plain_text,
+        )
+
+    async def send(self, user_ids: Optional[List[str]] = None) -> dict:
+        """
+        Build, render and send digests, logging each delivery.
+
+        Does not commit; the caller owns the transaction.
+        Returns counts of sent and failed digests.
+        """
+        summary = {"sent": 0, "failed": 0, "errors": []}
+
+        digests = await self.build(user_ids)
+        if not digests:
+            return summary
+
+        messages = [self._render(d) for d in digests]
+        results = await self.email_provider.send_batch(messages, max_concurrency=self.max_concurrency)
+
+        logs = []
+        for digest, message, result in zip(digests, messages, results):
+            logs.append(NotificationLog(
+                user_id=digest.user_id,
+                notification_type=NotificationType.DAILY_DIGEST,
+                channel=NotificationChannel.EMAIL,
+                recipient=digest.email,
+                subject=message.subject,
+                delivered=result.success,
+                error_message=result.error,
+                external_id=result.message_id,
+            ))
+            if result.success:
+                summary["sent"] += 1
+            else:
+                summary["failed"] += 1
+                summary["errors"].append({"user_id": digest.user_id, "error": result.error})
+
+        self.db.add_all(logs)
+        logger.info(f"Daily digests: {summary['sent']} sent, {summary['failed']} failed")
+        return summary
@@ -0,0 +1,424 @@
+"""
+Notification Dispatcher - V4 Architecture
+
+Outbox-based delivery for alert notifications.
+
+Detection runs call enqueue_alert_notifications() inside the transaction that
+creates the alerts. NotificationDispatcher then claims pending outbox rows in
+batches and:
+- Preloads preferences, cooldowns and recipient emails once per batch
+- Coalesces queued alerts into one message per (user, channel)
+- Sends email through the provider's batch API and Slack with bounded concurrency
+- Records NotificationLog rows and marks outbox rows sent/skipped/failed
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import User, DetectionAlert, AlertSeverity, DetectionType
+
+from .models import (
+    NotificationPreference,
+    NotificationType,
+    NotificationChannel,
+    NotificationLog,
+    NotificationOutbox,
+    OutboxStatus,
+)
+from .templates import build_alert_email, build_alert_batch_email
+from .email_provider import (
+    EmailProvider,
+    EmailMessage,
+    get_email_provider,
+    SlackProvider,
+    SlackMessage,
+    get_slack_provider,
+)
+from .service import email_enabled_for
+
+logger = logging.getLogger(__name__)
+
+# Alerts sent within this window are not re-sent on the same channel
+ALERT_COOLDOWN_MINUTES = 60
+
+# Slack allows 50 blocks per message; each alert uses up to 5
+SLACK_ALERTS_PER_MESSAGE = 8
+
+
+def _notification_type_for(severity: str) -> Optional[NotificationType]:
+    """Map alert severity to its notification type (None = don't notify)."""
+    if severity == AlertSeverity.EMERGENCY:
+        return NotificationType.ALERT_EMERGENCY
+    if severity == AlertSeverity.THIS_WEEK:
+        return NotificationType.ALERT_THIS_WEEK
+    return None
+
+
+async def enqueue_alert_notifications(
+    db: AsyncSession,
+    alerts: List[DetectionAlert],
+) -> int:
+    """
+    Queue notifications for newly created alerts.
+
+    Adds outbox rows to the caller's session so they commit atomically with
+    the alerts. Email is queued for EMERGENCY and THIS_WEEK alerts, Slack for
+    EMERGENCY only.
+
+    Returns the number of outbox rows added.
+    """
+    rows = []
+    for alert in alerts:
+        notification_type = _notification_type_for(alert.severity)
+        if notification_type is None:
+            continue
+
+        rows.append(NotificationOutbox(
+            alert=alert,
+            user_id=alert.user_id,
+            notification_type=notification_type,
+            channel=NotificationChannel.EMAIL,
+        ))
+        if alert.severity == AlertSeverity.EMERGENCY:
+            rows.append(NotificationOutbox(
+                alert=alert,
+                user_id=alert.user_id,
+                notification_type=notification_type,
+                channel=NotificationChannel.SLACK,
+            ))
+
+    db.add_all(rows)
+    return len(rows)
+
+
+class NotificationDispatcher:
+    """
+    Delivers queued alert notifications in batches.
+
+    Providers default to the same configuration as NotificationService;
+    pass StubEmailProvider/StubSlackProvider in tests.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        email_provider: Optional[EmailProvider] = None,
+        slack_provider: Optional[SlackProvider] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.db = db
+        self.email_provider = email_provider or get_email_provider(
+            resend_api_key=getattr(settings, "RESEND_API_KEY", None),
+            console_mode=settings.APP_ENV == "development",
+        )
+        self.slack_provider = slack_provider or get_slack_provider(
+            bot_token=getattr(settings, "SLACK_BOT_TOKEN", None),
+            default_channel=getattr(settings, "SLACK_DEFAULT_CHANNEL", "#treasury-alerts"),
+            console_mode=settings.APP_ENV == "development",
+        )
+        self.batch_size = batch_size or settings.NOTIFICATION_DISPATCH_BATCH_SIZE
+        self.max_concurrency = max_concurrency or settings.NOTIFICATION_DISPATCH_CONCURRENCY
+        self.max_attempts = max_attempts or settings.NOTIFICATION_MAX_ATTEMPTS
+
+    def _get_dashboard_url(self) -> str:
+        return f"{settings.FRONTEND_URL}/dashboard"
+
+    def _get_settings_url(self) -> str:
+        return f"{settings.FRONTEND_URL}/settings"
+
+    # =========================================================================
+    # BATCH LOADING
+    # =========================================================================
+
+    async def _claim_pending(self) -> List[NotificationOutbox]:
+        """Lock a batch of pending rows; other workers skip locked rows."""
+        result = await self.db.execute(
+            select(NotificationOutbox)
+            .where(NotificationOutbox.status == OutboxStatus.PENDING.value)
+            .order_by(NotificationOutbox.created_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    async def _load_alerts(self, alert_ids: List[str]) -> Dict[str, DetectionAlert]:
+        result = await self.db.execute(
+            select(DetectionAlert).where(DetectionAlert.id.in_(alert_ids))
+        )
+        return {alert.id: alert for alert in result.scalars().all()}
+
+    async def _load_emails(self, user_ids: List[str]) -> Dict[str, str]:
+        result = await self.db.execute(
+            select(User.id, User.email).where(User.id.in_(user_ids))
+        )
+        return {row.id: row.email for row in result.all()}
+
+    async def _load_preferences(
+        self,
+        user_ids: List[str],
+    ) -> Dict[Tuple[str, NotificationType], NotificationPreference]:
+        result = await self.db.execute(
+            select(NotificationPreference)
+            .where(NotificationPreference.user_id.in_(user_ids))
+            .where(NotificationPreference.notification_type.in_([
+                NotificationType.ALERT_EMERGENCY,
+                NotificationType.ALERT_THIS_WEEK,
+            ]))
+        )
+        return {
+            (pref.user_id, pref.notification_type): pref
+            for pref in result.scalars().all()
+        }
+
+    async def _load_recent(
+        self,
+        alert_ids: List[str],
+    ) -> set:
+        """(alert_id, channel) pairs delivered within the cooldown window."""
+        cutoff = datetime.utcnow() - timedelta(minutes=ALERT_COOLDOWN_MINUTES)
+        result = await self.db.execute(
+            select(NotificationLog.alert_id, NotificationLog.channel)
+            .where(NotificationLog.alert_id.in_(alert_ids))
+            .where(NotificationLog.sent_at > cutoff)
+            .where(NotificationLog.delivered == True)
+        )
+        return {(row.alert_id, row.channel) for row in result.all()}
+
+    # =========================================================================
+    # DISPATCH
+    # =========================================================================
+
+    async def dispatch_pending(self) -> dict:
+        """
+        Claim and deliver one batch of queued notifications.
+
+        Commits the outcome. Returns counts for the batch.
+        """
+        summary = {
+            "claimed": 0,
+            "email_sent": 0,
+            "slack_sent": 0,
+            "skipped": 0,
+            "failed": 0,
+            "total": 0,
+        }
+
+        entries = await self._claim_pending()
+        summary["claimed"] = len(entries)
+        if not entries:
+            return summary
+
+        alert_ids = list({e.alert_id for e in entries})
+        user_ids = list({e.user_id for e in entries})
+
+        alerts = await self._load_alerts(alert_ids)
+        emails = await self._load_emails(user_ids)
+        preferences = await self._load_preferences(user_ids)
+        recent = await self._load_recent(alert_ids)
+
+        now = datetime.utcnow()
+        groups: Dict[Tuple[str, NotificationChannel], List[NotificationOutbox]] = defaultdict(list)
+
+        for entry in entries:
+            alert = alerts.get(entry.alert_id)
+            skip_reason = None
+            if alert is None:
+                skip_reason = "alert no longer exists"
+            elif (entry.alert_id, entry.channel) in recent:
+                skip_reason = "sent within cooldown"
+            elif entry.channel == NotificationChannel.EMAIL:
+                pref = preferences.get((entry.user_id, entry.notification_type))
+                if not email_enabled_for(pref, entry.notification_type):
+                    skip_reason = "disabled by preference"
+                elif not emails.get(entry.user_id):
+                    skip_reason = "user has no email"
+
+            if skip_reason:
+                entry.status = OutboxStatus.SKIPPED.value
+                entry.error_message = skip_reason
+                entry.dispatched_at = now
+                summary["skipped"] += 1
+                continue
+
+            groups[(entry.user_id, entry.channel)].append(entry)
+
+        email_groups = [(uid, g) for (uid, ch), g in groups.items() if ch == NotificationChannel.EMAIL]
+        slack_groups = [(uid, g) for (uid, ch), g in groups.items() if ch == NotificationChannel.SLACK]
+
+        sent_email, failed_email = await self._dispatch_email(email_groups, alerts, emails)
+        sent_slack, failed_slack = await self._dispatch_slack(slack_groups, alerts)
+
+        summary["email_sent"] = sent_email
+        summary["slack_sent"] = sent_slack
+        summary["failed"] = failed_email + failed_slack
+        summary["total"] = sent_email + sent_slack
+
+        await self.db.commit()
+        return summary
+
+    async def _dispatch_email(
+        self,
+        groups: List[Tuple[str, List[NotificationOutbox]]],
+        alerts: Dict[str, DetectionAlert],
+        emails: Dict[str, str],
+    ) -> Tuple[int, int]:
+        """Send one email per user. Returns (sent, failed) message counts."""
+        if not groups:
+            return 0, 0
+
+        messages = [
+            self._build_email(emails[user_id], [alerts[e.alert_id] for e in group])
+            for user_id, group in groups
+        ]
+        results = await self.email_provider.send_batch(messages, max_concurrency=self.max_concurrency)
+
+        sent = failed = 0
+        for (user_id, group), message, result in zip(groups, messages, results):
+            self._record(
+                group,
+                success=result.success,
+                recipient=message.to,
+                subject=message.subject,
+                external_id=result.message_id,
+                error=result.error,
+            )
+            if result.success:
+                sent += 1
+            else:
+                failed += 1
+        return sent, failed
+
+    async def _dispatch_slack(
+        self,
+        groups: List[Tuple[str, List[NotificationOutbox]]],
+        alerts: Dict[str, DetectionAlert],
+    ) -> Tuple[int, int]:
+        """Send coalesced Slack messages. Returns (sent, failed) message counts."""
+        chunks = [
+            group[i:i + SLACK_ALERTS_PER_MESSAGE]
+            for _, group in groups
+            for i in range(0, len(group), SLACK_ALERTS_PER_MESSAGE)
+        ]
+        if not chunks:
+            return 0, 0
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        channel = self.slack_provider.default_channel
+
+        async def _send(chunk: List[NotificationOutbox]):
+            message = self._build_slack(channel, [alerts[e.alert_id] for e in chunk])
+            async with semaphore:
+                return message, await self.slack_provider.send(message)
+
+        sent = failed = 0
+        for chunk, (message, result) in zip(chunks, await asyncio.gather(*[_send(c) for c in chunks])):
+            self._record(
+                chunk,
+                success=result.success,
+                recipient=channel,
+                subject=f"Slack: {message.text}",
+                external_id=result.message_ts,
+                error=result.error,
+            )
+            if result.success:
+                sent += 1
+            else:
+                failed += 1
+        return sent, failed
+
+    def _build_email(self, to: str, alerts: List[DetectionAlert]) -> EmailMessage:
+        if len(alerts) == 1:
+            alert = alerts[0]
+            # Columns hold plain strings; templates expect the enums
+            subject, html_body, plain_text = build_alert_email(
+                alert_title=alert.title,
+                alert_description=alert.description or "",
+                severity=AlertSeverity(alert.severity),
+                detection_type=DetectionType(alert.detection_type),
+                cash_impact=alert.cash_impact,
+                context_data=alert.context_data or {},
+                dashboard_url=self._get_dashboard_url(),
+                settings_url=self._get_settings_url(),
+                deadline=alert.deadline,
+            )
+        else:
+            subject, html_body, plain_text = build_alert_batch_email(
+                alerts=[
+                    {
+                        "title": alert.title,
+                        "description": alert.description,
+                        "severity": alert.severity,
+                        "cash_impact": alert.cash_impact,
+                    }
+                    for alert in alerts
+                ],
+                dashboard_url=self._get_dashboard_url(),
+                settings_url=self._get_settings_url(),
+            )
+        return EmailMessage(to=to, subject=subject, html_body=html_body, plain_text_body=plain_text)
+
+    def _build_slack(self, channel: str, alerts: List[DetectionAlert]) -> SlackMessage:
+        blocks = []
+        for alert in alerts:
+            blocks.extend(self.slack_provider.build_alert_blocks(
+                title=alert.title,
+                description=alert.description or "",
+                severity=getattr(alert.severity, "value", alert.severity),
+                cash_impact=alert.cash_impact,
+                dashboard_url=self._get_dashboard_url(),
+            ))
+        if len(alerts) == 1:
+            text = f"🔴 EMERGENCY: {alerts[0].title}"
+        else:
+            text = f"🔴 {len(alerts)} EMERGENCY alerts"
+        return SlackMessage(channel=channel, text=text, blocks=blocks)
+
+    def _record(
+        self,
+        entries: List[NotificationOutbox],
+        success: bool,
+        recipient: str,
+        subject: str,
+        external_id: Optional[str],
+        error: Optional[str],
+    ) -> None:
+        """Update outbox rows and write one NotificationLog per alert."""
+        now = datetime.utcnow()
+        logs = []
+        for entry in entries:
+            entry.attempts = (entry.attempts or 0) + 1
+            if success:
+                entry.status = OutboxStatus.SENT.value
+                entry.error_message = None
+                entry.dispatched_at = now
+            elif entry.attempts >= self.max_attempts:
+                entry.status = OutboxStatus.FAILED.value
+                entry.error_message = error
+                entry.dispatched_at = now
+            else:
+                # Leave pending for the next dispatch run
+                entry.error_message = error
+                continue
+
+            logs.append(NotificationLog(
+                user_id=entry.user_id,
+                notification_type=entry.notification_type,
+                channel=entry.channel,
+                recipient=recipient,
+                subject=subject,
+                alert_id=entry.alert_id,
+                delivered=success,
+                error_message=error,
+                external_id=external_id,
+            ))
+
+        self.db.add_all(logs)
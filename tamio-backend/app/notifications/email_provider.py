@@ -6,14 +6,46 @@ Default: Resend (simple, modern API)
 Fallback: SMTP (for self-hosted)
 """
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# SHARED HTTP CLIENT
+# =============================================================================
+
+# One keep-alive client shared by every provider instance. Providers are
+# created per NotificationService, so a per-instance client would still
+# reconnect on every dispatch.
+_http_client = None
+
+
+def get_http_client():
+    """Get the shared pooled httpx client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        import httpx
+
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared httpx client (called on application shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
 @dataclass
 class EmailMessage:
     """Email message to send."""
@@ -46,6 +78,25 @@ class EmailProvider(ABC):
         """Check if the provider is properly configured."""
         pass
 
+    async def send_batch(
+        self,
+        messages: List[EmailMessage],
+        max_concurrency: int = 8,
+    ) -> List[SendResult]:
+        """
+        Send several messages, returning results in the same order.
+
+        Providers with a native batch API override this; the default sends
+        individually with bounded concurrency.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _send(message: EmailMessage) -> SendResult:
+            async with semaphore:
+                return await self.send(message)
+
+        return list(await asyncio.gather(*[_send(m) for m in messages]))
+
 
 class ResendProvider(EmailProvider):
     """
@@ -55,10 +106,12 @@ class ResendProvider(EmailProvider):
     https://resend.com/docs/api-reference/emails/send-email
     """
 
+    API_URL = "https://api.resend.com"
+    BATCH_LIMIT = 100  # Max emails per batch request
+
     def __init__(self, api_key: str, from_email: str = "Tamio <notifications@tamio.app>"):
         self.api_key = api_key
         self.from_email = from_email
-        self._client = None
 
     def is_configured(self) -> bool:
         return bool(self.api_key)
@@ -68,41 +121,90 @@ class ResendProvider(EmailProvider):
             return SendResult(success=False, error="Resend API key not configured")
 
         try:
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.resend.com/emails",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "from": message.from_email or self.from_email,
-                        "to": [message.to],
-                        "subject": message.subject,
-                        "html": message.html_body,
-                        "text": message.plain_text_body,
-                        **({"reply_to": message.reply_to} if message.reply_to else {}),
-                    },
-                    timeout=30.0,
-                )
+            response = await get_http_client().post(
+                f"{self.API_URL}/emails",
+                headers=self._headers(),
+                json=self._payload(message),
+            )
 
-                if response.status_code == 200:
-                    data = response.json()
-                    return SendResult(
-                        success=True,
-                        message_id=data.get("id"),
-                    )
-                else:
-                    error_msg = response.text
-                    logger.error(f"Resend API error: {response.status_code} - {error_msg}")
-                    return SendResult(success=False, error=error_msg)
+            if response.status_code == 200:
+                data = response.json()
+                return SendResult(
+                    success=True,
+                    message_id=data.get("id"),
+                )
+            else:
+                error_msg = response.text
+                logger.error(f"Resend API error: {response.status_code} - {error_msg}")
+                return SendResult(success=False, error=error_msg)
 
         except Exception as e:
             logger.exception("Failed to send email via Resend")
             return SendResult(success=False, error=str(e))
 
+    async def send_batch(
+        self,
+        messages: List[EmailMessage],
+        max_concurrency: int = 8,
+    ) -> List[SendResult]:
+        """
+        Send messages through the Resend batch endpoint.
+
+        Messages are split into chunks of BATCH_LIMIT; chunks are posted
+        concurrently up to max_concurrency.
+        https://resend.com/docs/api-reference/emails/send-batch-emails
+        """
+        if not self.is_configured():
+            return [SendResult(success=False, error="Resend API key not configured") for _ in messages]
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        chunks = [messages[i:i + self.BATCH_LIMIT] for i in range(0, len(messages), self.BATCH_LIMIT)]
+
+        async def _post_chunk(chunk: List[EmailMessage]) -> List[SendResult]:
+            async with semaphore:
+                try:
+                    response = await get_http_client().post(
+                        f"{self.API_URL}/emails/batch",
+                        headers=self._headers(),
+                        json=[self._payload(m) for m in chunk],
+                    )
+                except Exception as e:
+                    logger.exception("Failed to send email batch via Resend")
+                    return [SendResult(success=False, error=str(e)) for _ in chunk]
+
+            if response.status_code != 200:
+                error_msg = response.text
+                logger.error(f"Resend batch API error: {response.status_code} - {error_msg}")
+                return [SendResult(success=False, error=error_msg) for _ in chunk]
+
+            data = response.json().get("data", [])
+            results = [SendResult(success=True, message_id=item.get("id")) for item in data]
+            # Defensive: pad if the API returned fewer ids than messages
+            results.extend(
+                SendResult(success=False, error="Missing result in Resend batch response")
+                for _ in range(len(chunk) - len(results))
+            )
+            return results
+
+        chunk_results = await asyncio.gather(*[_post_chunk(c) for c in chunks])
+        return [result for chunk in chunk_results for result in chunk]
+
+    def _headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _payload(self, message: EmailMessage) -> dict:
+        return {
+            "from": message.from_email or self.from_email,
+            "to": [message.to],
+            "subject": message.subject,
+            "html": message.html_body,
+            "text": message.plain_text_body,
+            **({"reply_to": message.reply_to} if message.reply_to else {}),
+        }
+
 
 class SMTPProvider(EmailProvider):
     """
@@ -237,8 +339,6 @@ class SlackProvider:
             return SlackResult(success=False, error="Slack bot token not configured")
 
         try:
-            import httpx
-
             channel = message.channel or self.default_channel
 
             payload = {
@@ -252,29 +352,27 @@ class SlackProvider:
             if message.thread_ts:
                 payload["thread_ts"] = message.thread_ts
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://slack.com/api/chat.postMessage",
-                    headers={
-                        "Authorization": f"Bearer {self.bot_token}",
-                        "Content-Type": "application/json",
-                    },
-                    json=payload,
-                    timeout=30.0,
-                )
+            response = await get_http_client().post(
+                "https://slack.com/api/chat.postMessage",
+                headers={
+                    "Authorization": f"Bearer {self.bot_token}",
+                    "Content-Type": "application/json",
+                },
+                json=payload,
+            )
 
-                data = response.json()
+            data = response.json()
 
-                if data.get("ok"):
-                    return SlackResult(
-                        success=True,
-                        message_ts=data.get("ts"),
-                        channel=data.get("channel"),
-                    )
-                else:
-                    error_msg = data.get("error", "Unknown Slack error")
-                    logger.error(f"Slack API error: {error_msg}")
-                    return SlackResult(success=False, error=error_msg)
+            if data.get("ok"):
+                return SlackResult(
+                    success=True,
+                    message_ts=data.get("ts"),
+                    channel=data.get("channel"),
+                )
+            else:
+                error_msg = data.get("error", "Unknown Slack error")
+                logger.error(f"Slack API error: {error_msg}")
+                return SlackResult(success=False, error=error_msg)
 
         except Exception as e:
             logger.exception("Failed to send Slack message")
@@ -435,6 +533,56 @@ class ConsoleSlackProvider(SlackProvider):
         return SlackResult(success=True, message_ts="console-dev", channel=message.channel)
 
 
+# =============================================================================
+# STUB PROVIDERS (tests / local runs)
+# =============================================================================
+
+class StubEmailProvider(EmailProvider):
+    """
+    In-memory email provider for tests.
+
+    Records every message in `sent` instead of delivering it. Recipients
+    listed in `fail_for` get a failed SendResult.
+    """
+
+    def __init__(self, fail_for: Optional[set] = None):
+        self.sent: List[EmailMessage] = []
+        self.batch_calls = 0
+        self.fail_for = fail_for or set()
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def send(self, message: EmailMessage) -> SendResult:
+        if message.to in self.fail_for:
+            return SendResult(success=False, error="stub failure")
+        self.sent.append(message)
+        return SendResult(success=True, message_id=f"stub-{len(self.sent)}")
+
+    async def send_batch(
+        self,
+        messages: List[EmailMessage],
+        max_concurrency: int = 8,
+    ) -> List[SendResult]:
+        self.batch_calls += 1
+        return [await self.send(m) for m in messages]
+
+
+class StubSlackProvider(SlackProvider):
+    """In-memory Slack provider for tests. Records messages in `sent`."""
+
+    def __init__(self, default_channel: str = "#stub"):
+        super().__init__(bot_token="", default_channel=default_channel)
+        self.sent: List[SlackMessage] = []
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def send(self, message: SlackMessage) -> SlackResult:
+        self.sent.append(message)
+        return SlackResult(success=True, message_ts=f"stub-{len(self.sent)}", channel=message.channel)
+
+
 # =============================================================================
 # FACTORY FUNCTIONS
 # =============================================================================
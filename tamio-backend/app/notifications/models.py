@@ -7,6 +7,8 @@ from app.models.notification import (
     NotificationChannel,
     NotificationPreference,
     NotificationLog,
+    OutboxStatus,
+    NotificationOutbox,
 )
 
 __all__ = [
@@ -14,4 +16,6 @@ __all__ = [
     "NotificationChannel",
     "NotificationPreference",
     "NotificationLog",
+    "OutboxStatus",
+    "NotificationOutbox",
 ]
@@ -6,15 +6,20 @@ Main service for sending notifications when alerts fire.
 
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional
 
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.data.users.models import User
-from app.detection.models import DetectionAlert, AlertSeverity, AlertStatus
-from app.preparation.models import PreparedAction, ActionStatus
+from app.models import (
+    User,
+    DetectionAlert,
+    AlertSeverity,
+    AlertStatus,
+    PreparedAction,
+    ActionStatus,
+)
 
 from .models import (
     NotificationPreference,
@@ -26,8 +31,8 @@ from .templates import (
     build_alert_email,
     build_escalation_email,
     build_action_ready_email,
-    build_daily_digest_email,
 )
+from .digest import DailyDigestBuilder
 from .email_provider import (
     EmailProvider,
     EmailMessage,
@@ -40,6 +45,25 @@ from .email_provider import (
 logger = logging.getLogger(__name__)
 
 
+# Notification types that send email when the user has no stored preference
+DEFAULT_EMAIL_ENABLED = {
+    NotificationType.ALERT_EMERGENCY,
+    NotificationType.ALERT_THIS_WEEK,
+    NotificationType.ALERT_ESCALATED,
+    NotificationType.ACTION_READY,
+}
+
+
+def email_enabled_for(
+    pref: Optional[NotificationPreference],
+    notification_type: NotificationType,
+) -> bool:
+    """Resolve whether email is enabled, falling back to defaults when no preference exists."""
+    if not pref:
+        return notification_type in DEFAULT_EMAIL_ENABLED
+    return pref.email_enabled
+
+
 class NotificationService:
     """
     Service for sending notifications.
@@ -95,24 +119,7 @@ class NotificationService:
     ) -> bool:
         """Check if email should be sent based on user preferences."""
         pref = await self._get_user_preferences(user_id, notification_type)
-
-        # If no preference exists, use defaults
-        if not pref:
-            # Emergency alerts always send by default
-            if notification_type == NotificationType.ALERT_EMERGENCY:
-                return True
-            # This-week alerts send by default
-            if notification_type == NotificationType.ALERT_THIS_WEEK:
-                return True
-            # Escalations always send
-            if notification_type == NotificationType.ALERT_ESCALATED:
-                return True
-            # Action ready sends by default
-            if notification_type == NotificationType.ACTION_READY:
-                return True
-            return False
-
-        return pref.email_enabled
+        return email_enabled_for(pref, notification_type)
 
     async def _log_notification(
         self,
@@ -125,12 +132,13 @@ class NotificationService:
         delivered: bool = True,
         error_message: Optional[str] = None,
         external_id: Optional[str] = None,
+        channel: NotificationChannel = NotificationChannel.EMAIL,
     ) -> NotificationLog:
         """Log a sent notification."""
         log = NotificationLog(
             user_id=user_id,
             notification_type=notification_type,
-            channel=NotificationChannel.EMAIL,
+            channel=channel,
             recipient=recipient,
             subject=subject,
             alert_id=alert_id,
@@ -295,6 +303,7 @@ class NotificationService:
                 alert_id=alert.id,
                 delivered=True,
                 external_id=result.message_ts,
+                channel=NotificationChannel.SLACK,
             )
             logger.info(f"Sent Slack notification for emergency alert {alert.id}")
         else:
@@ -447,63 +456,8 @@ class NotificationService:
 
     async def send_daily_digest(self, user_id: str) -> bool:
         """Send daily digest email for a user."""
-        notification_type = NotificationType.DAILY_DIGEST
-
-        if not await self._should_send_email(user_id, notification_type):
-            return False
-
-        # Get user email
-        result = await self.db.execute(
-            select(User.email).where(User.id == user_id)
-        )
-        user_email = result.scalar_one_or_none()
-        if not user_email:
-            return False
-
-        # Count alerts by severity
-        emergency_count = await self._count_alerts(user_id, AlertSeverity.EMERGENCY)
-        this_week_count = await self._count_alerts(user_id, AlertSeverity.THIS_WEEK)
-        upcoming_count = await self._count_alerts(user_id, AlertSeverity.UPCOMING)
-
-        # Count pending actions
-        actions_pending = await self._count_pending_actions(user_id)
-
-        # Get recent alerts for summary
-        alerts_summary = await self._get_recent_alerts_summary(user_id)
-
-        # Build email
-        subject, html_body, plain_text = build_daily_digest_email(
-            emergency_count=emergency_count,
-            this_week_count=this_week_count,
-            upcoming_count=upcoming_count,
-            actions_pending=actions_pending,
-            alerts_summary=alerts_summary,
-            dashboard_url=self._get_dashboard_url(user_id),
-            settings_url=self._get_settings_url(),
-        )
-
-        # Send email
-        result = await self.email_provider.send(
-            EmailMessage(
-                to=user_email,
-                subject=subject,
-                html_body=html_body,
-                plain_text_body=plain_text,
-            )
-        )
-
-        # Log
-        await self._log_notification(
-            user_id=user_id,
-            notification_type=notification_type,
-            recipient=user_email,
-            subject=subject,
-            delivered=result.success,
-            error_message=result.error,
-            external_id=result.message_id,
-        )
-
-        return result.success
+        summary = await DailyDigestBuilder(self.db, self.email_provider).send([user_id])
+        return summary["sent"] > 0
 
     async def send_daily_digest_slack(self) -> bool:
         """
@@ -511,27 +465,16 @@ class NotificationService:
 
         Aggregates across all users for the company channel.
         """
-        # Count alerts across all users (company-wide view)
-        emergency_result = await self.db.execute(
-            select(func.count(DetectionAlert.id))
-            .where(DetectionAlert.severity == AlertSeverity.EMERGENCY)
-            .where(DetectionAlert.status == AlertStatus.ACTIVE)
-        )
-        emergency_count = emergency_result.scalar() or 0
-
-        this_week_result = await self.db.execute(
-            select(func.count(DetectionAlert.id))
-            .where(DetectionAlert.severity == AlertSeverity.THIS_WEEK)
+        # Count alerts across all users (company-wide view) in one grouped query
+        counts_result = await self.db.execute(
+            select(DetectionAlert.severity, func.count(DetectionAlert.id))
             .where(DetectionAlert.status == AlertStatus.ACTIVE)
+            .group_by(DetectionAlert.severity)
         )
-        this_week_count = this_week_result.scalar() or 0
-
-        upcoming_result = await self.db.execute(
-            select(func.count(DetectionAlert.id))
-            .where(DetectionAlert.severity == AlertSeverity.UPCOMING)
-            .where(DetectionAlert.status == AlertStatus.ACTIVE)
-        )
-        upcoming_count = upcoming_result.scalar() or 0
+        counts = {severity: count for severity, count in counts_result.all()}
+        emergency_count = counts.get(AlertSeverity.EMERGENCY.value, 0)
+        this_week_count = counts.get(AlertSeverity.THIS_WEEK.value, 0)
+        upcoming_count = counts.get(AlertSeverity.UPCOMING.value, 0)
 
         actions_result = await self.db.execute(
             select(func.count(PreparedAction.id))
@@ -571,96 +514,21 @@ class NotificationService:
 
         return result.success
 
-    async def _count_alerts(self, user_id: str, severity: AlertSeverity) -> int:
-        """Count active alerts by severity."""
-        result = await self.db.execute(
-            select(func.count(DetectionAlert.id))
-            .where(DetectionAlert.user_id == user_id)
-            .where(DetectionAlert.severity == severity)
-            .where(DetectionAlert.status == AlertStatus.ACTIVE)
-        )
-        return result.scalar() or 0
-
-    async def _count_pending_actions(self, user_id: str) -> int:
-        """Count actions pending approval."""
-        result = await self.db.execute(
-            select(func.count(PreparedAction.id))
-            .where(PreparedAction.user_id == user_id)
-            .where(PreparedAction.status == ActionStatus.PENDING_APPROVAL)
-        )
-        return result.scalar() or 0
-
-    async def _get_recent_alerts_summary(
-        self,
-        user_id: str,
-        limit: int = 10,
-    ) -> List[dict]:
-        """Get recent alerts for digest summary."""
-        result = await self.db.execute(
-            select(DetectionAlert)
-            .where(DetectionAlert.user_id == user_id)
-            .where(DetectionAlert.status == AlertStatus.ACTIVE)
-            .order_by(
-                # Emergency first, then by detection time
-                DetectionAlert.severity.asc(),
-                DetectionAlert.detected_at.desc(),
-            )
-            .limit(limit)
-        )
-        alerts = result.scalars().all()
-
-        return [
-            {
-                "title": alert.title,
-                "description": alert.description,
-                "severity": alert.severity.value,
-                "detection_type": alert.detection_type.value,
-            }
-            for alert in alerts
-        ]
-
     # =========================================================================
     # BATCH OPERATIONS
     # =========================================================================
 
     async def send_all_daily_digests(self) -> dict:
         """
-        Send daily digest to all users.
+        Send daily digest to all eligible users.
+
+        Uses DailyDigestBuilder, so the query count is fixed per chunk of
+        users rather than per user.
 
         Returns summary of results.
         """
-        from app.database import async_session_maker
-
-        summary = {
-            "sent": 0,
-            "failed": 0,
-            "skipped": 0,
-            "errors": [],
-        }
-
-        async with async_session_maker() as db:
-            # Get all users
-            result = await db.execute(select(User.id))
-            user_ids = [row[0] for row in result.fetchall()]
-
-            for user_id in user_ids:
-                try:
-                    service = NotificationService(db)
-                    sent = await service.send_daily_digest(user_id)
-                    if sent:
-                        summary["sent"] += 1
-                    else:
-                        summary["skipped"] += 1
-                except Exception as e:
-                    logger.error(f"Failed to send digest to user {user_id}: {e}")
-                    summary["failed"] += 1
-                    summary["errors"].append({
-                        "user_id": user_id,
-                        "error": str(e),
-                    })
-
-            await db.commit()
-
+        summary = await DailyDigestBuilder(self.db, self.email_provider).send()
+        await self.db.commit()
         return summary
 
 
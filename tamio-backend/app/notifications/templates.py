@@ -7,7 +7,7 @@ HTML and plain text email templates for notifications.
 from typing import Optional
 from datetime import datetime
 
-from app.detection.models import AlertSeverity, DetectionType
+from app.models import AlertSeverity, DetectionType
 
 
 def get_severity_color(severity: AlertSeverity) -> str:
@@ -376,6 +376,76 @@ def build_alert_email(
     return subject, html_body, plain_text.strip()
 
 
+def build_alert_batch_email(
+    alerts: list[dict],
+    dashboard_url: str,
+    settings_url: str,
+) -> tuple[str, str, str]:
+    """
+    Build a single email covering several new alerts for one user.
+
+    Each alert dict needs "title", "description", "severity" and
+    "cash_impact". Used by the notification dispatcher when more than one
+    alert for the same user is queued in a batch.
+
+    Returns: (subject, html_body, plain_text_body)
+    """
+    emergency_count = sum(1 for a in alerts if a["severity"] == AlertSeverity.EMERGENCY)
+    top_severity = AlertSeverity.EMERGENCY if emergency_count else AlertSeverity.THIS_WEEK
+    severity_color = get_severity_color(top_severity)
+
+    if emergency_count:
+        subject = f"🔴 {len(alerts)} New Alerts ({emergency_count} Emergency)"
+    else:
+        subject = f"🟡 {len(alerts)} New Alerts Need Attention"
+
+    items = []
+    plain_items = []
+    for alert in alerts:
+        color = get_severity_color(AlertSeverity(alert["severity"]))
+        impact = ""
+        if alert.get("cash_impact") is not None:
+            impact = f"${abs(alert['cash_impact']):,.0f}"
+        items.append(f"""
+        <div style="padding: 12px; border-left: 4px solid {color}; margin-bottom: 8px; background: #F9FAFB;">
+            <strong>{alert["title"]}</strong>
+            <div style="color: #6B7280; font-size: 14px;">{(alert.get("description") or "")[:200]}</div>
+            {f'<div style="font-size: 14px; margin-top: 4px;">Cash impact: <strong>{impact}</strong></div>' if impact else ''}
+        </div>
+        """)
+        plain_items.append(f"- [{get_severity_label(AlertSeverity(alert['severity']))}] {alert['title']}" + (f" ({impact})" if impact else ""))
+
+    content = f"""
+    <div class="card">
+        <span class="severity-badge">{get_severity_label(top_severity)}</span>
+        <h2 class="alert-title">{len(alerts)} new alerts</h2>
+        {"".join(items)}
+        <a href="{dashboard_url}" class="button">View in Dashboard</a>
+    </div>
+    """
+
+    html_body = BASE_HTML_TEMPLATE.format(
+        subject=subject,
+        content=content,
+        severity_color=severity_color,
+        dashboard_url=dashboard_url,
+        settings_url=settings_url,
+    )
+
+    plain_text = f"""
+{len(alerts)} NEW ALERTS
+
+{chr(10).join(plain_items)}
+
+View in Dashboard: {dashboard_url}
+
+---
+Tamio - Your Treasury Operator
+"""
+
+    return subject, html_body, plain_text.strip()
+
+
 # =============================================================================
 # ESCALATION TEMPLATE
 # =============================================================================
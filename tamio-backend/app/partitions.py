@@ -0,0 +1,102 @@
+"""
+Monthly range partition maintenance.
+
+Time-series tables (pipeline metrics, audit logs) are partitioned by month
+on a timestamp column. Partitions are named <table>_yYYYYmMM and cover
+[first of month, first of next month). Each partitioned table also has a
+<table>_default partition so inserts never fail if maintenance falls
+behind.
+"""
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Tables managed by ensure_all_partitions
+PARTITIONED_TABLES = ["pipeline_run_metrics", "audit_logs"]
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month covered by a partition name, or None if it isn't a monthly partition."""
+    match = re.fullmatch(rf"{re.escape(table)}_y(\d{{4}})m(\d{{2}})", name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def partition_ddl(table: str, month: date) -> str:
+    """CREATE TABLE statement for the partition holding the given month."""
+    start = month_start(month)
+    end = add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, start)} "
+        f"PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+async def ensure_monthly_partitions(
+    db: AsyncSession,
+    table: str,
+    months_ahead: int = 3,
+    today: Optional[date] = None,
+) -> List[str]:
+    """
+    Create partitions for the current month and months_ahead future months.
+
+    Idempotent. Does not commit. Returns the partition names ensured.
+    """
+    start = month_start(today or date.today())
+    names = []
+    for offset in range(months_ahead + 1):
+        month = add_months(start, offset)
+        await db.execute(text(partition_ddl(table, month)))
+        names.append(partition_name(table, month))
+    return names
+
+
+async def ensure_all_partitions(db: AsyncSession, months_ahead: int = 3) -> List[str]:
+    """Ensure upcoming partitions for every table in PARTITIONED_TABLES."""
+    names = []
+    for table in PARTITIONED_TABLES:
+        names.extend(await ensure_monthly_partitions(db, table, months_ahead))
+    return names
+
+
+async def list_monthly_partitions(db: AsyncSession, table: str) -> List[Tuple[str, date, bool]]:
+    """
+    Monthly partition tables for a parent, oldest first.
+
+    Includes tables that were detached but not yet dropped. Returns
+    (name, month, attached) tuples.
+    """
+    result = await db.execute(
+        text(
+            "SELECT c.relname, i.inhparent IS NOT NULL AS attached "
+            "FROM pg_class c "
+            "LEFT JOIN pg_inherits i ON i.inhrelid = c.oid "
+            "WHERE c.relkind IN ('r', 'p') AND c.relname LIKE :pattern"
+        ),
+        {"pattern": f"{table}\\_y%"},
+    )
+    partitions = []
+    for name, attached in result.all():
+        month = partition_month(table, name)
+        if month is not None:
+            partitions.append((name, month, attached))
+    return sorted(partitions, key=lambda p: p[1])
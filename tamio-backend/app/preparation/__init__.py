@@ -4,11 +4,14 @@
 from .models import PreparedAction, ActionOption, ActionType, ActionStatus, LinkedAction
 from .engine import PreparationEngine
 from .context import (
+    PreparationContext,
+    load_preparation_context,
     get_client_context,
     get_vendor_context,
     get_cash_context,
     get_payroll_context,
 )
+from .linking import LinkIndex, ActionFeatures, extract_features, pair_links
 from .risk_scoring import (
     calculate_composite_risk,
     calculate_relationship_risk,
@@ -29,6 +32,14 @@ from .message_drafting import (
     generate_ai_message,
     suggest_tone,
 )
+from .ai_drafting import (
+    LLMDraftingService,
+    DraftCache,
+    AIDraftStatus,
+    drafting_service,
+    enhance_pending_drafts,
+    release_stale_drafts,
+)
 from .escalation import (
     EscalationEngine,
     EscalationResult,
@@ -51,10 +62,17 @@ __all__ = [
     "EscalationReason",
     "run_escalation_sweep",
     # Context
+    "PreparationContext",
+    "load_preparation_context",
     "get_client_context",
     "get_vendor_context",
     "get_cash_context",
     "get_payroll_context",
+    # Linking
+    "LinkIndex",
+    "ActionFeatures",
+    "extract_features",
+    "pair_links",
     # Risk Scoring
     "calculate_composite_risk",
     "calculate_relationship_risk",
@@ -74,4 +92,11 @@ __all__ = [
     "enhance_with_ai",
     "generate_ai_message",
     "suggest_tone",
+    # AI Drafting
+    "LLMDraftingService",
+    "DraftCache",
+    "AIDraftStatus",
+    "drafting_service",
+    "enhance_pending_drafts",
+    "release_stale_drafts",
 ]
@@ -0,0 +1,381 @@
+"""
+LLM drafting service for preparation messages.
+
+All AI drafting (enhance_with_ai, generate_ai_message, suggest_tone) goes
+through drafting_service, which:
+- Shares one Anthropic client (and its connection pool) across calls
+- Caches responses by (template, tone, normalised context, model) with a
+  TTL and an LRU size bound, so the same client/template pair is not
+  re-drafted on every detection cycle
+- Coalesces identical prompts that are already in flight into one request
+- Bounds concurrent requests to AI_DRAFTING_CONCURRENCY
+
+Preparation never waits on the model. With AI_DRAFTING_ENABLED, email
+options are saved with their template text and ai_draft_status="pending";
+enhance_pending_drafts (a scheduler job) upgrades them in the background.
+It commits its claim before calling the model and writes the results in
+a second short transaction, so no transaction stays open across model
+calls. Options left "processing" by a worker that never finished are
+re-queued by release_stale_drafts after AI_DRAFTING_CLAIM_TIMEOUT_MINUTES.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AIDraftStatus:
+    """ActionOption.ai_draft_status values."""
+    PENDING = "pending"    # Template text saved, waiting for enhancement
+    PROCESSING = "processing"  # Claimed by a worker (ai_draft_claimed_at)
+    ENHANCED = "enhanced"
+    FAILED = "failed"      # Template text kept
+
+
+# =============================================================================
+# Shared Client
+# =============================================================================
+
+_llm_client = None
+
+
+def get_llm_client():
+    """Get the shared Anthropic client, creating it on first use."""
+    global _llm_client
+    if _llm_client is None:
+        from anthropic import AsyncAnthropic
+
+        _llm_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, max_retries=2, timeout=30.0)
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.close()
+    _llm_client = None
+
+
+# =============================================================================
+# Response Cache
+# =============================================================================
+
+def _normalise(value: Any) -> Any:
+    """Drop empty values, trim strings and round floats so equivalent contexts hash alike."""
+    if isinstance(value, dict):
+        return {str(k): _normalise(v) for k, v in value.items() if v is not None and v != ""}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def draft_cache_key(template: str, tone: str, context: Dict[str, Any], model: str) -> str:
+    """Content address of a drafting request."""
+    context_json = json.dumps(_normalise(context), sort_keys=True, default=str)
+    context_hash = hashlib.sha256(context_json.encode()).hexdigest()
+    return f"{template}:{tone}:{model}:{context_hash}"
+
+
+class DraftCache:
+    """In-process response cache; entries expire after ttl and the least recently used are evicted."""
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else settings.AI_DRAFTING_CACHE_TTL_SECONDS
+        self.max_entries = max_entries or settings.AI_DRAFTING_CACHE_MAX_ENTRIES
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# =============================================================================
+# Drafting Service
+# =============================================================================
+
+class LLMDraftingService:
+    """
+    Cached, coalesced, concurrency-bounded completions.
+
+    Usage:
+        text = await drafting_service.complete(
+            "collection_email", "firm", context,
+            system="...", prompt="...", max_tokens=500,
+        )
+    """
+
+    def __init__(
+        self,
+        cache: Optional[DraftCache] = None,
+        client_factory: Optional[Callable[[], Any]] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.cache = cache if cache is not None else DraftCache()
+        self._client_factory = client_factory or get_llm_client
+        self._concurrency = concurrency or settings.AI_DRAFTING_CONCURRENCY
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.ANTHROPIC_API_KEY)
+
+    async def complete(
+        self,
+        template: str,
+        tone: str,
+        context: Dict[str, Any],
+        system: str,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> str:
+        """
+        Return the model's text for a prompt.
+
+        template, tone and context identify the draft for caching; the
+        prompt must be fully determined by them. Raises on API errors
+        (nothing is cached).
+        """
+        model = model or settings.ANTHROPIC_MODEL_FAST
+        key = draft_cache_key(template, tone, context, model)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await self._request(system, prompt, max_tokens or settings.ANTHROPIC_MAX_TOKENS, temperature, model)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            future.set_exception(e)
+            # Waiters re-raise it; mark retrieved so an unawaited future doesn't warn
+            future.exception()
+            raise
+        else:
+            self.cache.set(key, text)
+            future.set_result(text)
+            return text
+        finally:
+            del self._inflight[key]
+
+    async def _request(self, system: str, prompt: str, max_tokens: int, temperature: float, model: str) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        async with self._semaphore:
+            self.stats["requests"] += 1
+            response = await self._client_factory().messages.create(
+                model=model,
+                system=system,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+        return "".join(block.text for block in response.content if block.type == "text").strip()
+
+
+# Process-wide service used by message_drafting
+drafting_service = LLMDraftingService()
+
+
+# =============================================================================
+# Background Enhancement
+# =============================================================================
+
+def mark_for_enhancement(option) -> bool:
+    """Queue an email option for background enhancement. Returns True if queued."""
+    content = option.prepared_content or {}
+    if content.get("type") != "email" or not content.get("body"):
+        return False
+    option.ai_draft_status = AIDraftStatus.PENDING
+    return True
+
+
+async def _claim_pending_drafts(db: AsyncSession, limit: int, claimed_at: datetime) -> List[Any]:
+    """Mark a batch of pending options processing; other workers skip locked rows."""
+    from app.models import ActionOption
+
+    pending = (
+        select(ActionOption.id)
+        .where(ActionOption.ai_draft_status == AIDraftStatus.PENDING)
+        .order_by(ActionOption.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(ActionOption)
+        .where(ActionOption.id.in_(pending.scalar_subquery()))
+        .values(
+            ai_draft_status=AIDraftStatus.PROCESSING,
+            ai_draft_claimed_at=claimed_at,
+            ai_draft_attempts=ActionOption.ai_draft_attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+        .returning(ActionOption.id, ActionOption.action_id, ActionOption.prepared_content)
+    )
+    return list(result.all())
+
+
+async def _load_alert_contexts(db: AsyncSession, action_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Alert context_data keyed by prepared action id."""
+    from app.models import DetectionAlert, PreparedAction
+
+    if not action_ids:
+        return {}
+    result = await db.execute(
+        select(PreparedAction.id, DetectionAlert.context_data)
+        .join(DetectionAlert, PreparedAction.alert_id == DetectionAlert.id)
+        .where(PreparedAction.id.in_(set(action_ids)))
+    )
+    return {row.id: dict(row.context_data or {}) for row in result.all()}
+
+
+async def release_stale_drafts(
+    db: AsyncSession,
+    timeout: Optional[timedelta] = None,
+    max_attempts: Optional[int] = None,
+) -> int:
+    """
+    Re-queue options left processing by a worker that never finished them.
+
+    Options claimed longer than `timeout` ago go back to pending, or are
+    marked failed (keeping their template text) once they have been
+    claimed max_attempts times. Does not commit. Returns the number of
+    options released.
+    """
+    from app.models import ActionOption
+
+    timeout = timeout or timedelta(minutes=settings.AI_DRAFTING_CLAIM_TIMEOUT_MINUTES)
+    max_attempts = max_attempts or settings.AI_DRAFTING_MAX_ATTEMPTS
+    cutoff = datetime.utcnow() - timeout
+
+    stale = (
+        select(ActionOption.id)
+        .where(ActionOption.ai_draft_status == AIDraftStatus.PROCESSING)
+        .where(or_(ActionOption.ai_draft_claimed_at < cutoff, ActionOption.ai_draft_claimed_at.is_(None)))
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(ActionOption)
+        .where(ActionOption.id.in_(stale.scalar_subquery()))
+        .values(
+            ai_draft_status=case(
+                (ActionOption.ai_draft_attempts < max_attempts, AIDraftStatus.PENDING),
+                else_=AIDraftStatus.FAILED,
+            ),
+            ai_draft_claimed_at=None,
+        )
+        .execution_options(synchronize_session=False)
+        .returning(ActionOption.ai_draft_status)
+    )
+    statuses = list(result.scalars().all())
+    if statuses:
+        requeued = statuses.count(AIDraftStatus.PENDING)
+        logger.warning(f"Released {len(statuses)} stale AI draft claims, {requeued} re-queued")
+    return len(statuses)
+
+
+async def enhance_pending_drafts(
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    enhance: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None,
+) -> Dict[str, int]:
+    """
+    Enhance one batch of pending email options.
+
+    The claim (status "processing", with FOR UPDATE SKIP LOCKED so
+    concurrent workers never enhance the same option) is committed before
+    the model is called, and the results are written and committed in a
+    second transaction. Enhancements run concurrently (bounded by the
+    drafting service). A result is only written while this worker's claim
+    still holds; a claim released as stale meanwhile belongs to the next
+    worker.
+    """
+    from app.models import ActionOption
+
+    if enhance is None:
+        from .message_drafting import enhance_with_ai as enhance
+
+    claimed_at = datetime.utcnow()
+    options = await _claim_pending_drafts(db, limit or settings.AI_DRAFTING_BATCH_SIZE, claimed_at)
+    contexts = await _load_alert_contexts(db, [option.action_id for option in options])
+    await db.commit()
+
+    summary = {"claimed": len(options), "enhanced": 0, "failed": 0}
+    if not options:
+        return summary
+
+    # No transaction is open while the model runs
+    outputs = await asyncio.gather(
+        *(enhance(option.prepared_content, contexts.get(option.action_id, {}), "personalize") for option in options),
+        return_exceptions=True,
+    )
+
+    for option, output in zip(options, outputs):
+        if isinstance(output, BaseException) or not output.get("ai_enhanced"):
+            values = {"ai_draft_status": AIDraftStatus.FAILED}
+            outcome = "failed"
+        else:
+            values = {"ai_draft_status": AIDraftStatus.ENHANCED, "prepared_content": output}
+            outcome = "enhanced"
+        result = await db.execute(
+            update(ActionOption)
+            .where(ActionOption.id == option.id)
+            .where(ActionOption.ai_draft_status == AIDraftStatus.PROCESSING)
+            .where(ActionOption.ai_draft_claimed_at == claimed_at)
+            .values(ai_draft_claimed_at=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            summary[outcome] += 1
+    await db.commit()
+
+    return summary
@@ -5,8 +5,9 @@ Helper functions for gathering context needed by preparation agents.
 Each function queries related entities and returns structured context.
 """
 
+from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Sequence
 from decimal import Decimal
 
 from sqlalchemy import select, func
@@ -21,6 +22,8 @@ from app.data.obligations.models import (
     PaymentEvent,
 )
 from app.data.balances.models import CashAccount
+from app.detection.models import DetectionAlert, DetectionType
+from app.services.cash_windows import get_cash_windows
 
 
 async def get_client_context(db: AsyncSession, client_id: str) -> Dict[str, Any]:
@@ -33,73 +36,82 @@ async def get_client_context(db: AsyncSession, client_id: str) -> Dict[str, Any]
         - Relationship info (type, revenue %)
         - Historical data (payment history, recent invoices)
     """
-    result = await db.execute(
-        select(Client)
-        .where(Client.id == client_id)
-        .options(selectinload(Client.obligations))
-    )
-    client = result.scalar_one_or_none()
+    contexts = await get_client_contexts(db, [client_id])
+    return contexts[client_id]
+
+
+async def get_client_contexts(db: AsyncSession, client_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Gather client context for many clients in three queries.
+
+    Returns a dict keyed by every requested id; unknown clients map to an
+    error context, as with get_client_context.
+    """
+    client_ids = list(dict.fromkeys(client_ids))
+    if not client_ids:
+        return {}
 
-    if not client:
-        return {"error": "Client not found", "client_id": client_id}
+    result = await db.execute(select(Client).where(Client.id.in_(client_ids)))
+    clients = {client.id: client for client in result.scalars().all()}
 
-    # Get payment history from PaymentEvents
+    # Payments in the last year (context reports up to the 10 most recent)
     payment_result = await db.execute(
-        select(PaymentEvent)
-        .join(ObligationAgreement)
-        .where(ObligationAgreement.client_id == client_id)
+        select(ObligationAgreement.client_id, func.count(PaymentEvent.id))
+        .join(PaymentEvent, PaymentEvent.obligation_id == ObligationAgreement.id)
+        .where(ObligationAgreement.client_id.in_(client_ids))
         .where(PaymentEvent.payment_date >= date.today() - timedelta(days=365))
-        .order_by(PaymentEvent.payment_date.desc())
-        .limit(10)
+        .group_by(ObligationAgreement.client_id)
     )
-    recent_payments = payment_result.scalars().all()
-
-    # Calculate payment behavior metrics
-    on_time_count = 0
-    late_count = 0
-    total_variance = Decimal(0)
+    payment_counts = dict(payment_result.all())
 
-    for payment in recent_payments:
-        if payment.variance_vs_expected is not None:
-            total_variance += payment.variance_vs_expected
-        # Would need to compare payment_date to schedule.due_date for late calculation
-
-    # Get outstanding invoices
+    # Outstanding invoices
     outstanding_result = await db.execute(
-        select(ObligationSchedule)
-        .join(ObligationAgreement)
-        .where(ObligationAgreement.client_id == client_id)
+        select(
+            ObligationAgreement.client_id,
+            func.count(ObligationSchedule.id),
+            func.coalesce(func.sum(ObligationSchedule.estimated_amount), 0),
+        )
+        .join(ObligationSchedule, ObligationSchedule.obligation_id == ObligationAgreement.id)
+        .where(ObligationAgreement.client_id.in_(client_ids))
         .where(ObligationSchedule.status.in_(["scheduled", "due", "overdue"]))
-        .order_by(ObligationSchedule.due_date)
+        .group_by(ObligationAgreement.client_id)
     )
-    outstanding = outstanding_result.scalars().all()
-
-    total_outstanding = sum(float(s.estimated_amount) for s in outstanding)
+    outstanding = {client_id: (count, total) for client_id, count, total in outstanding_result.all()}
+
+    contexts = {}
+    for client_id in client_ids:
+        client = clients.get(client_id)
+        if not client:
+            contexts[client_id] = {"error": "Client not found", "client_id": client_id}
+            continue
+
+        outstanding_count, total_outstanding = outstanding.get(client_id, (0, 0))
+        contexts[client_id] = {
+            "client_id": client.id,
+            "name": client.name,
+            "client_type": client.client_type,
+            "status": client.status,
+            "currency": client.currency,
+            # Relationship
+            "relationship_type": client.relationship_type or "transactional",
+            "revenue_percent": float(client.revenue_percent) if client.revenue_percent else 0,
+            "risk_level": client.risk_level or "medium",
+            # Payment behavior
+            "payment_behavior": client.payment_behavior or "unknown",
+            "avg_payment_delay_days": client.avg_payment_delay_days or 0,
+            "churn_risk": client.churn_risk or "low",
+            # Derived metrics
+            "recent_payment_count": min(payment_counts.get(client_id, 0), 10),
+            "total_outstanding": float(total_outstanding),
+            "outstanding_invoice_count": outstanding_count,
+            # For tone selection
+            "suggested_tone": _get_suggested_tone(client),
+            # Source info
+            "source": client.source,
+            "xero_contact_id": client.xero_contact_id,
+        }
 
-    return {
-        "client_id": client.id,
-        "name": client.name,
-        "client_type": client.client_type,
-        "status": client.status,
-        "currency": client.currency,
-        # Relationship
-        "relationship_type": client.relationship_type or "transactional",
-        "revenue_percent": float(client.revenue_percent) if client.revenue_percent else 0,
-        "risk_level": client.risk_level or "medium",
-        # Payment behavior
-        "payment_behavior": client.payment_behavior or "unknown",
-        "avg_payment_delay_days": client.avg_payment_delay_days or 0,
-        "churn_risk": client.churn_risk or "low",
-        # Derived metrics
-        "recent_payment_count": len(recent_payments),
-        "total_outstanding": total_outstanding,
-        "outstanding_invoice_count": len(outstanding),
-        # For tone selection
-        "suggested_tone": _get_suggested_tone(client),
-        # Source info
-        "source": client.source,
-        "xero_contact_id": client.xero_contact_id,
-    }
+    return contexts
 
 
 async def get_vendor_context(db: AsyncSession, expense_bucket_id: str) -> Dict[str, Any]:
@@ -112,66 +124,78 @@ async def get_vendor_context(db: AsyncSession, expense_bucket_id: str) -> Dict[s
         - Criticality assessment
         - Delay history
     """
-    result = await db.execute(
-        select(ExpenseBucket)
-        .where(ExpenseBucket.id == expense_bucket_id)
-        .options(selectinload(ExpenseBucket.obligations))
-    )
-    bucket = result.scalar_one_or_none()
+    contexts = await get_vendor_contexts(db, [expense_bucket_id])
+    return contexts[expense_bucket_id]
 
-    if not bucket:
-        return {"error": "Expense bucket not found", "bucket_id": expense_bucket_id}
 
-    # Get recent payment history
+async def get_vendor_contexts(db: AsyncSession, expense_bucket_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Gather vendor context for many expense buckets in two queries.
+
+    Returns a dict keyed by every requested id; unknown buckets map to an
+    error context, as with get_vendor_context.
+    """
+    expense_bucket_ids = list(dict.fromkeys(expense_bucket_ids))
+    if not expense_bucket_ids:
+        return {}
+
+    result = await db.execute(select(ExpenseBucket).where(ExpenseBucket.id.in_(expense_bucket_ids)))
+    buckets = {bucket.id: bucket for bucket in result.scalars().all()}
+
+    # Payments in the last 180 days (context reports up to the 6 most recent)
     payment_result = await db.execute(
-        select(PaymentEvent)
-        .join(ObligationAgreement)
-        .where(ObligationAgreement.expense_bucket_id == expense_bucket_id)
+        select(ObligationAgreement.expense_bucket_id, func.count(PaymentEvent.id))
+        .join(PaymentEvent, PaymentEvent.obligation_id == ObligationAgreement.id)
+        .where(ObligationAgreement.expense_bucket_id.in_(expense_bucket_ids))
         .where(PaymentEvent.payment_date >= date.today() - timedelta(days=180))
-        .order_by(PaymentEvent.payment_date.desc())
-        .limit(6)
+        .group_by(ObligationAgreement.expense_bucket_id)
     )
-    recent_payments = payment_result.scalars().all()
-
-    # Analyze delay history
-    delay_history = bucket.delay_history or []
-    total_delays = len(delay_history)
-    avg_delay_days = 0
-    if delay_history:
-        avg_delay_days = sum(d.get("days_delayed", 0) for d in delay_history) / len(delay_history)
-
-    # Calculate can_delay score (0-1)
-    can_delay_score = _calculate_delay_score(bucket)
+    payment_counts = dict(payment_result.all())
+
+    contexts = {}
+    for bucket_id in expense_bucket_ids:
+        bucket = buckets.get(bucket_id)
+        if not bucket:
+            contexts[bucket_id] = {"error": "Expense bucket not found", "bucket_id": bucket_id}
+            continue
+
+        # Analyze delay history
+        delay_history = bucket.delay_history or []
+        avg_delay_days = 0
+        if delay_history:
+            avg_delay_days = sum(d.get("days_delayed", 0) for d in delay_history) / len(delay_history)
+
+        contexts[bucket_id] = {
+            "bucket_id": bucket.id,
+            "name": bucket.name,
+            "category": bucket.category,
+            "bucket_type": bucket.bucket_type,
+            "monthly_amount": float(bucket.monthly_amount),
+            "currency": bucket.currency,
+            # Payment terms
+            "payment_terms": bucket.payment_terms or "net_30",
+            "payment_terms_days": bucket.payment_terms_days or 30,
+            "due_day": bucket.due_day or 15,
+            "frequency": bucket.frequency or "monthly",
+            # Flexibility
+            "flexibility_level": bucket.flexibility_level or "negotiable",
+            "criticality": bucket.criticality or "important",
+            "can_delay_score": _calculate_delay_score(bucket),
+            # History
+            "delay_history_count": len(delay_history),
+            "avg_delay_days": avg_delay_days,
+            "recent_payment_count": min(payment_counts.get(bucket_id, 0), 6),
+            # Priority
+            "priority": bucket.priority,
+            "is_stable": bucket.is_stable,
+            # For payroll
+            "employee_count": bucket.employee_count,
+            # Source info
+            "source": bucket.source,
+            "xero_contact_id": bucket.xero_contact_id,
+        }
 
-    return {
-        "bucket_id": bucket.id,
-        "name": bucket.name,
-        "category": bucket.category,
-        "bucket_type": bucket.bucket_type,
-        "monthly_amount": float(bucket.monthly_amount),
-        "currency": bucket.currency,
-        # Payment terms
-        "payment_terms": bucket.payment_terms or "net_30",
-        "payment_terms_days": bucket.payment_terms_days or 30,
-        "due_day": bucket.due_day or 15,
-        "frequency": bucket.frequency or "monthly",
-        # Flexibility
-        "flexibility_level": bucket.flexibility_level or "negotiable",
-        "criticality": bucket.criticality or "important",
-        "can_delay_score": can_delay_score,
-        # History
-        "delay_history_count": total_delays,
-        "avg_delay_days": avg_delay_days,
-        "recent_payment_count": len(recent_payments),
-        # Priority
-        "priority": bucket.priority,
-        "is_stable": bucket.is_stable,
-        # For payroll
-        "employee_count": bucket.employee_count,
-        # Source info
-        "source": bucket.source,
-        "xero_contact_id": bucket.xero_contact_id,
-    }
+    return contexts
 
 
 async def get_cash_context(db: AsyncSession, user_id: str) -> Dict[str, Any]:
@@ -184,8 +208,6 @@ async def get_cash_context(db: AsyncSession, user_id: str) -> Dict[str, Any]:
         - Expected revenue
         - Runway calculation
     """
-    today = date.today()
-
     # Get all cash accounts
     accounts_result = await db.execute(
         select(CashAccount)
@@ -205,39 +227,16 @@ async def get_cash_context(db: AsyncSession, user_id: str) -> Dict[str, Any]:
     ]
     total_cash = sum(float(acc.balance) for acc in accounts)
 
-    # Get upcoming obligations (expenses)
-    async def get_obligations_in_period(start: date, end: date) -> float:
-        result = await db.execute(
-            select(func.sum(ObligationSchedule.estimated_amount))
-            .join(ObligationAgreement)
-            .where(ObligationAgreement.user_id == user_id)
-            .where(ObligationAgreement.obligation_type != "revenue")
-            .where(ObligationSchedule.due_date >= start)
-            .where(ObligationSchedule.due_date <= end)
-            .where(ObligationSchedule.status.in_(["scheduled", "due"]))
-        )
-        return float(result.scalar() or 0)
-
-    # Get expected revenue
-    async def get_revenue_in_period(start: date, end: date) -> float:
-        result = await db.execute(
-            select(func.sum(ObligationSchedule.estimated_amount))
-            .join(ObligationAgreement)
-            .where(ObligationAgreement.user_id == user_id)
-            .where(ObligationAgreement.obligation_type == "revenue")
-            .where(ObligationSchedule.due_date >= start)
-            .where(ObligationSchedule.due_date <= end)
-            .where(ObligationSchedule.status.in_(["scheduled", "due"]))
-        )
-        return float(result.scalar() or 0)
+    # Upcoming obligations and expected revenue, all horizons in one query
+    windows = await get_cash_windows(db, user_id)
 
-    obligations_7d = await get_obligations_in_period(today, today + timedelta(days=7))
-    obligations_14d = await get_obligations_in_period(today, today + timedelta(days=14))
-    obligations_30d = await get_obligations_in_period(today, today + timedelta(days=30))
+    obligations_7d = windows.expenses[7]
+    obligations_14d = windows.expenses[14]
+    obligations_30d = windows.expenses[30]
 
-    revenue_7d = await get_revenue_in_period(today, today + timedelta(days=7))
-    revenue_14d = await get_revenue_in_period(today, today + timedelta(days=14))
-    revenue_30d = await get_revenue_in_period(today, today + timedelta(days=30))
+    revenue_7d = windows.revenue[7]
+    revenue_14d = windows.revenue[14]
+    revenue_30d = windows.revenue[30]
 
     # Calculate runway
     monthly_burn = obligations_30d
@@ -270,10 +269,16 @@ async def get_cash_context(db: AsyncSession, user_id: str) -> Dict[str, Any]:
     }
 
 
-async def get_payroll_context(db: AsyncSession, user_id: str) -> Dict[str, Any]:
+async def get_payroll_context(
+    db: AsyncSession,
+    user_id: str,
+    cash_context: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """
     Gather payroll-specific context.
 
+    Pass an already-loaded cash_context to avoid recomputing it.
+
     Returns:
         - Next payroll date and amount
         - Cash position relative to payroll
@@ -300,7 +305,7 @@ async def get_payroll_context(db: AsyncSession, user_id: str) -> Dict[str, Any]:
         select(ObligationSchedule)
         .join(ObligationAgreement)
         .join(ExpenseBucket, ObligationAgreement.expense_bucket_id == ExpenseBucket.id)
-        .where(ObligationAgreement.user_id == user_id)
+        .where(ObligationSchedule.user_id == user_id)
         .where(ExpenseBucket.category == "payroll")
         .where(ObligationSchedule.due_date >= today)
         .where(ObligationSchedule.status.in_(["scheduled", "due"]))
@@ -321,14 +326,14 @@ async def get_payroll_context(db: AsyncSession, user_id: str) -> Dict[str, Any]:
     days_until_payroll = (next_payroll.due_date - today).days
 
     # Get current cash
-    cash_context = await get_cash_context(db, user_id)
+    if cash_context is None:
+        cash_context = await get_cash_context(db, user_id)
     total_cash = cash_context["total_cash"]
 
     # Get obligations before payroll
     obligations_result = await db.execute(
         select(func.sum(ObligationSchedule.estimated_amount))
-        .join(ObligationAgreement)
-        .where(ObligationAgreement.user_id == user_id)
+        .where(ObligationSchedule.user_id == user_id)
         .where(ObligationSchedule.due_date >= today)
         .where(ObligationSchedule.due_date < next_payroll.due_date)
         .where(ObligationSchedule.status.in_(["scheduled", "due"]))
@@ -376,6 +381,84 @@ async def get_payroll_context(db: AsyncSession, user_id: str) -> Dict[str, Any]:
     }
 
 
+async def get_delayable_vendors(db: AsyncSession, user_id: str) -> List[ExpenseBucket]:
+    """Non-payroll expense buckets whose payments can be delayed or negotiated."""
+    result = await db.execute(
+        select(ExpenseBucket)
+        .where(ExpenseBucket.user_id == user_id)
+        .where(ExpenseBucket.flexibility_level.in_(["can_delay", "negotiable"]))
+        .where(ExpenseBucket.category != "payroll")
+    )
+    return list(result.scalars().all())
+
+
+async def get_top_client(db: AsyncSession, user_id: str) -> Optional[Client]:
+    """Highest-revenue active client that does not habitually pay late."""
+    result = await db.execute(
+        select(Client)
+        .where(Client.user_id == user_id)
+        .where(Client.status == "active")
+        .where(Client.payment_behavior != "delayed")
+        .order_by(Client.revenue_percent.desc().nullslast())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+# Delayable vendors offered by the payroll safety agent
+PAYROLL_DELAY_OPTIONS = 2
+
+
+@dataclass
+class PreparationContext:
+    """
+    Context shared by every agent in one preparation batch.
+
+    Loaded once by load_preparation_context; client and vendor contexts
+    cover every entity the batch's alerts reference.
+    """
+    cash: Dict[str, Any]
+    clients: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    vendors: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Loaded only when the batch has a payroll safety alert
+    payroll: Optional[Dict[str, Any]] = None
+    delayable_vendors: Optional[List[ExpenseBucket]] = None
+    top_client: Optional[Client] = None
+
+
+async def load_preparation_context(
+    db: AsyncSession,
+    user_id: str,
+    alerts: Sequence[DetectionAlert],
+) -> PreparationContext:
+    """
+    Load the context for a batch of alerts with a fixed number of queries,
+    regardless of how many alerts or entities are involved.
+    """
+    context = PreparationContext(cash=await get_cash_context(db, user_id))
+
+    client_ids: List[str] = []
+    vendor_ids: List[str] = []
+    for alert in alerts:
+        data = alert.context_data or {}
+        if alert.detection_type == DetectionType.LATE_PAYMENT and data.get("client_id"):
+            client_ids.append(data["client_id"])
+        elif alert.detection_type == DetectionType.VENDOR_TERMS_EXPIRING and data.get("vendor_id"):
+            vendor_ids.append(data["vendor_id"])
+
+    if any(alert.detection_type == DetectionType.PAYROLL_SAFETY for alert in alerts):
+        context.payroll = await get_payroll_context(db, user_id, cash_context=context.cash)
+        context.delayable_vendors = await get_delayable_vendors(db, user_id)
+        context.top_client = await get_top_client(db, user_id)
+        vendor_ids.extend(v.id for v in context.delayable_vendors[:PAYROLL_DELAY_OPTIONS])
+        if context.top_client:
+            client_ids.append(context.top_client.id)
+
+    context.clients = await get_client_contexts(db, client_ids)
+    context.vendors = await get_vendor_contexts(db, vendor_ids)
+    return context
+
+
 def _get_suggested_tone(client: Client) -> str:
     """
     Determine suggested communication tone based on client attributes.
@@ -21,23 +21,33 @@ Agent workflows for each action type:
 """
 
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence
+from uuid import uuid4
 import logging
+import time
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.config import settings
 from app.detection.models import DetectionAlert, DetectionType, AlertSeverity, AlertStatus
 from .models import (
     PreparedAction, ActionOption, ActionType, ActionStatus, RiskLevel, LinkedAction
 )
 from .context import (
+    PreparationContext,
+    PAYROLL_DELAY_OPTIONS,
+    load_preparation_context,
     get_client_context,
     get_vendor_context,
     get_cash_context,
     get_payroll_context,
+    get_delayable_vendors,
+    get_top_client,
 )
+from .ai_drafting import mark_for_enhancement
+from .linking import LinkIndex, extract_features
 from .risk_scoring import (
     score_action_option,
     calculate_composite_risk,
@@ -69,22 +79,47 @@ class PreparationEngine:
         self.db = db
         self.user_id = user_id
         self._cash_context: Optional[Dict[str, Any]] = None
+        # Shared context for the current batch (see prepare_actions_for_alerts)
+        self._context: Optional[PreparationContext] = None
+        self.context_load_ms = 0  # Time the last batch spent loading its context
 
     async def get_cash_context(self) -> Dict[str, Any]:
         """Get cash context, caching for performance."""
+        if self._context is not None:
+            return self._context.cash
         if self._cash_context is None:
             self._cash_context = await get_cash_context(self.db, self.user_id)
         return self._cash_context
 
-    async def prepare_from_alert(self, alert: DetectionAlert) -> PreparedAction:
-        """
-        Create a PreparedAction from a DetectionAlert.
-
-        Routes to appropriate agent based on detection type.
-        """
-        # Update alert status
-        alert.status = AlertStatus.PREPARING
-
+    # =========================================================================
+    # Context Lookups (shared batch context first, database otherwise)
+    # =========================================================================
+    async def _client_context(self, client_id: str) -> Dict[str, Any]:
+        if self._context is not None and client_id in self._context.clients:
+            return self._context.clients[client_id]
+        return await get_client_context(self.db, client_id)
+
+    async def _vendor_context(self, vendor_id: str) -> Dict[str, Any]:
+        if self._context is not None and vendor_id in self._context.vendors:
+            return self._context.vendors[vendor_id]
+        return await get_vendor_context(self.db, vendor_id)
+
+    async def _payroll_context(self, cash_context: Dict[str, Any]) -> Dict[str, Any]:
+        if self._context is not None and self._context.payroll is not None:
+            return self._context.payroll
+        return await get_payroll_context(self.db, self.user_id, cash_context=cash_context)
+
+    async def _delayable_vendors(self) -> list:
+        if self._context is not None and self._context.delayable_vendors is not None:
+            return self._context.delayable_vendors
+        return await get_delayable_vendors(self.db, self.user_id)
+
+    async def _top_client(self):
+        if self._context is not None and self._context.payroll is not None:
+            return self._context.top_client
+        return await get_top_client(self.db, self.user_id)
+
+    def _handler_for(self, alert: DetectionAlert):
         handler_map = {
             DetectionType.LATE_PAYMENT: self._invoice_followup_agent,
             DetectionType.PAYROLL_SAFETY: self._payroll_safety_agent,
@@ -99,23 +134,76 @@ class PreparationEngine:
             DetectionType.RUNWAY_THRESHOLD: self._runway_response_agent,
             DetectionType.HEADCOUNT_CHANGE: self._headcount_review_agent,
         }
+        return handler_map.get(alert.detection_type, self._generic_agent)
 
-        handler = handler_map.get(alert.detection_type)
-        if not handler:
-            return await self._generic_agent(alert)
+    async def _run_agent(self, alert: DetectionAlert) -> PreparedAction:
+        """Route an alert to its agent, falling back to the generic agent."""
+        # Update alert status
+        alert.status = AlertStatus.PREPARING
 
+        handler = self._handler_for(alert)
         try:
-            action = await handler(alert)
-            self.db.add(action)
-
-            # Check for linked actions
-            await self._detect_linked_actions(action)
-
-            return action
+            return await handler(alert)
         except Exception as e:
             logger.error(f"Preparation agent failed for alert {alert.id}: {e}")
             return await self._generic_agent(alert)
 
+    async def prepare_from_alert(self, alert: DetectionAlert) -> PreparedAction:
+        """
+        Create a PreparedAction from a DetectionAlert.
+
+        Routes to appropriate agent based on detection type.
+        """
+        action = await self._run_agent(alert)
+        action.id = action.id or str(uuid4())
+        self.db.add(action)
+
+        # Check for linked actions
+        await self._detect_linked_actions([action])
+
+        return action
+
+    async def prepare_actions_for_alerts(
+        self, alerts: Sequence[DetectionAlert]
+    ) -> List[PreparedAction]:
+        """
+        Prepare actions for a batch of alerts.
+
+        Loads one PreparationContext for the whole batch (cash, payroll,
+        and every referenced client and vendor), runs each alert's agent
+        against it without further context queries, and adds all actions
+        and options to the session together so they are written in one
+        flush. Link detection is separate (_detect_linked_actions).
+
+        With AI_DRAFTING_ENABLED, email options are queued for background
+        enhancement instead of waiting on the model here.
+        """
+        if not alerts:
+            return []
+
+        # New alerts need ids before actions can reference them
+        if any(alert.id is None for alert in alerts):
+            await self.db.flush()
+
+        context_start = time.perf_counter()
+        self._context = await load_preparation_context(self.db, self.user_id, alerts)
+        self.context_load_ms = int((time.perf_counter() - context_start) * 1000)
+        try:
+            actions = [await self._run_agent(alert) for alert in alerts]
+        finally:
+            self._context = None
+
+        for action in actions:
+            action.id = action.id or str(uuid4())
+            if settings.AI_DRAFTING_ENABLED:
+                # Saved with template text; the drafting job enhances them later
+                for option in action.options or []:
+                    mark_for_enhancement(option)
+        self.db.add_all(actions)
+        await self.db.flush()
+
+        return actions
+
     # =========================================================================
     # Agent: Invoice Follow-up
     # =========================================================================
@@ -138,7 +226,7 @@ class PreparationEngine:
         # Gather context
         client_context = {}
         if client_id:
-            client_context = await get_client_context(self.db, client_id)
+            client_context = await self._client_context(client_id)
 
         cash_context = await self.get_cash_context()
 
@@ -327,8 +415,8 @@ class PreparationEngine:
         payroll_amount = context.get("payroll_amount", 0)
         payroll_date = context.get("payroll_date", "")
 
-        payroll_context = await get_payroll_context(self.db, self.user_id)
         cash_context = await self.get_cash_context()
+        payroll_context = await self._payroll_context(cash_context)
 
         # OBLIGATION-FOCUSED: Use alert title which is already obligation-focused
         # Detection engine generates: "Payroll underfunded by $X - due Friday"
@@ -359,18 +447,10 @@ class PreparationEngine:
         options = []
 
         # Option 1: Find delayable vendor
-        from app.data.expenses.models import ExpenseBucket
+        delayable_vendors = await self._delayable_vendors()
 
-        delayable_result = await self.db.execute(
-            select(ExpenseBucket)
-            .where(ExpenseBucket.user_id == self.user_id)
-            .where(ExpenseBucket.flexibility_level.in_(["can_delay", "negotiable"]))
-            .where(ExpenseBucket.category != "payroll")
-        )
-        delayable_vendors = delayable_result.scalars().all()
-
-        for vendor in delayable_vendors[:2]:
-            vendor_context = await get_vendor_context(self.db, vendor.id)
+        for vendor in delayable_vendors[:PAYROLL_DELAY_OPTIONS]:
+            vendor_context = await self._vendor_context(vendor.id)
             risk_score = score_action_option(
                 action_type="VENDOR_DELAY",
                 entity_type="vendor",
@@ -403,20 +483,10 @@ class PreparationEngine:
             ))
 
         # Option 2: Request early payment from top client
-        from app.data.clients.models import Client
-
-        client_result = await self.db.execute(
-            select(Client)
-            .where(Client.user_id == self.user_id)
-            .where(Client.status == "active")
-            .where(Client.payment_behavior != "delayed")
-            .order_by(Client.revenue_percent.desc().nullslast())
-            .limit(1)
-        )
-        top_client = client_result.scalar_one_or_none()
+        top_client = await self._top_client()
 
         if top_client:
-            client_context = await get_client_context(self.db, top_client.id)
+            client_context = await self._client_context(top_client.id)
             early_payment_content = draft_early_payment_request(
                 client_name=top_client.name,
                 invoice_number="outstanding",
@@ -555,7 +625,7 @@ class PreparationEngine:
 
         vendor_context = {}
         if vendor_id:
-            vendor_context = await get_vendor_context(self.db, vendor_id)
+            vendor_context = await self._vendor_context(vendor_id)
 
         action = PreparedAction(
             user_id=self.user_id,
@@ -887,346 +957,43 @@ class PreparationEngine:
     # =========================================================================
     # Linked Actions Detection
     # =========================================================================
-    async def _detect_linked_actions(self, action: PreparedAction) -> List[LinkedAction]:
+    async def _detect_linked_actions(self, actions: Sequence[PreparedAction]) -> List[LinkedAction]:
         """
-        Detect and create links between related actions.
-
-        Link types:
-        - "resolves": Completing action_id resolves linked_action_id
-        - "conflicts": Cannot do both actions
-        - "sequence": linked_action_id should come after action_id
-        - "depends_on": action_id depends on linked_action_id being done first
-        - "cascades_to": Completing action_id affects linked_action_id
+        Detect and create links between new actions and related actions.
+
+        Each new action is matched against the user's other pending actions
+        and the rest of the batch through a LinkIndex (see linking.py);
+        pending actions and their options are loaded once.
         """
-        links = []
+        if not actions:
+            return []
 
+        new_ids = {action.id for action in actions}
         result = await self.db.execute(
             select(PreparedAction)
+            .options(selectinload(PreparedAction.options))
             .where(PreparedAction.user_id == self.user_id)
             .where(PreparedAction.status == ActionStatus.PENDING_APPROVAL)
-            .where(PreparedAction.id != action.id)
+            .where(PreparedAction.id.not_in(new_ids))
+        )
+        new_features = [extract_features(action) for action in actions]
+        index = LinkIndex(
+            [extract_features(action) for action in result.scalars().all()] + new_features
         )
-        other_actions = result.scalars().all()
-
-        for other in other_actions:
-            detected_links = await self._check_all_link_types(action, other)
-            for link in detected_links:
-                links.append(link)
-                self.db.add(link)
-
-        return links
 
-    async def _check_all_link_types(
-        self, action: PreparedAction, other: PreparedAction
-    ) -> List[LinkedAction]:
-        """Check all possible link types between two actions."""
         links = []
-
-        # Check each link type
-        link_checks = [
-            self._check_resolves_link,
-            self._check_conflicts_link,
-            self._check_sequence_link,
-            self._check_depends_on_link,
-            self._check_cascades_to_link,
-            self._check_same_entity_link,
-        ]
-
-        for check in link_checks:
-            link = await check(action, other)
-            if link:
+        seen = set()  # Symmetric links between two new actions are found from both sides
+        for features in new_features:
+            for link in index.links_for(features):
+                key = (frozenset((link.action_id, link.linked_action_id)), link.link_type)
+                if link.linked_action_id in new_ids and key in seen:
+                    continue
+                seen.add(key)
                 links.append(link)
 
+        self.db.add_all(links)
         return links
 
-    async def _check_resolves_link(
-        self, action: PreparedAction, other: PreparedAction
-    ) -> Optional[LinkedAction]:
-        """
-        Check if completing one action resolves another.
-
-        Examples:
-        - Collecting invoice resolves payroll shortfall
-        - Collecting invoice resolves buffer breach
-        - Early client payment resolves vendor delay need
-        """
-        # Invoice collection resolves payroll contingency
-        if (action.action_type == ActionType.INVOICE_FOLLOW_UP and
-            other.action_type == ActionType.PAYROLL_CONTINGENCY):
-            # Check if invoice amount would help
-            invoice_amount = self._get_action_cash_impact(action)
-            if invoice_amount > 0:
-                return LinkedAction(
-                    action_id=action.id,
-                    linked_action_id=other.id,
-                    link_type="resolves",
-                    link_reason=f"Collecting ${invoice_amount:,.0f} could help cover payroll shortfall",
-                )
-
-        # Invoice collection resolves buffer breach
-        if (action.action_type == ActionType.INVOICE_FOLLOW_UP and
-            other.action_type == ActionType.EXCESS_CASH_ALLOCATION):
-            invoice_amount = self._get_action_cash_impact(action)
-            if invoice_amount > 0:
-                return LinkedAction(
-                    action_id=action.id,
-                    linked_action_id=other.id,
-                    link_type="resolves",
-                    link_reason=f"Collecting ${invoice_amount:,.0f} helps restore cash buffer",
-                )
-
-        # Credit line draw resolves payroll contingency
-        if (action.action_type == ActionType.CREDIT_LINE_DRAW and
-            other.action_type == ActionType.PAYROLL_CONTINGENCY):
-            return LinkedAction(
-                action_id=action.id,
-                linked_action_id=other.id,
-                link_type="resolves",
-                link_reason="Credit draw provides immediate funds for payroll",
-            )
-
-        return None
-
-    async def _check_conflicts_link(
-        self, action: PreparedAction, other: PreparedAction
-    ) -> Optional[LinkedAction]:
-        """
-        Check if two actions conflict (cannot do both).
-
-        Examples:
-        - Delaying payment to same vendor twice
-        - Multiple draws from credit line exceeding limit
-        - Conflicting payment priorities
-        """
-        # Same vendor delay requested twice
-        if (action.action_type == ActionType.VENDOR_DELAY and
-            other.action_type == ActionType.VENDOR_DELAY):
-            action_vendor = self._get_vendor_id_from_action(action)
-            other_vendor = self._get_vendor_id_from_action(other)
-            if action_vendor and action_vendor == other_vendor:
-                return LinkedAction(
-                    action_id=action.id,
-                    linked_action_id=other.id,
-                    link_type="conflicts",
-                    link_reason="Cannot delay payments to same vendor twice",
-                )
-
-        # Payment batch conflicts with vendor delay for same vendor
-        if (action.action_type == ActionType.PAYMENT_BATCH and
-            other.action_type == ActionType.VENDOR_DELAY):
-            # Check if the payment batch includes the vendor being delayed
-            payment_vendors = self._get_vendor_ids_from_batch(action)
-            delay_vendor = self._get_vendor_id_from_action(other)
-            if delay_vendor and delay_vendor in payment_vendors:
-                return LinkedAction(
-                    action_id=action.id,
-                    linked_action_id=other.id,
-                    link_type="conflicts",
-                    link_reason="Payment batch includes vendor marked for delay",
-                )
-
-        # Multiple credit draws that exceed available credit
-        if (action.action_type == ActionType.CREDIT_LINE_DRAW and
-            other.action_type == ActionType.CREDIT_LINE_DRAW):
-            return LinkedAction(
-                action_id=action.id,
-                linked_action_id=other.id,
-                link_type="conflicts",
-                link_reason="Review combined credit draws against available limit",
-            )
-
-        return None
-
-    async def _check_sequence_link(
-        self, action: PreparedAction, other: PreparedAction
-    ) -> Optional[LinkedAction]:
-        """
-        Check if actions should be sequenced (order matters).
-
-        Examples:
-        - Payment batches in same week
-        - Multiple invoices to same client
-        """
-        # Payment batches in same week
-        if (action.action_type in [ActionType.PAYMENT_BATCH, ActionType.PAYMENT_PRIORITIZATION] and
-            other.action_type in [ActionType.PAYMENT_BATCH, ActionType.PAYMENT_PRIORITIZATION]):
-            if action.deadline and other.deadline:
-                days_apart = abs((action.deadline - other.deadline).days)
-                if days_apart <= 7:
-                    return LinkedAction(
-                        action_id=action.id,
-                        linked_action_id=other.id,
-                        link_type="sequence",
-                        link_reason="Both payment actions due within same week - consider sequencing",
-                    )
-
-        # Multiple invoice follow-ups to same client
-        if (action.action_type == ActionType.INVOICE_FOLLOW_UP and
-            other.action_type == ActionType.INVOICE_FOLLOW_UP):
-            action_client = self._get_client_id_from_action(action)
-            other_client = self._get_client_id_from_action(other)
-            if action_client and action_client == other_client:
-                return LinkedAction(
-                    action_id=action.id,
-                    linked_action_id=other.id,
-                    link_type="sequence",
-                    link_reason="Multiple invoices for same client - consider single communication",
-                )
-
-        return None
-
-    async def _check_depends_on_link(
-        self, action: PreparedAction, other: PreparedAction
-    ) -> Optional[LinkedAction]:
-        """
-        Check if one action depends on another being completed first.
-
-        Examples:
-        - Payroll confirmation depends on payroll contingency resolution
-        - Invoice escalation depends on initial follow-up
-        """
-        # Payroll confirmation depends on contingency being resolved
-        if (action.action_type == ActionType.PAYROLL_CONFIRMATION and
-            other.action_type == ActionType.PAYROLL_CONTINGENCY):
-            return LinkedAction(
-                action_id=action.id,
-                linked_action_id=other.id,
-                link_type="depends_on",
-                link_reason="Resolve payroll funding before confirming payroll",
-            )
-
-        # Collection escalation depends on initial follow-up attempt
-        if (action.action_type == ActionType.COLLECTION_ESCALATION and
-            other.action_type == ActionType.INVOICE_FOLLOW_UP):
-            action_client = self._get_client_id_from_action(action)
-            other_client = self._get_client_id_from_action(other)
-            if action_client and action_client == other_client:
-                return LinkedAction(
-                    action_id=action.id,
-                    linked_action_id=other.id,
-                    link_type="depends_on",
-                    link_reason="Try standard follow-up before escalation",
-                )
-
-        return None
-
-    async def _check_cascades_to_link(
-        self, action: PreparedAction, other: PreparedAction
-    ) -> Optional[LinkedAction]:
-        """
-        Check if completing one action cascades/affects another.
-
-        Examples:
-        - Vendor delay affects payment batch timing
-        - Large collection affects runway calculation
-        """
-        # Vendor delay cascades to payment batch
-        if (action.action_type == ActionType.VENDOR_DELAY and
-            other.action_type == ActionType.PAYMENT_BATCH):
-            return LinkedAction(
-                action_id=action.id,
-                linked_action_id=other.id,
-                link_type="cascades_to",
-                link_reason="Vendor delay will affect payment batch timing",
-            )
-
-        # Large invoice collection cascades to runway response
-        if (action.action_type == ActionType.INVOICE_FOLLOW_UP and
-            other.action_type == ActionType.EXCESS_CASH_ALLOCATION):
-            invoice_amount = self._get_action_cash_impact(action)
-            if invoice_amount > 10000:  # Significant amount
-                return LinkedAction(
-                    action_id=action.id,
-                    linked_action_id=other.id,
-                    link_type="cascades_to",
-                    link_reason=f"Collecting ${invoice_amount:,.0f} may change cash allocation needs",
-                )
-
-        return None
-
-    async def _check_same_entity_link(
-        self, action: PreparedAction, other: PreparedAction
-    ) -> Optional[LinkedAction]:
-        """
-        Check if actions involve the same entity (client/vendor).
-
-        This creates awareness links for related communications.
-        """
-        # Skip if other link types already detected
-        # (this is a catch-all for entity relationship awareness)
-
-        action_client = self._get_client_id_from_action(action)
-        other_client = self._get_client_id_from_action(other)
-
-        # Same client, different action types
-        if (action_client and action_client == other_client and
-            action.action_type != other.action_type):
-            return LinkedAction(
-                action_id=action.id,
-                linked_action_id=other.id,
-                link_type="sequence",
-                link_reason="Both actions involve same client - coordinate communications",
-            )
-
-        action_vendor = self._get_vendor_id_from_action(action)
-        other_vendor = self._get_vendor_id_from_action(other)
-
-        # Same vendor, different action types
-        if (action_vendor and action_vendor == other_vendor and
-            action.action_type != other.action_type):
-            return LinkedAction(
-                action_id=action.id,
-                linked_action_id=other.id,
-                link_type="sequence",
-                link_reason="Both actions involve same vendor - coordinate approach",
-            )
-
-        return None
-
-    def _get_action_cash_impact(self, action: PreparedAction) -> float:
-        """Get the positive cash impact from an action's options."""
-        if not action.options:
-            return 0
-        for option in action.options:
-            if option.cash_impact and option.cash_impact > 0:
-                return option.cash_impact
-        return 0
-
-    def _get_client_id_from_action(self, action: PreparedAction) -> Optional[str]:
-        """Extract client ID from action's prepared content."""
-        if not action.options:
-            return None
-        for option in action.options:
-            content = option.prepared_content or {}
-            if "client_id" in content:
-                return content["client_id"]
-        return None
-
-    def _get_vendor_id_from_action(self, action: PreparedAction) -> Optional[str]:
-        """Extract vendor ID from action's prepared content."""
-        if not action.options:
-            return None
-        for option in action.options:
-            content = option.prepared_content or {}
-            if "vendor_id" in content:
-                return content["vendor_id"]
-            if "bucket_id" in content:
-                return content["bucket_id"]
-        return None
-
-    def _get_vendor_ids_from_batch(self, action: PreparedAction) -> List[str]:
-        """Extract all vendor IDs from a payment batch action."""
-        vendor_ids = []
-        if not action.options:
-            return vendor_ids
-        for option in action.options:
-            content = option.prepared_content or {}
-            if "payments" in content and isinstance(content["payments"], list):
-                for payment in content["payments"]:
-                    if "vendor_id" in payment:
-                        vendor_ids.append(payment["vendor_id"])
-        return vendor_ids
-
     # =========================================================================
     # Action Queue Management
     # =========================================================================
@@ -90,7 +90,9 @@ class EscalationEngine:
     async def get_payroll_context(self) -> Dict[str, Any]:
         """Get cached payroll context."""
         if self._payroll_context is None:
-            self._payroll_context = await get_payroll_context(self.db, self.user_id)
+            self._payroll_context = await get_payroll_context(
+                self.db, self.user_id, cash_context=await self.get_cash_context()
+            )
         return self._payroll_context
 
     async def check_all_escalations(
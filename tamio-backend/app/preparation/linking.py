@@ -0,0 +1,254 @@
+"""
+Linked action detection.
+
+Each action's linking features (type, client, vendors, cash impact,
+deadline) are extracted from its options once. LinkIndex hashes actions
+by type, client and vendor and keeps payment deadlines sorted, so a new
+action is only compared with the actions it could link to instead of
+every pending action. pair_links holds the rules for a single pair.
+
+Link types:
+- "resolves": Completing action_id resolves linked_action_id
+- "conflicts": Cannot do both actions
+- "sequence": linked_action_id should come after action_id
+- "depends_on": action_id depends on linked_action_id being done first
+- "cascades_to": Completing action_id affects linked_action_id
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from .models import ActionType, LinkedAction, PreparedAction
+
+
+PAYMENT_TYPES = (ActionType.PAYMENT_BATCH, ActionType.PAYMENT_PRIORITIZATION)
+
+# Payment actions due within this many days of each other are sequenced
+SEQUENCE_WINDOW_DAYS = 7
+
+# Collections above this amount may change cash allocation needs
+CASCADE_CASH_THRESHOLD = 10000
+
+# Partner types that link to an action type whatever entities are involved
+_TYPE_PARTNERS = {
+    ActionType.INVOICE_FOLLOW_UP: (ActionType.PAYROLL_CONTINGENCY, ActionType.EXCESS_CASH_ALLOCATION),
+    ActionType.CREDIT_LINE_DRAW: (ActionType.PAYROLL_CONTINGENCY, ActionType.CREDIT_LINE_DRAW),
+    ActionType.PAYROLL_CONFIRMATION: (ActionType.PAYROLL_CONTINGENCY,),
+    ActionType.VENDOR_DELAY: (ActionType.PAYMENT_BATCH,),
+}
+
+
+@dataclass
+class ActionFeatures:
+    """Fields of an action that links are derived from."""
+    action: PreparedAction
+    client_id: Optional[str]
+    vendor_id: Optional[str]
+    batch_vendor_ids: FrozenSet[str]  # Vendors paid by a payment batch
+    cash_impact: float  # First positive option cash impact, else 0
+
+    @property
+    def id(self) -> str:
+        return self.action.id
+
+    @property
+    def action_type(self) -> str:
+        return self.action.action_type
+
+    @property
+    def deadline(self) -> Optional[datetime]:
+        return self.action.deadline
+
+
+def extract_features(action: PreparedAction) -> ActionFeatures:
+    """Walk an action's options once to collect its linking features."""
+    client_id = vendor_id = None
+    found_client = found_vendor = False
+    batch_vendor_ids = set()
+    cash_impact = 0
+
+    for option in action.options or []:
+        content = option.prepared_content or {}
+        if not found_client and "client_id" in content:
+            client_id, found_client = content["client_id"], True
+        if not found_vendor and ("vendor_id" in content or "bucket_id" in content):
+            vendor_id = content["vendor_id"] if "vendor_id" in content else content["bucket_id"]
+            found_vendor = True
+        if isinstance(content.get("payments"), list):
+            batch_vendor_ids.update(p["vendor_id"] for p in content["payments"] if "vendor_id" in p)
+        if not cash_impact and option.cash_impact and option.cash_impact > 0:
+            cash_impact = option.cash_impact
+
+    return ActionFeatures(
+        action=action,
+        client_id=client_id,
+        vendor_id=vendor_id,
+        batch_vendor_ids=frozenset(batch_vendor_ids),
+        cash_impact=cash_impact,
+    )
+
+
+def _link(a: ActionFeatures, o: ActionFeatures, link_type: str, reason: str) -> LinkedAction:
+    return LinkedAction(action_id=a.id, linked_action_id=o.id, link_type=link_type, link_reason=reason)
+
+
+def _resolves(a: ActionFeatures, o: ActionFeatures) -> Optional[LinkedAction]:
+    # Invoice collection resolves payroll contingency or restores the buffer
+    if a.action_type == ActionType.INVOICE_FOLLOW_UP and a.cash_impact > 0:
+        if o.action_type == ActionType.PAYROLL_CONTINGENCY:
+            return _link(a, o, "resolves", f"Collecting ${a.cash_impact:,.0f} could help cover payroll shortfall")
+        if o.action_type == ActionType.EXCESS_CASH_ALLOCATION:
+            return _link(a, o, "resolves", f"Collecting ${a.cash_impact:,.0f} helps restore cash buffer")
+
+    # Credit line draw resolves payroll contingency
+    if a.action_type == ActionType.CREDIT_LINE_DRAW and o.action_type == ActionType.PAYROLL_CONTINGENCY:
+        return _link(a, o, "resolves", "Credit draw provides immediate funds for payroll")
+
+    return None
+
+
+def _conflicts(a: ActionFeatures, o: ActionFeatures) -> Optional[LinkedAction]:
+    # Same vendor delay requested twice
+    if (a.action_type == ActionType.VENDOR_DELAY and o.action_type == ActionType.VENDOR_DELAY
+            and a.vendor_id and a.vendor_id == o.vendor_id):
+        return _link(a, o, "conflicts", "Cannot delay payments to same vendor twice")
+
+    # Payment batch includes the vendor being delayed
+    if (a.action_type == ActionType.PAYMENT_BATCH and o.action_type == ActionType.VENDOR_DELAY
+            and o.vendor_id and o.vendor_id in a.batch_vendor_ids):
+        return _link(a, o, "conflicts", "Payment batch includes vendor marked for delay")
+
+    # Multiple credit draws that exceed available credit
+    if a.action_type == ActionType.CREDIT_LINE_DRAW and o.action_type == ActionType.CREDIT_LINE_DRAW:
+        return _link(a, o, "conflicts", "Review combined credit draws against available limit")
+
+    return None
+
+
+def _sequence(a: ActionFeatures, o: ActionFeatures) -> Optional[LinkedAction]:
+    # Payment batches in same week
+    if (a.action_type in PAYMENT_TYPES and o.action_type in PAYMENT_TYPES
+            and a.deadline and o.deadline
+            and abs((a.deadline - o.deadline).days) <= SEQUENCE_WINDOW_DAYS):
+        return _link(a, o, "sequence", "Both payment actions due within same week - consider sequencing")
+
+    # Multiple invoice follow-ups to same client
+    if (a.action_type == ActionType.INVOICE_FOLLOW_UP and o.action_type == ActionType.INVOICE_FOLLOW_UP
+            and a.client_id and a.client_id == o.client_id):
+        return _link(a, o, "sequence", "Multiple invoices for same client - consider single communication")
+
+    return None
+
+
+def _depends_on(a: ActionFeatures, o: ActionFeatures) -> Optional[LinkedAction]:
+    # Payroll confirmation depends on contingency being resolved
+    if a.action_type == ActionType.PAYROLL_CONFIRMATION and o.action_type == ActionType.PAYROLL_CONTINGENCY:
+        return _link(a, o, "depends_on", "Resolve payroll funding before confirming payroll")
+
+    # Collection escalation depends on initial follow-up attempt
+    if (a.action_type == ActionType.COLLECTION_ESCALATION and o.action_type == ActionType.INVOICE_FOLLOW_UP
+            and a.client_id and a.client_id == o.client_id):
+        return _link(a, o, "depends_on", "Try standard follow-up before escalation")
+
+    return None
+
+
+def _cascades_to(a: ActionFeatures, o: ActionFeatures) -> Optional[LinkedAction]:
+    # Vendor delay cascades to payment batch
+    if a.action_type == ActionType.VENDOR_DELAY and o.action_type == ActionType.PAYMENT_BATCH:
+        return _link(a, o, "cascades_to", "Vendor delay will affect payment batch timing")
+
+    # Large invoice collection cascades to cash allocation
+    if (a.action_type == ActionType.INVOICE_FOLLOW_UP and o.action_type == ActionType.EXCESS_CASH_ALLOCATION
+            and a.cash_impact > CASCADE_CASH_THRESHOLD):
+        return _link(a, o, "cascades_to", f"Collecting ${a.cash_impact:,.0f} may change cash allocation needs")
+
+    return None
+
+
+def _same_entity(a: ActionFeatures, o: ActionFeatures) -> Optional[LinkedAction]:
+    # Awareness links between different action types for one client or vendor
+    if a.action_type == o.action_type:
+        return None
+    if a.client_id and a.client_id == o.client_id:
+        return _link(a, o, "sequence", "Both actions involve same client - coordinate communications")
+    if a.vendor_id and a.vendor_id == o.vendor_id:
+        return _link(a, o, "sequence", "Both actions involve same vendor - coordinate approach")
+    return None
+
+
+_RULES = (_resolves, _conflicts, _sequence, _depends_on, _cascades_to, _same_entity)
+
+
+def pair_links(a: ActionFeatures, o: ActionFeatures) -> List[LinkedAction]:
+    """All links from a to o (at most one per rule)."""
+    links = []
+    for rule in _RULES:
+        link = rule(a, o)
+        if link:
+            links.append(link)
+    return links
+
+
+class LinkIndex:
+    """
+    Actions hashed by the keys link rules join on.
+
+    links_for() gathers the candidates that share a partner type, client,
+    vendor or payment week with an action and applies pair_links to those
+    only, so the cost grows with the number of links found rather than
+    with the number of indexed actions.
+    """
+
+    def __init__(self, features: Iterable[ActionFeatures]):
+        self.by_type: Dict[str, List[ActionFeatures]] = defaultdict(list)
+        self.by_client: Dict[str, List[ActionFeatures]] = defaultdict(list)
+        self.by_vendor: Dict[str, List[ActionFeatures]] = defaultdict(list)
+        payments = []
+
+        for f in features:
+            self.by_type[f.action_type].append(f)
+            if f.client_id:
+                self.by_client[f.client_id].append(f)
+            if f.vendor_id:
+                self.by_vendor[f.vendor_id].append(f)
+            if f.action_type in PAYMENT_TYPES and f.deadline:
+                payments.append(f)
+
+        payments.sort(key=lambda f: f.deadline)
+        self._payments = payments
+        self._payment_deadlines = [f.deadline for f in payments]
+
+    def _payments_near(self, deadline: datetime) -> List[ActionFeatures]:
+        # One day of slack: timedelta.days floors, so the rule decides the edge
+        window = timedelta(days=SEQUENCE_WINDOW_DAYS + 1)
+        lo = bisect_left(self._payment_deadlines, deadline - window)
+        hi = bisect_right(self._payment_deadlines, deadline + window)
+        return self._payments[lo:hi]
+
+    def candidates(self, f: ActionFeatures) -> List[ActionFeatures]:
+        """Indexed actions that could link from f, excluding f itself."""
+        groups = [self.by_type[t] for t in _TYPE_PARTNERS.get(f.action_type, ())]
+        if f.client_id:
+            groups.append(self.by_client.get(f.client_id, []))
+        if f.vendor_id:
+            groups.append(self.by_vendor.get(f.vendor_id, []))
+        groups.extend(self.by_vendor.get(v, []) for v in f.batch_vendor_ids)
+        if f.action_type in PAYMENT_TYPES and f.deadline:
+            groups.append(self._payments_near(f.deadline))
+
+        found: Dict[str, ActionFeatures] = {}
+        for group in groups:
+            for other in group:
+                if other.id != f.id:
+                    found.setdefault(other.id, other)
+        return list(found.values())
+
+    def links_for(self, f: ActionFeatures) -> List[LinkedAction]:
+        links = []
+        for other in self.candidates(f):
+            links.extend(pair_links(f, other))
+        return links
@@ -2,7 +2,7 @@
 Message Drafting - V4 Architecture
 
 Template-based message generation for prepared actions.
-Designed for easy OpenAI integration later.
+AI enhancement goes through the cached LLM drafting service (ai_drafting.py).
 
 Message types:
 - Collection emails (soft, professional, firm)
@@ -331,11 +331,12 @@ def generate_action_summary(
 
 
 # =============================================================================
-# OpenAI Integration for Message Enhancement
+# AI Message Enhancement (cached and pooled; see ai_drafting.py)
 # =============================================================================
 
 import logging
-from openai import AsyncOpenAI
+
+from .ai_drafting import drafting_service
 
 logger = logging.getLogger(__name__)
 
@@ -384,7 +385,7 @@ async def enhance_with_ai(
     enhancement_type: str = "personalize"
 ) -> Dict[str, str]:
     """
-    Enhance message content using OpenAI.
+    Enhance message content with the LLM drafting service.
 
     Args:
         template_output: Dict with "subject" and "body" from template
@@ -400,16 +401,12 @@ async def enhance_with_ai(
     Returns:
         Enhanced template_output with "ai_enhanced": True flag
     """
-    from app.config import settings
-
     # If no API key configured, return template unchanged
-    if not settings.OPENAI_API_KEY:
-        logger.warning("OPENAI_API_KEY not configured, skipping AI enhancement")
+    if not drafting_service.enabled:
+        logger.warning("ANTHROPIC_API_KEY not configured, skipping AI enhancement")
         return {**template_output, "ai_enhanced": False}
 
     try:
-        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
         # Get the appropriate system prompt
         system_prompt = ENHANCEMENT_PROMPTS.get(
             enhancement_type,
@@ -440,19 +437,20 @@ Body:
 Please enhance this email according to your instructions.
 """
 
-        # Call OpenAI
-        response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL_FAST,  # Use faster model for message enhancement
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=settings.OPENAI_MAX_TOKENS,
+        enhanced_body = await drafting_service.complete(
+            f"enhance:{enhancement_type}",
+            template_output.get("tone", "professional"),
+            {
+                "context": context_str,
+                "subject": template_output.get("subject", ""),
+                "body": template_output.get("body", ""),
+                "target_tone": context.get("target_tone") if enhancement_type == "tone_adjust" else None,
+            },
+            system=system_prompt,
+            prompt=user_message,
             temperature=0.7,  # Some creativity but not too much
         )
 
-        enhanced_body = response.choices[0].message.content.strip()
-
         # Return enhanced output
         return {
             **template_output,
@@ -513,19 +511,15 @@ async def generate_ai_message(
     Returns:
         Dict with "subject", "body", and metadata
     """
-    from app.config import settings
-
-    if not settings.OPENAI_API_KEY:
-        logger.warning("OPENAI_API_KEY not configured")
+    if not drafting_service.enabled:
+        logger.warning("ANTHROPIC_API_KEY not configured")
         return {
             "subject": f"{message_type.replace('_', ' ').title()}",
-            "body": "Please configure OpenAI API key for AI-generated messages.",
+            "body": "Please configure an Anthropic API key for AI-generated messages.",
             "ai_generated": False,
         }
 
     try:
-        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
         system_prompt = f"""You are a professional business communications expert.
 Generate a {tone} business email based on the following context.
 The email should be concise, professional, and actionable.
@@ -545,18 +539,15 @@ CONTEXT:
 Generate the email.
 """
 
-        response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL_FAST,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=settings.OPENAI_MAX_TOKENS,
+        content = await drafting_service.complete(
+            f"generate:{message_type}",
+            tone,
+            {"context": context_str},
+            system=system_prompt,
+            prompt=user_message,
             temperature=0.7,
         )
 
-        content = response.choices[0].message.content.strip()
-
         # Parse response
         subject = ""
         body = content
@@ -599,15 +590,11 @@ async def suggest_tone(
     Returns:
         Dict with recommended tone and reasoning
     """
-    from app.config import settings
-
-    if not settings.OPENAI_API_KEY:
+    if not drafting_service.enabled:
         # Fallback to rule-based suggestion
         return _rule_based_tone_suggestion(client_context, situation)
 
     try:
-        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
         system_prompt = """You are a business communications strategist.
 Based on the client context and situation, recommend the best communication tone.
 Return your response in this exact format:
@@ -625,18 +612,16 @@ SITUATION:
 What tone should we use?
 """
 
-        response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL_FAST,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
+        content = await drafting_service.complete(
+            "suggest_tone",
+            "",
+            {"context": context_str, "situation": situation},
+            system=system_prompt,
+            prompt=user_message,
             max_tokens=200,
             temperature=0.3,  # More deterministic for recommendations
         )
 
-        content = response.choices[0].message.content.strip()
-
         # Parse response
         tone = "professional"
         reasoning = content
@@ -0,0 +1,179 @@
+"""
+Per-route and per-job SQL query instrumentation.
+
+Engines are hooked with instrument_engine(), which times every cursor
+execution. Statements are attributed to the QueryStats bound to the
+current context by track_queries(): QueryMetricsMiddleware opens one per
+HTTP request, and tracked_job() wraps each scheduler job. Statements run
+outside a tracked scope are not recorded.
+
+On completion each scope is folded into query_registry, which keeps
+per-label totals for the Prometheus-style /metrics endpoint. If a scope
+issues more statements than its query budget (QUERY_BUDGET_DEFAULT,
+overridable per label in QUERY_BUDGETS), a warning is logged with its
+slowest statements. That is usually an N+1 loop.
+"""
+import functools
+import heapq
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statement text kept for slow-statement reports
+STATEMENT_PREVIEW_CHARS = 300
+
+
+@dataclass
+class QueryStats:
+    """Statements executed within one request or job run."""
+    label: str
+    count: int = 0
+    db_time: float = 0.0
+    slowest: List[Tuple[float, str]] = field(default_factory=list)  # Min-heap of (seconds, statement)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.db_time += seconds
+        entry = (seconds, statement[:STATEMENT_PREVIEW_CHARS])
+        if len(self.slowest) < settings.QUERY_SLOW_STATEMENTS:
+            heapq.heappush(self.slowest, entry)
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def slowest_first(self) -> List[Tuple[float, str]]:
+        return sorted(self.slowest, reverse=True)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@dataclass
+class LabelTotals:
+    """Accumulated query counts for one route or job."""
+    runs: int = 0
+    queries: int = 0
+    db_time: float = 0.0
+    max_queries: int = 0
+    budget_exceeded: int = 0
+
+
+class QueryRegistry:
+    """Totals per label since process start."""
+
+    def __init__(self):
+        self.totals: Dict[str, LabelTotals] = {}
+
+    def record(self, stats: QueryStats, over_budget: bool) -> None:
+        totals = self.totals.setdefault(stats.label, LabelTotals())
+        totals.runs += 1
+        totals.queries += stats.count
+        totals.db_time += stats.db_time
+        totals.max_queries = max(totals.max_queries, stats.count)
+        if over_budget:
+            totals.budget_exceeded += 1
+
+    def reset(self) -> None:
+        self.totals.clear()
+
+    def render_prometheus(self) -> str:
+        """Render totals in the Prometheus text exposition format."""
+        metrics = [
+            ("tamio_db_scope_runs_total", "counter", "Requests or job runs observed", "runs"),
+            ("tamio_db_queries_total", "counter", "SQL statements executed", "queries"),
+            ("tamio_db_query_seconds_total", "counter", "Time spent executing SQL statements", "db_time"),
+            ("tamio_db_queries_max", "gauge", "Most SQL statements in a single run", "max_queries"),
+            ("tamio_db_query_budget_exceeded_total", "counter", "Runs over their query budget", "budget_exceeded"),
+        ]
+        lines = []
+        for name, kind, help_text, attr in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label, totals in sorted(self.totals.items()):
+                escaped = label.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{name}{{scope="{escaped}"}} {getattr(totals, attr)}')
+        return "\n".join(lines) + "\n"
+
+
+query_registry = QueryRegistry()
+
+
+def query_budget(label: str) -> int:
+    return settings.QUERY_BUDGETS.get(label, settings.QUERY_BUDGET_DEFAULT)
+
+
+def finish(stats: QueryStats) -> bool:
+    """Record a finished scope; returns True if it exceeded its budget."""
+    budget = query_budget(stats.label)
+    over_budget = stats.count > budget
+    if over_budget:
+        slowest = "; ".join(f"{seconds * 1000:.1f}ms {sql}" for seconds, sql in stats.slowest_first())
+        logger.warning(
+            f"Query budget exceeded for {stats.label}: {stats.count} statements "
+            f"(budget {budget}), {stats.db_time * 1000:.1f}ms in database. Slowest: {slowest}"
+        )
+    query_registry.record(stats, over_budget)
+    return over_budget
+
+
+@contextmanager
+def track_queries(label: str) -> Iterator[QueryStats]:
+    """Attribute statements executed in this context to label."""
+    stats = QueryStats(label=label)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        finish(stats)
+
+
+def tracked_job(func):
+    """Wrap a scheduler job so its statements are recorded under job:<name>."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with track_queries(f"job:{func.__name__}"):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine) -> None:
+    """Hook an (async) engine's cursor execution events."""
+    if not settings.QUERY_METRICS_ENABLED:
+        return
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
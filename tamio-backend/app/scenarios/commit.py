@@ -26,6 +26,7 @@ from app.scenarios.pipeline.types import (
     ScenarioStatusEnum,
 )
 from app.data.obligations.models import ObligationAgreement, ObligationSchedule
+from app.detection import changes
 
 
 def generate_id(prefix: str) -> str:
@@ -125,6 +126,13 @@ class ScenarioCommitService:
                 await self._deactivate_agreement(agreement_id, definition)
                 results["agreements_deactivated"] += 1
 
+            # Let the detection sweeps re-check the changed obligations
+            if any(results[key] for key in (
+                "agreements_created", "schedules_created", "schedules_updated",
+                "schedules_cancelled", "agreements_deactivated",
+            )):
+                await changes.mark_changed(self.db, self.user_id, changes.OBLIGATION)
+
             # Commit all changes
             await self.db.commit()
 
@@ -213,6 +221,7 @@ class ScenarioCommitService:
         schedule = ObligationSchedule(
             id=generate_id("sched"),
             obligation_id=obligation_id,
+            user_id=self.user_id,
             due_date=due_date,
             period_start=period_start,
             period_end=period_end,
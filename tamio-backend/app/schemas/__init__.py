@@ -208,6 +208,8 @@ from app.schemas.health import (
     ObligationsHealthData,
     ReceivablesHealthData,
     HealthMetricsResponse,
+    DatabasePoolStats,
+    DatabasePoolResponse,
 )
 
 # Reconciliation schemas
@@ -218,6 +220,7 @@ from app.schemas.reconciliation import (
     ApproveReconciliationRequest,
     BulkReconciliationRequest,
     BulkReconciliationResult,
+    ReconciliationMatchResult,
     RejectReconciliationRequest,
     RevertReconciliationRequest,
     ForecastImpactItem,
@@ -398,6 +401,8 @@ __all__ = [
     "ObligationsHealthData",
     "ReceivablesHealthData",
     "HealthMetricsResponse",
+    "DatabasePoolStats",
+    "DatabasePoolResponse",
     # Reconciliation
     "ReconciliationSuggestion",
     "ReconciliationSuggestionList",
@@ -405,6 +410,7 @@ __all__ = [
     "ApproveReconciliationRequest",
     "BulkReconciliationRequest",
     "BulkReconciliationResult",
+    "ReconciliationMatchResult",
     "RejectReconciliationRequest",
     "RevertReconciliationRequest",
     "ForecastImpactItem",
@@ -157,6 +157,7 @@ class RisksListResponse(BaseModel):
     """Response schema for list of risks."""
     risks: List[RiskResponse]
     total_count: int
+    next_cursor: Optional[str] = None  # Set when more risks follow this page
 
 
 class ControlsListResponse(BaseModel):
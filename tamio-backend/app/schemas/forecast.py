@@ -16,6 +16,9 @@ class ForecastEventSummary(BaseModel):
     source_id: Optional[str] = None
     source_name: Optional[str] = None
     source_type: Optional[str] = None
+    # Present when the source amount was in another currency
+    original_amount: Optional[str] = None
+    original_currency: Optional[str] = None
 
 
 class ConfidenceBreakdown(BaseModel):
@@ -76,6 +79,7 @@ class ForecastConfidence(BaseModel):
 class ForecastResponse(BaseModel):
     """Complete 13-week forecast response."""
     starting_cash: str
+    base_currency: Optional[str] = None
     forecast_start_date: str
     weeks: List[WeekForecast]
     summary: ForecastSummary
@@ -87,3 +87,27 @@ class HealthMetricsResponse(BaseModel):
 
     # Metadata
     last_updated: datetime
+
+
+class DatabasePoolStats(BaseModel):
+    """Connection pool usage and checkout latency for one engine."""
+    pool_class: str
+    size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    checked_out: Optional[int] = None
+    idle: Optional[int] = None
+    overflow: Optional[int] = None
+    saturation: Optional[float] = None       # checked_out / (size + max_overflow)
+
+    # Since process start
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None           # Checkouts that hit DB_POOL_TIMEOUT
+    checkout_avg_ms: Optional[float] = None
+    checkout_p95_ms: Optional[float] = None  # Over the most recent checkouts
+    checkout_max_ms: Optional[float] = None
+
+
+class DatabasePoolResponse(BaseModel):
+    """Response for the database pool metrics endpoint."""
+    primary: DatabasePoolStats
+    replica: Optional[DatabasePoolStats] = None  # None when no read replica is configured
@@ -85,12 +85,24 @@ class BulkReconciliationRequest(BaseModel):
     matches: List[ReconciliationMatch] = Field(..., min_length=1)
 
 
+class ReconciliationMatchResult(BaseModel):
+    """Outcome of one requested match in a bulk reconciliation."""
+
+    payment_id: str
+    schedule_id: str
+    success: bool
+    error: Optional[str] = None
+
+
 class BulkReconciliationResult(BaseModel):
     """Result of bulk reconciliation operation."""
 
     successful: int = Field(0, description="Number of successfully reconciled payments")
     failed: int = Field(0, description="Number of failed reconciliations")
     errors: List[str] = Field(default_factory=list, description="Error messages for failures")
+    results: List[ReconciliationMatchResult] = Field(
+        default_factory=list, description="Outcome per requested match, in request order"
+    )
 
 
 class RejectReconciliationRequest(BaseModel):
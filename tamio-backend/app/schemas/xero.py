@@ -1,6 +1,6 @@
 """Pydantic schemas for Xero integration."""
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 
 
@@ -44,7 +44,7 @@ class XeroTokenResponse(BaseModel):
 class XeroSyncRequest(BaseModel):
     """Request to sync data from Xero."""
     user_id: str
-    sync_type: str = "full"  # "full" | "incremental" | "invoices" | "contacts"
+    sync_type: Literal["full", "invoices", "contacts"] = "full"
 
 
 class XeroSyncResult(BaseModel):
@@ -55,6 +55,7 @@ class XeroSyncResult(BaseModel):
     records_created: Dict[str, int] = {}
     records_updated: Dict[str, int] = {}
     errors: List[str] = []
+    stage_durations_ms: Dict[str, float] = {}
 
 
 # ============================================================================
@@ -30,6 +30,7 @@ from app.preparation.models import PreparedAction, ActionOption, ActionType, Act
 from app.execution.models import ExecutionAutomationRule, AutomationActionType
 from app.auth.utils import get_password_hash
 from app.data.base import generate_id
+from app.detection import changes
 
 logger = logging.getLogger(__name__)
 
@@ -798,6 +799,7 @@ async def seed_agencyco_data(db: AsyncSession, force: bool = False) -> dict:
                 schedule = ObligationSchedule(
                     id=generate_id("sched"),
                     obligation_id=obligation.id,
+                    user_id=user_id,
                     due_date=today - timedelta(days=days_late),
                     estimated_amount=amount,
                     estimate_source="fixed_agreement",
@@ -833,6 +835,7 @@ async def seed_agencyco_data(db: AsyncSession, force: bool = False) -> dict:
     tax_schedule = ObligationSchedule(
         id=generate_id("sched"),
         obligation_id=tax_obligation.id,
+        user_id=user_id,
         due_date=today + timedelta(days=18),
         estimated_amount=Decimal("22000.00"),
         estimate_source="manual_estimate",
@@ -1472,6 +1475,9 @@ AgencyCo""",
         except Exception as e:
             logger.warning(f"Failed to create obligation for expense {expense.name}: {e}")
 
+    await changes.mark_changed(
+        db, user_id, changes.CASH_ACCOUNT, changes.CLIENT, changes.EXPENSE_BUCKET, changes.OBLIGATION
+    )
     await db.commit()
 
     result = {
@@ -19,10 +19,34 @@ from app.services.exchange_rates import (
     store_exchange_rates,
     get_rate,
     convert_amount,
+    convert_many,
     get_latest_rates,
     refresh_exchange_rates,
     SUPPORTED_CURRENCIES,
 )
+from app.services.fx_rates import FxRateTable, fx_rates, get_fx_rates
+
+# Windowed cash aggregates (already in services/)
+from app.services.cash_windows import (
+    CashWindows,
+    CASH_HORIZONS,
+    get_cash_windows,
+    load_cash_windows,
+    invalidate_cash_windows,
+)
+
+# Receivables (already in services/)
+from app.services.receivables import (
+    AR_HORIZONS,
+    ReceivablesSummary,
+    build_receivable_rows,
+    sync_xero_receivables,
+    sum_receivables_due,
+    summarize_receivables,
+)
+
+# Bulk reconciliation
+from app.services.reconciliation import RECONCILE_CHUNK_SIZE, bulk_reconcile
 
 # Notification services
 from app.notifications.service import NotificationService, get_notification_service
@@ -48,9 +72,29 @@ __all__ = [
     "store_exchange_rates",
     "get_rate",
     "convert_amount",
+    "convert_many",
     "get_latest_rates",
     "refresh_exchange_rates",
     "SUPPORTED_CURRENCIES",
+    "FxRateTable",
+    "fx_rates",
+    "get_fx_rates",
+    # Cash windows
+    "CashWindows",
+    "CASH_HORIZONS",
+    "get_cash_windows",
+    "load_cash_windows",
+    "invalidate_cash_windows",
+    # Receivables
+    "AR_HORIZONS",
+    "ReceivablesSummary",
+    "build_receivable_rows",
+    "sync_xero_receivables",
+    "sum_receivables_due",
+    "summarize_receivables",
+    # Reconciliation
+    "RECONCILE_CHUNK_SIZE",
+    "bulk_reconcile",
     # Notification
     "NotificationService",
     "get_notification_service",
@@ -0,0 +1,138 @@
+"""
+Windowed Cash Aggregates.
+
+Sums of scheduled obligations over forward-looking horizons (7/14/30 days by
+default), split into revenue, expenses and all obligations. Every bucket
+comes from a single query using SUM(...) FILTER (WHERE ...).
+
+Results are memoised per database session. A request or a pipeline run
+uses one session, so the preparation, escalation and health code paths
+share a single query per tenant. The memo is dropped whenever the session
+writes obligation schedules or agreements (ORM flush or DML statement) or
+rolls back; invalidate_cash_windows drops it explicitly.
+"""
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event, select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.models import ObligationAgreement, ObligationSchedule
+
+
+# Horizons (days from today, inclusive) returned by default
+CASH_HORIZONS: Tuple[int, ...] = (7, 14, 30)
+
+# Schedule statuses that still represent future cash movement
+OPEN_SCHEDULE_STATUSES = ("scheduled", "due")
+
+# Keyed by the sync Session behind each AsyncSession, which the session
+# events below receive
+_memo: "WeakKeyDictionary[Session, Dict[tuple, CashWindows]]" = WeakKeyDictionary()
+
+# Writes to these tables change the windows
+_SOURCE_TABLES = frozenset({ObligationSchedule.__tablename__, ObligationAgreement.__tablename__})
+
+
+@dataclass
+class CashWindows:
+    """Scheduled amounts due between as_of and as_of + N days, per horizon."""
+    as_of: date
+    revenue: Dict[int, float] = field(default_factory=dict)
+    expenses: Dict[int, float] = field(default_factory=dict)
+    total: Dict[int, float] = field(default_factory=dict)
+
+
+def _session_key(db: AsyncSession) -> Session:
+    return getattr(db, "sync_session", db)
+
+
+async def load_cash_windows(
+    db: AsyncSession,
+    user_id: str,
+    horizons: Tuple[int, ...] = CASH_HORIZONS,
+    today: Optional[date] = None,
+) -> CashWindows:
+    """Compute every horizon bucket for a user in one query (not memoised)."""
+    today = today or date.today()
+    is_revenue = ObligationAgreement.obligation_type == "revenue"
+
+    columns = []
+    for days in horizons:
+        in_window = ObligationSchedule.due_date <= today + timedelta(days=days)
+        columns.extend([
+            func.sum(ObligationSchedule.estimated_amount).filter(and_(in_window, is_revenue)),
+            func.sum(ObligationSchedule.estimated_amount).filter(and_(in_window, ~is_revenue)),
+            func.sum(ObligationSchedule.estimated_amount).filter(in_window),
+        ])
+
+    result = await db.execute(
+        select(*columns)
+        .select_from(ObligationSchedule)
+        .join(ObligationAgreement)
+        .where(ObligationSchedule.user_id == user_id)
+        .where(ObligationSchedule.due_date >= today)
+        .where(ObligationSchedule.due_date <= today + timedelta(days=max(horizons)))
+        .where(ObligationSchedule.status.in_(OPEN_SCHEDULE_STATUSES))
+    )
+    row = result.one()
+
+    windows = CashWindows(as_of=today)
+    for i, days in enumerate(horizons):
+        revenue, expenses, total = row[3 * i:3 * i + 3]
+        windows.revenue[days] = float(revenue or 0)
+        windows.expenses[days] = float(expenses or 0)
+        windows.total[days] = float(total or 0)
+    return windows
+
+
+async def get_cash_windows(
+    db: AsyncSession,
+    user_id: str,
+    horizons: Tuple[int, ...] = CASH_HORIZONS,
+) -> CashWindows:
+    """Windowed cash aggregates for a user, memoised on the session."""
+    today = date.today()
+    cache = _memo.setdefault(_session_key(db), {})
+    key = (user_id, today, tuple(horizons))
+    if key not in cache:
+        cache[key] = await load_cash_windows(db, user_id, horizons, today)
+    return cache[key]
+
+
+def invalidate_cash_windows(db: AsyncSession, user_id: Optional[str] = None) -> None:
+    """Drop memoised windows for a session (optionally for one user)."""
+    cache = _memo.get(_session_key(db))
+    if not cache:
+        return
+    if user_id is None:
+        cache.clear()
+        return
+    for key in [k for k in cache if k[0] == user_id]:
+        del cache[key]
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_flush(session: Session, flush_context) -> None:
+    if session not in _memo:
+        return
+    changed = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, (ObligationSchedule, ObligationAgreement)) for obj in changed):
+        _memo.pop(session, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_dml(state: ORMExecuteState) -> None:
+    if state.session not in _memo or not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(state.statement, "table", None)
+    if table is None or getattr(table, "name", None) in _SOURCE_TABLES:
+        _memo.pop(state.session, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _invalidate_on_rollback(session: Session) -> None:
+    _memo.pop(session, None)
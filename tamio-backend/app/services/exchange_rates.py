@@ -4,9 +4,11 @@ from datetime import date, datetime, timezone
 from decimal import Decimal
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.models import generate_id
 from app.data.exchange_rates.models import ExchangeRate
+from app.services.fx_rates import fx_rates, get_fx_rates
 
 
 # ECB provides rates relative to EUR
@@ -118,9 +120,10 @@ async def store_exchange_rates(
 ) -> list[ExchangeRate]:
     """
     Store exchange rates in the database.
-    Creates rate pairs for all supported currencies.
+    Creates rate pairs for all supported currencies in one upsert, then
+    reloads the in-process rate table.
     """
-    stored_rates = []
+    rows = []
 
     for from_currency in SUPPORTED_CURRENCIES:
         for to_currency in SUPPORTED_CURRENCIES:
@@ -137,34 +140,28 @@ async def store_exchange_rates(
             else:
                 continue
 
-            # Check if rate already exists
-            existing = await db.execute(
-                select(ExchangeRate).where(
-                    ExchangeRate.from_currency == from_currency,
-                    ExchangeRate.to_currency == to_currency,
-                    ExchangeRate.effective_date == effective_date
-                )
-            )
-            existing_rate = existing.scalar_one_or_none()
-
-            if existing_rate:
-                # Update existing rate
-                existing_rate.rate = cross_rate
-                existing_rate.source = source
-                stored_rates.append(existing_rate)
-            else:
-                # Create new rate
-                rate = ExchangeRate(
-                    from_currency=from_currency,
-                    to_currency=to_currency,
-                    rate=cross_rate,
-                    effective_date=effective_date,
-                    source=source
-                )
-                db.add(rate)
-                stored_rates.append(rate)
+            rows.append({
+                "id": generate_id("xrate"),
+                "from_currency": from_currency,
+                "to_currency": to_currency,
+                "rate": cross_rate,
+                "effective_date": effective_date,
+                "source": source,
+            })
+
+    if not rows:
+        return []
+
+    stmt = pg_insert(ExchangeRate).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_exchange_rate_currency_date",
+        set_={"rate": stmt.excluded.rate, "source": stmt.excluded.source},
+    ).returning(ExchangeRate)
+    result = await db.scalars(stmt)
+    stored_rates = list(result.all())
 
     await db.commit()
+    await fx_rates.load(db)
     return stored_rates
 
 
@@ -175,35 +172,35 @@ async def get_rate(
     target_date: Optional[date] = None
 ) -> Optional[ExchangeRate]:
     """
-    Get exchange rate from database.
+    Get exchange rate from the in-process rate table.
     Uses the most recent rate on or before the target date.
     """
+    if target_date is None:
+        target_date = date.today()
+
     if from_currency == to_currency:
         # Return a synthetic rate of 1.0
         return ExchangeRate(
             from_currency=from_currency,
             to_currency=to_currency,
             rate=Decimal('1.0'),
-            effective_date=target_date or date.today(),
+            effective_date=target_date,
             source='system'
         )
 
-    if target_date is None:
-        target_date = date.today()
-
-    result = await db.execute(
-        select(ExchangeRate)
-        .where(
-            ExchangeRate.from_currency == from_currency,
-            ExchangeRate.to_currency == to_currency,
-            ExchangeRate.effective_date <= target_date
-        )
-        .order_by(desc(ExchangeRate.effective_date))
-        .limit(1)
+    table = await get_fx_rates(db)
+    found = table.rate(from_currency, to_currency, target_date)
+    if found is None:
+        return None
+
+    rate, effective_date = found
+    return ExchangeRate(
+        from_currency=from_currency,
+        to_currency=to_currency,
+        rate=rate,
+        effective_date=effective_date,
     )
 
-    return result.scalar_one_or_none()
-
 
 async def convert_amount(
     db: AsyncSession,
@@ -215,26 +212,48 @@ async def convert_amount(
     """
     Convert an amount from one currency to another.
 
+    Only fetches from ECB when the rate table has nothing on or before
+    target_date for the pair.
+
     Returns:
         Tuple of (converted_amount, exchange_rate, effective_date)
     """
     if from_currency == to_currency:
         return amount, Decimal('1.0'), target_date or date.today()
 
-    rate = await get_rate(db, from_currency, to_currency, target_date)
+    table = await get_fx_rates(db)
+    found = table.rate(from_currency, to_currency, target_date)
 
-    if rate is None:
-        # Try to fetch and store rates
+    if found is None:
+        # Try to fetch and store rates (reloads the table)
         rates = await fetch_rates_from_ecb(target_date)
         if rates:
             await store_exchange_rates(db, rates, target_date or date.today())
-            rate = await get_rate(db, from_currency, to_currency, target_date)
+            found = fx_rates.rate(from_currency, to_currency, target_date)
 
-    if rate is None:
+    if found is None:
         raise ValueError(f"No exchange rate found for {from_currency} to {to_currency}")
 
-    converted = amount * rate.rate
-    return converted, rate.rate, rate.effective_date
+    rate, effective_date = found
+    converted = amount * rate
+    return converted, rate, effective_date
+
+
+async def convert_many(
+    db: AsyncSession,
+    amounts: list[Decimal],
+    currencies: list[str],
+    to_currency: str,
+    dates: Optional[list[Optional[date]]] = None,
+) -> list[Decimal]:
+    """
+    Convert many amounts to one currency without per-row queries.
+
+    amounts[i] is in currencies[i], converted as of dates[i] (today when
+    omitted). Raises ValueError if any amount has no known rate.
+    """
+    table = await get_fx_rates(db)
+    return table.convert_many(amounts, currencies, to_currency, dates)
 
 
 async def get_latest_rates(
@@ -249,6 +268,8 @@ async def get_latest_rates(
         e.g., {'EUR': {'rate': 0.92, 'effective_date': '2026-01-04'}, ...}
     """
     today = date.today()
+    table = await get_fx_rates(db)
+    latest = table.latest(base_currency, SUPPORTED_CURRENCIES)
     rates = {}
 
     for currency in SUPPORTED_CURRENCIES:
@@ -259,11 +280,11 @@ async def get_latest_rates(
             }
             continue
 
-        rate = await get_rate(db, base_currency, currency, today)
-        if rate:
+        if currency in latest:
+            rate, effective_date = latest[currency]
             rates[currency] = {
-                'rate': str(rate.rate),
-                'effective_date': rate.effective_date.isoformat()
+                'rate': str(rate),
+                'effective_date': effective_date.isoformat()
             }
 
     return rates
@@ -272,7 +293,7 @@ async def get_latest_rates(
 async def refresh_exchange_rates(db: AsyncSession) -> int:
     """
     Fetch and store latest exchange rates.
-    Should be called periodically (e.g., daily or weekly).
+    Called daily by the scheduler.
 
     Returns:
         Number of rates stored
@@ -0,0 +1,178 @@
+"""
+In-process FX rate table.
+
+The full exchange_rates history is loaded in one query into sorted
+per-pair arrays (effective dates alongside their rates). As-of lookups use
+a binary search, so converting a batch of amounts needs no queries at all.
+
+The table is shared per process. It reloads when older than
+FX_RATE_TABLE_TTL_SECONDS (so every worker picks up the scheduler's daily
+refresh) and immediately after this process stores new rates.
+"""
+import asyncio
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import ExchangeRate
+
+
+ONE = Decimal("1")
+
+
+@dataclass
+class PairSeries:
+    """Rates for one currency pair, sorted by effective date."""
+    dates: List[date] = field(default_factory=list)
+    rates: List[Decimal] = field(default_factory=list)
+
+    def as_of(self, on: date) -> Optional[Tuple[Decimal, date]]:
+        """Most recent rate effective on or before the given date."""
+        i = bisect_right(self.dates, on)
+        if i == 0:
+            return None
+        return self.rates[i - 1], self.dates[i - 1]
+
+
+class FxRateTable:
+    """Exchange rate history held in memory for as-of lookups."""
+
+    def __init__(self):
+        self._pairs: Dict[Tuple[str, str], PairSeries] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def is_stale(self, ttl_seconds: Optional[float] = None) -> bool:
+        if self._loaded_at is None:
+            return True
+        ttl = settings.FX_RATE_TABLE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        return time.monotonic() - self._loaded_at > ttl
+
+    def invalidate(self) -> None:
+        """Force a reload on next use."""
+        self._loaded_at = None
+
+    async def load(self, db: AsyncSession) -> int:
+        """
+        Replace the table with the full rate history (one query).
+
+        Returns:
+            Number of rates loaded
+        """
+        result = await db.execute(
+            select(
+                ExchangeRate.from_currency,
+                ExchangeRate.to_currency,
+                ExchangeRate.effective_date,
+                ExchangeRate.rate,
+            ).order_by(
+                ExchangeRate.from_currency,
+                ExchangeRate.to_currency,
+                ExchangeRate.effective_date,
+            )
+        )
+        rows = result.all()
+        self.replace(rows)
+        return len(rows)
+
+    def replace(self, rows: Sequence[Tuple[str, str, date, Decimal]]) -> None:
+        """Build the table from (from, to, effective_date, rate) rows."""
+        pairs: Dict[Tuple[str, str], PairSeries] = {}
+        for from_currency, to_currency, effective_date, rate in sorted(rows, key=lambda r: (r[0], r[1], r[2])):
+            series = pairs.setdefault((from_currency, to_currency), PairSeries())
+            series.dates.append(effective_date)
+            series.rates.append(Decimal(rate))
+        # Swap in one assignment so readers never see a partial table
+        self._pairs = pairs
+        self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, db: AsyncSession) -> "FxRateTable":
+        """Load the table if it is missing or stale."""
+        if self.is_stale():
+            async with self._lock:
+                if self.is_stale():
+                    await self.load(db)
+        return self
+
+    def rate(
+        self,
+        from_currency: str,
+        to_currency: str,
+        on: Optional[date] = None,
+    ) -> Optional[Tuple[Decimal, date]]:
+        """
+        Rate from one currency to another as of a date.
+
+        Returns:
+            Tuple of (rate, effective_date), or None if no rate is known
+        """
+        on = on or date.today()
+        if from_currency == to_currency:
+            return ONE, on
+        series = self._pairs.get((from_currency, to_currency))
+        if series is None:
+            return None
+        return series.as_of(on)
+
+    def convert_many(
+        self,
+        amounts: Sequence[Decimal],
+        currencies: Sequence[str],
+        to_currency: str,
+        dates: Optional[Sequence[Optional[date]]] = None,
+    ) -> List[Decimal]:
+        """
+        Convert many amounts to one currency in a single call.
+
+        amounts[i] is in currencies[i], converted at the rate as of
+        dates[i] (today when dates or dates[i] is None).
+
+        Raises:
+            ValueError: If any amount has no known rate
+        """
+        if len(currencies) != len(amounts) or (dates is not None and len(dates) != len(amounts)):
+            raise ValueError("amounts, currencies and dates must be the same length")
+
+        today = date.today()
+        converted = []
+        for i, amount in enumerate(amounts):
+            currency = currencies[i]
+            if currency == to_currency:
+                converted.append(Decimal(amount))
+                continue
+            on = (dates[i] if dates is not None else None) or today
+            found = self.rate(currency, to_currency, on)
+            if found is None:
+                raise ValueError(f"No exchange rate found for {currency} to {to_currency} on {on}")
+            converted.append(Decimal(amount) * found[0])
+        return converted
+
+    def latest(self, base_currency: str, currencies: Sequence[str]) -> Dict[str, Tuple[Decimal, date]]:
+        """Latest known rate from base_currency to each currency."""
+        today = date.today()
+        rates = {}
+        for currency in currencies:
+            found = self.rate(base_currency, currency, today)
+            if found is not None:
+                rates[currency] = found
+        return rates
+
+
+# Process-wide table
+fx_rates = FxRateTable()
+
+
+async def get_fx_rates(db: AsyncSession) -> FxRateTable:
+    """The process-wide rate table, loaded or reloaded as needed."""
+    return await fx_rates.ensure_loaded(db)
@@ -16,9 +16,9 @@ Data Flow:
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, or_
 
 from app.data.clients.models import Client
 from app.data.expenses.models import ExpenseBucket
@@ -96,6 +96,60 @@ class ObligationService:
         auto_generate_schedules: bool
     ) -> Optional[ObligationAgreement]:
         """Create a fixed recurring obligation from retainer configuration."""
+        obligation = self._build_retainer_obligation(client, config)
+        if obligation is None:
+            return None
+
+        self.db.add(obligation)
+        await self.db.commit()
+        await self.db.refresh(obligation)
+
+        if auto_generate_schedules:
+            await self.generate_schedules_from_agreement(obligation)
+
+        return obligation
+
+    async def _create_project_obligation(
+        self,
+        client: Client,
+        config: dict,
+        auto_generate_schedules: bool
+    ) -> Optional[ObligationAgreement]:
+        """Create milestone-based obligation from project configuration."""
+        obligation = self._build_project_obligation(client, config)
+        if obligation is None:
+            return None
+
+        self.db.add(obligation)
+        await self.db.commit()
+        await self.db.refresh(obligation)
+
+        if auto_generate_schedules:
+            await self._generate_milestone_schedules(obligation, config.get("milestones", []))
+
+        return obligation
+
+    async def _create_usage_obligation(
+        self,
+        client: Client,
+        config: dict,
+        auto_generate_schedules: bool
+    ) -> Optional[ObligationAgreement]:
+        """Create variable obligation from usage-based configuration."""
+        obligation = self._build_usage_obligation(client, config)
+        if obligation is None:
+            return None
+
+        self.db.add(obligation)
+        await self.db.commit()
+        await self.db.refresh(obligation)
+
+        if auto_generate_schedules:
+            await self.generate_schedules_from_agreement(obligation)
+
+        return obligation
+
+    def _build_retainer_obligation(self, client: Client, config: dict) -> Optional[ObligationAgreement]:
         amount = Decimal(str(config.get("amount", 0)))
         if amount <= 0:
             return None
@@ -103,7 +157,7 @@ class ObligationService:
         frequency = config.get("frequency", "monthly")
         confidence = self._calculate_client_confidence(client)
 
-        obligation = ObligationAgreement(
+        return ObligationAgreement(
             id=generate_id("obl"),
             user_id=client.user_id,
             client_id=client.id,
@@ -120,22 +174,7 @@ class ObligationService:
             notes=f"Auto-generated from client: {client.name}",
         )
 
-        self.db.add(obligation)
-        await self.db.commit()
-        await self.db.refresh(obligation)
-
-        if auto_generate_schedules:
-            await self.generate_schedules_from_agreement(obligation)
-
-        return obligation
-
-    async def _create_project_obligation(
-        self,
-        client: Client,
-        config: dict,
-        auto_generate_schedules: bool
-    ) -> Optional[ObligationAgreement]:
-        """Create milestone-based obligation from project configuration."""
+    def _build_project_obligation(self, client: Client, config: dict) -> Optional[ObligationAgreement]:
         milestones = config.get("milestones", [])
         total_value = sum(Decimal(str(m.get("amount", 0))) for m in milestones)
 
@@ -144,7 +183,7 @@ class ObligationService:
 
         confidence = self._calculate_client_confidence(client)
 
-        obligation = ObligationAgreement(
+        return ObligationAgreement(
             id=generate_id("obl"),
             user_id=client.user_id,
             client_id=client.id,
@@ -162,29 +201,14 @@ class ObligationService:
             variability_rule={"milestones": milestones},  # Store milestone details
         )
 
-        self.db.add(obligation)
-        await self.db.commit()
-        await self.db.refresh(obligation)
-
-        if auto_generate_schedules:
-            await self._generate_milestone_schedules(obligation, milestones)
-
-        return obligation
-
-    async def _create_usage_obligation(
-        self,
-        client: Client,
-        config: dict,
-        auto_generate_schedules: bool
-    ) -> Optional[ObligationAgreement]:
-        """Create variable obligation from usage-based configuration."""
+    def _build_usage_obligation(self, client: Client, config: dict) -> Optional[ObligationAgreement]:
         typical_amount = Decimal(str(config.get("typical_amount", 0)))
         if typical_amount <= 0:
             return None
 
         frequency = config.get("settlement_frequency", "monthly")
 
-        obligation = ObligationAgreement(
+        return ObligationAgreement(
             id=generate_id("obl"),
             user_id=client.user_id,
             client_id=client.id,
@@ -202,14 +226,33 @@ class ObligationService:
             variability_rule={"typical_amount": str(typical_amount)},
         )
 
-        self.db.add(obligation)
-        await self.db.commit()
-        await self.db.refresh(obligation)
+    def _build_client_obligation(self, client: Client) -> Tuple[Optional[ObligationAgreement], List[ObligationSchedule]]:
+        """Unsaved equivalent of create_obligation_from_client: (obligation, schedules)."""
+        if client.status != "active":
+            return None, []
 
-        if auto_generate_schedules:
-            await self.generate_schedules_from_agreement(obligation)
+        config = client.billing_config or {}
+        client_type = client.client_type
+        if client_type == "mixed":
+            if "retainer" in config:
+                client_type, config = "retainer", config["retainer"]
+            elif "usage" in config:
+                client_type, config = "usage", config["usage"]
 
-        return obligation
+        if client_type == "retainer":
+            obligation = self._build_retainer_obligation(client, config)
+        elif client_type == "project":
+            obligation = self._build_project_obligation(client, config)
+            if obligation is not None:
+                return obligation, self._build_milestone_schedules(obligation, config.get("milestones", []))
+        elif client_type == "usage":
+            obligation = self._build_usage_obligation(client, config)
+        else:
+            obligation = None
+
+        if obligation is None:
+            return None, []
+        return obligation, self.build_schedules(obligation)
 
     # ==========================================================================
     # ExpenseBucket -> Obligation Flow
@@ -230,6 +273,20 @@ class ObligationService:
         Returns:
             The created ObligationAgreement, or None if bucket has no amount
         """
+        obligation = self._build_expense_obligation(bucket)
+        if obligation is None:
+            return None
+
+        self.db.add(obligation)
+        await self.db.commit()
+        await self.db.refresh(obligation)
+
+        if auto_generate_schedules:
+            await self.generate_schedules_from_agreement(obligation, due_day=bucket.due_day)
+
+        return obligation
+
+    def _build_expense_obligation(self, bucket: ExpenseBucket) -> Optional[ObligationAgreement]:
         if bucket.monthly_amount is None or bucket.monthly_amount <= 0:
             return None
 
@@ -238,7 +295,7 @@ class ObligationService:
         amount_type = "fixed" if bucket.is_stable else "variable"
         confidence = "high" if bucket.is_stable else "medium"
 
-        obligation = ObligationAgreement(
+        return ObligationAgreement(
             id=generate_id("obl"),
             user_id=bucket.user_id,
             expense_bucket_id=bucket.id,
@@ -255,15 +312,6 @@ class ObligationService:
             notes=f"Auto-generated from expense bucket: {bucket.name}",
         )
 
-        self.db.add(obligation)
-        await self.db.commit()
-        await self.db.refresh(obligation)
-
-        if auto_generate_schedules:
-            await self.generate_schedules_from_agreement(obligation, due_day=bucket.due_day)
-
-        return obligation
-
     def _map_category_to_obligation_type(self, category: str) -> str:
         """Map expense bucket category to obligation type."""
         category_map = {
@@ -297,20 +345,30 @@ class ObligationService:
         Returns:
             List of generated ObligationSchedule entries
         """
+        schedules = self.build_schedules(obligation, months_ahead, due_day)
+        self.db.add_all(schedules)
+        await self.db.commit()
+        return schedules
+
+    def build_schedules(
+        self,
+        obligation: ObligationAgreement,
+        months_ahead: int = 3,
+        due_day: Optional[int] = None
+    ) -> List[ObligationSchedule]:
+        """Unsaved schedules for an agreement (see generate_schedules_from_agreement)."""
         if obligation.frequency == "one_time":
             # For one-time obligations, create a single schedule
-            schedule = ObligationSchedule(
+            return [ObligationSchedule(
                 id=generate_id("sched"),
                 obligation_id=obligation.id,
+                user_id=obligation.user_id,
                 due_date=obligation.start_date,
                 estimated_amount=obligation.base_amount or Decimal("0"),
                 estimate_source="fixed_agreement",
                 confidence=obligation.confidence,
                 status="scheduled",
-            )
-            self.db.add(schedule)
-            await self.db.commit()
-            return [schedule]
+            )]
 
         schedules = []
 
@@ -333,9 +391,10 @@ class ObligationService:
 
             # Only create schedule if due date is in the future
             if schedule_due_date >= date.today():
-                schedule = ObligationSchedule(
+                schedules.append(ObligationSchedule(
                     id=generate_id("sched"),
                     obligation_id=obligation.id,
+                    user_id=obligation.user_id,
                     due_date=schedule_due_date,
                     period_start=current_date,
                     period_end=current_date + relativedelta(months=1) - timedelta(days=1),
@@ -343,9 +402,7 @@ class ObligationService:
                     estimate_source="fixed_agreement",
                     confidence=obligation.confidence,
                     status="scheduled",
-                )
-                schedules.append(schedule)
-                self.db.add(schedule)
+                ))
 
             # Move to next period based on frequency
             if obligation.frequency == "monthly":
@@ -361,7 +418,6 @@ class ObligationService:
             else:
                 current_date += relativedelta(months=1)
 
-        await self.db.commit()
         return schedules
 
     async def _generate_milestone_schedules(
@@ -370,6 +426,16 @@ class ObligationService:
         milestones: List[Dict[str, Any]]
     ) -> List[ObligationSchedule]:
         """Generate schedules from project milestones."""
+        schedules = self._build_milestone_schedules(obligation, milestones)
+        self.db.add_all(schedules)
+        await self.db.commit()
+        return schedules
+
+    def _build_milestone_schedules(
+        self,
+        obligation: ObligationAgreement,
+        milestones: List[Dict[str, Any]]
+    ) -> List[ObligationSchedule]:
         schedules = []
 
         for milestone in milestones:
@@ -397,20 +463,18 @@ class ObligationService:
 
             due_date = milestone_date + timedelta(days=payment_delay_days)
 
-            schedule = ObligationSchedule(
+            schedules.append(ObligationSchedule(
                 id=generate_id("sched"),
                 obligation_id=obligation.id,
+                user_id=obligation.user_id,
                 due_date=due_date,
                 estimated_amount=amount,
                 estimate_source="fixed_agreement",
                 confidence=obligation.confidence,
                 status="scheduled",
                 notes=milestone.get("name", "Project milestone"),
-            )
-            schedules.append(schedule)
-            self.db.add(schedule)
+            ))
 
-        await self.db.commit()
         return schedules
 
     # ==========================================================================
@@ -548,6 +612,114 @@ class ObligationService:
         await self.db.commit()
         return result.rowcount
 
+    async def sync_obligations_bulk(
+        self,
+        clients: Sequence[Client] = (),
+        buckets: Sequence[ExpenseBucket] = (),
+    ) -> Dict[str, int]:
+        """
+        Batched sync_obligation_from_client / sync_obligation_from_expense.
+
+        Applies the same rules to many sources with one agreement lookup,
+        one delete of stale future schedules and one flush, regardless of
+        how many sources are passed. Nothing is committed; the caller owns
+        the transaction.
+
+        Returns:
+            Counts of created, updated and deactivated obligations and of
+            schedules generated
+        """
+        counts = {"created": 0, "updated": 0, "deactivated": 0, "schedules": 0}
+        if not clients and not buckets:
+            return counts
+
+        conditions = []
+        if clients:
+            conditions.append(ObligationAgreement.client_id.in_({c.id for c in clients}))
+        if buckets:
+            conditions.append(ObligationAgreement.expense_bucket_id.in_({b.id for b in buckets}))
+        result = await self.db.execute(select(ObligationAgreement).where(or_(*conditions)))
+
+        by_client: Dict[str, ObligationAgreement] = {}
+        by_bucket: Dict[str, ObligationAgreement] = {}
+        for agreement in result.scalars().all():
+            if agreement.client_id:
+                by_client.setdefault(agreement.client_id, agreement)
+            if agreement.expense_bucket_id:
+                by_bucket.setdefault(agreement.expense_bucket_id, agreement)
+
+        new_rows: List[Any] = []
+        regenerated: List[str] = []
+
+        def track(obligation: Optional[ObligationAgreement], schedules: List[ObligationSchedule]) -> None:
+            if obligation is not None:
+                new_rows.append(obligation)
+                new_rows.extend(schedules)
+                counts["created"] += 1
+                counts["schedules"] += len(schedules)
+
+        for client in clients:
+            existing = by_client.get(client.id)
+            if client.status != "active":
+                if existing:
+                    existing.end_date = date.today()
+                    counts["deactivated"] += 1
+                continue
+
+            if not existing:
+                track(*self._build_client_obligation(client))
+                continue
+
+            amount = self._get_amount_from_config(client.client_type, client.billing_config or {})
+            if amount:
+                existing.base_amount = amount
+                existing.currency = client.currency
+                existing.vendor_name = client.name
+                existing.confidence = self._calculate_client_confidence(client)
+                schedules = self.build_schedules(existing)
+                regenerated.append(existing.id)
+                new_rows.extend(schedules)
+                counts["updated"] += 1
+                counts["schedules"] += len(schedules)
+
+        for bucket in buckets:
+            existing = by_bucket.get(bucket.id)
+            if bucket.monthly_amount is None or bucket.monthly_amount <= 0:
+                if existing:
+                    existing.end_date = date.today()
+                    counts["deactivated"] += 1
+                continue
+
+            if not existing:
+                obligation = self._build_expense_obligation(bucket)
+                track(obligation, self.build_schedules(obligation, due_day=bucket.due_day) if obligation else [])
+                continue
+
+            existing.base_amount = bucket.monthly_amount
+            existing.currency = bucket.currency
+            existing.vendor_name = bucket.name
+            existing.amount_type = "fixed" if bucket.is_stable else "variable"
+            existing.confidence = "high" if bucket.is_stable else "medium"
+            schedules = self.build_schedules(existing, due_day=bucket.due_day)
+            regenerated.append(existing.id)
+            new_rows.extend(schedules)
+            counts["updated"] += 1
+            counts["schedules"] += len(schedules)
+
+        if regenerated:
+            # Delete future schedules of every updated agreement at once
+            await self.db.execute(
+                delete(ObligationSchedule).where(
+                    ObligationSchedule.obligation_id.in_(regenerated),
+                    ObligationSchedule.due_date >= date.today(),
+                    ObligationSchedule.status == "scheduled"
+                )
+            )
+
+        self.db.add_all(new_rows)
+        await self.db.flush()
+        return counts
+
     # ==========================================================================
     # Helper Methods
     # ==========================================================================
@@ -0,0 +1,223 @@
+"""
+Receivables.
+
+Outstanding customer invoices live in the receivables table, keyed by
+(user_id, expected_date). The Xero invoice sync replaces a user's Xero
+receivables wholesale on every pull, since Xero returns the complete set of
+outstanding invoices each time.
+
+Clients' billing_config["outstanding_invoices"] is still written alongside
+for API compatibility. Aggregates should read the table.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, delete, insert, cast, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Client, Receivable
+
+
+# Horizons (days from today, inclusive) for expected AR
+AR_HORIZONS: Tuple[int, ...] = (14, 30)
+
+
+@dataclass
+class ReceivablesSummary:
+    """Outstanding and overdue totals across a user's receivables."""
+    total_amount: Decimal
+    total_count: int
+    overdue_amount: Decimal
+    overdue_count: int
+    total_days_late: int
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_amount(value: Any) -> Optional[Decimal]:
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+
+def build_receivable_rows(
+    user_id: str,
+    client_id: str,
+    invoices: List[Dict[str, Any]],
+    synced_at: Optional[datetime] = None,
+    source: str = "xero",
+) -> List[Dict[str, Any]]:
+    """
+    Map outstanding-invoice dicts (the billing_config format) to row dicts.
+
+    Invoices without a usable date or amount are skipped, as the JSON
+    readers did.
+    """
+    rows = []
+    for invoice in invoices:
+        due_date = _parse_date(invoice.get("due_date"))
+        expected_date = _parse_date(invoice.get("expected_date")) or due_date
+        amount = _parse_amount(invoice.get("amount"))
+        if expected_date is None or amount is None:
+            continue
+
+        rows.append({
+            "user_id": user_id,
+            "client_id": client_id,
+            "source": source,
+            "external_id": invoice.get("xero_invoice_id"),
+            "invoice_number": invoice.get("invoice_number"),
+            "name": invoice.get("name"),
+            "amount": amount,
+            "currency": invoice.get("currency") or "USD",
+            "expected_date": expected_date,
+            "due_date": due_date,
+            "payment_terms": invoice.get("payment_terms"),
+            "synced_at": synced_at,
+        })
+    return rows
+
+
+async def sync_xero_receivables(
+    db: AsyncSession,
+    user_id: str,
+    invoices_by_client_id: Dict[str, List[Dict[str, Any]]],
+) -> int:
+    """
+    Replace a user's Xero receivables with the given outstanding invoices.
+
+    Clients missing from invoices_by_client_id end up with no Xero
+    receivables (their invoices were paid or voided). Does not commit.
+
+    Returns:
+        Number of receivables written
+    """
+    synced_at = datetime.now(timezone.utc)
+    rows = []
+    for client_id, invoices in invoices_by_client_id.items():
+        rows.extend(build_receivable_rows(user_id, client_id, invoices, synced_at))
+
+    await db.execute(
+        delete(Receivable)
+        .where(Receivable.user_id == user_id)
+        .where(Receivable.source == "xero")
+    )
+    if rows:
+        await db.execute(insert(Receivable), rows)
+    return len(rows)
+
+
+async def replace_xero_receivables_for_invoices(
+    db: AsyncSession,
+    user_id: str,
+    invoice_ids: Collection[str],
+    invoices_by_client_id: Dict[str, List[Dict[str, Any]]],
+) -> int:
+    """
+    Replace the Xero receivables of specific invoices only.
+
+    Used for webhook-driven changes: receivables whose external_id is in
+    invoice_ids are deleted, then the given still-outstanding invoices are
+    inserted. Other receivables are left alone. Does not commit.
+
+    Returns:
+        Number of receivables written
+    """
+    synced_at = datetime.now(timezone.utc)
+    rows = []
+    for client_id, invoices in invoices_by_client_id.items():
+        rows.extend(build_receivable_rows(user_id, client_id, invoices, synced_at))
+
+    await db.execute(
+        delete(Receivable)
+        .where(Receivable.user_id == user_id)
+        .where(Receivable.source == "xero")
+        .where(Receivable.external_id.in_(set(invoice_ids)))
+    )
+    if rows:
+        await db.execute(insert(Receivable), rows)
+    return len(rows)
+
+
+async def sum_receivables_due(
+    db: AsyncSession,
+    user_id: str,
+    horizons: Tuple[int, ...] = AR_HORIZONS,
+    today: Optional[date] = None,
+) -> Dict[int, Decimal]:
+    """
+    Expected AR between today and today + N days for active clients.
+
+    Every horizon comes from one range query on (user_id, expected_date).
+    """
+    today = today or date.today()
+    columns = [
+        func.sum(Receivable.amount).filter(
+            Receivable.expected_date <= today + timedelta(days=days)
+        )
+        for days in horizons
+    ]
+
+    result = await db.execute(
+        select(*columns)
+        .select_from(Receivable)
+        .join(Client, Client.id == Receivable.client_id)
+        .where(Receivable.user_id == user_id)
+        .where(Receivable.expected_date >= today)
+        .where(Receivable.expected_date <= today + timedelta(days=max(horizons)))
+        .where(Client.status == "active")
+    )
+    row = result.one()
+    return {days: Decimal(str(row[i] or 0)) for i, days in enumerate(horizons)}
+
+
+async def summarize_receivables(
+    db: AsyncSession,
+    user_id: str,
+    today: Optional[date] = None,
+) -> ReceivablesSummary:
+    """
+    Outstanding and overdue receivables for active clients.
+
+    An invoice is overdue once its due date (or expected date when it has
+    none) is before today.
+    """
+    today = today or date.today()
+    overdue_from = func.coalesce(Receivable.due_date, Receivable.expected_date)
+    is_overdue = overdue_from < today
+
+    result = await db.execute(
+        select(
+            func.sum(Receivable.amount),
+            func.count(),
+            func.sum(Receivable.amount).filter(is_overdue),
+            func.count().filter(is_overdue),
+            func.sum(cast(today, Date) - overdue_from).filter(is_overdue),
+        )
+        .select_from(Receivable)
+        .join(Client, Client.id == Receivable.client_id)
+        .where(Receivable.user_id == user_id)
+        .where(Client.status == "active")
+    )
+    total_amount, total_count, overdue_amount, overdue_count, days_late = result.one()
+    return ReceivablesSummary(
+        total_amount=Decimal(str(total_amount or 0)),
+        total_count=total_count or 0,
+        overdue_amount=Decimal(str(overdue_amount or 0)),
+        overdue_count=overdue_count or 0,
+        total_days_late=int(days_late or 0),
+    )
@@ -0,0 +1,159 @@
+"""
+Set-based Bulk Reconciliation.
+
+bulk_reconcile applies many (payment, schedule) matches for one user with
+a fixed number of statements per chunk of RECONCILE_CHUNK_SIZE pairs:
+- two IN queries load the payments and schedules (scoped to the user)
+- one UPDATE ... FROM (VALUES ...) links and reconciles every valid
+  payment and sets its variance against the schedule's estimate
+- one UPDATE marks the matched schedules paid
+- one multi-row INSERT writes a "reconcile" audit row per payment
+
+Invalid pairs are reported individually and never block the others.
+Nothing is committed here; the caller owns the transaction.
+"""
+from decimal import Decimal
+from typing import List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Numeric, String, cast, column, func, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.audit.services import AuditService, SourceType
+from app.models import ObligationSchedule, PaymentEvent
+from app.schemas.reconciliation import ReconciliationMatch, ReconciliationMatchResult
+
+
+# Pairs per statement set; keeps each statement well under the bind limit
+RECONCILE_CHUNK_SIZE = 1000
+
+# (payment_id, schedule_id, obligation_id, variance)
+PaymentLink = Tuple[str, str, Optional[str], Optional[Decimal]]
+
+
+async def bulk_reconcile(
+    db: AsyncSession,
+    user_id: str,
+    matches: Sequence[ReconciliationMatch],
+    source: SourceType = "api",
+) -> List[ReconciliationMatchResult]:
+    """
+    Reconcile payments to schedules in bulk.
+
+    Returns one result per match, in request order. A payment may only be
+    matched once per call; repeats are reported as failures.
+    """
+    results: List[ReconciliationMatchResult] = []
+    seen: Set[str] = set()
+    for start in range(0, len(matches), RECONCILE_CHUNK_SIZE):
+        chunk = matches[start:start + RECONCILE_CHUNK_SIZE]
+        results.extend(await _reconcile_chunk(db, user_id, chunk, seen, source))
+    return results
+
+
+async def _reconcile_chunk(
+    db: AsyncSession,
+    user_id: str,
+    matches: Sequence[ReconciliationMatch],
+    seen: Set[str],
+    source: SourceType,
+) -> List[ReconciliationMatchResult]:
+    payment_result = await db.execute(
+        select(PaymentEvent.id, PaymentEvent.amount).where(
+            PaymentEvent.user_id == user_id,
+            PaymentEvent.id.in_({m.payment_id for m in matches}),
+        )
+    )
+    amounts = {row.id: row.amount for row in payment_result.all()}
+
+    schedule_result = await db.execute(
+        select(
+            ObligationSchedule.id,
+            ObligationSchedule.obligation_id,
+            ObligationSchedule.estimated_amount,
+        ).where(
+            ObligationSchedule.user_id == user_id,
+            ObligationSchedule.id.in_({m.schedule_id for m in matches}),
+        )
+    )
+    schedules = {row.id: row for row in schedule_result.all()}
+
+    results = []
+    links: List[PaymentLink] = []
+    for match in matches:
+        error = None
+        if match.payment_id in seen:
+            error = f"Payment {match.payment_id} is matched more than once"
+        elif match.payment_id not in amounts:
+            error = f"Payment {match.payment_id} not found or not authorized"
+        elif match.schedule_id not in schedules:
+            error = f"Schedule {match.schedule_id} not found or not authorized"
+
+        if error:
+            results.append(ReconciliationMatchResult(
+                payment_id=match.payment_id, schedule_id=match.schedule_id, success=False, error=error,
+            ))
+            continue
+
+        seen.add(match.payment_id)
+        schedule = schedules[match.schedule_id]
+        amount = amounts[match.payment_id]
+        variance = amount - schedule.estimated_amount if amount and schedule.estimated_amount else None
+        links.append((match.payment_id, match.schedule_id, schedule.obligation_id, variance))
+        results.append(ReconciliationMatchResult(
+            payment_id=match.payment_id, schedule_id=match.schedule_id, success=True,
+        ))
+
+    if links:
+        await _apply_links(db, user_id, links, source)
+    return results
+
+
+async def _apply_links(db: AsyncSession, user_id: str, links: List[PaymentLink], source: SourceType) -> None:
+    variance_type = Numeric(precision=15, scale=2)
+    link_values = values(
+        column("payment_id", String),
+        column("schedule_id", String),
+        column("obligation_id", String),
+        column("variance", variance_type),
+        name="links",
+    ).data(links)
+    # None renders as a bare NULL; an all-NULL VALUES column would be text
+    variance = cast(link_values.c.variance, variance_type)
+
+    await db.execute(
+        update(PaymentEvent)
+        .where(PaymentEvent.id == link_values.c.payment_id, PaymentEvent.user_id == user_id)
+        .values(
+            schedule_id=link_values.c.schedule_id,
+            obligation_id=link_values.c.obligation_id,
+            is_reconciled=True,
+            reconciled_at=func.now(),
+            # Payments without a comparable amount keep their previous variance
+            variance_vs_expected=func.coalesce(variance, PaymentEvent.variance_vs_expected),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    await db.execute(
+        update(ObligationSchedule)
+        .where(
+            ObligationSchedule.user_id == user_id,
+            ObligationSchedule.id.in_({schedule_id for _, schedule_id, _, _ in links}),
+        )
+        .values(status="paid")
+        .execution_options(synchronize_session=False)
+    )
+
+    await AuditService(db, user_id=user_id, source=source).log_many([
+        {
+            "entity_type": "payment",
+            "entity_id": payment_id,
+            "action": "reconcile",
+            "new_value": {
+                "schedule_id": schedule_id,
+                "obligation_id": obligation_id,
+                "variance_vs_expected": float(variance) if variance is not None else None,
+            },
+        }
+        for payment_id, schedule_id, obligation_id, variance in links
+    ])
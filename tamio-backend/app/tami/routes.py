@@ -17,7 +17,6 @@ import json
 
 from app.database import get_db
 from app.tami import schemas, orchestrator
-from app.middleware import limiter
 from app.config import settings
 
 
@@ -29,7 +28,6 @@ router = APIRouter()
 # ============================================================================
 
 @router.post("/chat", response_model=schemas.ChatResponse)
-@limiter.limit(settings.RATE_LIMIT_TAMI)
 async def chat_with_tami(
     request: Request,
     chat_request: schemas.ChatRequest,
@@ -63,7 +61,6 @@ async def chat_with_tami(
 
 
 @router.post("/chat/stream")
-@limiter.limit(settings.RATE_LIMIT_TAMI)
 async def chat_with_tami_streaming(
     request: Request,
     chat_request: schemas.ChatRequest,
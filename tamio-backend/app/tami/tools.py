@@ -614,7 +614,7 @@ async def _compute_payroll_coverage(
         select(ObligationAgreement.client_id)
         .join(ObligationSchedule)
         .where(
-            ObligationAgreement.user_id == user_id,
+            ObligationSchedule.user_id == user_id,
             ObligationAgreement.client_id.isnot(None),
             ObligationSchedule.status == "overdue"
         )
@@ -635,7 +635,7 @@ async def _compute_payroll_coverage(
             .join(ObligationAgreement)
             .join(Client, Client.id == ObligationAgreement.client_id)
             .where(
-                ObligationAgreement.user_id == user_id,
+                ObligationSchedule.user_id == user_id,
                 ObligationAgreement.client_id.in_(overdue_client_ids),
                 ObligationSchedule.status == "overdue"
             )
@@ -1039,7 +1039,7 @@ async def _query_overdue_invoices(db: AsyncSession, user_id: str) -> List[Dict[s
         .join(ObligationAgreement)
         .join(Client, Client.id == ObligationAgreement.client_id)
         .where(
-            ObligationAgreement.user_id == user_id,
+            ObligationSchedule.user_id == user_id,
             ObligationAgreement.client_id.isnot(None),
             ObligationSchedule.status == "overdue"
         )
@@ -0,0 +1,67 @@
+"""Per-tenant Xero call budget.
+
+Xero allows each organisation XERO_TENANT_CALLS_PER_MINUTE calls, however
+many connections and code paths use it. Every sync - user-triggered,
+webhook-driven (sync_xero_changes) or background - goes through
+_logged_sync in app/xero/sync.py, which:
+- refuses to start while the tenant's token bucket is empty
+  (acquire_call_budget raises XeroBudgetExceeded)
+- charges the bucket with the requests the sync actually made, each page
+  of a paged fetch counting as one (settle_call_budget with
+  XeroClient.calls)
+
+A large sync can leave the bucket negative, so the tenant's next syncs
+wait until it has refilled. Buckets live in the rate limit store
+(RATE_LIMIT_STORAGE), shared by every worker.
+"""
+from typing import Optional
+
+from app.config import settings
+
+_budget_store = None
+
+
+class XeroBudgetExceeded(Exception):
+    """The tenant has used its Xero call budget; retry after retry_after seconds."""
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"Xero call budget for {key} is used up; retry in {retry_after:.0f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+def tenant_budget_store():
+    """Rate limit store holding the per-tenant Xero call budgets."""
+    global _budget_store
+    if _budget_store is None:
+        from app.middleware.rate_limit import create_rate_limit_store
+        _budget_store = create_rate_limit_store()
+    return _budget_store
+
+
+def budget_key(tenant_id: Optional[str], user_id: str) -> str:
+    """Bucket key for a connection; connections to one organisation share it."""
+    return f"xero:{tenant_id or user_id}"
+
+
+def _bucket():
+    capacity = float(settings.XERO_TENANT_CALLS_PER_MINUTE)
+    return capacity, capacity / 60
+
+
+async def acquire_call_budget(key: str, store=None) -> None:
+    """Take the first call of a sync from the tenant's bucket; raises XeroBudgetExceeded if empty."""
+    store = store if store is not None else tenant_budget_store()
+    capacity, refill_per_second = _bucket()
+    result = await store.take(key, 1.0, capacity, refill_per_second)
+    if not result.allowed:
+        raise XeroBudgetExceeded(key, result.retry_after)
+
+
+async def settle_call_budget(key: str, calls: int, store=None) -> None:
+    """Charge the calls a sync made beyond the one acquire_call_budget took."""
+    if calls <= 1:
+        return
+    store = store if store is not None else tenant_budget_store()
+    capacity, refill_per_second = _bucket()
+    await store.charge(key, float(calls - 1), capacity, refill_per_second)
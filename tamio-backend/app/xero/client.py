@@ -4,6 +4,8 @@ This module provides a wrapper around the xero-python SDK
 with automatic token refresh and error handling.
 """
 from typing import Optional, Dict, Any, List
+import functools
+import threading
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -194,15 +196,46 @@ async def get_valid_connection(
 # XERO API WRAPPER CLASS
 # ============================================================================
 
+class _CountedApi:
+    """
+    Proxy for an SDK API object that counts the requests made through it.
+
+    Every SDK method call is one HTTP request, so a paged fetch counts each
+    page. Safe to share between the threads that run the blocking calls.
+    """
+
+    def __init__(self, api):
+        self._api = api
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def counted(*args, **kwargs):
+            with self._lock:
+                self.calls += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
 class XeroClient:
     """High-level Xero API client with automatic token management."""
 
     def __init__(self, connection: XeroConnection):
         self.connection = connection
         self.api_client = create_api_client(connection.access_token)
-        self.accounting_api = AccountingApi(self.api_client)
+        self.accounting_api = _CountedApi(AccountingApi(self.api_client))
         self.tenant_id = connection.tenant_id
 
+    @property
+    def calls(self) -> int:
+        """Xero API requests made by this client so far (charged to the tenant's budget)."""
+        return self.accounting_api.calls
+
     # -------------------------------------------------------------------------
     # Organisation
     # -------------------------------------------------------------------------
@@ -231,7 +264,8 @@ class XeroClient:
         statuses: Optional[List[str]] = None,
         where: Optional[str] = None,
         page: int = 1,
-        fetch_all: bool = False
+        fetch_all: bool = False,
+        invoice_ids: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Get invoices from Xero.
@@ -241,6 +275,7 @@ class XeroClient:
             where: Xero filter expression
             page: Page number for pagination (starting page if fetch_all=True)
             fetch_all: If True, auto-paginate to fetch all matching results
+            invoice_ids: Only these invoices (Xero IDs filter)
         """
         all_invoices = []
         current_page = page
@@ -252,6 +287,8 @@ class XeroClient:
                 kwargs["statuses"] = statuses
             if where:
                 kwargs["where"] = where
+            if invoice_ids:
+                kwargs["i_ds"] = invoice_ids
 
             response = self.accounting_api.get_invoices(**kwargs)
             page_invoices = response.invoices or []
@@ -330,7 +367,8 @@ class XeroClient:
         is_customer: Optional[bool] = None,
         is_supplier: Optional[bool] = None,
         page: int = 1,
-        fetch_all: bool = False
+        fetch_all: bool = False,
+        contact_ids: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """Get contacts from Xero.
         
@@ -339,6 +377,7 @@ class XeroClient:
             is_supplier: Filter by IsSupplier
             page: Page number
             fetch_all: If True, auto-paginate to fetch all matching results
+            contact_ids: Only these contacts (Xero IDs filter)
         """
         all_contacts = []
         current_page = page
@@ -350,11 +389,11 @@ class XeroClient:
             elif is_supplier is not None:
                 where = f"IsSupplier=={str(is_supplier).lower()}"
 
-            response = self.accounting_api.get_contacts(
-                self.tenant_id,
-                where=where,
-                page=current_page
-            )
+            kwargs = {"where": where, "page": current_page}
+            if contact_ids:
+                kwargs["i_ds"] = contact_ids
+
+            response = self.accounting_api.get_contacts(self.tenant_id, **kwargs)
             
             page_contacts = response.contacts or []
             if not page_contacts:
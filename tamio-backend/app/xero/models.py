@@ -2,6 +2,6 @@
 
 DEPRECATED: Import from app.models instead.
 """
-from app.models.xero import XeroConnection, XeroSyncLog, OAuthState
+from app.models.xero import XeroConnection, XeroSyncLog, OAuthState, XeroWebhookEvent
 
-__all__ = ["XeroConnection", "XeroSyncLog", "OAuthState"]
+__all__ = ["XeroConnection", "XeroSyncLog", "OAuthState", "XeroWebhookEvent"]
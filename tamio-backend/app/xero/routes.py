@@ -7,13 +7,17 @@ Endpoints:
 - POST /xero/disconnect - Disconnect Xero
 - POST /xero/sync - Sync data from Xero
 - GET /xero/preview - Preview data before sync
+- POST /xero/webhooks - Xero change notifications (signed, no user auth)
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+import math
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+import json
 import logging
 
 from app.database import get_db
@@ -29,6 +33,7 @@ from app.xero.client import (
     XeroClient,
 )
 from app.xero.sync import sync_xero_data, analyze_payment_behavior
+from app.xero.webhooks import verify_webhook_signature, record_webhook_events
 from app.auth.dependencies import get_current_user
 from app.data.users.models import User
 
@@ -208,13 +213,14 @@ async def xero_callback(
 
         # Auto-sync data after successful connection
         try:
+            sync_started = datetime.utcnow()
             await sync_xero_data(db=db, user_id=user_id, sync_type="full")
             logger.info(f"Auto-sync completed for user: {user_id}")
 
             # Run detection after initial sync
             try:
                 from app.detection.scheduler import run_detections_after_sync
-                await run_detections_after_sync(user_id=user_id, sync_type="xero")
+                await run_detections_after_sync(user_id=user_id, sync_type="xero", changed_since=sync_started)
             except Exception as detection_err:
                 logger.error(f"Post-sync detection failed: {detection_err}")
 
@@ -284,18 +290,26 @@ async def sync_from_xero(
 
     Sync types:
     - "full": Sync all data (contacts, invoices, repeating invoices)
-    - "incremental": Only sync changes since last sync
     - "invoices": Only sync invoices
     - "contacts": Only sync contacts
 
     After sync completes, automatically runs detection engine to check
-    for alerts based on the new data.
+    for alerts based on the new data; only the detectors affected by what
+    the sync changed run.
     """
+    sync_started = datetime.utcnow()
     result = await sync_xero_data(
         db=db,
         user_id=current_user.id,  # Use authenticated user, ignore request.user_id
         sync_type=request.sync_type
     )
+    if result.get("deferred"):
+        # The organisation's Xero call budget is used up (app/xero/budget.py)
+        raise HTTPException(
+            status_code=429,
+            detail=result["message"],
+            headers={"Retry-After": str(math.ceil(result["retry_after"]))},
+        )
 
     # After main sync, also pull outstanding invoices to update billing_config
     if request.sync_type in ["full", "invoices"]:
@@ -317,11 +331,12 @@ async def sync_from_xero(
         from app.detection.scheduler import run_detections_after_sync
         detection_result = await run_detections_after_sync(
             user_id=current_user.id,
-            sync_type="xero"
+            sync_type="xero",
+            changed_since=sync_started,
         )
         result["detections"] = {
             "alerts_created": detection_result.get("alerts_created", 0),
-            "notifications_sent": detection_result.get("notifications_sent", 0),
+            "notifications_queued": detection_result.get("notifications_queued", 0),
         }
     except Exception as e:
         logger.error(f"Detection error after sync: {e}")
@@ -440,6 +455,41 @@ async def preview_xero_data(
         )
 
 
+# ============================================================================
+# WEBHOOKS
+# ============================================================================
+
+@router.post("/webhooks")
+async def receive_xero_webhook(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Receive Xero change notifications.
+
+    Xero signs each delivery (x-xero-signature) and expects 401 for a bad
+    signature and an empty 200 otherwise, within 5 seconds - including for
+    its "intent to receive" checks, which carry no events. Events are only
+    recorded here; the targeted sync runs in the background.
+    """
+    body = await request.body()
+    if not verify_webhook_signature(body, request.headers.get("x-xero-signature")):
+        return Response(status_code=401)
+
+    try:
+        events = json.loads(body or b"{}").get("events") or []
+    except (ValueError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+
+    if await record_webhook_events(db, events):
+        await db.commit()
+        from app.detection.scheduler import process_xero_webhook_events
+        background_tasks.add_task(process_xero_webhook_events)
+
+    return Response(status_code=200)
+
+
 # ============================================================================
 # ANALYTICS
 # ============================================================================
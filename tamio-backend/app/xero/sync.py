@@ -1,20 +1,57 @@
 """Xero data sync service.
 
 This module handles syncing data from Xero to Tamio's data models,
-mapping invoices to clients/cash events, contacts to clients, etc.
+mapping invoices to clients/receivables, contacts to clients, etc.
+
+The sync runs as a staged pipeline:
+1. fetch - every Xero dataset the sync type needs is pulled once,
+   concurrently (the SDK is blocking, so each call runs in a thread)
+2. contacts / invoices / repeating_invoices / suppliers - each stage
+   writes in its own savepoint; new rows go in as one
+   INSERT ... ON CONFLICT (xero_contact_id) per table
+3. obligations - every client and expense bucket the sync touched is
+   re-synced to its obligation in one batch for the tenant
+
+The duration of each stage is recorded on the XeroSyncLog.
 """
-from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Any, Iterator, List, Optional, Sequence, Set, Tuple
 from datetime import datetime, date, timedelta, timezone
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import attributes
 
+from app.xero import budget
 from app.xero.client import XeroClient, get_valid_connection
 from app.xero.models import XeroConnection, XeroSyncLog
 from app.data import models as data_models
+from app.data.base import generate_id
 from app.data.client_utils import build_canonical_client, update_client_billing_from_repeating_invoice
-from app.xero.categorization import get_category_from_line_items
+from app.detection import changes
+from app.services.obligations import ObligationService
+from app.services.receivables import replace_xero_receivables_for_invoices, sync_xero_receivables
+
+
+# Xero allows 5 concurrent calls per tenant; leave one for other requests
+XERO_FETCH_CONCURRENCY = 4
+
+# Rows per INSERT ... ON CONFLICT statement
+UPSERT_CHUNK_SIZE = 500
+
+# IDs per Xero request for targeted fetches (keeps the query string short)
+XERO_IDS_PER_CALL = 50
+
+# Datasets each sync type pulls from Xero
+SYNC_DATASETS: Dict[str, Tuple[str, ...]] = {
+    "full": ("customers", "invoices", "repeating_invoices", "suppliers"),
+    "contacts": ("customers",),
+    "invoices": ("invoices",),
+}
 
 
 # ============================================================================
@@ -32,10 +69,120 @@ async def sync_xero_data(
     Args:
         db: Database session
         user_id: User ID to sync for
-        sync_type: "full" | "incremental" | "invoices" | "contacts"
+        sync_type: "full" | "invoices" | "contacts"
 
     Returns:
-        Sync result with counts and any errors
+        Sync result with counts, per-stage durations and any errors
+
+    Raises:
+        ValueError: If sync_type is not a key of SYNC_DATASETS
+    """
+    if sync_type not in SYNC_DATASETS:
+        raise ValueError(f"Unknown Xero sync type: {sync_type!r}")
+
+    async def pipeline(xero_client: XeroClient, results: Dict[str, Any], durations: Dict[str, float]) -> None:
+        with stage_timer(durations, "fetch"):
+            snapshot = await fetch_xero_snapshot(xero_client, sync_type, durations)
+
+        touched = TouchedSources()
+
+        # Sync based on type
+        if sync_type in ["full", "contacts"]:
+            await _run_stage(
+                db, results, durations, "contacts", "Contact", snapshot, ("customers",),
+                lambda: sync_contacts(db, user_id, snapshot.customers, touched),
+            )
+
+        if sync_type in ["full", "invoices"]:
+            await _run_stage(
+                db, results, durations, "invoices", "Invoice", snapshot, ("invoices",),
+                lambda: sync_invoices(db, user_id, snapshot.invoices, touched),
+            )
+
+        if sync_type == "full":
+            # Also sync repeating invoices for retainer detection
+            await _run_stage(
+                db, results, durations, "repeating_invoices", "Repeating invoice", snapshot,
+                ("repeating_invoices",),
+                lambda: sync_repeating_invoices(db, user_id, snapshot.repeating_invoices, touched),
+            )
+
+            # Sync suppliers as expense buckets
+            await _run_stage(
+                db, results, durations, "suppliers", "Supplier", snapshot,
+                ("suppliers", "invoices", "repeating_invoices"),
+                lambda: sync_suppliers(
+                    db, user_id, snapshot.suppliers, snapshot.invoices, snapshot.repeating_invoices, touched
+                ),
+            )
+
+        if touched:
+            await _run_stage(
+                db, results, durations, "obligations", "Obligation", snapshot, (),
+                lambda: sync_obligations(db, user_id, touched),
+            )
+
+    return await _logged_sync(db, user_id, sync_type, pipeline)
+
+
+async def sync_xero_changes(
+    db: AsyncSession,
+    user_id: str,
+    invoice_ids: Sequence[str] = (),
+    contact_ids: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """
+    Targeted sync of specific invoices and contacts (webhook-driven).
+
+    Fetches only the changed entities and runs the same write stages on
+    them (see apply_invoice_changes). The connection's last_sync_at is
+    left alone, since the rest of the tenant's data was not refreshed.
+    The sync log has sync_type "webhook".
+    """
+    async def pipeline(xero_client: XeroClient, results: Dict[str, Any], durations: Dict[str, float]) -> None:
+        with stage_timer(durations, "fetch"):
+            snapshot = await fetch_xero_changes(xero_client, invoice_ids, contact_ids, durations)
+
+        touched = TouchedSources()
+
+        if contact_ids:
+            await _run_stage(
+                db, results, durations, "contacts", "Contact", snapshot, ("customers",),
+                lambda: sync_contacts(db, user_id, snapshot.customers, touched),
+            )
+            await _run_stage(
+                db, results, durations, "suppliers", "Supplier", snapshot, ("suppliers",),
+                lambda: sync_suppliers(db, user_id, snapshot.suppliers, None, None, touched),
+            )
+
+        if invoice_ids:
+            await _run_stage(
+                db, results, durations, "invoices", "Invoice", snapshot, ("invoices",),
+                lambda: apply_invoice_changes(db, user_id, snapshot.invoices, touched),
+            )
+
+        if touched:
+            await _run_stage(
+                db, results, durations, "obligations", "Obligation", snapshot, (),
+                lambda: sync_obligations(db, user_id, touched),
+            )
+
+    return await _logged_sync(db, user_id, "webhook", pipeline, mark_synced=False)
+
+
+async def _logged_sync(
+    db: AsyncSession,
+    user_id: str,
+    sync_type: str,
+    pipeline: Callable[[XeroClient, Dict[str, Any], Dict[str, float]], Awaitable[None]],
+    mark_synced: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run a sync pipeline for the user's connection, with a XeroSyncLog.
+
+    The sync is charged to the tenant's Xero call budget (app/xero/budget.py)
+    for the requests it made. With the budget used up it does not start; the
+    result then has "deferred": True and retry_after seconds.
     """
     # Get valid connection
     connection = await get_valid_connection(db, user_id)
@@ -49,6 +196,21 @@ async def sync_xero_data(
             "errors": ["No active connection"]
         }
 
+    budget_key = budget.budget_key(connection.tenant_id, user_id)
+    try:
+        await budget.acquire_call_budget(budget_key)
+    except budget.XeroBudgetExceeded as e:
+        return {
+            "success": False,
+            "deferred": True,
+            "retry_after": e.retry_after,
+            "message": str(e),
+            "records_fetched": {},
+            "records_created": {},
+            "records_updated": {},
+            "errors": [str(e)],
+        }
+
     # Create sync log
     sync_log = XeroSyncLog(
         user_id=user_id,
@@ -58,6 +220,8 @@ async def sync_xero_data(
     db.add(sync_log)
     await db.flush()
 
+    durations: Dict[str, float] = {}
+    xero_client: Optional[XeroClient] = None
     try:
         # Initialize Xero client
         xero_client = XeroClient(connection)
@@ -69,33 +233,19 @@ async def sync_xero_data(
             "errors": []
         }
 
-        # Sync based on type
-        if sync_type in ["full", "contacts"]:
-            contact_results = await sync_contacts(db, user_id, xero_client)
-            merge_results(results, contact_results)
-
-        if sync_type in ["full", "invoices"]:
-            invoice_results = await sync_invoices(db, user_id, xero_client)
-            merge_results(results, invoice_results)
-
-        if sync_type == "full":
-            # Also sync repeating invoices for retainer detection
-            repeating_results = await sync_repeating_invoices(db, user_id, xero_client)
-            merge_results(results, repeating_results)
-
-            # Sync suppliers as expense buckets
-            supplier_results = await sync_suppliers(db, user_id, xero_client)
-            merge_results(results, supplier_results)
+        await pipeline(xero_client, results, durations)
 
         # Update sync log
         sync_log.status = "completed"
         sync_log.records_fetched = results["records_fetched"]
         sync_log.records_created = results["records_created"]
         sync_log.records_updated = results["records_updated"]
+        sync_log.stage_durations_ms = durations
         sync_log.completed_at = datetime.now(timezone.utc)
 
         # Update connection last sync time
-        connection.last_sync_at = datetime.now(timezone.utc)
+        if mark_synced:
+            connection.last_sync_at = datetime.now(timezone.utc)
         connection.sync_error = None
 
         await db.commit()
@@ -103,12 +253,14 @@ async def sync_xero_data(
         return {
             "success": True,
             "message": f"Sync completed successfully",
-            **results
+            **results,
+            "stage_durations_ms": durations,
         }
 
     except Exception as e:
         sync_log.status = "failed"
         sync_log.error_message = str(e)
+        sync_log.stage_durations_ms = durations
         sync_log.completed_at = datetime.now(timezone.utc)
 
         connection.sync_error = str(e)
@@ -121,9 +273,13 @@ async def sync_xero_data(
             "records_fetched": {},
             "records_created": {},
             "records_updated": {},
-            "errors": [str(e)]
+            "errors": [str(e)],
+            "stage_durations_ms": durations,
         }
 
+    finally:
+        await budget.settle_call_budget(budget_key, xero_client.calls if xero_client is not None else 0)
+
 
 def merge_results(target: Dict, source: Dict):
     """Merge sync results from different operations."""
@@ -135,6 +291,226 @@ def merge_results(target: Dict, source: Dict):
         target["errors"].extend(source["errors"])
 
 
+@contextmanager
+def stage_timer(durations: Dict[str, float], stage: str) -> Iterator[None]:
+    """Record the wall-clock duration of a stage in milliseconds."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        durations[stage] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _run_stage(
+    db: AsyncSession,
+    results: Dict[str, Any],
+    durations: Dict[str, float],
+    stage: str,
+    label: str,
+    snapshot: "XeroSnapshot",
+    datasets: Tuple[str, ...],
+    run: Callable,
+) -> None:
+    """
+    Run one write stage in a savepoint.
+
+    A stage whose Xero data failed to fetch is skipped, and a stage that
+    raises is rolled back on its own; either way the error is reported as
+    "<label> sync error: ..." and the remaining stages still run.
+    """
+    with stage_timer(durations, stage):
+        missing = [snapshot.errors[name] for name in datasets if name in snapshot.errors]
+        if missing:
+            results["errors"].append(f"{label} sync error: {missing[0]}")
+            return
+        try:
+            async with db.begin_nested():
+                merge_results(results, await run())
+        except Exception as e:
+            results["errors"].append(f"{label} sync error: {str(e)}")
+
+
+# ============================================================================
+# FETCH STAGE
+# ============================================================================
+
+@dataclass
+class XeroSnapshot:
+    """Xero datasets for one sync, each fetched once.
+
+    A dataset that failed to fetch is None and its error is in `errors`.
+    """
+    customers: Optional[List[Dict[str, Any]]] = None
+    suppliers: Optional[List[Dict[str, Any]]] = None
+    invoices: Optional[List[Dict[str, Any]]] = None
+    repeating_invoices: Optional[List[Dict[str, Any]]] = None
+    contacts: Optional[List[Dict[str, Any]]] = None  # Targeted fetches only
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+async def fetch_xero_snapshot(
+    xero_client: XeroClient,
+    sync_type: str,
+    durations: Optional[Dict[str, float]] = None,
+) -> XeroSnapshot:
+    """
+    Fetch every dataset the sync type needs, concurrently.
+
+    The xero-python SDK is blocking, so each call runs in a worker thread;
+    at most XERO_FETCH_CONCURRENCY calls are in flight. Per-dataset
+    durations are recorded as "fetch.<dataset>".
+    """
+    fetchers = {
+        "customers": lambda: xero_client.get_contacts(is_customer=True),
+        "suppliers": lambda: xero_client.get_contacts(is_supplier=True),
+        "invoices": xero_client.get_outstanding_invoices,
+        "repeating_invoices": xero_client.get_repeating_invoices,
+    }
+    names = SYNC_DATASETS[sync_type]
+    return await _fetch_concurrently({name: fetchers[name] for name in names}, durations)
+
+
+async def fetch_xero_changes(
+    xero_client: XeroClient,
+    invoice_ids: Sequence[str],
+    contact_ids: Sequence[str],
+    durations: Optional[Dict[str, float]] = None,
+) -> XeroSnapshot:
+    """
+    Fetch only the given invoices and contacts, concurrently.
+
+    Invoices come back in any status, so paid or voided ones can be
+    removed. Contacts are split into customers and suppliers.
+    """
+    def by_ids(fetch: Callable[[List[str]], List[Dict[str, Any]]], ids: Sequence[str]) -> Callable:
+        def run() -> List[Dict[str, Any]]:
+            items = []
+            for start in range(0, len(ids), XERO_IDS_PER_CALL):
+                items.extend(fetch(list(ids[start:start + XERO_IDS_PER_CALL])))
+            return items
+        return run
+
+    fetchers = {}
+    if invoice_ids:
+        fetchers["invoices"] = by_ids(lambda ids: xero_client.get_invoices(invoice_ids=ids), invoice_ids)
+    if contact_ids:
+        fetchers["contacts"] = by_ids(lambda ids: xero_client.get_contacts(contact_ids=ids), contact_ids)
+
+    snapshot = await _fetch_concurrently(fetchers, durations)
+    if snapshot.contacts is not None:
+        snapshot.customers = [c for c in snapshot.contacts if c.get("is_customer")]
+        snapshot.suppliers = [c for c in snapshot.contacts if c.get("is_supplier")]
+    elif "contacts" in snapshot.errors:
+        snapshot.errors["customers"] = snapshot.errors["suppliers"] = snapshot.errors["contacts"]
+    return snapshot
+
+
+async def _fetch_concurrently(
+    fetchers: Dict[str, Callable[[], List[Dict[str, Any]]]],
+    durations: Optional[Dict[str, float]] = None,
+) -> XeroSnapshot:
+    durations = durations if durations is not None else {}
+    semaphore = asyncio.Semaphore(XERO_FETCH_CONCURRENCY)
+
+    async def fetch(name: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            with stage_timer(durations, f"fetch.{name}"):
+                return await asyncio.to_thread(fetchers[name])
+
+    names = list(fetchers)
+    fetched = await asyncio.gather(*(fetch(name) for name in names), return_exceptions=True)
+
+    snapshot = XeroSnapshot()
+    for name, data in zip(names, fetched):
+        if isinstance(data, Exception):
+            snapshot.errors[name] = str(data)
+        else:
+            setattr(snapshot, name, data)
+    return snapshot
+
+
+# ============================================================================
+# BULK WRITES
+# ============================================================================
+
+@dataclass
+class TouchedSources:
+    """Ids of the clients and expense buckets a sync created or updated."""
+    client_ids: Set[str] = field(default_factory=set)
+    bucket_ids: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.client_ids or self.bucket_ids)
+
+
+def _insert_row(obj: Any) -> Dict[str, Any]:
+    """
+    Column values of an unsaved model instance, for a Core insert.
+
+    Python-side column defaults are applied; columns left to a server
+    default (created_at) are omitted.
+    """
+    row = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        if value is None and column.default is not None:
+            default = column.default
+            value = default.arg(None) if default.is_callable else default.arg
+        if value is None and column.server_default is not None:
+            continue
+        row[column.key] = value
+    return row
+
+
+async def _upsert_by_xero_contact(
+    db: AsyncSession,
+    model: Any,
+    rows: List[Dict[str, Any]],
+) -> Dict[str, str]:
+    """
+    Insert Xero-sourced rows with INSERT ... ON CONFLICT (xero_contact_id).
+
+    xero_contact_id is globally unique, so a conflict means the contact is
+    already linked. The existing row is refreshed only when it belongs to
+    the same user; another tenant's row is never touched.
+
+    Returns:
+        Row id of each inserted or refreshed row, keyed by the id the row
+        was built with
+    """
+    written: Dict[str, str] = {}
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+        stmt = pg_insert(model).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[model.xero_contact_id],
+            set_={
+                "sync_status": stmt.excluded.sync_status,
+                "last_synced_at": stmt.excluded.last_synced_at,
+            },
+            where=model.user_id == stmt.excluded.user_id,
+        ).returning(model.id, model.xero_contact_id)
+        result = await db.execute(stmt)
+
+        returned = result.all()
+        inserted = {row_id for row_id, _ in returned}
+        by_contact = {contact_id: row_id for row_id, contact_id in returned if contact_id}
+        for row in chunk:
+            if row["id"] in inserted:
+                written[row["id"]] = row["id"]
+            elif row.get("xero_contact_id") in by_contact:
+                # A conflicting row keeps its existing id
+                written[row["id"]] = by_contact[row["xero_contact_id"]]
+    return written
+
+
+def _payment_behavior_from_terms(terms: Optional[int]) -> Optional[str]:
+    """Infer payment behavior from a contact's payment terms (days)."""
+    if not terms:
+        return None
+    return "on_time" if terms <= 30 else "delayed"
+
+
 # ============================================================================
 # CONTACT SYNC
 # ============================================================================
@@ -142,7 +518,8 @@ def merge_results(target: Dict, source: Dict):
 async def sync_contacts(
     db: AsyncSession,
     user_id: str,
-    xero_client: XeroClient
+    contacts: List[Dict[str, Any]],
+    touched: Optional[TouchedSources] = None,
 ) -> Dict[str, Any]:
     """
     Sync Xero contacts to Tamio clients.
@@ -151,98 +528,83 @@ async def sync_contacts(
     - Xero Contact (is_customer=True) → Tamio Client
     - Contact name → Client name
     - Payment terms → payment_behavior inference
+
+    Contacts match an existing client by Xero ID, then by name.
     """
+    touched = touched if touched is not None else TouchedSources()
     results = {
-        "records_fetched": {"contacts": 0},
+        "records_fetched": {"contacts": len(contacts)},
         "records_created": {"clients": 0},
         "records_updated": {"clients": 0},
         "errors": []
     }
 
-    try:
-        # Get customers from Xero
-        contacts = xero_client.get_contacts(is_customer=True)
-        results["records_fetched"]["contacts"] = len(contacts)
-
-        # Get existing clients for this user
-        existing_result = await db.execute(
-            select(data_models.Client).where(
-                data_models.Client.user_id == user_id
-            )
+    # Get existing clients for this user
+    existing_result = await db.execute(
+        select(data_models.Client).where(
+            data_models.Client.user_id == user_id
         )
-        existing_clients = {c.name.lower(): c for c in existing_result.scalars().all()}
-
-        for contact in contacts:
-            contact_name = contact["name"]
-            contact_lower = contact_name.lower()
-
-            # Check if client already exists (by name match)
-            if contact_lower in existing_clients:
-                # Update existing client with Xero data
-                client = existing_clients[contact_lower]
-
-                # Link to Xero contact if not already linked
-                if not client.xero_contact_id:
-                    client.xero_contact_id = contact["contact_id"]
-                    client.sync_status = "synced"
-                    client.last_synced_at = datetime.now(timezone.utc)
-
-                # Update payment behavior based on payment terms
-                if contact.get("payment_terms"):
-                    terms = contact["payment_terms"]
-                    if terms <= 14:
-                        client.payment_behavior = "on_time"
-                    elif terms <= 30:
-                        client.payment_behavior = "on_time"
-                    else:
-                        client.payment_behavior = "delayed"
-
-                results["records_updated"]["clients"] += 1
-            else:
-                # Create new client from contact
-                # Determine client type - default to retainer if they have recurring invoices
-                client_type = "project"  # Default
-
-                # Infer payment behavior from terms
-                payment_behavior = "unknown"
-                if contact.get("payment_terms"):
-                    terms = contact["payment_terms"]
-                    if terms <= 14:
-                        payment_behavior = "on_time"
-                    elif terms <= 30:
-                        payment_behavior = "on_time"
-                    else:
-                        payment_behavior = "delayed"
-
-                # Use canonical builder for consistent structure
-                new_client = build_canonical_client(
-                    user_id=user_id,
-                    name=contact_name,
-                    client_type=client_type,
-                    currency=contact.get("default_currency") or "USD",
-                    status="active",
-                    payment_behavior=payment_behavior,
-                    churn_risk="low",
-                    scope_risk="low",
-                    billing_config={
-                        "xero_contact_id": contact["contact_id"],
-                        "source": "xero_sync"
-                    },
-                    notes=f"Imported from Xero (Contact ID: {contact['contact_id']})"
-                )
-                # Set Xero fields directly on the model
-                new_client.xero_contact_id = contact["contact_id"]
-                new_client.source = "xero"
-                new_client.sync_status = "synced"
-                new_client.last_synced_at = datetime.now(timezone.utc)
-
-                db.add(new_client)
-                results["records_created"]["clients"] += 1
+    )
+    existing_clients = list(existing_result.scalars().all())
+    clients_by_name = {c.name.lower(): c for c in existing_clients}
+    clients_by_xero_id = {c.xero_contact_id: c for c in existing_clients if c.xero_contact_id}
+
+    now = datetime.now(timezone.utc)
+    new_rows: Dict[str, Dict[str, Any]] = {}
+
+    for contact in contacts:
+        contact_name = contact["name"]
+        contact_id = contact["contact_id"]
+        payment_behavior = _payment_behavior_from_terms(contact.get("payment_terms"))
+
+        client = clients_by_xero_id.get(contact_id) or clients_by_name.get(contact_name.lower())
+        if client:
+            # Link to Xero contact if not already linked
+            if not client.xero_contact_id:
+                client.xero_contact_id = contact_id
+                client.sync_status = "synced"
+                client.last_synced_at = now
+
+            # Update payment behavior based on payment terms
+            if payment_behavior:
+                client.payment_behavior = payment_behavior
+
+            touched.client_ids.add(client.id)
+            results["records_updated"]["clients"] += 1
+            continue
+
+        if contact_id in new_rows:
+            continue
+
+        # Create new client from contact, defaulting to project type
+        # Use canonical builder for consistent structure
+        new_client = build_canonical_client(
+            user_id=user_id,
+            name=contact_name,
+            client_type="project",
+            currency=contact.get("default_currency") or "USD",
+            status="active",
+            payment_behavior=payment_behavior or "unknown",
+            churn_risk="low",
+            scope_risk="low",
+            billing_config={
+                "xero_contact_id": contact_id,
+                "source": "xero_sync"
+            },
+            notes=f"Imported from Xero (Contact ID: {contact_id})"
+        )
+        # Set Xero fields directly on the model
+        new_client.xero_contact_id = contact_id
+        new_client.source = "xero"
+        new_client.sync_status = "synced"
+        new_client.last_synced_at = now
+        new_rows[contact_id] = _insert_row(new_client)
 
-        await db.flush()
+    await db.flush()
 
-    except Exception as e:
-        results["errors"].append(f"Contact sync error: {str(e)}")
+    written = await _upsert_by_xero_contact(db, data_models.Client, list(new_rows.values()))
+    touched.client_ids.update(written.values())
+    results["records_created"]["clients"] += len(written)
 
     return results
 
@@ -251,339 +613,261 @@ async def sync_contacts(
 # INVOICE SYNC
 # ============================================================================
 
+# Invoice statuses that still expect payment
+OUTSTANDING_STATUSES = ("AUTHORISED", "SUBMITTED")
+
+
 async def sync_invoices(
     db: AsyncSession,
     user_id: str,
-    xero_client: XeroClient
+    invoices: List[Dict[str, Any]],
+    touched: Optional[TouchedSources] = None,
 ) -> Dict[str, Any]:
     """
-    Sync Xero invoices to Tamio clients and cash events.
+    Sync Xero outstanding invoices to Tamio clients and receivables.
 
     Mapping:
-    - ACCREC (Accounts Receivable) → Client (project type) + CashEvent direction="in"
-    - ACCPAY (Accounts Payable) → CashEvent direction="out"
-    - Due date → CashEvent date / Client milestone
-    - Amount due → CashEvent amount / Client milestone amount
-    """
-    from app.data.base import generate_id
-
-    results = {
-        "records_fetched": {"invoices": 0},
-        "records_created": {"cash_events": 0, "clients": 0},
-        "records_updated": {"cash_events": 0, "clients": 0},
-        "errors": []
-    }
+    - ACCREC (Accounts Receivable) → Client (project type) + Receivable rows
+    - Due date → Receivable expected date / Client milestone
+    - Amount due → Receivable amount / Client milestone amount
 
-    try:
-        # Get outstanding invoices
-        invoices = xero_client.get_outstanding_invoices()
-        results["records_fetched"]["invoices"] = len(invoices)
+    Every client with outstanding invoices is passed to
+    sync_xero_receivables, which replaces the user's Xero receivables.
+    """
+    receivables = [inv for inv in invoices if inv["type"] == "ACCREC" and inv["amount_due"] > 0]
+    results, milestones_by_client = await _sync_receivable_clients(db, user_id, receivables, touched)
+    results["records_fetched"] = {"invoices": len(invoices)}
 
-        # Get existing clients to link
-        clients_result = await db.execute(
-            select(data_models.Client).where(
-                data_models.Client.user_id == user_id
-            )
-        )
-        existing_clients = list(clients_result.scalars().all())
-        clients_by_name = {c.name.lower(): c for c in existing_clients}
-        clients_by_xero_id = {c.xero_contact_id: c for c in existing_clients if c.xero_contact_id}
+    await sync_xero_receivables(db, user_id, milestones_by_client)
 
-        # Get today for week number calculation
-        today = date.today()
-        week_start = today - timedelta(days=today.weekday())
+    return results
 
-        # Group receivable invoices by contact for client creation/update
-        receivables_by_contact: Dict[str, List[dict]] = {}
 
-        for invoice in invoices:
-            if invoice["amount_due"] <= 0:
-                continue
+async def apply_invoice_changes(
+    db: AsyncSession,
+    user_id: str,
+    invoices: List[Dict[str, Any]],
+    touched: Optional[TouchedSources] = None,
+) -> Dict[str, Any]:
+    """
+    Apply specific changed invoices (any status) without a full pull.
 
-            is_receivable = invoice["type"] == "ACCREC"
-
-            if is_receivable:
-                contact_name = invoice.get("contact_name", "")
-                contact_id = invoice.get("contact_id", "")
-                if contact_name:
-                    key = contact_id or contact_name.lower()
-                    if key not in receivables_by_contact:
-                        receivables_by_contact[key] = []
-                    receivables_by_contact[key].append(invoice)
-
-            # Get due date
-            due_date = invoice.get("due_date")
-            if due_date and isinstance(due_date, datetime):
-                due_date = due_date.date()
-            elif not due_date:
-                inv_date = invoice.get("date")
-                if inv_date and isinstance(inv_date, datetime):
-                    due_date = (inv_date + timedelta(days=30)).date()
-                else:
-                    due_date = today + timedelta(days=30)
-
-            # Calculate week number
-            days_diff = (due_date - week_start).days
-            week_number = max(0, days_diff // 7)
-
-            # Find linked client
-            client_id = None
-            client_name = invoice.get("contact_name", "").lower()
-            if client_name in clients_by_name:
-                client_id = clients_by_name[client_name].id
-
-            # Determine confidence based on invoice status
-            status = invoice.get("status", "").upper()
-            if status in ["AUTHORISED", "SUBMITTED"]:
-                confidence = "high"
-            elif status == "DRAFT":
-                confidence = "medium"
-            else:
-                confidence = "low"
+    Each changed ACCREC invoice replaces its own entry in the client's
+    outstanding invoices and receivables: still-outstanding invoices are
+    upserted, paid or voided ones removed. Other invoices are untouched.
+    ACCPAY changes are left to the full sync, since supplier amounts are
+    derived from all of a supplier's bills.
+    """
+    receivables = [inv for inv in invoices if inv["type"] == "ACCREC"]
+    changed_ids = {inv["invoice_id"] for inv in receivables if inv.get("invoice_id")}
+    results, milestones_by_client = await _sync_receivable_clients(
+        db, user_id, receivables, touched, changed_ids=changed_ids
+    )
+    results["records_fetched"] = {"invoices": len(invoices)}
 
-            # Determine category
-            if is_receivable:
-                category = "client_invoice"
-            else:
-                line_items = invoice.get("line_items", [])
-                category = get_category_from_line_items(line_items)
+    await replace_xero_receivables_for_invoices(db, user_id, changed_ids, milestones_by_client)
 
-            # Create cash event
-            event = data_models.CashEvent(
-                user_id=user_id,
-                date=due_date,
-                week_number=week_number,
-                amount=Decimal(str(invoice["amount_due"])),
-                direction="in" if is_receivable else "out",
-                event_type="expected_revenue" if is_receivable else "expected_expense",
-                category=category,
-                client_id=client_id,
-                confidence=confidence,
-                confidence_reason=f"Xero invoice {invoice.get('invoice_number', 'N/A')} - Status: {status}",
-                is_recurring=False,
-                notes=f"Synced from Xero Invoice #{invoice.get('invoice_number', 'N/A')}"
-            )
-            db.add(event)
-            results["records_created"]["cash_events"] += 1
-
-        # Create/update clients from receivable invoices
-        for contact_key, contact_invoices in receivables_by_contact.items():
-            first_invoice = contact_invoices[0]
-            contact_name = first_invoice.get("contact_name", "")
-            contact_id = first_invoice.get("contact_id")
-            contact_lower = contact_name.lower()
+    return results
 
-            # Check if client exists by Xero ID or name
-            existing_client = None
-            if contact_id and contact_id in clients_by_xero_id:
-                existing_client = clients_by_xero_id[contact_id]
-            elif contact_lower in clients_by_name:
-                existing_client = clients_by_name[contact_lower]
-
-            # Build milestones from outstanding invoices
-            milestones = []
-            for inv in contact_invoices:
-                inv_due_date = inv.get("due_date")
-                if inv_due_date and isinstance(inv_due_date, datetime):
-                    inv_due_date = inv_due_date.date()
-                elif not inv_due_date:
-                    inv_due_date = today + timedelta(days=30)
-
-                milestones.append({
-                    "name": f"Invoice #{inv.get('invoice_number', 'N/A')}",
-                    "expected_date": inv_due_date.isoformat(),
-                    "amount": float(inv["amount_due"]),
-                    "payment_terms": "net_0",  # Due date already accounts for terms
-                    "xero_invoice_id": inv.get("invoice_id"),
-                })
 
-            if existing_client:
-                # Update existing client with outstanding invoices
-                existing_config = dict(existing_client.billing_config or {})
+def _invoice_milestone(invoice: Dict[str, Any], today: date) -> Dict[str, Any]:
+    """An outstanding invoice in the billing_config milestone format."""
+    due_date = invoice.get("due_date")
+    if due_date and isinstance(due_date, datetime):
+        due_date = due_date.date()
+    elif not due_date:
+        due_date = today + timedelta(days=30)
+
+    return {
+        "name": f"Invoice #{invoice.get('invoice_number', 'N/A')}",
+        "expected_date": due_date.isoformat(),
+        "amount": float(invoice["amount_due"]),
+        "payment_terms": "net_0",  # Due date already accounts for terms
+        "xero_invoice_id": invoice.get("invoice_id"),
+        "invoice_number": invoice.get("invoice_number"),
+        "currency": invoice.get("currency_code") or "USD",
+    }
 
-                # Store outstanding invoices for ALL client types
-                # These are one-time payments separate from recurring billing
-                existing_config["outstanding_invoices"] = milestones
 
-                # For project clients, also set as milestones for backward compatibility
-                if existing_client.client_type == "project":
-                    existing_config["milestones"] = milestones
+async def _sync_receivable_clients(
+    db: AsyncSession,
+    user_id: str,
+    invoices: List[Dict[str, Any]],
+    touched: Optional[TouchedSources] = None,
+    changed_ids: Optional[Set[str]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, List[dict]]]:
+    """
+    Update or create the clients behind ACCREC invoices.
 
-                # Assign a NEW dict to force SQLAlchemy to detect the change
-                existing_client.billing_config = existing_config
-                # Explicitly flag as modified for JSONB column
-                attributes.flag_modified(existing_client, "billing_config")
+    With changed_ids=None the invoices are the complete outstanding set and
+    replace each client's outstanding invoices. Otherwise only entries for
+    changed_ids are replaced and the client's other invoices are kept.
 
-                # Link to Xero if not already
-                if contact_id and not existing_client.xero_contact_id:
-                    existing_client.xero_contact_id = contact_id
-                    existing_client.source = "xero"
-                    existing_client.sync_status = "synced"
-                    existing_client.last_synced_at = datetime.now(timezone.utc)
+    Returns:
+        (results, outstanding invoice milestones keyed by client id)
+    """
+    touched = touched if touched is not None else TouchedSources()
+    results = {
+        "records_created": {"clients": 0},
+        "records_updated": {"clients": 0},
+        "errors": []
+    }
 
-                results["records_updated"]["clients"] += 1
-            else:
-                # Create new client as project type with milestones
-                new_client = build_canonical_client(
-                    user_id=user_id,
-                    name=contact_name,
-                    client_type="project",
-                    currency=first_invoice.get("currency_code") or "USD",
-                    status="active",
-                    payment_behavior="unknown",
-                    churn_risk="low",
-                    scope_risk="low",
-                    billing_config={
-                        "milestones": milestones,
-                    },
-                    notes=f"Imported from Xero outstanding invoices"
-                )
-                new_client.xero_contact_id = contact_id
-                new_client.source = "xero"
-                new_client.sync_status = "synced"
-                new_client.last_synced_at = datetime.now(timezone.utc)
-
-                db.add(new_client)
-                # Add to lookup for subsequent invoices
-                clients_by_name[contact_lower] = new_client
-                if contact_id:
-                    clients_by_xero_id[contact_id] = new_client
-
-                results["records_created"]["clients"] += 1
+    # Get existing clients to link
+    clients_result = await db.execute(
+        select(data_models.Client).where(
+            data_models.Client.user_id == user_id
+        )
+    )
+    existing_clients = list(clients_result.scalars().all())
+    clients_by_name = {c.name.lower(): c for c in existing_clients}
+    clients_by_xero_id = {c.xero_contact_id: c for c in existing_clients if c.xero_contact_id}
+
+    today = date.today()
+    now = datetime.now(timezone.utc)
+
+    # Group receivable invoices by contact for client creation/update
+    receivables_by_contact: Dict[str, List[dict]] = {}
+    for invoice in invoices:
+        contact_name = invoice.get("contact_name", "")
+        if contact_name:
+            key = invoice.get("contact_id") or contact_name.lower()
+            receivables_by_contact.setdefault(key, []).append(invoice)
+
+    def kept(entries: Optional[List[dict]]) -> List[dict]:
+        if changed_ids is None:
+            return []
+        return [m for m in entries or [] if m.get("xero_invoice_id") not in changed_ids]
+
+    milestones_by_client: Dict[str, List[dict]] = {}
+    new_rows: List[Tuple[Dict[str, Any], List[dict]]] = []
+    for contact_invoices in receivables_by_contact.values():
+        first_invoice = contact_invoices[0]
+        contact_name = first_invoice.get("contact_name", "")
+        contact_id = first_invoice.get("contact_id")
+
+        # Check if client exists by Xero ID or name
+        existing_client = None
+        if contact_id and contact_id in clients_by_xero_id:
+            existing_client = clients_by_xero_id[contact_id]
+        else:
+            existing_client = clients_by_name.get(contact_name.lower())
+
+        # Build milestones from outstanding invoices
+        milestones = [
+            _invoice_milestone(inv, today) for inv in contact_invoices
+            if inv["amount_due"] > 0 and (changed_ids is None or inv.get("status") in OUTSTANDING_STATUSES)
+        ]
+
+        if existing_client:
+            # Update existing client with outstanding invoices
+            existing_config = dict(existing_client.billing_config or {})
+
+            # Store outstanding invoices for ALL client types
+            # These are one-time payments separate from recurring billing
+            existing_config["outstanding_invoices"] = kept(existing_config.get("outstanding_invoices")) + milestones
+
+            # For project clients, also set as milestones for backward compatibility
+            if existing_client.client_type == "project":
+                existing_config["milestones"] = kept(existing_config.get("milestones")) + milestones
+
+            # Assign a NEW dict to force SQLAlchemy to detect the change
+            existing_client.billing_config = existing_config
+            # Explicitly flag as modified for JSONB column
+            attributes.flag_modified(existing_client, "billing_config")
+
+            # Link to Xero if not already
+            if contact_id and not existing_client.xero_contact_id:
+                existing_client.xero_contact_id = contact_id
+                existing_client.source = "xero"
+                existing_client.sync_status = "synced"
+                existing_client.last_synced_at = now
+
+            milestones_by_client[existing_client.id] = milestones
+            touched.client_ids.add(existing_client.id)
+            results["records_updated"]["clients"] += 1
+        elif milestones:
+            # Create new client as project type with milestones
+            new_client = build_canonical_client(
+                user_id=user_id,
+                name=contact_name,
+                client_type="project",
+                currency=first_invoice.get("currency_code") or "USD",
+                status="active",
+                payment_behavior="unknown",
+                churn_risk="low",
+                scope_risk="low",
+                billing_config={
+                    "milestones": milestones,
+                },
+                notes=f"Imported from Xero outstanding invoices"
+            )
+            new_client.xero_contact_id = contact_id
+            new_client.source = "xero"
+            new_client.sync_status = "synced"
+            new_client.last_synced_at = now
+            new_rows.append((_insert_row(new_client), milestones))
 
-        await db.flush()
+    await db.flush()
 
-    except Exception as e:
-        results["errors"].append(f"Invoice sync error: {str(e)}")
+    written = await _upsert_by_xero_contact(db, data_models.Client, [row for row, _ in new_rows])
+    for row, milestones in new_rows:
+        if row["id"] in written:
+            milestones_by_client[written[row["id"]]] = milestones
+    touched.client_ids.update(written.values())
+    results["records_created"]["clients"] += len(written)
 
-    return results
+    return results, milestones_by_client
 
 
 # ============================================================================
-# REPEATING INVOICE SYNC (RETAINERS & RECURRING EXPENSES)
+# REPEATING INVOICE SYNC (RETAINERS)
 # ============================================================================
 
 async def sync_repeating_invoices(
     db: AsyncSession,
     user_id: str,
-    xero_client: XeroClient
+    repeating: List[Dict[str, Any]],
+    touched: Optional[TouchedSources] = None,
 ) -> Dict[str, Any]:
     """
-    Sync Xero repeating invoices to:
-    1. Detect retainer clients (ACCREC - recurring revenue)
-    2. Create recurring cash events for both ACCREC and ACCPAY
+    Sync Xero repeating invoices to detect retainer clients.
 
-    This generates events for weeks 1-13 based on the repeating invoice schedule.
+    Authorised ACCREC repeating invoices update the matching client's
+    billing to a retainer. The recurring amounts then reach the forecast
+    through the client's obligation schedules (see sync_obligations).
     """
+    touched = touched if touched is not None else TouchedSources()
     results = {
-        "records_fetched": {"repeating_invoices": 0},
-        "records_created": {"cash_events": 0},
+        "records_fetched": {"repeating_invoices": len(repeating)},
         "records_updated": {"clients": 0},
         "errors": []
     }
 
-    try:
-        # Get repeating invoices
-        repeating = xero_client.get_repeating_invoices()
-        results["records_fetched"]["repeating_invoices"] = len(repeating)
-
-        # Get existing clients for linking
-        clients_result = await db.execute(
-            select(data_models.Client).where(
-                data_models.Client.user_id == user_id
-            )
+    # Get existing clients for linking
+    clients_result = await db.execute(
+        select(data_models.Client).where(
+            data_models.Client.user_id == user_id
         )
-        clients_by_name = {c.name.lower(): c for c in clients_result.scalars().all()}
-
-        # Get today for week number calculation
-        today = date.today()
-        week_start = today - timedelta(days=today.weekday())
-
-        for inv in repeating:
-            is_receivable = inv["type"] == "ACCREC"
-            direction = "in" if is_receivable else "out"
-            amount = Decimal(str(inv.get("total", 0)))
-
-            if amount <= 0:
-                continue
-
-            # Only process AUTHORISED repeating invoices
-            if inv.get("status") != "AUTHORISED":
-                continue
-
-            contact_name = inv.get("contact_name", "")
-            contact_lower = contact_name.lower()
+    )
+    clients_by_name = {c.name.lower(): c for c in clients_result.scalars().all()}
 
-            # Update client to retainer type if it's a receivable
-            if is_receivable and contact_lower in clients_by_name:
-                client = clients_by_name[contact_lower]
+    for inv in repeating:
+        if inv["type"] != "ACCREC" or Decimal(str(inv.get("total", 0))) <= 0:
+            continue
 
-                # Use canonical utility to update billing from repeating invoice
-                update_client_billing_from_repeating_invoice(client, inv)
-                results["records_updated"]["clients"] += 1
-
-            # Get schedule info
-            schedule = inv.get("schedule", {})
-            frequency = map_xero_frequency(schedule.get("unit"), schedule.get("period"))
-
-            # Determine payment interval in days
-            if frequency == "weekly":
-                interval_days = 7
-            elif frequency == "bi-weekly":
-                interval_days = 14
-            elif frequency == "monthly":
-                interval_days = 30
-            elif frequency == "quarterly":
-                interval_days = 91
-            else:
-                interval_days = 30  # Default to monthly
-
-            # Generate events for weeks 1-13 (skip week 0 as one-time invoices cover near-term)
-            # Start from next week to avoid duplicating with outstanding invoices
-            next_payment_date = today + timedelta(days=interval_days)
-
-            events_created = 0
-            while next_payment_date <= today + timedelta(weeks=13):
-                # Calculate week number
-                days_diff = (next_payment_date - week_start).days
-                week_number = max(1, days_diff // 7)
-
-                if week_number > 13:
-                    break
-
-                # Find linked client
-                client_id = None
-                if contact_lower in clients_by_name:
-                    client_id = clients_by_name[contact_lower].id
-
-                # Create recurring cash event
-                event = data_models.CashEvent(
-                    user_id=user_id,
-                    date=next_payment_date,
-                    week_number=week_number,
-                    amount=amount,
-                    direction=direction,
-                    event_type="expected_revenue" if is_receivable else "expected_expense",
-                    category="recurring_invoice" if is_receivable else "recurring_bill",
-                    client_id=client_id,
-                    confidence="high",
-                    confidence_reason=f"Xero repeating invoice - {contact_name}",
-                    is_recurring=True,
-                    recurrence_pattern=frequency,
-                    notes=f"Recurring {frequency} from Xero: {contact_name}"
-                )
-                db.add(event)
-                events_created += 1
-
-                # Move to next payment date
-                next_payment_date += timedelta(days=interval_days)
-
-            results["records_created"]["cash_events"] += events_created
+        # Only process AUTHORISED repeating invoices
+        if inv.get("status") != "AUTHORISED":
+            continue
 
-        await db.flush()
+        client = clients_by_name.get(inv.get("contact_name", "").lower())
+        if client:
+            # Use canonical utility to update billing from repeating invoice
+            update_client_billing_from_repeating_invoice(client, inv)
+            touched.client_ids.add(client.id)
+            results["records_updated"]["clients"] += 1
 
-    except Exception as e:
-        results["errors"].append(f"Repeating invoice sync error: {str(e)}")
+    await db.flush()
 
     return results
 
@@ -595,7 +879,10 @@ async def sync_repeating_invoices(
 async def sync_suppliers(
     db: AsyncSession,
     user_id: str,
-    xero_client: XeroClient
+    contacts: List[Dict[str, Any]],
+    bills: Optional[List[Dict[str, Any]]],
+    repeating: Optional[List[Dict[str, Any]]],
+    touched: Optional[TouchedSources] = None,
 ) -> Dict[str, Any]:
     """
     Sync Xero suppliers to Tamio expense buckets.
@@ -604,159 +891,216 @@ async def sync_suppliers(
     - Xero Contact (is_supplier=True) → Tamio ExpenseBucket
     - Supplier name → Expense bucket name
     - Outstanding bills → monthly_amount (average or total)
+
+    `bills` and `repeating` are the outstanding and repeating invoices
+    already fetched for the invoice stages; only ACCPAY entries are used.
+    When they are None (a targeted contact sync), amounts and due days of
+    existing buckets are left as they are.
     """
+    amounts_known = bills is not None
+    touched = touched if touched is not None else TouchedSources()
     results = {
-        "records_fetched": {"suppliers": 0},
+        "records_fetched": {"suppliers": len(contacts)},
         "records_created": {"expense_buckets": 0},
         "records_updated": {"expense_buckets": 0},
         "errors": []
     }
 
-    try:
-        # Get suppliers from Xero
-        contacts = xero_client.get_contacts(is_supplier=True)
-        results["records_fetched"]["suppliers"] = len(contacts)
-
-        # Get outstanding bills to calculate amounts per supplier
-        bills = xero_client.get_outstanding_invoices()
-        payables = [b for b in bills if b["type"] == "ACCPAY"]
-
-        # Calculate total outstanding per supplier and track due days
-        supplier_amounts: Dict[str, Decimal] = {}
-        supplier_due_days: Dict[str, int] = {}  # Track due day from bills
-        for bill in payables:
-            contact_name = bill.get("contact_name", "").lower()
-            amount = Decimal(str(bill.get("amount_due", 0)))
-            if contact_name:
-                supplier_amounts[contact_name] = supplier_amounts.get(contact_name, Decimal("0")) + amount
-                # Extract due day from bill due date
-                due_date_val = bill.get("due_date")
-                if due_date_val:
-                    try:
-                        # Handle both datetime objects and strings
-                        if hasattr(due_date_val, 'day'):
-                            # It's a datetime.date or datetime.datetime object
-                            supplier_due_days[contact_name] = due_date_val.day
-                        elif isinstance(due_date_val, str):
-                            from datetime import datetime as dt
-                            due_date = dt.fromisoformat(due_date_val.replace("Z", "+00:00"))
-                            supplier_due_days[contact_name] = due_date.day
-                    except (ValueError, AttributeError):
-                        pass
-
-        # Also get repeating bills for recurring expense amounts
-        repeating = xero_client.get_repeating_invoices()
-        repeating_bills = [r for r in repeating if r["type"] == "ACCPAY" and r.get("status") == "AUTHORISED"]
-
-        supplier_recurring: Dict[str, Decimal] = {}
-        supplier_recurring_due_days: Dict[str, int] = {}  # Track due day from repeating bills
-        for bill in repeating_bills:
-            contact_name = bill.get("contact_name", "").lower()
-            amount = Decimal(str(bill.get("total", 0)))
-            if contact_name:
-                supplier_recurring[contact_name] = amount
-                # Extract due day from schedule if available
-                schedule = bill.get("schedule", {})
-                due_day_of_month = schedule.get("due_day_of_month")
-                if due_day_of_month:
-                    supplier_recurring_due_days[contact_name] = due_day_of_month
-
-        # Get existing expense buckets for this user
-        existing_result = await db.execute(
-            select(data_models.ExpenseBucket).where(
-                data_models.ExpenseBucket.user_id == user_id
-            )
+    payables = [b for b in bills or [] if b["type"] == "ACCPAY"]
+
+    # Calculate total outstanding per supplier and track due days
+    supplier_amounts: Dict[str, Decimal] = {}
+    supplier_due_days: Dict[str, int] = {}  # Track due day from bills
+    for bill in payables:
+        contact_name = bill.get("contact_name", "").lower()
+        amount = Decimal(str(bill.get("amount_due", 0)))
+        if contact_name:
+            supplier_amounts[contact_name] = supplier_amounts.get(contact_name, Decimal("0")) + amount
+            # Extract due day from bill due date
+            due_date_val = bill.get("due_date")
+            if due_date_val:
+                try:
+                    # Handle both datetime objects and strings
+                    if hasattr(due_date_val, 'day'):
+                        # It's a datetime.date or datetime.datetime object
+                        supplier_due_days[contact_name] = due_date_val.day
+                    elif isinstance(due_date_val, str):
+                        due_date = datetime.fromisoformat(due_date_val.replace("Z", "+00:00"))
+                        supplier_due_days[contact_name] = due_date.day
+                except (ValueError, AttributeError):
+                    pass
+
+    # Also use repeating bills for recurring expense amounts
+    repeating_bills = [r for r in repeating or [] if r["type"] == "ACCPAY" and r.get("status") == "AUTHORISED"]
+
+    supplier_recurring: Dict[str, Decimal] = {}
+    supplier_recurring_due_days: Dict[str, int] = {}  # Track due day from repeating bills
+    for bill in repeating_bills:
+        contact_name = bill.get("contact_name", "").lower()
+        amount = Decimal(str(bill.get("total", 0)))
+        if contact_name:
+            supplier_recurring[contact_name] = amount
+            # Extract due day from schedule if available
+            schedule = bill.get("schedule", {})
+            due_day_of_month = schedule.get("due_day_of_month")
+            if due_day_of_month:
+                supplier_recurring_due_days[contact_name] = due_day_of_month
+
+    # Get existing expense buckets for this user
+    existing_result = await db.execute(
+        select(data_models.ExpenseBucket).where(
+            data_models.ExpenseBucket.user_id == user_id
         )
-        all_buckets = existing_result.scalars().all()
-        existing_buckets = {b.name.lower(): b for b in all_buckets}
-        existing_by_xero_id = {
-            b.xero_contact_id: b for b in all_buckets
-            if b.xero_contact_id
-        }
+    )
+    all_buckets = existing_result.scalars().all()
+    existing_buckets = {b.name.lower(): b for b in all_buckets}
+    existing_by_xero_id = {
+        b.xero_contact_id: b for b in all_buckets
+        if b.xero_contact_id
+    }
 
-        for contact in contacts:
-            contact_name = contact["name"]
-            contact_lower = contact_name.lower()
-            contact_id = contact["contact_id"]
-
-            # Get amount from outstanding bills or recurring bills
-            monthly_amount = supplier_recurring.get(contact_lower, Decimal("0"))
-            if monthly_amount == 0:
-                # Fall back to outstanding amount
-                monthly_amount = supplier_amounts.get(contact_lower, Decimal("0"))
-
-            # Get due day: prefer recurring bill schedule, fall back to outstanding bill due date
-            due_day = supplier_recurring_due_days.get(
-                contact_lower,
-                supplier_due_days.get(contact_lower, 15)  # Default to 15 if no data
-            )
+    now = datetime.now(timezone.utc)
+    new_rows: Dict[str, Dict[str, Any]] = {}
 
-            # Skip if already linked by Xero ID
-            if contact_id in existing_by_xero_id:
-                bucket = existing_by_xero_id[contact_id]
-                if bucket.source == "xero":
-                    bucket.name = contact_name
-                    bucket.last_synced_at = datetime.now(timezone.utc)
-                    bucket.sync_status = "synced"
-                    # Update amount if we have bill data
-                    if monthly_amount > 0:
-                        bucket.monthly_amount = monthly_amount
-                    # Update due day from Xero
-                    bucket.due_day = due_day
-                results["records_updated"]["expense_buckets"] += 1
-                continue
+    for contact in contacts:
+        contact_name = contact["name"]
+        contact_lower = contact_name.lower()
+        contact_id = contact["contact_id"]
+
+        # Get amount from outstanding bills or recurring bills
+        monthly_amount = supplier_recurring.get(contact_lower, Decimal("0"))
+        if monthly_amount == 0:
+            # Fall back to outstanding amount
+            monthly_amount = supplier_amounts.get(contact_lower, Decimal("0"))
+
+        # Get due day: prefer recurring bill schedule, fall back to outstanding bill due date
+        due_day = supplier_recurring_due_days.get(
+            contact_lower,
+            supplier_due_days.get(contact_lower, 15)  # Default to 15 if no data
+        )
 
-            # Check if bucket exists by name match
-            if contact_lower in existing_buckets:
-                # Link existing bucket to Xero contact
-                bucket = existing_buckets[contact_lower]
-                bucket.xero_contact_id = contact_id
+        # Already linked by Xero ID
+        if contact_id in existing_by_xero_id:
+            bucket = existing_by_xero_id[contact_id]
+            if bucket.source == "xero":
+                bucket.name = contact_name
+                bucket.last_synced_at = now
                 bucket.sync_status = "synced"
-                bucket.last_synced_at = datetime.now(timezone.utc)
-                # Update amount if we have bill data and bucket is from xero
-                if monthly_amount > 0 and bucket.source == "xero":
+                # Update amount if we have bill data
+                if monthly_amount > 0:
                     bucket.monthly_amount = monthly_amount
                 # Update due day from Xero
-                if bucket.source == "xero":
+                if amounts_known:
                     bucket.due_day = due_day
-                results["records_updated"]["expense_buckets"] += 1
-            else:
-                # Create new expense bucket from supplier
-                from app.data.base import generate_id
-
-                # Determine bucket type based on whether there's a recurring bill
-                is_recurring = contact_lower in supplier_recurring
-                bucket_type = "fixed" if is_recurring else "variable"
-
-                new_bucket = data_models.ExpenseBucket(
-                    id=generate_id("bucket"),
-                    user_id=user_id,
-                    name=contact_name,
-                    category="other",  # Default, user can categorize
-                    bucket_type=bucket_type,
-                    monthly_amount=monthly_amount,
-                    currency=contact.get("default_currency") or "USD",
-                    priority="medium",
-                    is_stable=is_recurring,
-                    due_day=due_day,
-                    frequency="monthly",
-                    source="xero",
-                    xero_contact_id=contact_id,
-                    sync_status="synced",
-                    last_synced_at=datetime.now(timezone.utc),
-                    locked_fields=["name"],
-                )
-                db.add(new_bucket)
-                results["records_created"]["expense_buckets"] += 1
+            touched.bucket_ids.add(bucket.id)
+            results["records_updated"]["expense_buckets"] += 1
+            continue
+
+        # Check if bucket exists by name match
+        if contact_lower in existing_buckets:
+            # Link existing bucket to Xero contact
+            bucket = existing_buckets[contact_lower]
+            bucket.xero_contact_id = contact_id
+            bucket.sync_status = "synced"
+            bucket.last_synced_at = now
+            # Update amount if we have bill data and bucket is from xero
+            if monthly_amount > 0 and bucket.source == "xero":
+                bucket.monthly_amount = monthly_amount
+            # Update due day from Xero
+            if bucket.source == "xero" and amounts_known:
+                bucket.due_day = due_day
+            touched.bucket_ids.add(bucket.id)
+            results["records_updated"]["expense_buckets"] += 1
+        elif contact_id not in new_rows:
+            # Create new expense bucket from supplier
+            # Determine bucket type based on whether there's a recurring bill
+            is_recurring = contact_lower in supplier_recurring
+            bucket_type = "fixed" if is_recurring else "variable"
+
+            new_bucket = data_models.ExpenseBucket(
+                id=generate_id("bucket"),
+                user_id=user_id,
+                name=contact_name,
+                category="other",  # Default, user can categorize
+                bucket_type=bucket_type,
+                monthly_amount=monthly_amount,
+                currency=contact.get("default_currency") or "USD",
+                priority="medium",
+                is_stable=is_recurring,
+                due_day=due_day,
+                frequency="monthly",
+                source="xero",
+                xero_contact_id=contact_id,
+                sync_status="synced",
+                last_synced_at=now,
+                locked_fields=["name"],
+            )
+            new_rows[contact_id] = _insert_row(new_bucket)
 
-        await db.flush()
+    await db.flush()
 
-    except Exception as e:
-        results["errors"].append(f"Supplier sync error: {str(e)}")
+    written = await _upsert_by_xero_contact(db, data_models.ExpenseBucket, list(new_rows.values()))
+    touched.bucket_ids.update(written.values())
+    results["records_created"]["expense_buckets"] += len(written)
 
     return results
 
 
+# ============================================================================
+# OBLIGATION SYNC
+# ============================================================================
+
+async def sync_obligations(
+    db: AsyncSession,
+    user_id: str,
+    touched: TouchedSources,
+) -> Dict[str, Any]:
+    """
+    Re-sync the obligations of every client and bucket the sync touched.
+
+    Runs once per tenant after the write stages, through
+    ObligationService.sync_obligations_bulk, and records the changed
+    entity types for the detection sweeps.
+    """
+    clients: List[Any] = []
+    if touched.client_ids:
+        clients_result = await db.execute(
+            select(data_models.Client).where(
+                data_models.Client.user_id == user_id,
+                data_models.Client.id.in_(touched.client_ids),
+            ).execution_options(populate_existing=True)
+        )
+        clients = list(clients_result.scalars().all())
+
+    buckets: List[Any] = []
+    if touched.bucket_ids:
+        buckets_result = await db.execute(
+            select(data_models.ExpenseBucket).where(
+                data_models.ExpenseBucket.user_id == user_id,
+                data_models.ExpenseBucket.id.in_(touched.bucket_ids),
+            ).execution_options(populate_existing=True)
+        )
+        buckets = list(buckets_result.scalars().all())
+
+    counts = await ObligationService(db).sync_obligations_bulk(clients, buckets)
+
+    changed = [changes.OBLIGATION]
+    if clients:
+        changed.append(changes.CLIENT)
+    if buckets:
+        changed.append(changes.EXPENSE_BUCKET)
+    await changes.mark_changed(db, user_id, *changed)
+
+    return {
+        "records_created": {
+            "obligations": counts["created"],
+            "obligation_schedules": counts["schedules"],
+        },
+        "records_updated": {"obligations": counts["updated"] + counts["deactivated"]},
+        "errors": []
+    }
+
+
 def map_xero_frequency(unit: Optional[str], period: Optional[int]) -> str:
     """Map Xero schedule unit to Tamio frequency."""
     if not unit:
@@ -0,0 +1,238 @@
+"""Background Xero sync scheduling.
+
+run_background_sync syncs every active Xero connection, several tenants at
+a time (XERO_SYNC_CONCURRENCY):
+- connections synced within XERO_SYNC_FRESH_MINUTES (usually by a
+  user-triggered sync) are skipped
+- the rest are queued stalest first; a tenant whose user made API calls
+  within XERO_SYNC_ACTIVE_USER_MINUTES counts as twice as stale
+- each queued tenant gets a full sync (sync_xero_data "full")
+- each tenant's sync starts after a random delay of up to
+  XERO_SYNC_START_JITTER_SECONDS, so a run does not hit Xero in lockstep
+- a tenant whose Xero call budget is used up (by any sync path; see
+  app/xero/budget.py) is deferred to the next run
+
+Each run publishes its queue depth and sync lag to xero_sync_metrics, which
+the /metrics endpoint renders.
+"""
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Collection, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models import AuditLog
+from app.xero.models import XeroConnection
+
+logger = logging.getLogger(__name__)
+
+# A recently active user's tenant counts as this many times as stale
+ACTIVE_USER_PRIORITY_WEIGHT = 2.0
+
+SyncFn = Callable[[AsyncSession, str, str], Awaitable[dict]]
+
+
+@dataclass
+class SyncCandidate:
+    """An active connection considered for a background sync."""
+    user_id: str
+    tenant_id: Optional[str]
+    last_sync_at: Optional[datetime]
+    active: bool = False
+
+    def lag_seconds(self, now: datetime) -> Optional[float]:
+        """Seconds since the last sync; None if never synced."""
+        if self.last_sync_at is None:
+            return None
+        return max(0.0, (now - self.last_sync_at).total_seconds())
+
+    def priority(self, now: datetime) -> float:
+        """Higher syncs sooner. Never-synced connections come first."""
+        lag = self.lag_seconds(now)
+        if lag is None:
+            return float("inf")
+        return lag * ACTIVE_USER_PRIORITY_WEIGHT if self.active else lag
+
+
+def plan_background_sync(
+    candidates: Sequence[SyncCandidate],
+    now: datetime,
+    fresh_minutes: Optional[int] = None,
+) -> Tuple[List[SyncCandidate], List[SyncCandidate]]:
+    """
+    Split candidates into (queue, skipped).
+
+    Skipped connections were synced within fresh_minutes; the queue is in
+    priority order.
+    """
+    fresh_minutes = settings.XERO_SYNC_FRESH_MINUTES if fresh_minutes is None else fresh_minutes
+    fresh_since = now - timedelta(minutes=fresh_minutes)
+
+    queue, skipped = [], []
+    for candidate in candidates:
+        if candidate.last_sync_at is not None and candidate.last_sync_at >= fresh_since:
+            skipped.append(candidate)
+        else:
+            queue.append(candidate)
+    queue.sort(key=lambda c: c.priority(now), reverse=True)
+    return queue, skipped
+
+
+async def load_sync_candidates(db: AsyncSession, now: datetime) -> List[SyncCandidate]:
+    """Active connections, flagged with recent API activity by their user."""
+    result = await db.execute(
+        select(XeroConnection.user_id, XeroConnection.tenant_id, XeroConnection.last_sync_at)
+        .where(XeroConnection.is_active == True)
+    )
+    candidates = [
+        SyncCandidate(user_id=row.user_id, tenant_id=row.tenant_id, last_sync_at=row.last_sync_at)
+        for row in result.all()
+    ]
+    if not candidates:
+        return candidates
+
+    active = await load_active_user_ids(
+        db,
+        [c.user_id for c in candidates],
+        now - timedelta(minutes=settings.XERO_SYNC_ACTIVE_USER_MINUTES),
+    )
+    for candidate in candidates:
+        candidate.active = candidate.user_id in active
+    return candidates
+
+
+async def load_active_user_ids(db: AsyncSession, user_ids: Collection[str], since: datetime) -> Set[str]:
+    """Users with API-sourced audit entries since the given time."""
+    result = await db.execute(
+        select(AuditLog.user_id).distinct().where(
+            AuditLog.user_id.in_(set(user_ids)),
+            AuditLog.source == "api",
+            AuditLog.created_at >= since,
+        )
+    )
+    return set(result.scalars().all())
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+@dataclass
+class XeroSyncMetrics:
+    """Gauges from the latest background sync run."""
+    queue_depth: int = 0            # Connections still waiting to start
+    max_lag_seconds: float = 0.0    # Stalest queued connection at run start
+    last_run_synced: int = 0
+    last_run_skipped: int = 0
+    last_run_deferred: int = 0
+    last_run_failed: int = 0
+
+    def render_prometheus(self) -> str:
+        metrics = [
+            ("tamio_xero_sync_queue_depth", "Connections waiting for a background sync", "queue_depth"),
+            ("tamio_xero_sync_lag_seconds", "Time since the stalest queued connection last synced", "max_lag_seconds"),
+            ("tamio_xero_sync_last_run_synced", "Connections synced by the latest run", "last_run_synced"),
+            ("tamio_xero_sync_last_run_skipped", "Recently synced connections skipped by the latest run", "last_run_skipped"),
+            ("tamio_xero_sync_last_run_deferred", "Connections deferred for Xero budget by the latest run", "last_run_deferred"),
+            ("tamio_xero_sync_last_run_failed", "Connections whose sync failed in the latest run", "last_run_failed"),
+        ]
+        lines = []
+        for name, help_text, attr in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {getattr(self, attr)}")
+        return "\n".join(lines) + "\n"
+
+
+xero_sync_metrics = XeroSyncMetrics()
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+async def run_background_sync(
+    sync: Optional[SyncFn] = None,
+    now: Optional[datetime] = None,
+    metrics: Optional[XeroSyncMetrics] = None,
+) -> dict:
+    """
+    Sync all active Xero connections, several tenants at a time.
+
+    Every tenant syncs in its own session, so one slow or failing tenant
+    only holds up its own slot.
+    """
+    if sync is None:
+        from app.xero.sync import sync_xero_data
+        sync = sync_xero_data
+    metrics = metrics if metrics is not None else xero_sync_metrics
+    now = now or datetime.now(timezone.utc)
+
+    summary = {
+        "started_at": datetime.utcnow().isoformat(),
+        "users_synced": 0,
+        "sync_errors": 0,
+        "queued": 0,
+        "skipped_recent": 0,
+        "deferred": 0,
+        "max_lag_seconds": 0.0,
+        "errors": [],
+    }
+
+    async with async_session_maker() as db:
+        candidates = await load_sync_candidates(db, now)
+    queue, skipped = plan_background_sync(candidates, now)
+
+    lags = [candidate.lag_seconds(now) for candidate in queue]
+    summary["queued"] = len(queue)
+    summary["skipped_recent"] = len(skipped)
+    summary["max_lag_seconds"] = max((lag for lag in lags if lag is not None), default=0.0)
+    metrics.queue_depth = len(queue)
+    metrics.max_lag_seconds = summary["max_lag_seconds"]
+
+    logger.info(
+        f"Background Xero sync: {len(queue)} connections queued, {len(skipped)} recently synced, "
+        f"max lag {summary['max_lag_seconds']:.0f}s"
+    )
+
+    semaphore = asyncio.Semaphore(max(1, settings.XERO_SYNC_CONCURRENCY))
+
+    async def run_one(candidate: SyncCandidate) -> None:
+        async with semaphore:
+            metrics.queue_depth -= 1
+            await asyncio.sleep(random.uniform(0, settings.XERO_SYNC_START_JITTER_SECONDS))
+
+            try:
+                async with async_session_maker() as db:
+                    result = await sync(db, candidate.user_id, "full")
+                if result.get("deferred"):
+                    summary["deferred"] += 1
+                elif result.get("success", True):
+                    summary["users_synced"] += 1
+                else:
+                    raise RuntimeError(result.get("message", "Sync failed"))
+            except Exception as e:
+                summary["sync_errors"] += 1
+                summary["errors"].append({"user_id": candidate.user_id, "error": str(e)})
+                logger.error(f"Background sync failed for user {candidate.user_id}: {e}")
+
+    # Tasks queue on the semaphore in priority order
+    await asyncio.gather(*(run_one(candidate) for candidate in queue))
+
+    metrics.last_run_synced = summary["users_synced"]
+    metrics.last_run_skipped = summary["skipped_recent"]
+    metrics.last_run_deferred = summary["deferred"]
+    metrics.last_run_failed = summary["sync_errors"]
+
+    summary["completed_at"] = datetime.utcnow().isoformat()
+    logger.info(
+        f"Background Xero sync completed: {summary['users_synced']} users synced, "
+        f"{summary['deferred']} deferred, {summary['sync_errors']} errors"
+    )
+    return summary
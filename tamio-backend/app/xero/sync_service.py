@@ -25,9 +25,11 @@ from sqlalchemy import select
 
 from app.data.clients.models import Client
 from app.data.expenses.models import ExpenseBucket
+from app.detection import changes
 from app.xero.client import XeroClient, get_valid_connection
 from app.xero.models import XeroConnection, XeroSyncLog
 from app.integrations.services import IntegrationMappingService
+from app.services.receivables import sync_xero_receivables
 
 
 class SyncService:
@@ -392,6 +394,8 @@ class SyncService:
                 except Exception as e:
                     errors.append(f"Contact {contact.get('name', 'unknown')}: {str(e)}")
 
+            if created or updated:
+                await changes.mark_changed(self.db, self.user_id, changes.CLIENT)
             await self.db.commit()
             await self._log_sync("clients_pull", None, "success", f"Created: {created}, Updated: {updated}")
 
@@ -483,6 +487,8 @@ class SyncService:
                 except Exception as e:
                     errors.append(f"Supplier {contact.get('name', 'unknown')}: {str(e)}")
 
+            if created or updated:
+                await changes.mark_changed(self.db, self.user_id, changes.EXPENSE_BUCKET)
             await self.db.commit()
             await self._log_sync("expenses_pull", None, "success", f"Created: {created}, Updated: {updated}")
 
@@ -550,53 +556,50 @@ class SyncService:
                     })
                     invoices_processed += 1
 
-            # Update each client with their outstanding invoices
-            for contact_id, invoices in invoices_by_contact.items():
-                try:
-                    # Find the client by xero_contact_id
-                    result = await self.db.execute(
-                        select(Client).where(
-                            Client.user_id == self.user_id,
-                            Client.xero_contact_id == contact_id
-                        )
-                    )
-                    client = result.scalar_one_or_none()
-
-                    if client:
-                        # Update billing_config with outstanding invoices
-                        billing_config = client.billing_config or {}
-                        billing_config["outstanding_invoices"] = invoices
-                        billing_config["invoices_synced_at"] = datetime.now(timezone.utc).isoformat()
-                        client.billing_config = billing_config
-                        client.last_synced_at = datetime.now(timezone.utc)
-                        clients_updated += 1
-                    else:
-                        # Client doesn't exist in Tamio - they may need to sync contacts first
-                        contact_name = invoices[0].get("contact_name", contact_id)
-                        errors.append(f"No client found for Xero contact: {contact_name}")
-
-                except Exception as e:
-                    errors.append(f"Error updating client {contact_id}: {str(e)}")
-
-            # Also clear outstanding_invoices for clients with no current invoices
-            # (in case an invoice was paid since last sync)
+            # Load every Xero-linked client once, keyed by contact
             result = await self.db.execute(
                 select(Client).where(
                     Client.user_id == self.user_id,
                     Client.xero_contact_id.isnot(None)
                 )
             )
-            all_synced_clients = result.scalars().all()
+            clients_by_contact = {c.xero_contact_id: c for c in result.scalars().all()}
+            synced_at = datetime.now(timezone.utc)
 
-            for client in all_synced_clients:
-                if client.xero_contact_id not in invoices_by_contact:
-                    billing_config = client.billing_config or {}
+            # Update each client with their outstanding invoices
+            invoices_by_client_id: Dict[str, List[Dict]] = {}
+            for contact_id, invoices in invoices_by_contact.items():
+                client = clients_by_contact.get(contact_id)
+                if client:
+                    # Update billing_config with outstanding invoices
+                    billing_config = dict(client.billing_config or {})
+                    billing_config["outstanding_invoices"] = invoices
+                    billing_config["invoices_synced_at"] = synced_at.isoformat()
+                    client.billing_config = billing_config
+                    client.last_synced_at = synced_at
+                    invoices_by_client_id[client.id] = invoices
+                    clients_updated += 1
+                else:
+                    # Client doesn't exist in Tamio - they may need to sync contacts first
+                    contact_name = invoices[0].get("contact_name", contact_id)
+                    errors.append(f"No client found for Xero contact: {contact_name}")
+
+            # Also clear outstanding_invoices for clients with no current invoices
+            # (in case an invoice was paid since last sync)
+            for contact_id, client in clients_by_contact.items():
+                if contact_id not in invoices_by_contact:
+                    billing_config = dict(client.billing_config or {})
                     if "outstanding_invoices" in billing_config:
                         # Clear old invoices that are no longer outstanding
                         billing_config["outstanding_invoices"] = []
-                        billing_config["invoices_synced_at"] = datetime.now(timezone.utc).isoformat()
+                        billing_config["invoices_synced_at"] = synced_at.isoformat()
                         client.billing_config = billing_config
 
+            # Replace the normalised receivables in the same transaction
+            await sync_xero_receivables(self.db, self.user_id, invoices_by_client_id)
+            if clients_by_contact:
+                await changes.mark_changed(self.db, self.user_id, changes.CLIENT)
+
             await self.db.commit()
             await self._log_sync(
                 "invoices_pull",
@@ -0,0 +1,391 @@
+"""Xero webhook intake and processing.
+
+Xero posts change notifications (invoice and contact CREATE/UPDATE events)
+to POST /xero/webhooks:
+1. the payload signature is checked against XERO_WEBHOOK_KEY
+2. events are recorded in xero_webhook_events. Pending events coalesce per
+   (tenant, resource type, resource), so a burst of updates to one invoice
+   is fetched once
+3. process_pending_events claims pending rows (FOR UPDATE SKIP LOCKED),
+   fetches only the changed invoices and contacts for each tenant
+   (sync_xero_changes) and runs the detections those changes can affect
+
+Failed rows go back to pending until XERO_WEBHOOK_MAX_ATTEMPTS; rows whose
+sync was deferred for the tenant's Xero call budget go back without using
+an attempt. Rows left
+processing for XERO_WEBHOOK_CLAIM_TIMEOUT_MINUTES (a worker crashed or was
+cancelled mid-batch) are failed and re-queued the same way by
+release_stale_claims.
+"""
+import base64
+import hashlib
+import hmac
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.detection.models import DetectionType
+from app.models.base import generate_id
+from app.xero.models import XeroConnection, XeroWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+INVOICE = "INVOICE"
+CONTACT = "CONTACT"
+
+# Detections that can change when an entity of the category changes
+DETECTIONS_BY_CATEGORY: Dict[str, Tuple[DetectionType, ...]] = {
+    INVOICE: (
+        DetectionType.LATE_PAYMENT,
+        DetectionType.UNEXPECTED_REVENUE,
+        DetectionType.REVENUE_VARIANCE,
+        DetectionType.PAYMENT_TIMING_CONFLICT,
+        DetectionType.BUFFER_BREACH,
+        DetectionType.RUNWAY_THRESHOLD,
+        DetectionType.PAYROLL_SAFETY,
+    ),
+    CONTACT: (
+        DetectionType.CLIENT_CHURN,
+        DetectionType.LATE_PAYMENT,
+        DetectionType.VENDOR_TERMS_EXPIRING,
+    ),
+}
+
+ChangeSyncFn = Callable[..., Awaitable[dict]]
+DetectFn = Callable[..., Awaitable[dict]]
+
+
+# ============================================================================
+# INTAKE
+# ============================================================================
+
+def verify_webhook_signature(body: bytes, signature: Optional[str], key: Optional[str] = None) -> bool:
+    """
+    Check the x-xero-signature header: base64 HMAC-SHA256 of the raw body.
+
+    Always False when no webhook key is configured.
+    """
+    key = settings.XERO_WEBHOOK_KEY if key is None else key
+    if not key or not signature:
+        return False
+    expected = base64.b64encode(hmac.new(key.encode(), body, hashlib.sha256).digest()).decode()
+    return hmac.compare_digest(expected, signature)
+
+
+def _event_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse Xero's eventDateUtc (ISO 8601, UTC, no offset)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def coalesce_events(events: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reduce a webhook payload to one row per (tenant, category, resource).
+
+    Only invoice and contact events are kept.
+    """
+    rows: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for event in events:
+        category = (event.get("eventCategory") or "").upper()
+        tenant_id = event.get("tenantId")
+        resource_id = event.get("resourceId")
+        if category not in DETECTIONS_BY_CATEGORY or not tenant_id or not resource_id:
+            continue
+
+        at = _event_time(event.get("eventDateUtc"))
+        key = (tenant_id, category, resource_id)
+        row = rows.get(key)
+        if row is None:
+            rows[key] = {
+                "tenant_id": tenant_id,
+                "resource_type": category,
+                "resource_id": resource_id,
+                "event_type": event.get("eventType") or "UPDATE",
+                "event_count": 1,
+                "first_event_at": at,
+                "last_event_at": at,
+            }
+            continue
+
+        row["event_count"] += 1
+        if at is not None and (row["last_event_at"] is None or at >= row["last_event_at"]):
+            row["last_event_at"] = at
+            row["event_type"] = event.get("eventType") or row["event_type"]
+        if at is not None and (row["first_event_at"] is None or at < row["first_event_at"]):
+            row["first_event_at"] = at
+    return list(rows.values())
+
+
+async def _upsert_pending(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert pending rows, merging into the entity's existing pending row."""
+    values = [
+        {"id": generate_id("xwh"), "status": "pending", "attempts": 0, **row}
+        for row in rows
+    ]
+    stmt = pg_insert(XeroWebhookEvent).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            XeroWebhookEvent.tenant_id,
+            XeroWebhookEvent.resource_type,
+            XeroWebhookEvent.resource_id,
+        ],
+        index_where=text("status = 'pending'"),
+        set_={
+            "event_count": XeroWebhookEvent.event_count + stmt.excluded.event_count,
+            "event_type": stmt.excluded.event_type,
+            "first_event_at": func.least(XeroWebhookEvent.first_event_at, stmt.excluded.first_event_at),
+            "last_event_at": func.greatest(XeroWebhookEvent.last_event_at, stmt.excluded.last_event_at),
+            "attempts": func.greatest(XeroWebhookEvent.attempts, stmt.excluded.attempts),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def record_webhook_events(db: AsyncSession, events: Sequence[Dict[str, Any]]) -> int:
+    """
+    Record a webhook payload's events in the intake table.
+
+    Does not commit. Returns the number of entities recorded.
+    """
+    rows = coalesce_events(events)
+    if rows:
+        await _upsert_pending(db, rows)
+    return len(rows)
+
+
+# ============================================================================
+# PROCESSING
+# ============================================================================
+
+# Columns a claimed event carries through processing and re-queueing
+_EVENT_COLUMNS = (
+    XeroWebhookEvent.id,
+    XeroWebhookEvent.tenant_id,
+    XeroWebhookEvent.resource_type,
+    XeroWebhookEvent.resource_id,
+    XeroWebhookEvent.event_type,
+    XeroWebhookEvent.event_count,
+    XeroWebhookEvent.first_event_at,
+    XeroWebhookEvent.last_event_at,
+    XeroWebhookEvent.attempts,
+)
+
+
+async def _claim_pending(db: AsyncSession, limit: int) -> List[Any]:
+    """Mark a batch of pending rows processing; other workers skip locked rows."""
+    pending = (
+        select(XeroWebhookEvent.id)
+        .where(XeroWebhookEvent.status == "pending")
+        .order_by(XeroWebhookEvent.received_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(XeroWebhookEvent)
+        .where(XeroWebhookEvent.id.in_(pending.scalar_subquery()))
+        .values(
+            status="processing",
+            attempts=XeroWebhookEvent.attempts + 1,
+            claimed_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+        .returning(*_EVENT_COLUMNS)
+    )
+    return list(result.all())
+
+
+async def _finish(db: AsyncSession, events: Sequence[Any], status: str, error: Optional[str] = None) -> None:
+    await db.execute(
+        update(XeroWebhookEvent)
+        .where(XeroWebhookEvent.id.in_([event.id for event in events]))
+        .values(status=status, error=error, processed_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _load_tenant_users(db: AsyncSession, tenant_ids: Set[str]) -> Dict[str, List[str]]:
+    result = await db.execute(
+        select(XeroConnection.tenant_id, XeroConnection.user_id)
+        .where(XeroConnection.tenant_id.in_(tenant_ids))
+        .where(XeroConnection.is_active == True)
+    )
+    users: Dict[str, List[str]] = defaultdict(list)
+    for row in result.all():
+        users[row.tenant_id].append(row.user_id)
+    return users
+
+
+def detection_types_for(events: Sequence[Any]) -> List[DetectionType]:
+    """The detection types the given change events can affect."""
+    types: List[DetectionType] = []
+    for category in sorted({event.resource_type for event in events}):
+        for detection_type in DETECTIONS_BY_CATEGORY.get(category, ()):
+            if detection_type not in types:
+                types.append(detection_type)
+    return types
+
+
+async def _fail(
+    db: AsyncSession,
+    events: Sequence[Any],
+    error: str,
+    max_attempts: int,
+    count_attempt: bool = True,
+) -> int:
+    """
+    Mark events failed and re-queue those with attempts left. Returns the re-queued count.
+
+    Without count_attempt the claim's attempt is given back, for events
+    that were never tried (e.g. deferred for the Xero call budget).
+    """
+    await _finish(db, events, "failed", error)
+    retry = [
+        {
+            "tenant_id": event.tenant_id,
+            "resource_type": event.resource_type,
+            "resource_id": event.resource_id,
+            "event_type": event.event_type,
+            "event_count": event.event_count,
+            "first_event_at": event.first_event_at,
+            "last_event_at": event.last_event_at,
+            "attempts": event.attempts if count_attempt else event.attempts - 1,
+        }
+        for event in events
+        if event.attempts < max_attempts or not count_attempt
+    ]
+    if retry:
+        # Merges into any pending row that arrived while these were processing
+        await _upsert_pending(db, retry)
+    return len(retry)
+
+
+async def release_stale_claims(
+    db: AsyncSession,
+    timeout: Optional[timedelta] = None,
+    max_attempts: Optional[int] = None,
+) -> int:
+    """
+    Re-queue events left processing by a worker that never finished them.
+
+    Events claimed longer than `timeout` ago are failed and, with attempts
+    left, merged back into the entity's pending row. Does not commit.
+    Returns the number of events released.
+    """
+    timeout = timeout or timedelta(minutes=settings.XERO_WEBHOOK_CLAIM_TIMEOUT_MINUTES)
+    max_attempts = max_attempts or settings.XERO_WEBHOOK_MAX_ATTEMPTS
+    cutoff = datetime.now(timezone.utc) - timeout
+
+    result = await db.execute(
+        select(*_EVENT_COLUMNS)
+        .where(XeroWebhookEvent.status == "processing")
+        .where(or_(
+            XeroWebhookEvent.claimed_at < cutoff,
+            # Claimed before claimed_at was recorded
+            XeroWebhookEvent.claimed_at.is_(None) & (XeroWebhookEvent.received_at < cutoff),
+        ))
+        .with_for_update(skip_locked=True)
+    )
+    stale = list(result.all())
+    if stale:
+        requeued = await _fail(db, stale, "Claim expired before processing finished", max_attempts)
+        logger.warning(f"Released {len(stale)} stale Xero webhook claims, {requeued} re-queued")
+    return len(stale)
+
+
+async def process_pending_events(
+    db: AsyncSession,
+    sync: Optional[ChangeSyncFn] = None,
+    detect: Optional[DetectFn] = None,
+    batch_size: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Process one batch of pending webhook events.
+
+    The claim is committed before any Xero call, so events arriving for the
+    same entities meanwhile queue as new pending rows. Each user's targeted
+    sync commits on its own; detections run after a successful sync, scoped
+    to the types the changed entities can affect.
+    """
+    if sync is None:
+        from app.xero.sync import sync_xero_changes
+        sync = sync_xero_changes
+    if detect is None:
+        from app.detection.scheduler import run_detections_after_sync
+        detect = run_detections_after_sync
+    batch_size = batch_size or settings.XERO_WEBHOOK_BATCH_SIZE
+    max_attempts = max_attempts or settings.XERO_WEBHOOK_MAX_ATTEMPTS
+
+    summary = {"claimed": 0, "users_synced": 0, "done": 0, "failed": 0, "requeued": 0, "deferred": 0}
+
+    claimed = await _claim_pending(db, batch_size)
+    await db.commit()
+    summary["claimed"] = len(claimed)
+    if not claimed:
+        return summary
+
+    by_tenant: Dict[str, List[Any]] = defaultdict(list)
+    for event in claimed:
+        by_tenant[event.tenant_id].append(event)
+    users_by_tenant = await _load_tenant_users(db, set(by_tenant))
+
+    for tenant_id, events in by_tenant.items():
+        user_ids = users_by_tenant.get(tenant_id)
+        if not user_ids:
+            await _finish(db, events, "failed", "No active Xero connection for tenant")
+            summary["failed"] += len(events)
+            await db.commit()
+            continue
+
+        invoice_ids = sorted({e.resource_id for e in events if e.resource_type == INVOICE})
+        contact_ids = sorted({e.resource_id for e in events if e.resource_type == CONTACT})
+
+        error = None
+        deferred = None
+        synced_users = []
+        for user_id in user_ids:
+            try:
+                result = await sync(db, user_id, invoice_ids=invoice_ids, contact_ids=contact_ids)
+                if result.get("deferred"):
+                    # The tenant's budget is shared, so its other users would wait too
+                    deferred = result.get("message", "Xero call budget used up")
+                    break
+                if not result.get("success", True):
+                    raise RuntimeError(result.get("message", "Sync failed"))
+                synced_users.append(user_id)
+            except Exception as e:
+                await db.rollback()
+                error = str(e)
+                logger.error(f"Webhook sync failed for user {user_id}: {e}")
+
+        if deferred is not None:
+            summary["deferred"] += len(events)
+            summary["requeued"] += await _fail(db, events, deferred, max_attempts, count_attempt=False)
+        elif error is None:
+            await _finish(db, events, "done")
+            summary["done"] += len(events)
+        else:
+            summary["failed"] += len(events)
+            summary["requeued"] += await _fail(db, events, error, max_attempts)
+        await db.commit()
+
+        summary["users_synced"] += len(synced_users)
+        detection_types = detection_types_for(events)
+        for user_id in synced_users:
+            try:
+                await detect(user_id, "xero_webhook", detection_types=detection_types)
+            except Exception as e:
+                logger.error(f"Post-webhook detections failed for user {user_id}: {e}")
+
+    return summary
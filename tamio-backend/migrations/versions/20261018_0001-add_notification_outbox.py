@@ -0,0 +1,75 @@
+"""Add notification outbox table
+
+Revision ID: notification_outbox_001
+Revises: drop_cash_events_001
+Create Date: 2026-10-18
+
+Adds notification_outbox so detection runs can enqueue alert notifications
+in the same transaction that creates the alert. A separate dispatcher job
+delivers them in batches. Also adds the "slack" notification channel so
+Slack deliveries are logged under their own channel.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "notification_outbox_001"
+down_revision: Union[str, None] = "drop_cash_events_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE notificationchannel ADD VALUE IF NOT EXISTS 'slack'")
+
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("alert_id", sa.String(), nullable=False),
+        sa.Column(
+            "notification_type",
+            sa.Enum(name="notificationtype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "channel",
+            sa.Enum(name="notificationchannel", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error_message", sa.String(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("dispatched_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["alert_id"], ["detection_alerts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_notification_outbox_status_created",
+        "notification_outbox",
+        ["status", "created_at"],
+    )
+
+    # Cooldown lookups filter delivered logs by alert within a time window
+    op.create_index(
+        "ix_notification_logs_alert_sent",
+        "notification_logs",
+        ["alert_id", "sent_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notification_logs_alert_sent", table_name="notification_logs")
+    op.drop_index("ix_notification_outbox_status_created", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
+    # Postgres cannot drop a single enum value; "slack" is left in place.
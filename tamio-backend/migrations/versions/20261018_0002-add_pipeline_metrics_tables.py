@@ -0,0 +1,171 @@
+"""Add pipeline metrics tables
+
+Revision ID: pipeline_metrics_001
+Revises: notification_outbox_001
+Create Date: 2026-10-18
+
+Adds typed per-run pipeline metrics (range-partitioned by month on run_at)
+and per-user daily rollups, so pipeline health no longer scans audit_logs
+and sums JSON fields in Python. Existing pipeline audit entries are
+backfilled into the new tables.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "pipeline_metrics_001"
+down_revision: Union[str, None] = "notification_outbox_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Monthly partitions created up front; the scheduler keeps adding more
+PARTITION_MONTHS_BACK = 12
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE pipeline_run_metrics (
+            id VARCHAR NOT NULL,
+            run_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            user_id VARCHAR NOT NULL,
+            run_id VARCHAR NOT NULL,
+            mode VARCHAR NOT NULL,
+            alerts_detected INTEGER NOT NULL DEFAULT 0,
+            actions_prepared INTEGER NOT NULL DEFAULT 0,
+            escalations_applied INTEGER NOT NULL DEFAULT 0,
+            detection_ms INTEGER NOT NULL DEFAULT 0,
+            preparation_ms INTEGER NOT NULL DEFAULT 0,
+            escalation_ms INTEGER NOT NULL DEFAULT 0,
+            total_ms INTEGER NOT NULL DEFAULT 0,
+            has_errors BOOLEAN NOT NULL DEFAULT false,
+            PRIMARY KEY (id, run_at)
+        ) PARTITION BY RANGE (run_at)
+    """)
+    op.execute("CREATE TABLE pipeline_run_metrics_default PARTITION OF pipeline_run_metrics DEFAULT")
+
+    this_month = date.today().replace(day=1)
+    for offset in range(-PARTITION_MONTHS_BACK, PARTITION_MONTHS_AHEAD + 1):
+        start = _add_months(this_month, offset)
+        end = _add_months(start, 1)
+        op.execute(
+            f"CREATE TABLE pipeline_run_metrics_y{start.year:04d}m{start.month:02d} "
+            f"PARTITION OF pipeline_run_metrics "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    op.create_index(
+        "ix_pipeline_run_metrics_user_run_at",
+        "pipeline_run_metrics",
+        ["user_id", "run_at"],
+    )
+
+    op.create_table(
+        "pipeline_daily_rollups",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("runs", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("successful_runs", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_duration_ms", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_duration_ms", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("alerts_detected", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("actions_prepared", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("escalations_applied", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+
+    op.create_table(
+        "pipeline_daily_type_counts",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("user_id", "day", "kind", "type"),
+    )
+
+    # Backfill from pipeline audit entries; new_value holds the run result
+    # (PipelineResult.to_dict)
+    op.execute("""
+        INSERT INTO pipeline_run_metrics (
+            id, run_at, user_id, run_id, mode,
+            alerts_detected, actions_prepared, escalations_applied,
+            detection_ms, preparation_ms, escalation_ms, total_ms, has_errors
+        )
+        SELECT
+            'prm_' || substr(md5(id), 1, 12),
+            created_at,
+            user_id,
+            entity_id,
+            COALESCE(new_value->>'mode', 'full'),
+            COALESCE((new_value->'detection'->>'alerts_detected')::int, 0),
+            COALESCE((new_value->'preparation'->>'actions_prepared')::int, 0),
+            COALESCE((new_value->'escalation'->>'escalations_applied')::int, 0),
+            COALESCE((new_value->'performance'->>'detection_ms')::int, 0),
+            COALESCE((new_value->'performance'->>'preparation_ms')::int, 0),
+            COALESCE((new_value->'performance'->>'escalation_ms')::int, 0),
+            COALESCE((new_value->'performance'->>'total_ms')::int, 0),
+            CASE WHEN jsonb_typeof(new_value->'errors') = 'array'
+                 THEN jsonb_array_length(new_value->'errors') > 0
+                 ELSE false END
+        FROM audit_logs
+        WHERE entity_type = 'pipeline' AND action = 'create' AND user_id IS NOT NULL
+    """)
+    op.execute("""
+        INSERT INTO pipeline_daily_rollups (
+            user_id, day, runs, successful_runs, total_duration_ms, max_duration_ms,
+            alerts_detected, actions_prepared, escalations_applied
+        )
+        SELECT
+            user_id,
+            (run_at AT TIME ZONE 'UTC')::date,
+            count(*),
+            count(*) FILTER (WHERE NOT has_errors),
+            sum(total_ms),
+            max(total_ms),
+            sum(alerts_detected),
+            sum(actions_prepared),
+            sum(escalations_applied)
+        FROM pipeline_run_metrics
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        INSERT INTO pipeline_daily_type_counts (user_id, day, kind, type, count)
+        SELECT user_id, day, kind, type, sum(count)
+        FROM (
+            SELECT user_id, (created_at AT TIME ZONE 'UTC')::date AS day, 'alert' AS kind,
+                   t.key AS type, t.value::int AS count
+            FROM audit_logs, jsonb_each_text(new_value->'detection'->'by_type') AS t
+            WHERE entity_type = 'pipeline' AND action = 'create' AND user_id IS NOT NULL
+            UNION ALL
+            SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, 'action',
+                   t.key, t.value::int
+            FROM audit_logs, jsonb_each_text(new_value->'preparation'->'by_type') AS t
+            WHERE entity_type = 'pipeline' AND action = 'create' AND user_id IS NOT NULL
+        ) counts
+        WHERE count > 0
+        GROUP BY user_id, day, kind, type
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("pipeline_daily_type_counts")
+    op.drop_table("pipeline_daily_rollups")
+    # Dropping the parent drops every partition
+    op.execute("DROP TABLE pipeline_run_metrics")
@@ -0,0 +1,153 @@
+"""Partition audit_logs by month
+
+Revision ID: audit_logs_partitioned_001
+Revises: pipeline_metrics_001
+Create Date: 2026-10-18
+
+Rebuilds audit_logs as a table range-partitioned by month on created_at,
+so retention can detach and archive whole months and history queries
+prune to the partitions they need. The primary key becomes
+(id, created_at), as Postgres requires the partition key in it.
+
+The context column is created as extra_data, matching the model. The
+original table named it "metadata".
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = "audit_logs_partitioned_001"
+down_revision: Union[str, None] = "pipeline_metrics_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PARTITION_MONTHS_AHEAD = 3
+
+OLD_INDEXES = [
+    "ix_audit_log_entity_type",
+    "ix_audit_log_entity_id",
+    "ix_audit_log_action",
+    "ix_audit_log_user_id",
+    "ix_audit_log_created_at",
+    "ix_audit_log_entity",
+    "ix_audit_log_entity_action",
+    "ix_audit_log_user_time",
+    "ix_audit_log_source",
+]
+
+NEW_INDEXES = [
+    ("ix_audit_log_entity", ["entity_type", "entity_id", "created_at"]),
+    ("ix_audit_log_entity_action", ["entity_type", "action"]),
+    ("ix_audit_log_user_time", ["user_id", "created_at"]),
+    ("ix_audit_log_action_time", ["action", "created_at"]),
+    ("ix_audit_log_source", ["source"]),
+    ("ix_audit_log_created_at", ["created_at"]),
+]
+
+COLUMNS = (
+    "id, entity_type, entity_id, action, field_name, old_value, new_value, "
+    "user_id, source, {context}, notes, created_at"
+)
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    audit_columns = {c["name"] for c in sa.inspect(bind).get_columns("audit_logs")}
+    context_column = "extra_data" if "extra_data" in audit_columns else "metadata"
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+    op.execute("ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey")
+    for name in OLD_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id VARCHAR NOT NULL,
+            entity_type VARCHAR NOT NULL,
+            entity_id VARCHAR NOT NULL,
+            action VARCHAR NOT NULL,
+            field_name VARCHAR,
+            old_value JSONB,
+            new_value JSONB,
+            user_id VARCHAR,
+            source VARCHAR NOT NULL DEFAULT 'api',
+            extra_data JSONB,
+            notes TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM audit_logs_legacy")).scalar()
+    this_month = date.today().replace(day=1)
+    start = oldest.date().replace(day=1) if oldest else this_month
+    last = _add_months(this_month, PARTITION_MONTHS_AHEAD)
+    while start <= last:
+        end = _add_months(start, 1)
+        op.execute(
+            f"CREATE TABLE audit_logs_y{start.year:04d}m{start.month:02d} "
+            f"PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+
+    for name, columns in NEW_INDEXES:
+        op.create_index(name, "audit_logs", columns)
+
+    op.execute(
+        f"INSERT INTO audit_logs ({COLUMNS.format(context='extra_data')}) "
+        f"SELECT {COLUMNS.format(context=context_column)} FROM audit_logs_legacy"
+    )
+    op.execute("DROP TABLE audit_logs_legacy")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+    for name, _ in NEW_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("entity_type", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.String(), nullable=False),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("field_name", sa.String(), nullable=True),
+        sa.Column("old_value", JSONB, nullable=True),
+        sa.Column("new_value", JSONB, nullable=True),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("source", sa.String(), nullable=False, server_default="api"),
+        sa.Column("extra_data", JSONB, nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_audit_log_entity_type", "audit_logs", ["entity_type"])
+    op.create_index("ix_audit_log_entity_id", "audit_logs", ["entity_id"])
+    op.create_index("ix_audit_log_action", "audit_logs", ["action"])
+    op.create_index("ix_audit_log_user_id", "audit_logs", ["user_id"])
+    op.create_index("ix_audit_log_created_at", "audit_logs", ["created_at"])
+    op.create_index("ix_audit_log_entity", "audit_logs", ["entity_type", "entity_id"])
+    op.create_index("ix_audit_log_entity_action", "audit_logs", ["entity_type", "action"])
+    op.create_index("ix_audit_log_user_time", "audit_logs", ["user_id", "created_at"])
+    op.create_index("ix_audit_log_source", "audit_logs", ["source"])
+
+    op.execute(
+        f"INSERT INTO audit_logs ({COLUMNS.format(context='extra_data')}) "
+        f"SELECT {COLUMNS.format(context='extra_data')} FROM audit_logs_partitioned"
+    )
+    # Dropping the parent drops every partition
+    op.execute("DROP TABLE audit_logs_partitioned")
@@ -0,0 +1,99 @@
+"""Add receivables table
+
+Revision ID: receivables_001
+Revises: audit_logs_partitioned_001
+Create Date: 2026-10-18
+
+Normalises outstanding invoices out of clients.billing_config JSON into an
+indexed receivables table keyed by (user_id, expected_date), so AR within
+N days is a range aggregate. Existing billing_config outstanding_invoices
+are backfilled; entries without a valid date or amount are skipped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "receivables_001"
+down_revision: Union[str, None] = "audit_logs_partitioned_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}"
+AMOUNT_PATTERN = r"^-?\d+(\.\d+)?$"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "receivables",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("client_id", sa.String(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False, server_default="xero"),
+        sa.Column("external_id", sa.String(), nullable=True),
+        sa.Column("invoice_number", sa.String(), nullable=True),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("amount", sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column("currency", sa.String(), nullable=False, server_default="USD"),
+        sa.Column("expected_date", sa.Date(), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=True),
+        sa.Column("payment_terms", sa.String(), nullable=True),
+        sa.Column("synced_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["client_id"], ["clients.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "source", "external_id", name="uq_receivables_user_source_external"),
+    )
+    op.create_index("ix_receivables_user_expected", "receivables", ["user_id", "expected_date"])
+    op.create_index("ix_receivables_client_id", "receivables", ["client_id"])
+
+    # Backfill from billing_config. The same Xero invoice can only appear
+    # under one client, but DISTINCT ON guards the unique constraint.
+    op.execute(f"""
+        INSERT INTO receivables (
+            id, user_id, client_id, source, external_id, invoice_number, name,
+            amount, currency, expected_date, due_date, payment_terms, synced_at
+        )
+        SELECT DISTINCT ON (user_id, source, coalesce(external_id, id))
+            id, user_id, client_id, source, external_id, invoice_number, name,
+            amount, currency, expected_date, due_date, payment_terms, synced_at
+        FROM (
+            SELECT
+                'recv_' || substr(md5(c.id || ':' || inv.ordinality::text), 1, 12) AS id,
+                c.user_id,
+                c.id AS client_id,
+                CASE WHEN inv.value->>'xero_invoice_id' IS NOT NULL THEN 'xero' ELSE 'manual' END AS source,
+                inv.value->>'xero_invoice_id' AS external_id,
+                inv.value->>'invoice_number' AS invoice_number,
+                inv.value->>'name' AS name,
+                (inv.value->>'amount')::numeric AS amount,
+                coalesce(inv.value->>'currency', c.currency, 'USD') AS currency,
+                substr(coalesce(inv.value->>'expected_date', inv.value->>'due_date'), 1, 10)::date AS expected_date,
+                CASE WHEN inv.value->>'due_date' ~ '{DATE_PATTERN}'
+                     THEN substr(inv.value->>'due_date', 1, 10)::date END AS due_date,
+                inv.value->>'payment_terms' AS payment_terms,
+                CASE WHEN c.billing_config->>'invoices_synced_at' IS NOT NULL
+                     THEN (c.billing_config->>'invoices_synced_at')::timestamptz END AS synced_at
+            FROM clients c,
+                 jsonb_array_elements(c.billing_config->'outstanding_invoices') WITH ORDINALITY AS inv(value, ordinality)
+            WHERE jsonb_typeof(c.billing_config->'outstanding_invoices') = 'array'
+              AND coalesce(inv.value->>'expected_date', inv.value->>'due_date') ~ '{DATE_PATTERN}'
+              AND inv.value->>'amount' ~ '{AMOUNT_PATTERN}'
+        ) invoices
+        ORDER BY user_id, source, coalesce(external_id, id), expected_date
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_receivables_client_id", table_name="receivables")
+    op.drop_index("ix_receivables_user_expected", table_name="receivables")
+    op.drop_table("receivables")
@@ -0,0 +1,36 @@
+"""Add ai_draft_status to action options
+
+Revision ID: ai_draft_status_001
+Revises: rate_limit_buckets_001
+Create Date: 2026-10-18
+
+Email options are saved with their template text and marked "pending";
+the AI drafting job enhances them in the background. The partial index
+keeps the pending-queue scan small once most options are done.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ai_draft_status_001"
+down_revision: Union[str, None] = "rate_limit_buckets_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("action_options", sa.Column("ai_draft_status", sa.String(), nullable=True))
+    op.create_index(
+        "ix_action_options_ai_draft_pending",
+        "action_options",
+        ["created_at"],
+        postgresql_where=sa.text("ai_draft_status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_action_options_ai_draft_pending", table_name="action_options")
+    op.drop_column("action_options", "ai_draft_status")
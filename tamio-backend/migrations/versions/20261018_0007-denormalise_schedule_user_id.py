@@ -0,0 +1,64 @@
+"""Denormalise user_id onto obligation schedules
+
+Revision ID: schedule_user_id_001
+Revises: ai_draft_status_001
+Create Date: 2026-10-18
+
+Forecast, detection, health, reconciliation and TAMI queries all filtered
+schedules by user through a join to obligation_agreements. Schedules now
+carry user_id (backfilled from their agreement) with composite indexes so
+those queries become range scans on one table:
+- (user_id, status, due_date) for open/overdue schedule lookups
+- (user_id, due_date) INCLUDE (estimated_amount) for forecast windows
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "schedule_user_id_001"
+down_revision: Union[str, None] = "ai_draft_status_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("obligation_schedules", sa.Column("user_id", sa.String(), nullable=True))
+
+    op.execute("""
+        UPDATE obligation_schedules AS s
+        SET user_id = a.user_id
+        FROM obligation_agreements AS a
+        WHERE a.id = s.obligation_id
+          AND s.user_id IS NULL
+    """)
+
+    op.alter_column("obligation_schedules", "user_id", nullable=False)
+    op.create_foreign_key(
+        "fk_obligation_schedules_user_id",
+        "obligation_schedules",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        "ix_obligation_schedules_user_status_due",
+        "obligation_schedules",
+        ["user_id", "status", "due_date"],
+    )
+    op.create_index(
+        "ix_obligation_schedules_user_due",
+        "obligation_schedules",
+        ["user_id", "due_date"],
+        postgresql_include=["estimated_amount"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_obligation_schedules_user_due", table_name="obligation_schedules")
+    op.drop_index("ix_obligation_schedules_user_status_due", table_name="obligation_schedules")
+    op.drop_constraint("fk_obligation_schedules_user_id", "obligation_schedules", type_="foreignkey")
+    op.drop_column("obligation_schedules", "user_id")
@@ -0,0 +1,32 @@
+"""Index payment events in listing order
+
+Revision ID: payment_keyset_001
+Revises: schedule_user_id_001
+Create Date: 2026-10-18
+
+The payment listings page by keyset on (payment_date, id) within a user.
+(user_id, payment_date, id) lets each page start with an index seek
+instead of sorting every payment the user has.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "payment_keyset_001"
+down_revision: Union[str, None] = "schedule_user_id_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_payment_events_user_date_id",
+        "payment_events",
+        ["user_id", "payment_date", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payment_events_user_date_id", table_name="payment_events")
@@ -0,0 +1,33 @@
+"""Record per-stage durations on Xero sync logs
+
+Revision ID: xero_stage_durations_001
+Revises: payment_keyset_001
+Create Date: 2026-10-18
+
+The Xero sync runs as a pipeline (concurrent fetch, then contacts,
+invoices, repeating invoices, suppliers and obligations). Each log now
+stores how long every stage took, in milliseconds.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "xero_stage_durations_001"
+down_revision: Union[str, None] = "payment_keyset_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "xero_sync_logs",
+        sa.Column("stage_durations_ms", postgresql.JSONB(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("xero_sync_logs", "stage_durations_ms")
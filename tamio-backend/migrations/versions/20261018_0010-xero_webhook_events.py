@@ -0,0 +1,59 @@
+"""Add Xero webhook event intake table
+
+Revision ID: xero_webhook_events_001
+Revises: xero_stage_durations_001
+Create Date: 2026-10-18
+
+Xero webhooks record INVOICE and CONTACT change events here. A partial
+unique index on pending rows coalesces repeated events for one entity,
+so each changed invoice or contact is fetched once per processing run.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "xero_webhook_events_001"
+down_revision: Union[str, None] = "xero_stage_durations_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "xero_webhook_events",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("tenant_id", sa.String(), nullable=False),
+        sa.Column("resource_type", sa.String(), nullable=False),
+        sa.Column("resource_id", sa.String(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("first_event_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_event_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("received_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_xero_webhook_events_pending",
+        "xero_webhook_events",
+        ["tenant_id", "resource_type", "resource_id"],
+        unique=True,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index(
+        "ix_xero_webhook_events_status_received",
+        "xero_webhook_events",
+        ["status", "received_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_xero_webhook_events_status_received", table_name="xero_webhook_events")
+    op.drop_index("uq_xero_webhook_events_pending", table_name="xero_webhook_events")
+    op.drop_table("xero_webhook_events")
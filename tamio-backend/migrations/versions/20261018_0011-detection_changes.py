@@ -0,0 +1,38 @@
+"""Track data changes for targeted detection sweeps
+
+Revision ID: detection_changes_001
+Revises: xero_webhook_events_001
+Create Date: 2026-10-18
+
+One row per user and entity type (client, expense_bucket, obligation,
+payment, cash_account) holding when that kind of data last changed.
+The critical and routine detection sweeps read it to run only the
+detectors affected by recent changes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "detection_changes_001"
+down_revision: Union[str, None] = "xero_webhook_events_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "detection_changes",
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("entity_type", sa.String(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "entity_type"),
+    )
+    op.create_index("ix_detection_changes_changed_at", "detection_changes", ["changed_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_detection_changes_changed_at", table_name="detection_changes")
+    op.drop_table("detection_changes")
@@ -0,0 +1,32 @@
+"""Record when Xero webhook events are claimed
+
+Revision ID: xero_webhook_claimed_at_001
+Revises: detection_changes_001
+Create Date: 2026-10-18
+
+Events claimed by a worker that crashed or was cancelled stay in
+"processing"; claimed_at lets the processing job re-queue them once the
+claim times out.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "xero_webhook_claimed_at_001"
+down_revision: Union[str, None] = "detection_changes_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "xero_webhook_events",
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("xero_webhook_events", "claimed_at")
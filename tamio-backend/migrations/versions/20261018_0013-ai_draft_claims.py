@@ -0,0 +1,42 @@
+"""Record AI draft claims on action options
+
+Revision ID: ai_draft_claims_001
+Revises: xero_webhook_claimed_at_001
+Create Date: 2026-10-18
+
+The drafting job commits its claim ("processing") before calling the
+model. Options claimed by a worker that crashed or was cancelled stay
+"processing"; ai_draft_claimed_at lets the job re-queue them once the
+claim times out, and ai_draft_attempts bounds how often that happens.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ai_draft_claims_001"
+down_revision: Union[str, None] = "xero_webhook_claimed_at_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("action_options", sa.Column("ai_draft_claimed_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        "action_options",
+        sa.Column("ai_draft_attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_action_options_ai_draft_processing",
+        "action_options",
+        ["ai_draft_claimed_at"],
+        postgresql_where=sa.text("ai_draft_status = 'processing'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_action_options_ai_draft_processing", table_name="action_options")
+    op.drop_column("action_options", "ai_draft_attempts")
+    op.drop_column("action_options", "ai_draft_claimed_at")
@@ -0,0 +1,37 @@
+"""Order detection changes by writing transaction
+
+Revision ID: detection_change_xid_001
+Revises: ai_draft_claims_001
+Create Date: 2026-10-18
+
+changed_at is stamped when mark_changed runs, not when the transaction
+commits, so a long writer's changes could land behind a sweep's
+time-based watermark and be skipped. change_xid records the writing
+transaction's id; sweeps read changes from transactions that had not
+finished when the previous sweep planned (see app/detection/changes.py).
+Existing rows get 0; the first sweep after a restart is a full one.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "detection_change_xid_001"
+down_revision: Union[str, None] = "ai_draft_claims_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "detection_changes",
+        sa.Column("change_xid", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+    )
+    op.create_index("ix_detection_changes_change_xid", "detection_changes", ["change_xid"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_detection_changes_change_xid", table_name="detection_changes")
+    op.drop_column("detection_changes", "change_xid")
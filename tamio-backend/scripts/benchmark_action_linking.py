@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Linked Action Detection Benchmark.
+
+Compares the old pairwise scan (every rule applied to every pending
+action, re-reading both actions' options for each pair) with LinkIndex
+for growing numbers of pending actions. Both produce the same links; the
+pairwise time grows with pending x batch while the index grows with the
+links found.
+
+Runs entirely in memory (no database needed).
+
+Usage:
+    python -m scripts.benchmark_action_linking
+    python -m scripts.benchmark_action_linking --sizes 250 500 1000 2000 --batch 50
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import app.data  # noqa: F401  (loads app.data before app.services)
+from app.models import ActionOption, PreparedAction
+from app.preparation.linking import LinkIndex, extract_features, pair_links
+from app.preparation.models import ActionType
+
+
+def make_actions(count: int, rng: random.Random, prefix: str) -> list:
+    types = list(ActionType)
+    clients = max(count // 4, 1)
+    vendors = max(count // 8, 1)
+    start = datetime(2026, 10, 1)
+    actions = []
+    for i in range(count):
+        content = {"client_id": f"c{rng.randrange(clients)}"} if rng.random() < 0.5 else {}
+        if rng.random() < 0.3:
+            content["vendor_id"] = f"v{rng.randrange(vendors)}"
+        if rng.random() < 0.1:
+            content["payments"] = [{"vendor_id": f"v{rng.randrange(vendors)}"} for _ in range(5)]
+        actions.append(PreparedAction(
+            id=f"{prefix}{i}",
+            user_id="bench",
+            action_type=rng.choice(types),
+            problem_summary="",
+            deadline=start + timedelta(hours=rng.randrange(24 * 90)),
+            options=[
+                ActionOption(prepared_content=content, cash_impact=rng.choice([0, 2000, 15000])),
+                ActionOption(prepared_content={}, cash_impact=0),
+            ],
+        ))
+    return actions
+
+
+def bench_pairwise(pending: list, batch: list) -> tuple:
+    start = time.perf_counter()
+    links = 0
+    candidates = pending + batch
+    for action in batch:
+        for other in candidates:
+            if other.id != action.id:
+                links += len(pair_links(extract_features(action), extract_features(other)))
+    return time.perf_counter() - start, links
+
+
+def bench_index(pending: list, batch: list) -> tuple:
+    start = time.perf_counter()
+    new_features = [extract_features(a) for a in batch]
+    index = LinkIndex([extract_features(a) for a in pending] + new_features)
+    links = sum(len(index.links_for(f)) for f in new_features)
+    return time.perf_counter() - start, links
+
+
+def main(sizes: list, batch_size: int, seed: int):
+    rng = random.Random(seed)
+    batch = make_actions(batch_size, rng, "new_")
+
+    print(f"Batch of {batch_size} new actions against N pending actions")
+    print("-" * 72)
+    print(f"{'N':>7} {'pairwise':>12} {'index':>12} {'speedup':>9} {'index us/pending':>17} {'links':>8}")
+    for size in sizes:
+        pending = make_actions(size, rng, "pending_")
+        pairwise, pairwise_links = bench_pairwise(pending, batch)
+        indexed, index_links = bench_index(pending, batch)
+        assert pairwise_links == index_links, "index and pairwise scan disagree"
+        print(
+            f"{size:>7} {pairwise * 1000:>10.1f}ms {indexed * 1000:>10.1f}ms "
+            f"{pairwise / indexed:>8.1f}x {indexed * 1e6 / size:>17.1f} {index_links:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark linked action detection")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200, 400, 800, 1600], help="Pending action counts")
+    parser.add_argument("--batch", type=int, default=50, help="New actions per batch")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    main(args.sizes, args.batch, args.seed)
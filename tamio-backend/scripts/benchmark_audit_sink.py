@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Audit Sink Throughput Benchmark.
+
+Compares per-event ORM writes (one AuditLog added + flushed per event, the
+old request-path behaviour) with the buffered AuditSink (multi-row INSERT
+batches from a background task).
+
+By default both paths run against a fake session that only simulates
+round-trip latency, so the script works without a database. Pass --real to
+write to the configured DATABASE_URL (rows are tagged with
+entity_type="benchmark" and deleted afterwards).
+
+Usage:
+    python -m scripts.benchmark_audit_sink
+    python -m scripts.benchmark_audit_sink --events 20000 --latency-ms 2
+    python -m scripts.benchmark_audit_sink --real
+"""
+import asyncio
+import argparse
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete
+
+from app.audit.sink import AuditSink
+from app.models.audit import AuditLog
+from app.models.base import generate_id
+
+
+def make_row(i: int) -> dict:
+    payload = {f"field_{n}": "x" * 32 for n in range(20)}
+    return {
+        "id": generate_id("audit"),
+        "entity_type": "benchmark",
+        "entity_id": f"bench_{i}",
+        "action": "create",
+        "user_id": None,
+        "source": "system",
+        "new_value": payload,
+        "extra_data": {"i": i},
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+class FakeSession:
+    """Session stand-in that charges a fixed latency per round trip."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.round_trips = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add(self, obj):
+        pass
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+
+    async def flush(self):
+        await self._round_trip()
+
+    async def execute(self, *args, **kwargs):
+        await self._round_trip()
+
+    async def commit(self):
+        await self._round_trip()
+
+
+async def bench_per_event(session_factory, events: int) -> float:
+    start = time.perf_counter()
+    async with session_factory() as session:
+        for i in range(events):
+            session.add(AuditLog(**make_row(i)))
+            await session.flush()
+        await session.commit()
+    return time.perf_counter() - start
+
+
+async def bench_sink(session_factory, events: int, batch_size: int) -> tuple:
+    sink = AuditSink(
+        capacity=max(batch_size * 4, 1000),
+        batch_size=batch_size,
+        flush_interval=0.05,
+        session_factory=session_factory,
+    )
+    await sink.start()
+
+    start = time.perf_counter()
+    for i in range(events):
+        await sink.enqueue(make_row(i))
+    enqueue_elapsed = time.perf_counter() - start
+
+    await sink.stop()
+    total_elapsed = time.perf_counter() - start
+    return enqueue_elapsed, total_elapsed, sink.stats
+
+
+async def main(events: int, batch_size: int, latency_ms: float, real: bool):
+    if real:
+        from app.database import AsyncSessionLocal
+        session_factory = AsyncSessionLocal
+    else:
+        fake = FakeSession(latency_ms / 1000)
+        session_factory = lambda: fake
+
+    print(f"Events: {events}, batch size: {batch_size}, backend: {'database' if real else f'fake ({latency_ms}ms/round trip)'}")
+    print("-" * 60)
+
+    per_event = await bench_per_event(session_factory, events)
+    print(f"Per-event ORM flush:   {per_event:8.3f}s  ({events / per_event:10.0f} events/s)")
+
+    enqueue_elapsed, total_elapsed, stats = await bench_sink(session_factory, events, batch_size)
+    print(f"Sink enqueue (caller): {enqueue_elapsed:8.3f}s  ({events / enqueue_elapsed:10.0f} events/s)")
+    print(f"Sink end-to-end:       {total_elapsed:8.3f}s  ({events / total_elapsed:10.0f} events/s)")
+    print(f"Sink stats: {stats}")
+
+    if real:
+        async with session_factory() as session:
+            await session.execute(delete(AuditLog).where(AuditLog.entity_type == "benchmark"))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark buffered audit writes")
+    parser.add_argument("--events", type=int, default=5000, help="Audit events to write")
+    parser.add_argument("--batch-size", type=int, default=500, help="Sink batch size")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Fake round-trip latency")
+    parser.add_argument("--real", action="store_true", help="Write to the configured database")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.events, args.batch_size, args.latency_ms, args.real))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Middleware Overhead Benchmark.
+
+Measures per-request overhead of each middleware layer by driving a tiny
+FastAPI app in-process through httpx's ASGI transport (no sockets).
+Each layer is compared against the bare app:
+
+- basehttp-passthrough: an empty BaseHTTPMiddleware, i.e. the wrapping cost
+  the old BaseHTTPMiddleware-based layers paid on every request
+- demo-guard: DemoGuardMiddleware (pure ASGI)
+- rate-limit: RateLimitMiddleware with the in-memory token bucket store
+- stack: both layers together, as in main.py
+
+GETs hit the demo guard's short-circuit; POSTs carry a non-demo token whose
+principal is pre-cached, so no database is needed.
+
+Usage:
+    python -m scripts.benchmark_middleware
+    python -m scripts.benchmark_middleware --requests 5000 --method POST
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.auth.principal import principal_cache
+from app.auth.utils import create_access_token
+from app.middleware.demo_guard import DemoGuardMiddleware
+from app.middleware.rate_limit import MemoryRateLimitStore, RateLimiter, RateLimitMiddleware
+from app.models import User
+
+
+USER_ID = "user_benchmark"
+
+
+class BaseHTTPPassthrough(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        return await call_next(request)
+
+
+class BenchRateLimit(RateLimitMiddleware):
+    """Rate limiting with a limit the benchmark never reaches."""
+
+    def __init__(self, app):
+        super().__init__(app, RateLimiter(MemoryRateLimitStore(), default_limit="10000000/minute"))
+
+
+def build_app(layers) -> FastAPI:
+    app = FastAPI()
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/api/mutate")
+    async def mutate():
+        return {"ok": True}
+
+    # add_middleware wraps outermost last; apply in reverse so layers[0] is outermost
+    for layer in reversed(layers):
+        app.add_middleware(layer)
+    return app
+
+
+LAYERS = {
+    "bare": [],
+    "basehttp-passthrough": [BaseHTTPPassthrough],
+    "demo-guard": [DemoGuardMiddleware],
+    "rate-limit": [BenchRateLimit],
+    "stack": [DemoGuardMiddleware, BenchRateLimit],
+}
+
+
+async def bench(app: FastAPI, method: str, requests: int, headers: dict) -> float:
+    transport = httpx.ASGITransport(app=app)
+    url = "/api/ping" if method == "GET" else "/api/mutate"
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing and caches
+        for _ in range(50):
+            await client.request(method, url, headers=headers)
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.request(method, url, headers=headers)
+            assert response.status_code == 200, response.text
+        return (time.perf_counter() - start) / requests
+
+
+async def main(requests: int, method: str):
+    principal_cache.put(User(id=USER_ID, email="bench@example.com", is_demo=False))
+    headers = {"Authorization": f"Bearer {create_access_token(USER_ID, 'bench@example.com')}"}
+
+    print(f"{requests} {method} requests per configuration\n")
+    print(f"{'configuration':<22} {'us/request':>11} {'overhead':>10}")
+    baseline = None
+    for name, layers in LAYERS.items():
+        per_request = await bench(build_app(layers), method, requests, headers)
+        if baseline is None:
+            baseline = per_request
+        print(f"{name:<22} {per_request * 1e6:>11.1f} {(per_request - baseline) * 1e6:>+10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--method", choices=["GET", "POST"], default="GET")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.method))
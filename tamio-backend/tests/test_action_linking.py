@@ -0,0 +1,98 @@
+"""
+Tests for indexed linked-action detection.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.models import ActionOption, PreparedAction
+from app.preparation.linking import LinkIndex, extract_features, pair_links
+from app.preparation.models import ActionType
+
+
+def make_action(action_id: str, action_type: str, options=(), deadline=None) -> PreparedAction:
+    return PreparedAction(
+        id=action_id,
+        user_id="u1",
+        action_type=action_type,
+        problem_summary="",
+        deadline=deadline,
+        options=[ActionOption(prepared_content=content, cash_impact=cash) for content, cash in options],
+    )
+
+
+def random_actions(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    types = list(ActionType)
+    start = datetime(2026, 10, 1)
+    actions = []
+    for i in range(count):
+        content = {}
+        if rng.random() < 0.5:
+            content["client_id"] = f"c{rng.randrange(10)}"
+        if rng.random() < 0.3:
+            content["vendor_id"] = f"v{rng.randrange(10)}"
+        if rng.random() < 0.2:
+            content["payments"] = [{"vendor_id": f"v{rng.randrange(10)}"} for _ in range(3)]
+        deadline = start + timedelta(hours=rng.randrange(24 * 60)) if rng.random() < 0.8 else None
+        actions.append(make_action(
+            f"a{i}",
+            rng.choice(types),
+            options=[(content, rng.choice([0, 500, 15000]))],
+            deadline=deadline,
+        ))
+    return actions
+
+
+def _keys(links):
+    return {(link.action_id, link.linked_action_id, link.link_type, link.link_reason) for link in links}
+
+
+class TestExtractFeatures:
+    """Tests for reading linking fields from options."""
+
+    def test_first_matching_option_wins(self):
+        action = make_action("a1", ActionType.PAYMENT_BATCH, options=[
+            ({"bucket_id": "b1", "payments": [{"vendor_id": "v1"}]}, -200),
+            ({"client_id": "c1", "vendor_id": "v2", "payments": [{"vendor_id": "v3"}]}, 900),
+        ])
+
+        features = extract_features(action)
+
+        assert features.client_id == "c1"
+        assert features.vendor_id == "b1"
+        assert features.batch_vendor_ids == {"v1", "v3"}
+        assert features.cash_impact == 900
+
+
+class TestLinkIndex:
+    """Tests for candidate selection."""
+
+    def test_matches_pairwise_rules(self):
+        features = [extract_features(a) for a in random_actions(300)]
+        index = LinkIndex(features)
+
+        for f in features[:60]:
+            expected = [link for other in features if other.id != f.id for link in pair_links(f, other)]
+            assert _keys(index.links_for(f)) == _keys(expected)
+
+    def test_unrelated_actions_are_not_candidates(self):
+        follow_up = make_action("f1", ActionType.INVOICE_FOLLOW_UP, options=[({"client_id": "c1"}, 5000)])
+        others = [
+            make_action(f"s{i}", ActionType.STATUTORY_PAYMENT, options=[({"client_id": f"x{i}"}, 0)])
+            for i in range(100)
+        ]
+        index = LinkIndex([extract_features(a) for a in others + [follow_up]])
+
+        assert index.candidates(extract_features(follow_up)) == []
+
+    def test_payment_window_follows_day_rounding(self):
+        due = datetime(2026, 10, 10)
+        batch = make_action("p1", ActionType.PAYMENT_BATCH, deadline=due)
+        later = make_action("p2", ActionType.PAYMENT_PRIORITIZATION, deadline=due + timedelta(days=7, hours=12))
+        index = LinkIndex([extract_features(batch), extract_features(later)])
+
+        # (due - later).days == -8 but (later - due).days == 7
+        assert index.links_for(extract_features(batch)) == []
+        assert [link.link_type for link in index.links_for(extract_features(later))] == ["sequence"]
@@ -0,0 +1,213 @@
+"""
+Tests for the cached LLM drafting service and background enhancement.
+"""
+
+import asyncio
+import pytest
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.models import ActionOption
+from app.preparation.ai_drafting import (
+    AIDraftStatus,
+    DraftCache,
+    LLMDraftingService,
+    draft_cache_key,
+    enhance_pending_drafts,
+    mark_for_enhancement,
+    release_stale_drafts,
+)
+from app.preparation.message_drafting import enhance_with_ai
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class FakeClient:
+    """Anthropic client stand-in that counts requests."""
+
+    def __init__(self, text="Enhanced body", delay=0.0, error=None):
+        self.calls = 0
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.messages = SimpleNamespace(create=self._create)
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=f" {self.text} ")])
+
+
+def make_service(client: FakeClient) -> LLMDraftingService:
+    return LLMDraftingService(cache=DraftCache(ttl=60, max_entries=10), client_factory=lambda: client, concurrency=2)
+
+
+class TestDraftCache:
+    """Tests for cache keys and bounds."""
+
+    def test_equivalent_contexts_share_a_key(self):
+        a = draft_cache_key("enhance", "soft", {"name": "Acme  Ltd", "amount": 1200.001, "notes": None}, "m")
+        b = draft_cache_key("enhance", "soft", {"amount": 1200.0, "name": "Acme Ltd"}, "m")
+
+        assert a == b
+        assert a != draft_cache_key("enhance", "firm", {"amount": 1200.0, "name": "Acme Ltd"}, "m")
+        assert a != draft_cache_key("enhance", "soft", {"amount": 1200.0, "name": "Acme Ltd"}, "other")
+
+    def test_entries_expire_and_are_bounded(self):
+        cache = DraftCache(ttl=10, max_entries=2)
+        with patch("app.preparation.ai_drafting.time.monotonic", return_value=100.0):
+            cache.set("a", "1")
+            cache.set("b", "2")
+            cache.get("a")
+            cache.set("c", "3")
+            assert cache.get("b") is None
+            assert cache.get("a") == "1"
+
+        with patch("app.preparation.ai_drafting.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+
+
+class TestDraftingService:
+    """Tests for caching and request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_is_served_from_cache(self):
+        client = FakeClient()
+        service = make_service(client)
+
+        first = await service.complete("t", "soft", {"k": 1}, system="s", prompt="p")
+        second = await service.complete("t", "soft", {"k": 1}, system="s", prompt="p")
+
+        assert first == second == "Enhanced body"
+        assert client.calls == 1
+        assert service.stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_identical_inflight_prompts_are_coalesced(self):
+        client = FakeClient(delay=0.05)
+        service = make_service(client)
+
+        results = await asyncio.gather(*(
+            service.complete("t", "soft", {"k": 1}, system="s", prompt="p") for _ in range(5)
+        ))
+
+        assert results == ["Enhanced body"] * 5
+        assert client.calls == 1
+        assert service.stats["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter_and_are_not_cached(self):
+        client = FakeClient(delay=0.01, error=RuntimeError("overloaded"))
+        service = make_service(client)
+
+        results = await asyncio.gather(
+            service.complete("t", "", {}, system="s", prompt="p"),
+            service.complete("t", "", {}, system="s", prompt="p"),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(service.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_enhance_with_ai_uses_the_service(self):
+        client = FakeClient()
+        service = make_service(client)
+        template = {"subject": "Invoice #1", "body": "Please pay.", "tone": "soft"}
+
+        with patch("app.preparation.message_drafting.drafting_service", service), \
+                patch("app.preparation.ai_drafting.settings.ANTHROPIC_API_KEY", "key"):
+            first = await enhance_with_ai(template, {"days_overdue": 10})
+            second = await enhance_with_ai(template, {"days_overdue": 10})
+
+        assert first["ai_enhanced"] and first["body"] == "Enhanced body"
+        assert first["original_body"] == "Please pay."
+        assert second == first
+        assert client.calls == 1
+
+
+class TestBackgroundEnhancement:
+    """Tests for queued enhancement of prepared emails."""
+
+    def test_only_email_options_are_queued(self):
+        email = ActionOption(prepared_content={"type": "email", "subject": "s", "body": "b"})
+        call = ActionOption(prepared_content={"type": "call_script", "talking_points": []})
+
+        assert mark_for_enhancement(email)
+        assert not mark_for_enhancement(call)
+        assert email.ai_draft_status == AIDraftStatus.PENDING
+        assert call.ai_draft_status is None
+
+    @pytest.mark.asyncio
+    async def test_pending_options_are_upgraded_or_marked_failed(self):
+        options = [
+            SimpleNamespace(id="o1", action_id="a1", prepared_content={"type": "email", "body": "ok"}),
+            SimpleNamespace(id="o2", action_id="a1", prepared_content={"type": "email", "body": "bad"}),
+        ]
+        claim = MagicMock()
+        claim.all.return_value = options
+        contexts = MagicMock()
+        contexts.all.return_value = [SimpleNamespace(id="a1", context_data={"days_overdue": 12})]
+        written = MagicMock(rowcount=1)
+        order = []
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[claim, contexts, written, written])
+        db.commit = AsyncMock(side_effect=lambda: order.append("commit"))
+
+        async def enhance(content, context, enhancement_type):
+            order.append("model")
+            assert context == {"days_overdue": 12}
+            if content["body"] == "bad":
+                return {**content, "ai_enhanced": False}
+            return {**content, "body": "better", "ai_enhanced": True}
+
+        summary = await enhance_pending_drafts(db, enhance=enhance)
+
+        assert summary == {"claimed": 2, "enhanced": 1, "failed": 1}
+        assert order == ["commit", "model", "model", "commit"]  # Claim committed before the model runs
+        claim_sql = _sql(db.execute.await_args_list[0].args[0])
+        assert "SET ai_draft_status=%(ai_draft_status)s" in claim_sql
+        assert "FOR UPDATE SKIP LOCKED" in claim_sql
+        first = db.execute.await_args_list[2].args[0]
+        assert "action_options.ai_draft_claimed_at = %(ai_draft_claimed_at_1)s" in _sql(first)
+        params = first.compile().params
+        assert params["ai_draft_status"] == AIDraftStatus.ENHANCED
+        assert params["prepared_content"]["body"] == "better"
+        assert db.execute.await_args_list[3].args[0].compile().params["ai_draft_status"] == AIDraftStatus.FAILED
+
+    @pytest.mark.asyncio
+    async def test_results_for_released_claims_are_dropped(self):
+        claim = MagicMock()
+        claim.all.return_value = [SimpleNamespace(id="o1", action_id="a1", prepared_content={"body": "ok"})]
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[claim, MagicMock(), MagicMock(rowcount=0)])
+        db.commit = AsyncMock()
+
+        enhance = AsyncMock(return_value={"body": "better", "ai_enhanced": True})
+        summary = await enhance_pending_drafts(db, enhance=enhance)
+
+        assert summary == {"claimed": 1, "enhanced": 0, "failed": 0}
+
+    @pytest.mark.asyncio
+    async def test_stale_claims_are_requeued_until_attempts_run_out(self):
+        released = MagicMock()
+        released.scalars.return_value.all.return_value = [AIDraftStatus.PENDING, AIDraftStatus.FAILED]
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=released)
+        db.commit = AsyncMock()
+
+        assert await release_stale_drafts(db, timeout=timedelta(minutes=10), max_attempts=3) == 2
+
+        sql = _sql(db.execute.await_args.args[0])
+        assert "action_options.ai_draft_claimed_at <" in sql
+        assert "CASE WHEN (action_options.ai_draft_attempts < %(ai_draft_attempts_1)s)" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        db.commit.assert_not_called()
@@ -0,0 +1,119 @@
+"""
+Tests for audit log retention and partition-pruned history queries.
+"""
+
+import pytest
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pyarrow.parquet as pq
+
+from app.audit.retention import archive_expired_partitions, export_partition
+from app.audit.services import AuditService
+
+
+class FakeStream:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def partitions(self, size):
+        for start in range(0, len(self.rows), size):
+            yield self.rows[start:start + size]
+
+
+def make_row(i: int):
+    return SimpleNamespace(_mapping={
+        "id": f"audit_{i}",
+        "entity_type": "client",
+        "entity_id": "c1",
+        "action": "update",
+        "field_name": "name",
+        "old_value": '{"name": "Old"}',
+        "new_value": '{"name": "New"}',
+        "user_id": "u1",
+        "source": "api",
+        "extra_data": None,
+        "notes": None,
+        "created_at": datetime(2025, 1, 15, tzinfo=timezone.utc),
+    })
+
+
+def _scalars(rows):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = rows
+    return result
+
+
+class TestRetention:
+    """Tests for exporting and dropping expired partitions."""
+
+    @pytest.mark.asyncio
+    async def test_export_writes_parquet(self, tmp_path):
+        db = MagicMock()
+        db.stream = AsyncMock(return_value=FakeStream([make_row(i) for i in range(3)]))
+
+        export = await export_partition(db, "audit_logs_y2025m01", str(tmp_path))
+
+        table = pq.read_table(export["path"])
+        assert export["rows"] == 3
+        assert table.num_rows == 3
+        assert table.column("new_value").to_pylist()[0] == '{"name": "New"}'
+
+    @pytest.mark.asyncio
+    async def test_only_expired_partitions_archived(self, tmp_path):
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        partitions = [
+            ("audit_logs_y2025m01", date(2025, 1, 1), True),
+            ("audit_logs_y2025m02", date(2025, 2, 1), False),
+            ("audit_logs_y2025m10", date(2025, 10, 1), True),
+        ]
+        export = AsyncMock(side_effect=lambda db, name, d: {"partition": name, "path": "", "rows": 0})
+
+        with patch("app.audit.retention.list_monthly_partitions", AsyncMock(return_value=partitions)), \
+                patch("app.audit.retention.export_partition", export):
+            archived = await archive_expired_partitions(
+                db, retention_months=12, archive_dir=str(tmp_path), today=date(2026, 10, 18)
+            )
+
+        assert [a["partition"] for a in archived] == ["audit_logs_y2025m01", "audit_logs_y2025m02"]
+        statements = [str(c.args[0]) for c in db.execute.await_args_list]
+        # Already-detached partition is exported and dropped without detaching again
+        assert statements == [
+            "ALTER TABLE audit_logs DETACH PARTITION audit_logs_y2025m01",
+            "DROP TABLE audit_logs_y2025m01",
+            "DROP TABLE audit_logs_y2025m02",
+        ]
+
+
+class TestPrunedHistory:
+    """Tests for partition-pruned history queries."""
+
+    @pytest.mark.asyncio
+    async def test_one_query_bounded_by_retention(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=_scalars(["a", "b"]))
+
+        with patch("app.audit.services.settings.AUDIT_RETENTION_MONTHS", 12):
+            logs = await AuditService(db).get_entity_history("client", "c1", limit=3)
+
+        assert logs == ["a", "b"]
+        assert db.execute.await_count == 1
+        query = db.execute.await_args.args[0]
+        cutoff = query.compile().params["created_at_1"]
+        today = datetime.now(timezone.utc).date()
+        assert cutoff.day == 1 and (today.year - cutoff.year) * 12 + today.month - cutoff.month == 12
+        assert query._limit_clause.value == 3
+
+    @pytest.mark.asyncio
+    async def test_since_is_the_lower_bound(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=_scalars([]))
+        since = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+        await AuditService(db).get_user_activity("u1", since=since.replace(tzinfo=None))
+
+        assert db.execute.await_count == 1
+        assert db.execute.await_args.args[0].compile().params["created_at_1"] == since
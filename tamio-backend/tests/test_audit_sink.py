@@ -0,0 +1,125 @@
+"""
+Tests for the buffered audit sink and AuditService durability routing.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.audit.services import AuditService
+from app.audit.sink import AuditSink
+
+
+class FakeSession:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, rows):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.batches.append(list(rows))
+
+    async def commit(self):
+        pass
+
+
+def make_sink(session, **kwargs):
+    return AuditSink(
+        capacity=kwargs.pop("capacity", 100),
+        batch_size=kwargs.pop("batch_size", 10),
+        flush_interval=kwargs.pop("flush_interval", 0.01),
+        backpressure_timeout=kwargs.pop("backpressure_timeout", 0.05),
+        session_factory=lambda: session,
+    )
+
+
+class TestAuditSink:
+    """Tests for AuditSink buffering and batching."""
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_in_batches(self):
+        session = FakeSession()
+        sink = make_sink(session)
+        await sink.start()
+
+        for i in range(25):
+            assert await sink.enqueue({"id": f"a{i}"})
+        await sink.stop()
+
+        assert [len(b) for b in session.batches] == [10, 10, 5]
+        assert sink.stats["written"] == 25
+        assert len(sink) == 0
+
+    @pytest.mark.asyncio
+    async def test_backpressure_drops_when_full(self):
+        sink = make_sink(FakeSession(), capacity=2, backpressure_timeout=0.01)
+        # Not started: nothing drains the buffer
+        sink._has_items = MagicMock()
+        sink._has_space = asyncio.Event()
+
+        assert await sink.enqueue({"id": "a1"})
+        assert await sink.enqueue({"id": "a2"})
+        assert not await sink.enqueue({"id": "a3"})
+        assert sink.stats["dropped"] == 1
+        assert sink.stats["backpressure_waits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_write_errors_do_not_stop_flusher(self):
+        sink = make_sink(FakeSession(fail=True))
+        await sink.start()
+        await sink.enqueue({"id": "a1"})
+        await sink.stop()
+
+        assert sink.stats["write_errors"] == 1
+        assert sink.stats["dropped"] == 1
+
+
+class TestAuditServiceDurability:
+    """Tests for sync/async routing in AuditService.log."""
+
+    @pytest.mark.asyncio
+    async def test_telemetry_goes_to_sink(self):
+        db = MagicMock()
+        with patch("app.audit.services.audit_sink") as sink:
+            sink.running = True
+            sink.enqueue = AsyncMock()
+            await AuditService(db, source="system").log(
+                entity_type="pipeline", entity_id="run_1", action="create", metadata={"mode": "full"}
+            )
+
+        row = sink.enqueue.await_args.args[0]
+        assert row["extra_data"] == {"mode": "full"}
+        assert row["id"].startswith("audit_")
+        db.add.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_data_edits_stay_in_transaction(self):
+        db = MagicMock()
+        with patch("app.audit.services.audit_sink") as sink:
+            sink.running = True
+            sink.enqueue = AsyncMock()
+            log = await AuditService(db).log_create("client", "c1", {"name": "Acme"})
+
+        sink.enqueue.assert_not_awaited()
+        db.add.assert_called_once_with(log)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_sink_not_running(self):
+        db = MagicMock()
+        with patch("app.audit.services.audit_sink") as sink:
+            sink.running = False
+            sink.enqueue = AsyncMock()
+            await AuditService(db, durability="async").log(
+                entity_type="forecast", entity_id="f1", action="create"
+            )
+
+        sink.enqueue.assert_not_awaited()
+        db.add.assert_called_once()
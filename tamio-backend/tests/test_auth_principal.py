@@ -0,0 +1,83 @@
+"""
+Tests for the authenticated principal cache.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_session
+
+from app.auth.principal import (
+    PrincipalCache,
+    _evict_changed_user,
+    get_user_by_id,
+    principal_cache,
+)
+from app.auth.utils import create_access_token, decode_access_token
+from app.models import User
+
+
+def make_user(**overrides):
+    values = {"id": "user_1", "email": "a@example.com", "is_demo": False, "base_currency": "USD"}
+    values.update(overrides)
+    return User(**values)
+
+
+def _scalar(user):
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = user
+    return result
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    principal_cache.invalidate()
+    yield
+    principal_cache.invalidate()
+
+
+class TestPrincipalCache:
+    """Tests for cached user loading."""
+
+    @pytest.mark.asyncio
+    async def test_second_load_skips_query(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=_scalar(make_user()))
+        await get_user_by_id(db, "user_1")
+
+        session = AsyncSession()
+        cached = await get_user_by_id(session, "user_1")
+
+        assert db.execute.await_count == 1
+        assert cached.email == "a@example.com"
+        # Attached to the request session so routes can modify and commit it
+        assert object_session(cached) is session.sync_session
+
+    @pytest.mark.asyncio
+    async def test_user_change_evicts_entry(self):
+        user = make_user()
+        principal_cache.put(user)
+
+        _evict_changed_user(None, None, user)
+
+        assert principal_cache.get("user_1") is None
+
+    def test_entries_expire_and_are_bounded(self):
+        cache = PrincipalCache(ttl_seconds=30, max_entries=2)
+        for i in range(3):
+            cache.put(make_user(id=f"user_{i}"))
+
+        assert len(cache) == 2
+        assert cache.get("user_0") is None
+
+        with patch("app.auth.principal.time.monotonic", return_value=10 ** 9):
+            assert cache.get("user_2") is None
+
+
+class TestDemoClaim:
+    """Tests for the demo claim in access tokens."""
+
+    def test_token_carries_demo_claim(self):
+        assert decode_access_token(create_access_token("u1", "a@example.com", True))["demo"] is True
+        assert decode_access_token(create_access_token("u1", "a@example.com"))["demo"] is False
@@ -0,0 +1,119 @@
+"""
+Tests for set-based bulk reconciliation.
+"""
+
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.schemas.reconciliation import BulkReconciliationRequest, ReconciliationMatch
+from app.services.reconciliation import bulk_reconcile
+from app.data.obligations.routes import approve_bulk_reconciliation
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def rows(*items):
+    result = MagicMock()
+    result.all.return_value = [SimpleNamespace(**item) for item in items]
+    return result
+
+
+def make_db(payments, schedules):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[rows(*payments), rows(*schedules)] + [MagicMock()] * 4)
+    db.commit = AsyncMock()
+    return db
+
+
+PAYMENTS = [
+    {"id": "pay_1", "amount": Decimal("120")},
+    {"id": "pay_2", "amount": Decimal("80")},
+]
+SCHEDULES = [
+    {"id": "sch_1", "obligation_id": "obl_1", "estimated_amount": Decimal("100")},
+    {"id": "sch_2", "obligation_id": "obl_2", "estimated_amount": None},
+]
+
+
+class TestBulkReconcile:
+    """Tests for validation and the set-based writes."""
+
+    @pytest.mark.asyncio
+    async def test_valid_pairs_are_applied_with_one_statement_each(self):
+        db = make_db(PAYMENTS, SCHEDULES)
+        matches = [
+            ReconciliationMatch(payment_id="pay_1", schedule_id="sch_1"),
+            ReconciliationMatch(payment_id="pay_2", schedule_id="sch_2"),
+        ]
+
+        with patch("app.audit.services.AuditService._resolve_durability", return_value="sync"):
+            results = await bulk_reconcile(db, "u1", matches)
+
+        assert [r.success for r in results] == [True, True]
+        assert db.execute.await_count == 5
+
+        statements = [call.args[0] for call in db.execute.await_args_list]
+        payment_update, schedule_update, audit_insert = statements[2:]
+        update_sql = _sql(payment_update)
+        assert "UPDATE payment_events SET" in update_sql
+        assert "FROM (VALUES" in update_sql
+        assert "coalesce(CAST(links.variance AS NUMERIC(15, 2)), payment_events.variance_vs_expected)" in update_sql
+        params = list(payment_update.compile(dialect=postgresql.dialect()).params.values())
+        start = params.index("pay_1")
+        assert params[start:start + 7] == ["pay_1", "sch_1", "obl_1", Decimal("20"), "pay_2", "sch_2", "obl_2"]
+
+        assert "UPDATE obligation_schedules SET status=" in _sql(schedule_update)
+        audit_rows = db.execute.await_args_list[4].args[1]
+        assert [(r["entity_id"], r["action"]) for r in audit_rows] == [("pay_1", "reconcile"), ("pay_2", "reconcile")]
+        assert audit_rows[0]["new_value"]["variance_vs_expected"] == 20.0
+
+    @pytest.mark.asyncio
+    async def test_invalid_pairs_are_reported_per_pair(self):
+        db = make_db(PAYMENTS, SCHEDULES[:1])
+        matches = [
+            ReconciliationMatch(payment_id="pay_1", schedule_id="sch_1"),
+            ReconciliationMatch(payment_id="pay_1", schedule_id="sch_1"),
+            ReconciliationMatch(payment_id="pay_x", schedule_id="sch_1"),
+            ReconciliationMatch(payment_id="pay_2", schedule_id="sch_x"),
+        ]
+
+        with patch("app.audit.services.AuditService._resolve_durability", return_value="sync"):
+            results = await bulk_reconcile(db, "u1", matches)
+
+        assert [r.success for r in results] == [True, False, False, False]
+        assert results[1].error == "Payment pay_1 is matched more than once"
+        assert results[2].error == "Payment pay_x not found or not authorized"
+        assert results[3].error == "Schedule sch_x not found or not authorized"
+
+    @pytest.mark.asyncio
+    async def test_nothing_is_written_when_no_pair_is_valid(self):
+        db = make_db([], [])
+
+        results = await bulk_reconcile(db, "u1", [ReconciliationMatch(payment_id="p", schedule_id="s")])
+
+        assert not results[0].success
+        assert db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_endpoint_summarises_results(self):
+        db = make_db(PAYMENTS[:1], SCHEDULES[:1])
+        request = BulkReconciliationRequest(matches=[
+            ReconciliationMatch(payment_id="pay_1", schedule_id="sch_1"),
+            ReconciliationMatch(payment_id="pay_2", schedule_id="sch_1"),
+        ])
+
+        with patch("app.audit.services.AuditService._resolve_durability", return_value="sync"):
+            result = await approve_bulk_reconciliation(request, MagicMock(id="u1"), db)
+
+        assert (result.successful, result.failed) == (1, 1)
+        assert result.errors == ["Payment pay_2 not found or not authorized"]
+        assert [r.payment_id for r in result.results] == ["pay_1", "pay_2"]
+        assert "INSERT INTO detection_changes" in str(db.execute.await_args.args[0])
+        db.commit.assert_awaited_once()
@@ -0,0 +1,128 @@
+"""
+Tests for the windowed cash aggregate service.
+"""
+
+import pytest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import event, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.models import CashAccount, ObligationSchedule
+from app.preparation.context import get_cash_context
+from app.services import cash_windows
+from app.services.cash_windows import (
+    get_cash_windows,
+    invalidate_cash_windows,
+    load_cash_windows,
+)
+
+
+def _row(values):
+    result = MagicMock()
+    result.one.return_value = values
+    return result
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    # (revenue, expenses, total) for 7, 14 and 30 days
+    db.execute = AsyncMock(return_value=_row([100, 50, 150, 200, None, 200, 300, 400, 700]))
+    return db
+
+
+class TestCashWindows:
+    """Tests for load_cash_windows and session memoisation."""
+
+    @pytest.mark.asyncio
+    async def test_all_horizons_from_one_query(self, mock_db):
+        windows = await load_cash_windows(mock_db, "u1", today=date(2026, 10, 18))
+
+        assert mock_db.execute.await_count == 1
+        assert windows.revenue == {7: 100.0, 14: 200.0, 30: 300.0}
+        assert windows.expenses == {7: 50.0, 14: 0.0, 30: 400.0}
+        assert windows.total[30] == 700.0
+
+        sql = str(mock_db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.count("FILTER (WHERE") == 9
+
+    @pytest.mark.asyncio
+    async def test_memoised_per_session(self, mock_db):
+        first = await get_cash_windows(mock_db, "u1")
+        second = await get_cash_windows(mock_db, "u1")
+        await get_cash_windows(mock_db, "u2")
+
+        assert first is second
+        assert mock_db.execute.await_count == 2
+
+        invalidate_cash_windows(mock_db, "u1")
+        await get_cash_windows(mock_db, "u1")
+        assert mock_db.execute.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_cash_context_uses_windows(self, mock_db):
+        accounts = MagicMock()
+        accounts.scalars.return_value.all.return_value = []
+        mock_db.execute.side_effect = [accounts, _row([100, 50, 150, 200, 80, 280, 300, 400, 700])]
+
+        context = await get_cash_context(mock_db, "u1")
+
+        # Accounts + one windowed aggregate, instead of six per-window sums
+        assert mock_db.execute.await_count == 2
+        assert context["obligations_14d"] == 80.0
+        assert context["revenue_30d"] == 300.0
+        assert context["net_burn"] == 100.0
+
+
+class TestInvalidation:
+    """Tests for dropping memoised windows when the session writes schedules."""
+
+    @pytest.fixture
+    def session(self):
+        session = Session()
+        db = SimpleNamespace(sync_session=session, execute=AsyncMock(return_value=_row([0] * 9)))
+        return session, db
+
+    def test_listeners_are_registered(self):
+        assert event.contains(Session, "after_flush", cash_windows._invalidate_on_flush)
+        assert event.contains(Session, "do_orm_execute", cash_windows._invalidate_on_dml)
+        assert event.contains(Session, "after_rollback", cash_windows._invalidate_on_rollback)
+
+    @pytest.mark.asyncio
+    async def test_flushing_schedules_drops_the_memo(self, session):
+        session, db = session
+        await get_cash_windows(db, "u1")
+
+        session.add(CashAccount(id="acc_1", user_id="u1", account_name="Ops", balance=0))
+        cash_windows._invalidate_on_flush(session, None)
+        await get_cash_windows(db, "u1")
+        assert db.execute.await_count == 1
+
+        session.add(ObligationSchedule(id="sched_1", user_id="u1"))
+        cash_windows._invalidate_on_flush(session, None)
+        await get_cash_windows(db, "u1")
+        assert db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_schedule_statements_and_rollbacks_drop_the_memo(self, session):
+        session, db = session
+        await get_cash_windows(db, "u1")
+
+        def state(statement):
+            return SimpleNamespace(
+                session=session, statement=statement, is_insert=False, is_update=True, is_delete=False,
+            )
+
+        cash_windows._invalidate_on_dml(state(update(CashAccount).values(balance=1)))
+        assert session in cash_windows._memo
+
+        cash_windows._invalidate_on_dml(state(update(ObligationSchedule).values(status="paid")))
+        assert session not in cash_windows._memo
+
+        await get_cash_windows(db, "u1")
+        cash_windows._invalidate_on_rollback(session)
+        assert session not in cash_windows._memo
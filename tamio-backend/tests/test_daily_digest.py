@@ -0,0 +1,81 @@
+"""
+Tests for the set-based daily digest builder.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.notifications.digest import DailyDigestBuilder
+from app.notifications.email_provider import StubEmailProvider
+
+
+def _result(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.execute = AsyncMock()
+    return db
+
+
+class TestDailyDigestBuilder:
+    """Tests for DailyDigestBuilder."""
+
+    @pytest.mark.asyncio
+    async def test_fixed_query_count_for_many_users(self, mock_db):
+        recipients = [SimpleNamespace(id=f"u{i}", email=f"u{i}@example.com") for i in range(50)]
+        mock_db.execute.side_effect = [
+            _result(recipients),
+            _result([("u1", "emergency", 2), ("u1", "upcoming", 1), ("u2", "this_week", 3)]),
+            _result([("u1", 4)]),
+            _result([
+                SimpleNamespace(
+                    user_id="u1", title="Payroll at risk", description="Short by $2k",
+                    severity="emergency", detection_type="payroll_safety",
+                ),
+            ]),
+        ]
+
+        digests = await DailyDigestBuilder(mock_db, StubEmailProvider()).build()
+
+        # Recipients + counts + actions + recent alerts, regardless of user count
+        assert mock_db.execute.await_count == 4
+        by_user = {d.user_id: d for d in digests}
+        assert len(by_user) == 50
+        assert by_user["u1"].emergency_count == 2
+        assert by_user["u1"].upcoming_count == 1
+        assert by_user["u1"].actions_pending == 4
+        assert by_user["u1"].alerts_summary[0]["title"] == "Payroll at risk"
+        assert by_user["u2"].this_week_count == 3
+        assert by_user["u3"].alerts_summary == []
+
+    @pytest.mark.asyncio
+    async def test_send_uses_single_batch_and_logs(self, mock_db):
+        mock_db.execute.side_effect = [
+            _result([SimpleNamespace(id="u1", email="a@example.com"), SimpleNamespace(id="u2", email="b@example.com")]),
+            _result([]),
+            _result([]),
+            _result([]),
+        ]
+        provider = StubEmailProvider(fail_for={"b@example.com"})
+
+        summary = await DailyDigestBuilder(mock_db, provider).send()
+
+        assert provider.batch_calls == 1
+        assert summary["sent"] == 1
+        assert summary["failed"] == 1
+        assert len(mock_db.add_all.call_args.args[0]) == 2
+
+    @pytest.mark.asyncio
+    async def test_no_recipients_skips_queries(self, mock_db):
+        mock_db.execute.side_effect = [_result([])]
+
+        summary = await DailyDigestBuilder(mock_db, StubEmailProvider()).send()
+
+        assert mock_db.execute.await_count == 1
+        assert summary["sent"] == 0
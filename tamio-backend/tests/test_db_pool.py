@@ -0,0 +1,61 @@
+"""
+Tests for connection pool instrumentation and read-only sessions.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.database import engine, get_pool_stats, get_read_db
+from app.db_pool import InstrumentedQueuePool, PoolMetrics, pool_stats
+
+
+class TestPoolMetrics:
+    """Tests for checkout latency and saturation."""
+
+    def test_percentiles_use_recent_window(self):
+        metrics = PoolMetrics(window=3)
+        for seconds in [10.0, 0.1, 0.2, 0.3]:
+            metrics.record(seconds)
+
+        assert metrics.checkouts == 4
+        assert metrics.max_wait == 10.0
+        assert metrics.percentile(0.95) == 0.3
+
+    @pytest.mark.asyncio
+    async def test_pool_records_checkouts_and_timeouts(self):
+        pool = InstrumentedQueuePool(lambda: MagicMock(), pool_size=1, max_overflow=0, timeout=0.01)
+
+        connection = await greenlet_spawn(pool.connect)
+        with pytest.raises(exc.TimeoutError):
+            await greenlet_spawn(pool.connect)
+
+        stats = pool_stats(pool)
+        assert stats["checked_out"] == 1
+        assert stats["saturation"] == 1.0
+        assert stats["checkouts"] == 1
+        assert stats["timeouts"] == 1
+        assert stats["checkout_p95_ms"] is not None
+        connection.close()
+
+    def test_engine_uses_instrumented_pool(self):
+        stats = get_pool_stats()
+
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert stats["primary"]["pool_class"] == "InstrumentedQueuePool"
+        assert stats["replica"] is None
+
+
+class TestReadSession:
+    """Tests for the read-only session dependency."""
+
+    @pytest.mark.asyncio
+    async def test_read_session_never_commits(self):
+        dependency = get_read_db()
+        session = await dependency.__anext__()
+        session.commit = MagicMock(side_effect=AssertionError("read session committed"))
+
+        with pytest.raises(StopAsyncIteration):
+            await dependency.__anext__()
@@ -0,0 +1,75 @@
+"""
+Tests for the pure-ASGI demo guard middleware.
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.auth.principal import principal_cache
+from app.auth.utils import create_access_token
+from app.middleware.demo_guard import DemoGuardMiddleware
+from app.models import User
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/data/clients")
+    async def list_clients():
+        return []
+
+    @app.post("/api/data/clients")
+    async def create_client():
+        return {"id": "client_1"}
+
+    @app.post("/api/tami/chat/stream")
+    async def chat_stream():
+        async def chunks():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    app.add_middleware(DemoGuardMiddleware)
+    return app
+
+
+def auth(user_id: str, is_demo: bool = False) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user_id, 'a@example.com', is_demo)}"}
+
+
+@pytest.fixture
+def client():
+    principal_cache.invalidate()
+    transport = httpx.ASGITransport(app=build_app())
+    yield httpx.AsyncClient(transport=transport, base_url="http://test")
+    principal_cache.invalidate()
+
+
+class TestDemoGuard:
+    """Tests for demo mutation blocking."""
+
+    @pytest.mark.asyncio
+    async def test_demo_claim_blocks_mutation(self, client):
+        response = await client.post("/api/data/clients", headers=auth("demo_1", is_demo=True))
+
+        assert response.status_code == 403
+        assert response.headers["X-Demo-Account"] == "true"
+
+    @pytest.mark.asyncio
+    async def test_reads_and_allowed_posts_pass(self, client):
+        headers = auth("demo_1", is_demo=True)
+
+        assert (await client.get("/api/data/clients", headers=headers)).status_code == 200
+        response = await client.post("/api/tami/chat/stream", headers=headers)
+        assert response.status_code == 200
+        assert response.text == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
+
+    @pytest.mark.asyncio
+    async def test_cached_principal_decides_without_claim(self, client):
+        principal_cache.put(User(id="user_1", email="a@example.com", is_demo=False))
+        principal_cache.put(User(id="user_2", email="b@example.com", is_demo=True))
+
+        assert (await client.post("/api/data/clients", headers=auth("user_1"))).status_code == 200
+        assert (await client.post("/api/data/clients", headers=auth("user_2"))).status_code == 403
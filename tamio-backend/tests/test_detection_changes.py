@@ -0,0 +1,321 @@
+"""
+Tests for detection change tracking and targeted sweeps.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.data.user_config.routes import update_user_configuration
+from app.data.user_config.schemas import UserConfigurationUpdate
+from app.detection import changes
+from app.detection.models import DetectionType
+from app.detection.scheduler import (
+    CRITICAL_DETECTIONS,
+    ROUTINE_DETECTIONS,
+    DetectionScheduler,
+)
+from app.scenarios.pipeline.types import ScenarioDelta  # (loads the pipeline before commit)
+from app.scenarios.commit import ScenarioCommitService
+from app.xero.sync import TouchedSources, sync_obligations
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def session_maker(db):
+    @asynccontextmanager
+    async def session():
+        yield db
+    return session
+
+
+def make_db(*results):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    db.commit = AsyncMock()
+    return db
+
+
+def users(*user_ids):
+    result = MagicMock()
+    result.fetchall.return_value = [(user_id,) for user_id in user_ids]
+    return result
+
+
+def watermark(xid=100):
+    result = MagicMock()
+    result.scalar_one.return_value = xid
+    return result
+
+
+def resume(scheduler, sweep, since=None, xid=90):
+    """Give the sweep a previous run today, so it plans a targeted sweep."""
+    setattr(scheduler, f"_last_{sweep}_run", since or datetime.utcnow())
+    scheduler._watermarks[sweep] = xid
+
+
+def engine_factory(engines):
+    def build(db, user_id):
+        engine = MagicMock()
+        engine.run_detection_types = AsyncMock(return_value=[])
+        engine.run_detection_type = AsyncMock(return_value=[])
+        engine.run_all_detections = AsyncMock(return_value=[])
+        engine.escalate_alerts = AsyncMock(return_value=[])
+        engine.failed_types = set()
+        engines[user_id] = engine
+        return engine
+    return build
+
+
+class TestChangeSet:
+    """Tests for recording changes and mapping them to detectors."""
+
+    def test_entity_types_map_to_affected_detectors(self):
+        assert changes.affected_detections([changes.CASH_ACCOUNT], within=CRITICAL_DETECTIONS) == [
+            DetectionType.BUFFER_BREACH, DetectionType.PAYROLL_SAFETY,
+        ]
+        assert changes.affected_detections([changes.PAYMENT], within=CRITICAL_DETECTIONS) == []
+        assert DetectionType.CLIENT_CHURN in changes.affected_detections([changes.CLIENT])
+        assert changes.affected_detections(["something_new"]) == list(DetectionType)
+
+    @pytest.mark.asyncio
+    async def test_marks_upsert_one_row_per_entity_type(self):
+        db = make_db(MagicMock())
+
+        await changes.mark_changed(db, "u1", changes.OBLIGATION, changes.PAYMENT, changes.OBLIGATION)
+
+        statement = db.execute.await_args.args[0]
+        sql = _sql(statement)
+        assert "ON CONFLICT (user_id, entity_type) DO UPDATE SET changed_at = excluded.changed_at, " \
+            "change_xid = excluded.change_xid" in sql
+        assert "pg_current_xact_id()" in sql
+        assert sorted(v for v in statement.compile().params.values() if v in ("obligation", "payment")) == [
+            "obligation", "payment",
+        ]
+        db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_load_by_watermark_filters_on_writing_transaction(self):
+        rows = MagicMock()
+        rows.all.return_value = [MagicMock(user_id="u1", entity_type="payment")]
+        db = make_db(rows)
+
+        assert await changes.load_changes(db, since_xid=90) == {"u1": {"payment"}}
+        sql = _sql(db.execute.await_args.args[0])
+        assert "detection_changes.change_xid >=" in sql
+        assert "changed_at" not in sql.split("WHERE")[1]
+
+    @pytest.mark.asyncio
+    async def test_xero_obligation_stage_records_changes(self):
+        clients = MagicMock()
+        clients.scalars.return_value.all.return_value = [MagicMock(id="client_1")]
+        db = make_db(clients)
+        touched = TouchedSources(client_ids={"client_1"})
+
+        with patch("app.xero.sync.ObligationService") as service, \
+                patch("app.xero.sync.changes.mark_changed", new_callable=AsyncMock) as mark:
+            service.return_value.sync_obligations_bulk = AsyncMock(
+                return_value={"created": 0, "updated": 0, "deactivated": 0, "schedules": 0}
+            )
+            await sync_obligations(db, "u1", touched)
+
+        mark.assert_awaited_once_with(db, "u1", changes.OBLIGATION, changes.CLIENT)
+
+    @pytest.mark.asyncio
+    async def test_scenario_commit_marks_obligations_before_committing(self):
+        db = make_db()
+        service = ScenarioCommitService(db, "u1")
+        service._cancel_schedule = AsyncMock()
+        order = []
+
+        async def mark(*args):
+            order.append(("mark", args[1:]))
+
+        db.commit.side_effect = lambda: order.append(("commit",))
+        with patch("app.scenarios.commit.changes.mark_changed", side_effect=mark):
+            await service.commit_scenario(MagicMock(), ScenarioDelta(scenario_id="s1", deleted_schedule_ids=["sch_1"]))
+            await service.commit_scenario(MagicMock(), ScenarioDelta(scenario_id="s2"))
+
+        assert order == [("mark", ("u1", changes.OBLIGATION)), ("commit",), ("commit",)]
+
+    @pytest.mark.asyncio
+    async def test_config_update_marks_config_changed(self):
+        config = MagicMock()
+        found = MagicMock()
+        found.scalar_one_or_none.return_value = config
+        db = make_db(found)
+        db.flush = AsyncMock()
+
+        with patch("app.data.user_config.routes.changes.mark_changed", new_callable=AsyncMock) as mark:
+            await update_user_configuration("u1", UserConfigurationUpdate(obligations_buffer_amount=5000), db)
+
+        mark.assert_awaited_once_with(db, "u1", changes.CONFIG)
+        assert config.obligations_buffer_amount == 5000
+        assert DetectionType.BUFFER_BREACH in changes.affected_detections([changes.CONFIG])
+
+
+class TestTargetedSweeps:
+    """Tests for sweeps that only run affected detectors."""
+
+    @pytest.mark.asyncio
+    async def test_first_run_and_new_day_are_full_sweeps(self):
+        scheduler = DetectionScheduler()
+        now = datetime(2026, 10, 18, 0, 5)
+
+        scheduler._watermarks["critical"] = 90
+
+        with patch("app.detection.scheduler.load_changes", new_callable=AsyncMock) as load:
+            assert await scheduler._plan_sweep(
+                make_db(watermark()), "critical", None, now, CRITICAL_DETECTIONS
+            ) == (None, 100)
+            assert await scheduler._plan_sweep(
+                make_db(watermark()), "critical", now - timedelta(minutes=10), now, CRITICAL_DETECTIONS
+            ) == (None, 100)
+        load.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_plan_uses_changes_since_last_run_and_retries_failures(self):
+        scheduler = DetectionScheduler()
+        scheduler._retry_users["critical"] = {"u3"}
+        scheduler._watermarks["critical"] = 90
+        now = datetime(2026, 10, 18, 12, 0)
+        since = now - timedelta(minutes=5)
+        load = AsyncMock(return_value={"u1": {changes.CASH_ACCOUNT}, "u2": {changes.PAYMENT}})
+        db = make_db(watermark(100))
+
+        with patch("app.detection.scheduler.load_changes", load):
+            plan, xid = await scheduler._plan_sweep(db, "critical", since, now, CRITICAL_DETECTIONS)
+
+        # Changes by transactions unfinished at the last plan, whatever their time
+        assert load.await_args.kwargs == {"since_xid": 90}
+        assert xid == 100
+        assert "pg_snapshot_xmin(pg_current_snapshot())" in _sql(db.execute.await_args.args[0])
+        assert plan == {
+            "u1": [DetectionType.BUFFER_BREACH, DetectionType.PAYROLL_SAFETY],
+            "u3": CRITICAL_DETECTIONS,
+        }
+        assert scheduler._retry_users["critical"] == {"u3"}  # Taken by _advance_sweep
+
+    @pytest.mark.asyncio
+    async def test_failed_plan_keeps_watermark_and_retries(self):
+        scheduler = DetectionScheduler()
+        since = datetime.utcnow() - timedelta(minutes=5)
+        resume(scheduler, "critical", since)
+        scheduler._retry_users["critical"] = {"u3"}
+
+        with patch("app.detection.scheduler.async_session_maker", session_maker(make_db(watermark()))), \
+                patch("app.detection.scheduler.load_changes", AsyncMock(side_effect=RuntimeError("db down"))):
+            summary = await scheduler.run_critical_detections()
+
+        assert summary["errors"] == [{"error": "db down"}]
+        assert (scheduler._last_critical_run, scheduler._watermarks["critical"]) == (since, 90)
+        assert scheduler._retry_users["critical"] == {"u3"}
+
+    @pytest.mark.asyncio
+    async def test_failed_run_rewinds_to_the_previous_watermark(self):
+        scheduler = DetectionScheduler()
+        since = datetime.utcnow() - timedelta(minutes=5)
+        resume(scheduler, "routine", since)
+        scheduler._retry_users["routine"] = {"u3"}
+        db = make_db(watermark(), RuntimeError("db down"))  # User scan fails after the plan loaded
+
+        with patch("app.detection.scheduler.async_session_maker", session_maker(db)), \
+                patch("app.detection.scheduler.load_changes", AsyncMock(return_value={})):
+            await scheduler.run_routine_detections()
+
+        assert (scheduler._last_routine_run, scheduler._watermarks["routine"]) == (since, 90)
+        assert scheduler._retry_users["routine"] == {"u3"}
+
+    @pytest.mark.asyncio
+    async def test_critical_sweep_skips_unchanged_tenants(self):
+        scheduler = DetectionScheduler()
+        resume(scheduler, "critical")
+        engines = {}
+        db = make_db(watermark())
+
+        with patch("app.detection.scheduler.async_session_maker", session_maker(db)), \
+                patch("app.detection.scheduler.DetectionEngine", side_effect=engine_factory(engines)), \
+                patch("app.detection.scheduler.AuditService") as audit, \
+                patch("app.detection.scheduler.load_changes",
+                      AsyncMock(return_value={"u1": {changes.OBLIGATION}, "u2": {changes.CLIENT}})):
+            audit.return_value.log = AsyncMock()
+            summary = await scheduler.run_critical_detections()
+
+        assert summary["sweep"] == "targeted"
+        assert list(engines) == ["u1"]
+        engines["u1"].run_detection_types.assert_awaited_once_with(
+            [DetectionType.BUFFER_BREACH, DetectionType.PAYROLL_SAFETY]
+        )
+        db.execute.assert_awaited_once()  # The watermark, but no user scan
+        assert scheduler._last_critical_run.isoformat() == summary["started_at"]
+        assert scheduler._watermarks["critical"] == 100
+
+    @pytest.mark.asyncio
+    async def test_routine_sweep_still_escalates_unchanged_tenants(self):
+        scheduler = DetectionScheduler()
+        resume(scheduler, "routine")
+        engines = {}
+        db = make_db(watermark(), users("u1", "u2"))
+
+        with patch("app.detection.scheduler.async_session_maker", session_maker(db)), \
+                patch("app.detection.scheduler.DetectionEngine", side_effect=engine_factory(engines)), \
+                patch("app.detection.scheduler.load_changes",
+                      AsyncMock(return_value={"u1": {changes.PAYMENT}})):
+            summary = await scheduler.run_routine_detections()
+
+        assert summary["users_skipped"] == 1
+        ran = {call.args[0] for call in engines["u1"].run_detection_type.await_args_list}
+        assert ran == changes.AFFECTED_DETECTIONS[changes.PAYMENT] & set(ROUTINE_DETECTIONS)
+        engines["u2"].run_detection_type.assert_not_called()
+        engines["u2"].escalate_alerts.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_post_sync_run_is_limited_to_what_the_sync_changed(self):
+        scheduler = DetectionScheduler()
+        engines = {}
+        db = make_db()
+        started = datetime.utcnow()
+
+        with patch("app.detection.scheduler.async_session_maker", session_maker(db)), \
+                patch("app.detection.scheduler.DetectionEngine", side_effect=engine_factory(engines)), \
+                patch("app.detection.scheduler.load_changes",
+                      AsyncMock(return_value={"u1": {changes.CLIENT}})) as load:
+            await scheduler.run_all_detections_for_user("u1", changed_since=started)
+
+        assert load.await_args.kwargs["user_ids"] == ["u1"]
+        engines["u1"].run_all_detections.assert_not_called()
+        engines["u1"].run_detection_types.assert_awaited_once_with(
+            [DetectionType.LATE_PAYMENT, DetectionType.CLIENT_CHURN]
+        )
+
+    @pytest.mark.asyncio
+    async def test_detector_failures_are_retried_next_sweep(self):
+        scheduler = DetectionScheduler()
+        resume(scheduler, "critical")
+        resume(scheduler, "routine")
+        engines = {}
+
+        def build(db, user_id):
+            engine = engine_factory(engines)(db, user_id)
+            engine.failed_types = {DetectionType.BUFFER_BREACH}
+            engine.run_detection_type = AsyncMock(side_effect=RuntimeError("boom"))
+            return engine
+
+        with patch("app.detection.scheduler.async_session_maker", session_maker(make_db(watermark(), watermark(), users("u1")))), \
+                patch("app.detection.scheduler.DetectionEngine", side_effect=build), \
+                patch("app.detection.scheduler.AuditService") as audit, \
+                patch("app.detection.scheduler.load_changes",
+                      AsyncMock(return_value={"u1": {changes.CASH_ACCOUNT, changes.PAYMENT}})):
+            audit.return_value.log = AsyncMock()
+            critical = await scheduler.run_critical_detections()
+            routine = await scheduler.run_routine_detections()
+
+        assert scheduler._retry_users == {"critical": {"u1"}, "routine": {"u1"}}
+        assert critical["errors"][0]["user_id"] == "u1"
+        assert {error["user_id"] for error in routine["errors"]} == {"u1"}
@@ -0,0 +1,71 @@
+"""
+Tests for base-currency normalisation in the forecast engine.
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.forecast.engine_v2 import _amounts_in_base_currency, _original_amount
+from app.services.fx_rates import FxRateTable
+
+
+def make_table():
+    table = FxRateTable()
+    table.replace([
+        ("GBP", "USD", date(2026, 1, 1), Decimal("1.25")),
+        ("EUR", "USD", date(2026, 1, 1), Decimal("1.1")),
+    ])
+    return table
+
+
+class TestNormalisation:
+    """Tests for batched conversion to the base currency."""
+
+    @pytest.mark.asyncio
+    async def test_converts_foreign_amounts_in_one_batch(self):
+        table = make_table()
+        with patch("app.forecast.engine_v2.get_fx_rates", AsyncMock(return_value=table)) as get_rates, \
+                patch.object(table, "convert_many", wraps=table.convert_many) as convert_many:
+            amounts = await _amounts_in_base_currency(
+                MagicMock(),
+                [Decimal("100"), Decimal("10.00"), Decimal("33.33")],
+                ["GBP", "USD", "EUR"],
+                [date(2026, 2, 1), date(2026, 2, 1), date(2026, 2, 1)],
+                "USD",
+            )
+
+        assert amounts == [Decimal("125.00"), Decimal("10.00"), Decimal("36.66")]
+        assert get_rates.await_count == 1
+        assert convert_many.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_single_currency_skips_rate_table(self):
+        with patch("app.forecast.engine_v2.get_fx_rates", AsyncMock()) as get_rates:
+            amounts = await _amounts_in_base_currency(
+                MagicMock(), [Decimal("5")], ["USD"], [None], "USD"
+            )
+
+        assert amounts == [Decimal("5")]
+        get_rates.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unknown_currency_left_unconverted(self):
+        with patch("app.forecast.engine_v2.get_fx_rates", AsyncMock(return_value=make_table())):
+            amounts = await _amounts_in_base_currency(
+                MagicMock(),
+                [Decimal("100"), Decimal("7")],
+                ["GBP", "JPY"],
+                [date(2026, 2, 1), date(2026, 2, 1)],
+                "USD",
+            )
+
+        assert amounts == [Decimal("125.00"), Decimal("7")]
+
+    def test_original_amount_only_for_foreign_currency(self):
+        assert _original_amount(Decimal("1"), "USD", "USD") == {}
+        assert _original_amount(Decimal("1"), "GBP", "USD") == {
+            "original_amount": Decimal("1"),
+            "original_currency": "GBP",
+        }
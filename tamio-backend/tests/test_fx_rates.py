@@ -0,0 +1,74 @@
+"""
+Tests for the in-process FX rate table.
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import app.data  # noqa: F401  (loads app.data before app.services)
+from app.services.fx_rates import FxRateTable
+
+
+def make_table():
+    table = FxRateTable()
+    table.replace([
+        ("GBP", "USD", date(2026, 1, 1), Decimal("1.25")),
+        ("GBP", "USD", date(2026, 3, 1), Decimal("1.30")),
+        ("EUR", "USD", date(2026, 1, 1), Decimal("1.10")),
+    ])
+    return table
+
+
+class TestAsOfLookup:
+    """Tests for binary-search rate lookups."""
+
+    def test_uses_latest_rate_on_or_before_date(self):
+        table = make_table()
+
+        assert table.rate("GBP", "USD", date(2026, 2, 15)) == (Decimal("1.25"), date(2026, 1, 1))
+        assert table.rate("GBP", "USD", date(2026, 3, 1)) == (Decimal("1.30"), date(2026, 3, 1))
+        assert table.rate("GBP", "USD", date(2025, 12, 31)) is None
+        assert table.rate("GBP", "JPY", date(2026, 3, 1)) is None
+
+    def test_same_currency_is_one(self):
+        assert make_table().rate("USD", "USD", date(2026, 1, 1)) == (Decimal("1"), date(2026, 1, 1))
+
+
+class TestConvertMany:
+    """Tests for batch conversion."""
+
+    def test_converts_each_amount_as_of_its_date(self):
+        converted = make_table().convert_many(
+            [Decimal("100"), Decimal("100"), Decimal("50"), Decimal("10")],
+            ["GBP", "GBP", "EUR", "USD"],
+            "USD",
+            [date(2026, 2, 1), date(2026, 4, 1), date(2026, 2, 1), None],
+        )
+
+        assert converted == [Decimal("125.00"), Decimal("130.00"), Decimal("55.00"), Decimal("10")]
+
+    def test_missing_rate_raises(self):
+        with pytest.raises(ValueError):
+            make_table().convert_many([Decimal("1")], ["JPY"], "USD", [date(2026, 2, 1)])
+
+
+class TestLoading:
+    """Tests for loading and reloading the table."""
+
+    @pytest.mark.asyncio
+    async def test_ensure_loaded_queries_once_until_stale(self):
+        result = MagicMock()
+        result.all.return_value = [("GBP", "USD", date(2026, 1, 1), Decimal("1.25"))]
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        table = FxRateTable()
+
+        await table.ensure_loaded(db)
+        await table.ensure_loaded(db)
+        assert db.execute.await_count == 1
+
+        table.invalidate()
+        await table.ensure_loaded(db)
+        assert db.execute.await_count == 2
@@ -0,0 +1,200 @@
+"""
+Tests for the notification outbox dispatcher.
+
+Tests cover enqueueing, per-user coalescing, retry bookkeeping and the
+Resend batch endpoint chunking, using the stub providers.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.detection.models import AlertSeverity
+from app.notifications.dispatcher import (
+    NotificationDispatcher,
+    enqueue_alert_notifications,
+    SLACK_ALERTS_PER_MESSAGE,
+)
+from app.notifications.email_provider import (
+    EmailMessage,
+    ResendProvider,
+    StubEmailProvider,
+    StubSlackProvider,
+)
+from app.notifications.models import (
+    NotificationChannel,
+    NotificationType,
+    NotificationOutbox,
+    OutboxStatus,
+)
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def make_alert(alert_id: str, user_id: str, severity: str):
+    return SimpleNamespace(
+        id=alert_id,
+        user_id=user_id,
+        severity=severity,
+        title=f"Alert {alert_id}",
+        description="Something needs attention",
+        detection_type="late_payment",
+        cash_impact=-5000.0,
+        context_data={},
+        deadline=None,
+    )
+
+
+def make_entry(alert, channel=NotificationChannel.EMAIL, attempts=0):
+    return NotificationOutbox(
+        user_id=alert.user_id,
+        alert_id=alert.id,
+        notification_type=NotificationType.ALERT_EMERGENCY,
+        channel=channel,
+        status=OutboxStatus.PENDING.value,
+        attempts=attempts,
+    )
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.commit = AsyncMock()
+    db.execute = AsyncMock()
+    return db
+
+
+@pytest.fixture
+def dispatcher(mock_db):
+    return NotificationDispatcher(
+        mock_db,
+        email_provider=StubEmailProvider(),
+        slack_provider=StubSlackProvider(),
+        batch_size=100,
+        max_concurrency=4,
+        max_attempts=2,
+    )
+
+
+# =============================================================================
+# Enqueue
+# =============================================================================
+
+class TestEnqueue:
+    """Tests for enqueue_alert_notifications."""
+
+    @pytest.mark.asyncio
+    async def test_channels_by_severity(self, mock_db):
+        alerts = [
+            make_alert("a1", "u1", AlertSeverity.EMERGENCY.value),
+            make_alert("a2", "u1", AlertSeverity.THIS_WEEK.value),
+            make_alert("a3", "u1", AlertSeverity.UPCOMING.value),
+        ]
+
+        with patch("app.notifications.dispatcher.NotificationOutbox") as outbox_cls:
+            queued = await enqueue_alert_notifications(mock_db, alerts)
+
+        # Emergency: email + slack, this_week: email, upcoming: nothing
+        assert queued == 3
+        channels = [call.kwargs["channel"] for call in outbox_cls.call_args_list]
+        assert channels.count(NotificationChannel.EMAIL) == 2
+        assert channels.count(NotificationChannel.SLACK) == 1
+        mock_db.add_all.assert_called_once()
+
+
+# =============================================================================
+# Dispatch
+# =============================================================================
+
+class TestDispatch:
+    """Tests for coalescing and delivery bookkeeping."""
+
+    @pytest.mark.asyncio
+    async def test_email_coalesced_per_user(self, dispatcher):
+        a1 = make_alert("a1", "u1", AlertSeverity.EMERGENCY.value)
+        a2 = make_alert("a2", "u1", AlertSeverity.THIS_WEEK.value)
+        a3 = make_alert("a3", "u2", AlertSeverity.EMERGENCY.value)
+        alerts = {a.id: a for a in (a1, a2, a3)}
+        groups = [
+            ("u1", [make_entry(a1), make_entry(a2)]),
+            ("u2", [make_entry(a3)]),
+        ]
+
+        sent, failed = await dispatcher._dispatch_email(
+            groups, alerts, {"u1": "one@example.com", "u2": "two@example.com"}
+        )
+
+        provider = dispatcher.email_provider
+        assert (sent, failed) == (2, 0)
+        assert provider.batch_calls == 1
+        assert [m.to for m in provider.sent] == ["one@example.com", "two@example.com"]
+        assert "2 New Alerts" in provider.sent[0].subject
+        for _, group in groups:
+            assert all(e.status == OutboxStatus.SENT.value for e in group)
+
+        # One log row per alert, not per message
+        logs = dispatcher.db.add_all.call_args_list
+        assert sum(len(call.args[0]) for call in logs) == 3
+
+    @pytest.mark.asyncio
+    async def test_email_failure_retries_then_fails(self, dispatcher):
+        dispatcher.email_provider.fail_for = {"one@example.com"}
+        alert = make_alert("a1", "u1", AlertSeverity.EMERGENCY.value)
+        entry = make_entry(alert)
+
+        await dispatcher._dispatch_email([("u1", [entry])], {"a1": alert}, {"u1": "one@example.com"})
+        assert entry.status == OutboxStatus.PENDING.value
+        assert entry.attempts == 1
+
+        await dispatcher._dispatch_email([("u1", [entry])], {"a1": alert}, {"u1": "one@example.com"})
+        assert entry.status == OutboxStatus.FAILED.value
+        assert entry.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_slack_chunks_large_groups(self, dispatcher):
+        alerts = {
+            f"a{i}": make_alert(f"a{i}", "u1", AlertSeverity.EMERGENCY.value)
+            for i in range(SLACK_ALERTS_PER_MESSAGE + 1)
+        }
+        entries = [make_entry(a, channel=NotificationChannel.SLACK) for a in alerts.values()]
+
+        sent, failed = await dispatcher._dispatch_slack([("u1", entries)], alerts)
+
+        assert (sent, failed) == (2, 0)
+        assert len(dispatcher.slack_provider.sent) == 2
+
+
+# =============================================================================
+# Resend batch endpoint
+# =============================================================================
+
+class TestResendBatch:
+    """Tests for ResendProvider.send_batch."""
+
+    @pytest.mark.asyncio
+    async def test_chunks_at_batch_limit(self):
+        provider = ResendProvider(api_key="re_test")
+        messages = [
+            EmailMessage(to=f"u{i}@example.com", subject="s", html_body="h", plain_text_body="t")
+            for i in range(ResendProvider.BATCH_LIMIT + 5)
+        ]
+
+        def _response(url, headers, json):
+            return SimpleNamespace(
+                status_code=200,
+                json=lambda: {"data": [{"id": f"id-{m['to'][0]}"} for m in json]},
+                text="",
+            )
+
+        client = MagicMock()
+        client.post = AsyncMock(side_effect=_response)
+
+        with patch("app.notifications.email_provider.get_http_client", return_value=client):
+            results = await provider.send_batch(messages)
+
+        assert client.post.await_count == 2
+        assert all(call.args[0].endswith("/emails/batch") for call in client.post.await_args_list)
+        assert len(results) == len(messages)
+        assert results[-1].message_id == f"id-{messages[-1].to}"
@@ -0,0 +1,152 @@
+"""
+Tests for keyset pages and NDJSON streaming on obligation listings.
+"""
+
+import json
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.data.obligations.routes import (
+    NEXT_CURSOR_HEADER,
+    _decode_cursor,
+    _encode_cursor,
+    _keyset,
+    list_payment_events,
+    list_unpaid_schedules,
+)
+from app.models import ObligationSchedule, PaymentEvent
+from app.schemas.obligation import PaymentEventResponse
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def make_schedule(schedule_id: str, due: date) -> ObligationSchedule:
+    return ObligationSchedule(
+        id=schedule_id,
+        obligation_id="obl_1",
+        user_id="u1",
+        due_date=due,
+        estimated_amount=Decimal("100"),
+        estimate_source="fixed_agreement",
+        confidence="high",
+        status="scheduled",
+    )
+
+
+def make_payment(payment_id: str, paid: date) -> PaymentEvent:
+    return PaymentEvent(
+        id=payment_id,
+        user_id="u1",
+        amount=Decimal("100"),
+        currency="USD",
+        payment_date=paid,
+        status="completed",
+        source="manual",
+        is_reconciled=False,
+        created_at=datetime(2026, 10, 1),
+    )
+
+
+def db_returning(rows):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = rows
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+class TestCursor:
+    """Tests for cursor encoding and keyset clauses."""
+
+    def test_round_trip(self):
+        cursor = _encode_cursor(date(2026, 10, 1), "sch_9")
+
+        assert _decode_cursor(cursor, ObligationSchedule.due_date) == (date(2026, 10, 1), "sch_9")
+
+    def test_invalid_cursor_is_a_400(self):
+        with pytest.raises(HTTPException) as exc:
+            _decode_cursor("not-a-cursor", ObligationSchedule.due_date)
+        assert exc.value.status_code == 400
+
+    def test_descending_pages_continue_below_the_cursor(self):
+        cursor = _encode_cursor(date(2026, 10, 1), "pay_9")
+        query = _keyset(select(PaymentEvent), PaymentEvent.payment_date, PaymentEvent.id, True, cursor)
+
+        sql = _sql(query)
+        assert "(payment_events.payment_date, payment_events.id) < (" in sql
+        assert "ORDER BY payment_events.payment_date DESC, payment_events.id DESC" in sql
+
+
+class TestListingPages:
+    """Tests for paged listing responses."""
+
+    @pytest.mark.asyncio
+    async def test_full_page_sets_next_cursor(self):
+        rows = [make_schedule(f"sch_{i}", date(2026, 10, i + 1)) for i in range(3)]
+        db = db_returning(rows)
+        response = Response()
+
+        page = await list_unpaid_schedules(
+            response, MagicMock(id="u1"), overdue_only=False, limit=2, cursor=None, stream=False, db=db
+        )
+
+        assert [s.id for s in page] == ["sch_0", "sch_1"]
+        assert "LIMIT" in _sql(db.execute.await_args.args[0])
+        assert _decode_cursor(response.headers[NEXT_CURSOR_HEADER], ObligationSchedule.due_date) == (
+            date(2026, 10, 2), "sch_1",
+        )
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_cursor(self):
+        db = db_returning([make_schedule("sch_0", date(2026, 10, 1))])
+        response = Response()
+
+        page = await list_unpaid_schedules(
+            response, MagicMock(id="u1"), overdue_only=False, limit=2, cursor=None, stream=False, db=db
+        )
+
+        assert len(page) == 1
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+
+class TestListingStream:
+    """Tests for NDJSON streaming."""
+
+    @pytest.mark.asyncio
+    async def test_rows_stream_from_a_server_side_cursor(self):
+        rows = [make_payment("pay_1", date(2026, 10, 2)), make_payment("pay_2", date(2026, 10, 1))]
+
+        async def scalars():
+            for row in rows:
+                yield row
+
+        session = MagicMock()
+        session.stream_scalars = AsyncMock(return_value=scalars())
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        db = db_returning([])
+
+        with patch("app.data.obligations.routes.ReadSessionLocal", return_value=session):
+            response = await list_payment_events(
+                Response(), MagicMock(id="u1"), obligation_id=None, from_date=None, to_date=None,
+                payment_status=None, reconciled_only=False, limit=None, cursor=None, stream=True, db=db,
+            )
+            lines = [line async for line in response.body_iterator]
+
+        assert isinstance(response, StreamingResponse)
+        assert response.media_type == "application/x-ndjson"
+        db.execute.assert_not_awaited()
+        statement = session.stream_scalars.await_args.args[0]
+        assert statement.get_execution_options()["yield_per"] > 0
+        assert [PaymentEventResponse(**json.loads(line)).id for line in lines] == ["pay_1", "pay_2"]
+        assert all(line.endswith("\n") for line in lines)
@@ -0,0 +1,79 @@
+"""
+Tests for typed pipeline metrics, daily rollups and partition helpers.
+"""
+
+import pytest
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.engines.pipeline import (
+    log_pipeline_run,
+    get_pipeline_health,
+    PipelineMode,
+    PipelineResult,
+)
+from app.models.pipeline_metrics import PipelineRunMetric
+from app.partitions import add_months, partition_ddl
+
+
+class TestPipelineMetrics:
+    """Tests for metrics written at log time and read by the health endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_log_run_writes_metric_and_rollups(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+        result = PipelineResult(
+            user_id="test-user",
+            run_at=datetime(2026, 10, 18, 9, 30),
+            mode=PipelineMode.FULL,
+            alerts_detected=2,
+            alerts_by_type={"late_payment": 2},
+            actions_by_type={"invoice_follow_up": 1},
+            total_duration_ms=120,
+        )
+
+        with patch("app.audit.services.audit_sink") as sink:
+            sink.running = False
+            await log_pipeline_run(db, "test-user", result)
+
+        metrics = [c.args[0] for c in db.add.call_args_list if isinstance(c.args[0], PipelineRunMetric)]
+        assert len(metrics) == 1
+        assert metrics[0].total_ms == 120
+        assert metrics[0].run_at.tzinfo is not None
+        # Daily rollup upsert + per-type counts upsert
+        assert db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_health_reads_rollups(self):
+        db = MagicMock()
+        totals = MagicMock()
+        totals.one.return_value = (10, 9, 5000, 12, 4, 1)
+        last_run = MagicMock()
+        last_run.scalar_one_or_none.return_value = None
+        queue = MagicMock()
+        queue.all.return_value = [("pending_approval", 3)]
+        db.execute = AsyncMock(side_effect=[totals, last_run, queue])
+
+        health = await get_pipeline_health(db, "test-user")
+
+        assert db.execute.await_count == 3
+        assert health["metrics"]["runs_last_7_days"] == 10
+        assert health["metrics"]["success_rate"] == 0.9
+        assert health["metrics"]["avg_duration_ms"] == 500.0
+        assert health["action_queue"]["pending_approval"] == 3
+        assert health["status"] == "warning"
+
+
+class TestPartitions:
+    """Tests for monthly partition naming and bounds."""
+
+    def test_partition_ddl_covers_month(self):
+        ddl = partition_ddl("pipeline_run_metrics", date(2026, 12, 15))
+
+        assert "pipeline_run_metrics_y2026m12" in ddl
+        assert "FROM ('2026-12-01') TO ('2027-01-01')" in ddl
+
+    def test_add_months_crosses_years(self):
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+        assert add_months(date(2026, 11, 1), 14) == date(2028, 1, 1)
@@ -0,0 +1,144 @@
+"""
+Tests for batch preparation with a shared context.
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.models import ActionOption, DetectionAlert, PreparedAction
+from app.preparation.context import PreparationContext, get_client_contexts, load_preparation_context
+from app.preparation.engine import PreparationEngine
+from app.preparation.models import ActionStatus, ActionType
+
+
+CASH = {
+    "total_starting_cash": 50000.0,
+    "buffer_amount": 20000.0,
+    "buffer_months": 3,
+    "runway_weeks": 20,
+    "weekly_forecast": [],
+    "accounts": [],
+}
+
+
+def make_alert(alert_id: str, client_id: str) -> DetectionAlert:
+    return DetectionAlert(
+        id=alert_id,
+        user_id="u1",
+        title=f"Invoice {alert_id} overdue",
+        detection_type="late_payment",
+        severity="this_week",
+        status="active",
+        context_data={"client_id": client_id, "amount": 5000, "days_overdue": 10},
+        cash_impact=5000.0,
+        detected_at=datetime(2026, 10, 1),
+    )
+
+
+def make_action(action_id: str, action_type: str) -> PreparedAction:
+    return PreparedAction(
+        id=action_id,
+        user_id="u1",
+        alert_id="a1",
+        action_type=action_type,
+        status=ActionStatus.PENDING_APPROVAL,
+        problem_summary="",
+        options=[],
+    )
+
+
+def _rows(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    result.scalars.return_value.all.return_value = rows
+    return result
+
+
+def make_db(*results):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    db.flush = AsyncMock()
+    return db
+
+
+class TestContextLoading:
+    """Tests for loading context for many entities at once."""
+
+    @pytest.mark.asyncio
+    async def test_client_contexts_use_three_queries(self):
+        clients = [
+            MagicMock(id=f"c{i}", revenue_percent=None, relationship_type=None, payment_behavior="on_time")
+            for i in range(5)
+        ]
+        db = make_db(_rows(clients), _rows([("c0", 14)]), _rows([("c1", 2, 1500)]))
+
+        contexts = await get_client_contexts(db, [c.id for c in clients] + ["missing", "c0"])
+
+        assert db.execute.await_count == 3
+        assert contexts["c0"]["recent_payment_count"] == 10
+        assert contexts["c1"]["total_outstanding"] == 1500.0
+        assert contexts["c1"]["outstanding_invoice_count"] == 2
+        assert contexts["missing"]["error"] == "Client not found"
+
+    @pytest.mark.asyncio
+    async def test_batch_context_loads_each_client_once(self):
+        alerts = [make_alert("a1", "c1"), make_alert("a2", "c1"), make_alert("a3", "c2")]
+
+        with patch("app.preparation.context.get_cash_context", AsyncMock(return_value=CASH)) as cash, \
+                patch("app.preparation.context.get_client_contexts", AsyncMock(return_value={})) as clients, \
+                patch("app.preparation.context.get_payroll_context", AsyncMock()) as payroll:
+            await load_preparation_context(MagicMock(), "u1", alerts)
+
+        cash.assert_awaited_once()
+        clients.assert_awaited_once()
+        assert clients.await_args.args[1] == ["c1", "c1", "c2"]
+        payroll.assert_not_awaited()
+
+
+class TestBatchPreparation:
+    """Tests for PreparationEngine.prepare_actions_for_alerts."""
+
+    @pytest.mark.asyncio
+    async def test_agents_run_against_shared_context(self):
+        alerts = [make_alert("a1", "c1"), make_alert("a2", "c2")]
+        context = PreparationContext(
+            cash=CASH,
+            clients={
+                "c1": {"name": "Acme", "suggested_tone": "soft"},
+                "c2": {"name": "Globex", "suggested_tone": "firm"},
+            },
+        )
+        db = make_db()
+        engine = PreparationEngine(db, "u1")
+
+        with patch("app.preparation.engine.load_preparation_context", AsyncMock(return_value=context)) as load:
+            actions = await engine.prepare_actions_for_alerts(alerts)
+
+        load.assert_awaited_once()
+        db.execute.assert_not_awaited()
+        db.add_all.assert_called_once_with(actions)
+        db.flush.assert_awaited_once()
+        assert [a.action_type for a in actions] == [ActionType.INVOICE_FOLLOW_UP] * 2
+        assert all(a.id for a in actions)
+        assert all(alert.status == "preparing" for alert in alerts)
+        assert engine._context is None
+
+    @pytest.mark.asyncio
+    async def test_linking_loads_pending_actions_once(self):
+        batch = [make_action("n1", ActionType.VENDOR_DELAY), make_action("n2", ActionType.VENDOR_DELAY)]
+        pending = [make_action("p1", ActionType.VENDOR_DELAY)]
+        for action in batch + pending:
+            action.options = [ActionOption(prepared_content={"vendor_id": "v1"}, cash_impact=0)]
+        db = make_db(_rows(pending))
+        engine = PreparationEngine(db, "u1")
+
+        links = await engine._detect_linked_actions(batch)
+
+        db.execute.assert_awaited_once()
+        pairs = {(link.action_id, link.linked_action_id) for link in links}
+        # Each new action links to the pending one; the batch pair is linked once
+        assert pairs == {("n1", "p1"), ("n1", "n2"), ("n2", "p1")}
+        assert {link.link_type for link in links} == {"conflicts"}
+        db.add_all.assert_called_once_with(links)
@@ -0,0 +1,97 @@
+"""
+Tests for per-route SQL query instrumentation.
+"""
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.middleware.query_metrics import QueryMetricsMiddleware
+from app.query_metrics import instrument_engine, query_registry, track_queries, tracked_job
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    query_registry.reset()
+    yield
+    query_registry.reset()
+
+
+def run_queries(engine, n: int):
+    with engine.connect() as conn:
+        for i in range(n):
+            conn.execute(text(f"SELECT {i}"))
+
+
+class TestTrackQueries:
+    """Tests for statement attribution."""
+
+    def test_counts_statements_in_scope_only(self, sqlite_engine):
+        run_queries(sqlite_engine, 2)
+        with track_queries("job:test") as stats:
+            run_queries(sqlite_engine, 3)
+
+        assert stats.count == 3
+        assert len(stats.slowest) == 3
+        assert query_registry.totals["job:test"].queries == 3
+        assert query_registry.totals["job:test"].runs == 1
+
+    def test_budget_exceeded_is_flagged(self, sqlite_engine, caplog):
+        with patch("app.query_metrics.settings.QUERY_BUDGETS", {"job:loop": 2}):
+            with track_queries("job:loop"):
+                run_queries(sqlite_engine, 3)
+
+        assert query_registry.totals["job:loop"].budget_exceeded == 1
+        assert "Query budget exceeded for job:loop" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_tracked_job_uses_function_name(self, sqlite_engine):
+        async def nightly_job():
+            run_queries(sqlite_engine, 1)
+            return "done"
+
+        assert await tracked_job(nightly_job)() == "done"
+        assert query_registry.totals["job:nightly_job"].queries == 1
+
+    def test_prometheus_rendering(self, sqlite_engine):
+        with track_queries('GET /api/"odd"'):
+            run_queries(sqlite_engine, 2)
+
+        body = query_registry.render_prometheus()
+
+        assert "# TYPE tamio_db_queries_total counter" in body
+        assert 'tamio_db_queries_total{scope="GET /api/\\"odd\\""} 2' in body
+
+
+class TestQueryMetricsMiddleware:
+    """Tests for per-request labelling and debug headers."""
+
+    @pytest.mark.asyncio
+    async def test_labels_by_route_template_and_sets_headers(self, sqlite_engine):
+        app = FastAPI()
+
+        @app.get("/api/clients/{client_id}")
+        async def get_client(client_id: str):
+            run_queries(sqlite_engine, 4)
+            return {"id": client_id}
+
+        app.add_middleware(QueryMetricsMiddleware)
+        transport = httpx.ASGITransport(app=app)
+
+        with patch("app.middleware.query_metrics.settings.QUERY_METRICS_DEBUG", True):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/api/clients/abc")
+
+        assert response.headers["X-DB-Query-Count"] == "4"
+        assert query_registry.totals["GET /api/clients/{client_id}"].queries == 4
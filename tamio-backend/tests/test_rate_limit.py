@@ -0,0 +1,213 @@
+"""
+Tests for token-bucket rate limiting.
+"""
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from sqlalchemy.dialects import postgresql
+
+from app.auth.utils import create_access_token
+from app.middleware.rate_limit import (
+    MemoryRateLimitStore,
+    PostgresRateLimitStore,
+    RateLimiter,
+    RateLimitMiddleware,
+    RateLimitStore,
+    _TAKE_SQL,
+    parse_rate,
+)
+
+
+class FailingEngine:
+    def __init__(self):
+        self.attempts = 0
+
+    def begin(self):
+        self.attempts += 1
+        raise ConnectionError("database unavailable")
+
+
+def build_app(limiter: RateLimiter) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/data/clients")
+    async def list_clients():
+        return []
+
+    @app.post("/api/tami/chat")
+    async def chat():
+        return {"ok": True}
+
+    @app.post("/api/xero/webhooks")
+    async def xero_webhooks():
+        return None
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return app
+
+
+class TestMemoryStore:
+    """Tests for the in-process token bucket."""
+
+    @pytest.mark.asyncio
+    async def test_bucket_empties_and_refills(self):
+        store = MemoryRateLimitStore(max_keys=10)
+        with patch("app.middleware.rate_limit.time.monotonic", return_value=100.0):
+            results = [await store.take("k", 1, capacity=3, refill_per_second=1) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert results[-1].retry_after == pytest.approx(1.0)
+
+        with patch("app.middleware.rate_limit.time.monotonic", return_value=101.5):
+            result = await store.take("k", 1, capacity=3, refill_per_second=1)
+        assert result.allowed
+        assert result.remaining == pytest.approx(0.5)
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_keys_are_evicted(self):
+        store = MemoryRateLimitStore(max_keys=2)
+        await store.take("a", 1, 5, 1)
+        await store.take("b", 1, 5, 1)
+        await store.take("a", 1, 5, 1)
+        await store.take("c", 1, 5, 1)
+
+        assert len(store) == 2
+        assert set(store._buckets) == {"a", "c"}
+
+    @pytest.mark.asyncio
+    async def test_charge_can_overdraw_a_bucket(self):
+        store = MemoryRateLimitStore()
+
+        assert await store.charge("a", 8, 5, 1) == pytest.approx(-3, abs=0.01)
+        assert not (await store.take("a", 1, 5, 1)).allowed
+
+    def test_stores_must_implement_take(self):
+        class Incomplete(RateLimitStore):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestRateLimiter:
+    """Tests for endpoint classes and bucket keys."""
+
+    def test_parse_rate(self):
+        assert parse_rate("100/minute") == (100, 60)
+        assert parse_rate("5/hours") == (5, 3600)
+        with pytest.raises(ValueError):
+            parse_rate("5/fortnight")
+
+    def test_expensive_classes_cost_more(self):
+        with patch.multiple(
+            "app.middleware.rate_limit.settings",
+            RATE_LIMIT_TAMI="20/minute",
+            RATE_LIMIT_SCENARIO_BUILD="10/minute",
+        ):
+            limiter = RateLimiter(MemoryRateLimitStore(), default_limit="100/minute")
+
+        assert limiter.cost("GET", "/api/data/clients") == 1.0
+        assert limiter.cost("POST", "/api/tami/chat") == pytest.approx(5.0)
+        assert limiter.cost("GET", "/api/tami/sessions") == 1.0
+        assert limiter.classify("POST", "/api/scenarios/scenarios/abc/build") == "scenario_build"
+        assert limiter.cost("POST", "/api/scenarios/abc/iterate") == pytest.approx(10.0)
+        assert limiter.classify("GET", "/api/forecast/confidence") == "forecast"
+        assert limiter.classify("GET", "/api/scenarios/scenarios/abc/forecast") == "forecast"
+        assert limiter.classify("GET", "/api/forecasting") is None
+
+    def test_key_prefers_authenticated_user(self):
+        token = create_access_token("user_1", "a@example.com")
+        scope = {"headers": [(b"authorization", f"Bearer {token}".encode())], "client": ("10.0.0.1", 1234)}
+
+        assert RateLimiter.key_for(scope) == "user:user_1"
+        assert RateLimiter.key_for({"headers": [], "client": ("10.0.0.1", 1234)}) == "ip:10.0.0.1"
+
+
+class TestPostgresStore:
+    """Tests for the shared store."""
+
+    def test_take_is_a_single_upsert(self):
+        sql = str(_TAKE_SQL.compile(dialect=postgresql.dialect()))
+
+        assert sql.count("INSERT INTO rate_limit_buckets") == 1
+        assert "ON CONFLICT (key) DO UPDATE" in sql
+        assert "RETURNING tokens, allowed" in sql
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_memory_when_database_fails(self):
+        fallback = MemoryRateLimitStore(max_keys=10)
+        store = PostgresRateLimitStore(engine=FailingEngine(), fallback=fallback)
+
+        result = await store.take("k", 1, 2, 1)
+
+        assert result.allowed
+        assert len(fallback) == 1
+
+    @pytest.mark.asyncio
+    async def test_breaker_skips_the_database_during_cooldown(self, caplog):
+        engine = FailingEngine()
+        store = PostgresRateLimitStore(engine=engine, cooldown=30)
+
+        with patch("app.middleware.rate_limit.time.monotonic", return_value=100.0):
+            for _ in range(3):
+                assert (await store.take("k", 1, 5, 1)).allowed
+            await store.charge("k", 1, 5, 1)
+        assert engine.attempts == 1
+
+        with patch("app.middleware.rate_limit.time.monotonic", return_value=131.0):
+            await store.take("k", 1, 5, 1)
+        assert engine.attempts == 2  # Probed again after the cooldown
+        assert len([r for r in caplog.records if "unavailable" in r.getMessage()]) == 1
+
+    def test_dedicated_engine_has_short_timeouts(self):
+        with patch("app.database.create_async_engine") as create, \
+                patch("app.database.settings.RATE_LIMIT_DB_TIMEOUT", 0.5):
+            PostgresRateLimitStore()
+
+        kwargs = create.call_args.kwargs
+        assert kwargs["pool_timeout"] == 0.5 and kwargs["max_overflow"] == 0
+        assert kwargs["connect_args"]["command_timeout"] == 0.5
+
+
+class TestRateLimitMiddleware:
+    """Tests for the ASGI middleware."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_with_429_once_bucket_is_empty(self):
+        with patch("app.middleware.rate_limit.settings.RATE_LIMIT_TAMI", "1/minute"):
+            limiter = RateLimiter(MemoryRateLimitStore(), default_limit="3/minute")
+        transport = httpx.ASGITransport(app=build_app(limiter))
+        headers = {"Authorization": f"Bearer {create_access_token('user_1', 'a@example.com')}"}
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/api/data/clients", headers=headers)
+            assert first.status_code == 200
+            assert first.headers["X-RateLimit-Remaining"] == "2"
+
+            # A TAMI call costs the whole remaining bucket's worth (3 tokens)
+            denied = await client.post("/api/tami/chat", headers=headers)
+            assert denied.status_code == 429
+            assert int(denied.headers["Retry-After"]) >= 1
+
+            # Unlimited paths and other principals are unaffected
+            assert (await client.get("/health")).status_code == 200
+            assert (await client.get("/api/data/clients")).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_xero_webhooks_are_not_limited(self):
+        limiter = RateLimiter(MemoryRateLimitStore(), default_limit="2/minute")
+        transport = httpx.ASGITransport(app=build_app(limiter))
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for _ in range(5):
+                response = await client.post("/api/xero/webhooks")
+                assert response.status_code == 200
+                assert "X-RateLimit-Remaining" not in response.headers
+            assert (await client.get("/api/data/clients")).headers["X-RateLimit-Remaining"] == "1"
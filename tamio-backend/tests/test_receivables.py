@@ -0,0 +1,160 @@
+"""
+Tests for the normalised receivables table helpers.
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.services.receivables import (
+    build_receivable_rows,
+    sum_receivables_due,
+    sync_xero_receivables,
+)
+from app.models import Client
+from app.xero.sync import sync_contacts, sync_invoices
+
+
+def _row(*values):
+    result = MagicMock()
+    result.one.return_value = values
+    return result
+
+
+class TestBuildRows:
+    """Tests for mapping billing_config invoices to rows."""
+
+    def test_maps_invoice_fields(self):
+        rows = build_receivable_rows("u1", "c1", [{
+            "name": "Invoice #42",
+            "expected_date": "2026-11-01",
+            "amount": 1500.5,
+            "payment_terms": "net_0",
+            "xero_invoice_id": "inv-42",
+            "invoice_number": "42",
+            "currency": "EUR",
+        }])
+
+        assert rows == [{
+            "user_id": "u1",
+            "client_id": "c1",
+            "source": "xero",
+            "external_id": "inv-42",
+            "invoice_number": "42",
+            "name": "Invoice #42",
+            "amount": Decimal("1500.5"),
+            "currency": "EUR",
+            "expected_date": date(2026, 11, 1),
+            "due_date": None,
+            "payment_terms": "net_0",
+            "synced_at": None,
+        }]
+
+    def test_skips_unusable_invoices(self):
+        rows = build_receivable_rows("u1", "c1", [
+            {"expected_date": "not-a-date", "amount": 10},
+            {"expected_date": "2026-11-01", "amount": "n/a"},
+            {"due_date": "2026-11-02T00:00:00", "amount": 5},
+        ])
+
+        assert [r["expected_date"] for r in rows] == [date(2026, 11, 2)]
+
+
+class TestSync:
+    """Tests for replacing a user's Xero receivables."""
+
+    @pytest.mark.asyncio
+    async def test_replaces_xero_rows(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        written = await sync_xero_receivables(db, "u1", {
+            "c1": [{"expected_date": "2026-11-01", "amount": 100, "xero_invoice_id": "a"}],
+            "c2": [{"expected_date": "2026-11-05", "amount": 200, "xero_invoice_id": "b"}],
+        })
+
+        assert written == 2
+        delete_stmt = db.execute.await_args_list[0].args[0]
+        assert str(delete_stmt).startswith("DELETE FROM receivables")
+        inserted = db.execute.await_args_list[1].args[1]
+        assert [r["client_id"] for r in inserted] == ["c1", "c2"]
+
+    @pytest.mark.asyncio
+    async def test_empty_sync_only_deletes(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        assert await sync_xero_receivables(db, "u1", {}) == 0
+        assert db.execute.await_count == 1
+
+
+class TestAggregates:
+    """Tests for AR range aggregates."""
+
+    @pytest.mark.asyncio
+    async def test_sum_due_is_one_range_query(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=_row(Decimal("100.00"), None))
+
+        due = await sum_receivables_due(db, "u1", horizons=(14, 30), today=date(2026, 10, 18))
+
+        assert due == {14: Decimal("100.00"), 30: Decimal("0")}
+        assert db.execute.await_count == 1
+        sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "FILTER (WHERE receivables.expected_date <=" in sql
+        assert "clients.status" in sql
+
+
+class TestXeroSyncExistingClients:
+    """Tests for Xero syncs that match clients the user already has."""
+
+    @staticmethod
+    def _db(*clients):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = list(clients)
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        db.flush = AsyncMock()
+        return db
+
+    @staticmethod
+    def _client(**overrides):
+        values = dict(
+            id="client_1", user_id="u1", name="Acme", client_type="retainer", currency="USD",
+            status="active", billing_config={}, xero_contact_id=None, payment_behavior="unknown",
+        )
+        values.update(overrides)
+        return Client(**values)
+
+    @pytest.mark.asyncio
+    async def test_contact_matching_a_client_by_name_links_it(self):
+        existing = self._client()
+        db = self._db(existing)
+
+        results = await sync_contacts(db, "u1", [{"name": "ACME", "contact_id": "xc_1", "payment_terms": 45}])
+
+        assert results["errors"] == []
+        assert results["records_updated"] == {"clients": 1}
+        assert results["records_created"] == {"clients": 0}
+        assert existing.xero_contact_id == "xc_1"
+        assert existing.payment_behavior == "delayed"
+
+    @pytest.mark.asyncio
+    async def test_invoices_of_an_existing_client_keep_its_receivables(self):
+        existing = self._client()
+        db = self._db(existing)
+        invoices = [{
+            "type": "ACCREC", "amount_due": 120, "contact_name": "Acme", "contact_id": "xc_1",
+            "due_date": date(2026, 11, 1), "invoice_id": "inv_1", "invoice_number": "INV-1",
+        }]
+
+        with patch("app.xero.sync.sync_xero_receivables", new_callable=AsyncMock) as replace:
+            results = await sync_invoices(db, "u1", invoices)
+
+        assert results["records_updated"] == {"clients": 1}
+        assert existing.xero_contact_id == "xc_1"
+        assert [m["xero_invoice_id"] for m in replace.await_args.args[2]["client_1"]] == ["inv_1"]
@@ -0,0 +1,126 @@
+"""
+Tests for building the risk list.
+"""
+
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import Response
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.alerts_actions.routes import (
+    _after_risk_cursor,
+    _decode_risk_cursor,
+    _encode_risk_cursor,
+    build_risks,
+    get_risks,
+)
+from app.models import DetectionAlert
+
+
+def make_alert(alert_id: str, severity: str = "this_week", deadline=None) -> DetectionAlert:
+    return DetectionAlert(
+        id=alert_id,
+        user_id="u1",
+        title=f"Alert {alert_id}",
+        detection_type="late_payment",
+        severity=severity,
+        status="active",
+        context_data={},
+        cash_impact=5000.0,
+        detected_at=datetime(2026, 10, 1),
+        deadline=deadline,
+        prepared_actions=[],
+    )
+
+
+def _scalar(value):
+    result = MagicMock()
+    result.scalar.return_value = value
+    return result
+
+
+def _alerts(alerts):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = alerts
+    return result
+
+
+def make_request(headers=None) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw, "query_string": b""})
+
+
+CONFIG = SimpleNamespace(obligations_buffer_amount=20000)
+
+
+class TestBuildRisks:
+    """Tests for shared per-user context."""
+
+    @pytest.mark.asyncio
+    async def test_cash_and_config_loaded_once(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=_scalar(100000))
+        alerts = [make_alert(f"a{i}") for i in range(5)]
+
+        with patch("app.alerts_actions.routes.get_or_create_config", AsyncMock(return_value=CONFIG)) as config:
+            risks = await build_risks(db, "u1", alerts)
+
+        assert [r.id for r in risks] == [f"a{i}" for i in range(5)]
+        assert risks[0].buffer_impact_percent == 25.0
+        assert db.execute.await_count == 1
+        assert config.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_no_alerts_no_queries(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        assert await build_risks(db, "u1", []) == []
+        db.execute.assert_not_awaited()
+
+
+class TestRiskPagination:
+    """Tests for keyset cursors and ETags."""
+
+    def test_cursor_round_trip(self):
+        deadline = datetime(2026, 11, 1, 9, 30)
+
+        assert _decode_risk_cursor(_encode_risk_cursor(make_alert("a1", "emergency", deadline))) == (
+            "emergency", deadline, "a1"
+        )
+        assert _decode_risk_cursor(_encode_risk_cursor(make_alert("a2"))) == ("this_week", None, "a2")
+
+    def test_cursor_clause_compares_sort_key(self):
+        clause = _after_risk_cursor(_encode_risk_cursor(make_alert("a2")))
+        sql = str(clause.compile(dialect=postgresql.dialect()))
+
+        assert "coalesce(detection_alerts.deadline, 'infinity'::timestamp)" in sql
+        assert sql.count("'infinity'::timestamp") == 2
+
+    @pytest.mark.asyncio
+    async def test_page_has_next_cursor_and_unchanged_page_is_304(self):
+        alerts = [make_alert("a1"), make_alert("a2"), make_alert("a3")]
+
+        async def fetch(headers=None):
+            db = MagicMock()
+            db.execute = AsyncMock(side_effect=[_scalar(3), _alerts(list(alerts)), _scalar(100000)])
+            response = Response()
+            with patch("app.alerts_actions.routes.get_or_create_config", AsyncMock(return_value=CONFIG)):
+                body = await get_risks(
+                    make_request(headers), response, severity=None, timing=None, status=None,
+                    category=None, limit=2, cursor=None, user=SimpleNamespace(id="u1"), db=db,
+                )
+            return body, response
+
+        body, response = await fetch()
+        assert [r.id for r in body.risks] == ["a1", "a2"]
+        assert body.total_count == 3
+        assert _decode_risk_cursor(body.next_cursor)[2] == "a2"
+
+        not_modified, _ = await fetch({"If-None-Match": response.headers["ETag"]})
+        assert not_modified.status_code == 304
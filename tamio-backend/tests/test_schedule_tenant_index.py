@@ -0,0 +1,68 @@
+"""
+Tests for the denormalised user_id on obligation schedules.
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.models import ObligationAgreement, ObligationSchedule
+from app.services.cash_windows import load_cash_windows
+from app.services.obligations import ObligationService
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestScheduleIndexes:
+    """Tests for the tenant indexes."""
+
+    def test_composite_indexes(self):
+        indexes = {index.name: index for index in ObligationSchedule.__table__.indexes}
+
+        status_due = _sql(CreateIndex(indexes["ix_obligation_schedules_user_status_due"]))
+        due = _sql(CreateIndex(indexes["ix_obligation_schedules_user_due"]))
+
+        assert "(user_id, status, due_date)" in status_due
+        assert "(user_id, due_date) INCLUDE (estimated_amount)" in due
+
+
+class TestScheduleUserId:
+    """Tests that schedules carry and are filtered by their owner."""
+
+    @pytest.mark.asyncio
+    async def test_generated_schedules_copy_the_agreement_owner(self):
+        db = MagicMock()
+        db.commit = AsyncMock()
+        obligation = ObligationAgreement(
+            id="obl_1",
+            user_id="u1",
+            frequency="monthly",
+            base_amount=Decimal("1000"),
+            confidence="high",
+            start_date=date.today(),
+        )
+
+        schedules = await ObligationService(db).generate_schedules_from_agreement(obligation, months_ahead=3)
+
+        assert schedules
+        assert {s.user_id for s in schedules} == {"u1"}
+
+    @pytest.mark.asyncio
+    async def test_cash_windows_filter_on_schedule_owner(self):
+        result = MagicMock()
+        result.one.return_value = [0] * 9
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+
+        await load_cash_windows(db, "u1", today=date(2026, 10, 18))
+
+        sql = _sql(db.execute.await_args.args[0])
+        assert "obligation_schedules.user_id = " in sql
+        assert "obligation_agreements.user_id" not in sql
@@ -0,0 +1,248 @@
+"""
+Tests for the staged Xero sync pipeline.
+"""
+
+import time
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.middleware.rate_limit import MemoryRateLimitStore
+from app.models import Client, ExpenseBucket, ObligationAgreement, ObligationSchedule
+from app.services.obligations import ObligationService
+from app.xero.sync import (
+    TouchedSources,
+    XeroSnapshot,
+    _run_stage,
+    fetch_xero_snapshot,
+    sync_contacts,
+    sync_invoices,
+    sync_xero_data,
+)
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class FakeXeroClient:
+    """Blocking Xero client stand-in; every call sleeps like a network call."""
+
+    def __init__(self, delay=0.1, fail=None):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def _call(self, name, data):
+        self.calls += 1
+        time.sleep(self.delay)
+        if name == self.fail:
+            raise RuntimeError(f"{name} unavailable")
+        return data
+
+    def get_contacts(self, is_customer=False, is_supplier=False):
+        name = "customers" if is_customer else "suppliers"
+        return self._call(name, [{"name": name}])
+
+    def get_outstanding_invoices(self):
+        return self._call("invoices", [])
+
+    def get_repeating_invoices(self):
+        return self._call("repeating_invoices", [])
+
+
+def scalars(*items):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(items)
+    return result
+
+
+def returning(*pairs):
+    result = MagicMock()
+    result.all.return_value = list(pairs)
+    return result
+
+
+def make_db(*results):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    db.flush = AsyncMock()
+    db.commit = AsyncMock()
+    return db
+
+
+def make_client(**overrides):
+    values = dict(
+        id="client_1", user_id="u1", name="Acme", client_type="project", currency="USD",
+        status="active", billing_config={}, xero_contact_id=None, payment_behavior="unknown",
+    )
+    values.update(overrides)
+    return Client(**values)
+
+
+class TestFetchStage:
+    """Tests for the concurrent Xero fetch."""
+
+    @pytest.mark.asyncio
+    async def test_datasets_are_fetched_concurrently(self):
+        durations = {}
+        started = time.perf_counter()
+
+        snapshot = await fetch_xero_snapshot(FakeXeroClient(delay=0.2), "full", durations)
+
+        assert time.perf_counter() - started < 0.6
+        assert snapshot.customers == [{"name": "customers"}]
+        assert snapshot.suppliers == [{"name": "suppliers"}]
+        assert {"fetch.customers", "fetch.suppliers", "fetch.invoices", "fetch.repeating_invoices"} <= set(durations)
+
+    @pytest.mark.asyncio
+    async def test_a_failed_fetch_is_reported_per_dataset(self):
+        snapshot = await fetch_xero_snapshot(FakeXeroClient(delay=0, fail="invoices"), "full")
+
+        assert snapshot.invoices is None
+        assert snapshot.errors == {"invoices": "invoices unavailable"}
+        assert snapshot.customers is not None
+
+    @pytest.mark.asyncio
+    async def test_stages_without_their_data_are_skipped(self):
+        db = make_db()
+        results = {"records_fetched": {}, "records_created": {}, "records_updated": {}, "errors": []}
+        durations = {}
+        run = AsyncMock()
+
+        await _run_stage(
+            db, results, durations, "suppliers", "Supplier",
+            XeroSnapshot(errors={"invoices": "timeout"}), ("suppliers", "invoices"), run,
+        )
+
+        run.assert_not_called()
+        assert results["errors"] == ["Supplier sync error: timeout"]
+        assert "suppliers" in durations
+
+
+class TestWriteStages:
+    """Tests for the bulk write stages."""
+
+    @pytest.mark.asyncio
+    async def test_contacts_update_matches_and_upsert_new_clients(self):
+        linked = make_client(id="client_1", name="Renamed Co", xero_contact_id="xc_1")
+        db = make_db(scalars(linked), returning(("client_new", "xc_2")))
+        touched = TouchedSources()
+        contacts = [
+            {"name": "Acme", "contact_id": "xc_1", "payment_terms": 45},
+            {"name": "Beta", "contact_id": "xc_2", "payment_terms": 14},
+        ]
+
+        results = await sync_contacts(db, "u1", contacts, touched)
+
+        assert results["records_updated"] == {"clients": 1}
+        assert results["records_created"] == {"clients": 1}
+        assert linked.payment_behavior == "delayed"
+        assert touched.client_ids == {"client_1", "client_new"}
+
+        upsert = db.execute.await_args_list[1].args[0]
+        sql = _sql(upsert)
+        assert "ON CONFLICT (xero_contact_id) DO UPDATE" in sql
+        assert "WHERE clients.user_id = excluded.user_id" in sql
+        assert db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invoices_refresh_receivables_for_existing_and_new_clients(self):
+        existing = make_client(id="client_1", name="Acme", xero_contact_id="xc_1")
+        invoices = [
+            {"type": "ACCREC", "amount_due": 100, "contact_name": "Acme", "contact_id": "xc_1",
+             "due_date": date(2026, 11, 1), "invoice_number": "INV-1"},
+            {"type": "ACCREC", "amount_due": 50, "contact_name": "Beta", "contact_id": "xc_2",
+             "due_date": date(2026, 11, 5), "invoice_number": "INV-2"},
+            {"type": "ACCPAY", "amount_due": 75, "contact_name": "Vendor", "contact_id": "xs_1"},
+        ]
+
+        def execute(statement):
+            if statement.is_select:
+                return scalars(existing)
+            # The upsert returns the id the new row was built with
+            return returning((statement.compile().params["id_m0"], "xc_2"))
+
+        db = make_db()
+        db.execute.side_effect = execute
+
+        with patch("app.xero.sync.sync_xero_receivables", new_callable=AsyncMock) as receivables:
+            results = await sync_invoices(db, "u1", invoices)
+
+        assert results["records_updated"] == {"clients": 1}
+        assert results["records_created"] == {"clients": 1}
+        assert existing.billing_config["milestones"][0]["amount"] == 100.0
+        milestones_by_client = receivables.await_args.args[2]
+        assert len(milestones_by_client) == 2
+        assert [m["invoice_number"] for m in milestones_by_client["client_1"]] == ["INV-1"]
+
+
+class TestObligationBatch:
+    """Tests for batched obligation regeneration."""
+
+    @pytest.mark.asyncio
+    async def test_sources_are_synced_with_one_lookup_delete_and_flush(self):
+        existing = ObligationAgreement(
+            id="obl_1", user_id="u1", expense_bucket_id="bucket_1", frequency="monthly",
+            base_amount=Decimal("100"), confidence="high", start_date=date.today(),
+        )
+        bucket = ExpenseBucket(
+            id="bucket_1", user_id="u1", name="Rent", category="rent", bucket_type="fixed",
+            monthly_amount=Decimal("250"), currency="USD", is_stable=True, due_day=28, frequency="monthly",
+        )
+        client = make_client(
+            client_type="retainer", billing_config={"amount": 500, "frequency": "monthly"},
+        )
+        paused = make_client(id="client_2", status="paused")
+        db = make_db(scalars(existing), MagicMock())
+        db.add_all = MagicMock()
+
+        counts = await ObligationService(db).sync_obligations_bulk([client, paused], [bucket])
+
+        assert counts["created"] == 1 and counts["updated"] == 1
+        assert existing.base_amount == Decimal("250")
+        assert db.execute.await_count == 2
+        assert "DELETE FROM obligation_schedules" in _sql(db.execute.await_args_list[1].args[0])
+        db.flush.assert_awaited_once()
+        db.commit.assert_not_called()
+
+        added = db.add_all.call_args.args[0]
+        new_obligation = next(row for row in added if isinstance(row, ObligationAgreement))
+        assert new_obligation.client_id == "client_1" and new_obligation.base_amount == Decimal("500")
+        schedules = [row for row in added if isinstance(row, ObligationSchedule)]
+        assert {s.obligation_id for s in schedules} == {"obl_1", new_obligation.id}
+        assert counts["schedules"] == len(schedules)
+
+
+class TestSyncLog:
+    """Tests for per-stage durations on the sync log."""
+
+    @pytest.mark.asyncio
+    async def test_stage_durations_are_recorded(self):
+        db = MagicMock()
+        db.flush = AsyncMock()
+        db.commit = AsyncMock()
+        db.add = MagicMock()
+        connection = SimpleNamespace(tenant_id="t1", last_sync_at=None, sync_error=None)
+
+        async def contacts(db, user_id, data, touched):
+            touched.client_ids.add("client_1")
+            return {"records_created": {"clients": 1}}
+
+        with patch("app.xero.sync.get_valid_connection", AsyncMock(return_value=connection)), \
+                patch("app.xero.sync.XeroClient", return_value=FakeXeroClient(delay=0)), \
+                patch("app.xero.budget.tenant_budget_store", return_value=MemoryRateLimitStore()), \
+                patch("app.xero.sync.sync_contacts", side_effect=contacts), \
+                patch("app.xero.sync.sync_obligations", AsyncMock(return_value={})) as obligations:
+            result = await sync_xero_data(db, "u1", sync_type="contacts")
+
+        sync_log = db.add.call_args.args[0]
+        assert result["success"]
+        assert set(result["stage_durations_ms"]) == {"fetch", "fetch.customers", "contacts", "obligations"}
+        assert sync_log.stage_durations_ms == result["stage_durations_ms"]
+        assert obligations.await_args.args[2].client_ids == {"client_1"}
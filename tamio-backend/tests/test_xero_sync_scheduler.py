@@ -0,0 +1,215 @@
+"""
+Tests for tenant-parallel background Xero sync scheduling.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.middleware.rate_limit import MemoryRateLimitStore
+from app.xero import budget
+from app.xero.client import _CountedApi
+from app.xero.sync import sync_xero_data
+from app.xero.sync_scheduler import (
+    SyncCandidate,
+    XeroSyncMetrics,
+    load_active_user_ids,
+    plan_background_sync,
+    run_background_sync,
+)
+
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def ago(minutes: int) -> datetime:
+    return NOW - timedelta(minutes=minutes)
+
+
+def session_factory():
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+    return MagicMock(return_value=session)
+
+
+class TestPlan:
+    """Tests for skipping and prioritising connections."""
+
+    def test_recent_syncs_are_skipped_and_the_rest_ordered_by_staleness(self):
+        candidates = [
+            SyncCandidate("fresh", "t1", ago(5)),
+            SyncCandidate("stale", "t2", ago(120)),
+            SyncCandidate("never", "t3", None),
+            SyncCandidate("active", "t4", ago(90), active=True),
+            SyncCandidate("idle", "t5", ago(30)),
+        ]
+
+        queue, skipped = plan_background_sync(candidates, NOW, fresh_minutes=15)
+
+        assert [c.user_id for c in skipped] == ["fresh"]
+        assert [c.user_id for c in queue] == ["never", "active", "stale", "idle"]
+
+    @pytest.mark.asyncio
+    async def test_activity_comes_from_recent_api_audit_entries(self):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = ["u1"]
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+
+        active = await load_active_user_ids(db, ["u1", "u2"], ago(60))
+
+        assert active == {"u1"}
+        sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "audit_logs.source = " in sql
+        assert "audit_logs.created_at >= " in sql
+
+
+class TestRun:
+    """Tests for the concurrent runner."""
+
+    @pytest.mark.asyncio
+    async def test_tenants_sync_concurrently_within_the_limit(self):
+        candidates = [SyncCandidate(f"u{i}", f"t{i}", ago(60 + i)) for i in range(6)]
+        running, peak, started = 0, 0, []
+
+        async def sync(db, user_id, sync_type):
+            nonlocal running, peak
+            started.append(user_id)
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            if user_id == "u0":
+                return {"success": False, "message": "Sync failed: token revoked"}
+            return {"success": True}
+
+        metrics = XeroSyncMetrics()
+        with patch("app.xero.sync_scheduler.async_session_maker", session_factory()), \
+                patch("app.xero.sync_scheduler.load_sync_candidates", AsyncMock(return_value=candidates)), \
+                patch("app.xero.sync_scheduler.settings.XERO_SYNC_CONCURRENCY", 3), \
+                patch("app.xero.sync_scheduler.settings.XERO_SYNC_START_JITTER_SECONDS", 0):
+            summary = await run_background_sync(sync=sync, now=NOW, metrics=metrics)
+
+        assert peak == 3
+        assert started[:3] == ["u5", "u4", "u3"]
+        assert summary["users_synced"] == 5
+        assert summary["sync_errors"] == 1
+        assert summary["errors"][0]["user_id"] == "u0"
+        assert summary["max_lag_seconds"] == 65 * 60
+        assert metrics.queue_depth == 0
+        assert metrics.max_lag_seconds == 65 * 60
+        assert metrics.last_run_failed == 1
+
+    @pytest.mark.asyncio
+    async def test_tenants_without_budget_are_deferred(self):
+        candidates = [SyncCandidate("u1", "org", ago(60)), SyncCandidate("u2", "org", ago(50))]
+        sync = AsyncMock(side_effect=[
+            {"success": True},
+            {"success": False, "deferred": True, "message": "Xero call budget for xero:org is used up"},
+        ])
+
+        with patch("app.xero.sync_scheduler.async_session_maker", session_factory()), \
+                patch("app.xero.sync_scheduler.load_sync_candidates", AsyncMock(return_value=candidates)), \
+                patch("app.xero.sync_scheduler.settings.XERO_SYNC_CONCURRENCY", 1), \
+                patch("app.xero.sync_scheduler.settings.XERO_SYNC_START_JITTER_SECONDS", 0):
+            summary = await run_background_sync(sync=sync, now=NOW, metrics=XeroSyncMetrics())
+
+        assert (summary["users_synced"], summary["deferred"], summary["sync_errors"]) == (1, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_background_sync_runs_the_sync_stages(self):
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        session.flush = AsyncMock()
+        session.commit = AsyncMock()
+        connection = MagicMock(last_sync_at=None)
+        xero_client = MagicMock(calls=3)
+        xero_client.get_contacts.return_value = []
+        xero_client.get_outstanding_invoices.return_value = []
+        xero_client.get_repeating_invoices.return_value = []
+        stages = {
+            name: AsyncMock(return_value={})
+            for name in ("sync_contacts", "sync_invoices", "sync_repeating_invoices", "sync_suppliers")
+        }
+
+        with patch("app.xero.sync_scheduler.async_session_maker", MagicMock(return_value=session)), \
+                patch("app.xero.sync_scheduler.load_sync_candidates",
+                      AsyncMock(return_value=[SyncCandidate("u1", "t1", ago(60))])), \
+                patch("app.xero.sync_scheduler.settings.XERO_SYNC_START_JITTER_SECONDS", 0), \
+                patch("app.xero.sync.get_valid_connection", AsyncMock(return_value=connection)), \
+                patch("app.xero.sync.XeroClient", return_value=xero_client), \
+                patch("app.xero.budget.tenant_budget_store", return_value=MemoryRateLimitStore()), \
+                patch.multiple("app.xero.sync", **stages):
+            summary = await run_background_sync(now=NOW, metrics=XeroSyncMetrics())
+
+        assert summary["users_synced"] == 1
+        for stage in stages.values():
+            stage.assert_awaited_once()
+        xero_client.get_outstanding_invoices.assert_called_once()
+        assert connection.last_sync_at is not None
+
+    @pytest.mark.asyncio
+    async def test_unknown_sync_types_are_rejected(self):
+        from app.xero.sync import sync_xero_data
+
+        with pytest.raises(ValueError, match="incremental"):
+            await sync_xero_data(MagicMock(), "u1", "incremental")
+
+    def test_metrics_render_as_gauges(self):
+        text = XeroSyncMetrics(queue_depth=3, max_lag_seconds=120.0).render_prometheus()
+
+        assert "# TYPE tamio_xero_sync_queue_depth gauge" in text
+        assert "tamio_xero_sync_queue_depth 3" in text
+        assert "tamio_xero_sync_lag_seconds 120.0" in text
+
+
+class TestTenantBudget:
+    """Tests for the per-tenant Xero call budget shared by every sync."""
+
+    def test_client_counts_every_request(self):
+        api = MagicMock()
+        counted = _CountedApi(api)
+
+        counted.get_invoices("t1", page=1)
+        counted.get_invoices("t1", page=2)
+        counted.get_contacts("t1")
+
+        assert counted.calls == 3
+        assert api.get_invoices.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_syncs_are_charged_their_real_calls(self):
+        store = MemoryRateLimitStore()
+
+        with patch("app.xero.budget.settings.XERO_TENANT_CALLS_PER_MINUTE", 60):
+            await budget.acquire_call_budget("xero:t1", store=store)
+            await budget.settle_call_budget("xero:t1", 75, store=store)
+            with pytest.raises(budget.XeroBudgetExceeded) as exceeded:
+                await budget.acquire_call_budget("xero:t1", store=store)
+
+        assert store._buckets["xero:t1"][0] < 0
+        assert exceeded.value.retry_after > 15
+
+    @pytest.mark.asyncio
+    async def test_sync_without_budget_is_deferred_before_calling_xero(self):
+        db = MagicMock()
+        db.commit = AsyncMock()
+        connection = MagicMock(tenant_id="t1")
+        store = MemoryRateLimitStore()
+        await store.charge("xero:t1", 100, 60, 1)
+
+        with patch("app.xero.sync.get_valid_connection", AsyncMock(return_value=connection)), \
+                patch("app.xero.sync.XeroClient") as client, \
+                patch("app.xero.budget.tenant_budget_store", return_value=store):
+            result = await sync_xero_data(db, "u1", "full")
+
+        assert result["deferred"] and not result["success"]
+        assert result["retry_after"] > 0
+        client.assert_not_called()
+        db.add.assert_not_called()
@@ -0,0 +1,324 @@
+"""
+Tests for Xero webhook intake and targeted change sync.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.dialects import postgresql
+
+import app.health.routes  # noqa: F401  (loads app.data before app.services)
+from app.config import settings
+from app.database import get_db
+from app.detection.models import DetectionType
+from app.middleware.rate_limit import MemoryRateLimitStore
+from app.models import Client
+from app.xero import routes as xero_routes
+from app.xero.sync import apply_invoice_changes, fetch_xero_changes, sync_xero_changes
+from app.xero.webhooks import (
+    coalesce_events,
+    process_pending_events,
+    record_webhook_events,
+    release_stale_claims,
+    verify_webhook_signature,
+)
+
+KEY = "webhook-key"
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def sign(body: bytes, key: str = KEY) -> str:
+    return base64.b64encode(hmac.new(key.encode(), body, hashlib.sha256).digest()).decode()
+
+
+def event(resource_id, category="INVOICE", tenant_id="tenant_1", event_type="UPDATE", at="2026-10-18T10:00:00.000"):
+    return {
+        "resourceId": resource_id, "eventCategory": category, "tenantId": tenant_id,
+        "eventType": event_type, "eventDateUtc": at,
+    }
+
+
+def claimed(resource_id, resource_type="INVOICE", tenant_id="tenant_1", attempts=1):
+    return SimpleNamespace(
+        id=f"xwh_{resource_id}", tenant_id=tenant_id, resource_type=resource_type, resource_id=resource_id,
+        event_type="UPDATE", event_count=1, first_event_at=None, last_event_at=None, attempts=attempts,
+    )
+
+
+def rows(*items):
+    result = MagicMock()
+    result.all.return_value = list(items)
+    return result
+
+
+def make_db(*results):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=list(results))
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+class TestIntake:
+    """Tests for signature checks and event recording."""
+
+    def test_signature_is_checked_against_the_raw_body(self):
+        body = b'{"events":[]}'
+
+        assert verify_webhook_signature(body, sign(body), key=KEY)
+        assert not verify_webhook_signature(body + b" ", sign(body), key=KEY)
+        assert not verify_webhook_signature(body, None, key=KEY)
+        assert not verify_webhook_signature(body, sign(body, ""), key="")
+
+    def test_events_coalesce_per_entity(self):
+        rows = coalesce_events([
+            event("inv_1", event_type="CREATE", at="2026-10-18T10:00:00"),
+            event("inv_1", event_type="UPDATE", at="2026-10-18T10:05:00"),
+            event("inv_1", tenant_id="tenant_2"),
+            event("con_1", category="CONTACT"),
+            event("sub_1", category="SUBSCRIPTION"),
+        ])
+
+        assert len(rows) == 3
+        invoice = next(r for r in rows if r["resource_id"] == "inv_1" and r["tenant_id"] == "tenant_1")
+        assert invoice["event_count"] == 2
+        assert invoice["event_type"] == "UPDATE"
+        assert invoice["first_event_at"] < invoice["last_event_at"]
+
+    @pytest.mark.asyncio
+    async def test_recording_merges_into_the_pending_row(self):
+        db = make_db(MagicMock())
+
+        recorded = await record_webhook_events(db, [event("inv_1"), event("inv_1")])
+
+        sql = _sql(db.execute.await_args.args[0])
+        assert recorded == 1
+        assert "ON CONFLICT (tenant_id, resource_type, resource_id) WHERE status = 'pending' DO UPDATE" in sql
+        assert "event_count = (xero_webhook_events.event_count + excluded.event_count)" in sql
+        db.commit.assert_not_called()
+
+
+class TestReceiver:
+    """Tests for POST /xero/webhooks."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(settings, "XERO_WEBHOOK_KEY", KEY)
+        db = make_db(MagicMock())
+        api = FastAPI()
+        api.include_router(xero_routes.router, prefix="/xero")
+        api.dependency_overrides[get_db] = lambda: db
+        transport = httpx.ASGITransport(app=api)
+        yield httpx.AsyncClient(transport=transport, base_url="http://test"), db
+
+    @pytest.mark.asyncio
+    async def test_bad_signature_is_rejected(self, client):
+        http, db = client
+        body = json.dumps({"events": [event("inv_1")]}).encode()
+
+        response = await http.post("/xero/webhooks", content=body, headers={"x-xero-signature": sign(body, "other")})
+
+        assert response.status_code == 401
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_events_are_recorded_and_processed_in_the_background(self, client):
+        http, db = client
+        body = json.dumps({"events": [event("inv_1")]}).encode()
+
+        with patch("app.detection.scheduler.process_xero_webhook_events", new_callable=AsyncMock) as process:
+            response = await http.post("/xero/webhooks", content=body, headers={"x-xero-signature": sign(body)})
+
+        assert response.status_code == 200
+        assert response.content == b""
+        db.commit.assert_awaited_once()
+        process.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_intent_to_receive_is_acknowledged(self, client):
+        http, db = client
+        body = b'{"events":[],"firstEventSequence":0,"lastEventSequence":0}'
+
+        response = await http.post("/xero/webhooks", content=body, headers={"x-xero-signature": sign(body)})
+
+        assert response.status_code == 200
+        db.execute.assert_not_called()
+
+
+class TestTargetedSync:
+    """Tests for fetching and applying only changed entities."""
+
+    @pytest.mark.asyncio
+    async def test_only_changed_ids_are_fetched(self):
+        xero_client = MagicMock()
+        xero_client.get_invoices.return_value = [{"invoice_id": "inv_1"}]
+        xero_client.get_contacts.return_value = [
+            {"contact_id": "con_1", "is_customer": True, "is_supplier": False},
+            {"contact_id": "con_2", "is_customer": False, "is_supplier": True},
+        ]
+
+        snapshot = await fetch_xero_changes(xero_client, ["inv_1"], ["con_1", "con_2"])
+
+        xero_client.get_invoices.assert_called_once_with(invoice_ids=["inv_1"])
+        xero_client.get_contacts.assert_called_once_with(contact_ids=["con_1", "con_2"])
+        assert [c["contact_id"] for c in snapshot.customers] == ["con_1"]
+        assert [c["contact_id"] for c in snapshot.suppliers] == ["con_2"]
+
+    @pytest.mark.asyncio
+    async def test_paid_invoice_is_removed_and_others_kept(self):
+        kept = {"xero_invoice_id": "inv_2", "amount": 50.0}
+        existing = Client(
+            id="client_1", user_id="u1", name="Acme", client_type="retainer", currency="USD", status="active",
+            billing_config={"outstanding_invoices": [{"xero_invoice_id": "inv_1", "amount": 100.0}, kept]},
+            xero_contact_id="xc_1",
+        )
+        scalars = MagicMock()
+        scalars.scalars.return_value.all.return_value = [existing]
+        db = make_db(scalars)
+        db.flush = AsyncMock()
+        paid = {
+            "type": "ACCREC", "invoice_id": "inv_1", "status": "PAID", "amount_due": 0,
+            "contact_name": "Acme", "contact_id": "xc_1", "due_date": date(2026, 11, 1),
+        }
+
+        with patch("app.xero.sync.replace_xero_receivables_for_invoices", new_callable=AsyncMock) as replace:
+            await apply_invoice_changes(db, "u1", [paid])
+
+        assert existing.billing_config["outstanding_invoices"] == [kept]
+        assert replace.await_args.args[2] == {"inv_1"}
+        assert replace.await_args.args[3] == {"client_1": []}
+
+    @pytest.mark.asyncio
+    async def test_targeted_sync_is_logged_without_marking_the_tenant_synced(self):
+        db = MagicMock()
+        db.flush = AsyncMock()
+        db.commit = AsyncMock()
+        db.add = MagicMock()
+        connection = SimpleNamespace(tenant_id="tenant_1", last_sync_at=None, sync_error="stale")
+        xero_client = MagicMock(calls=1)
+        xero_client.get_invoices.return_value = []
+
+        with patch("app.xero.sync.get_valid_connection", AsyncMock(return_value=connection)), \
+                patch("app.xero.sync.XeroClient", return_value=xero_client), \
+                patch("app.xero.budget.tenant_budget_store", return_value=MemoryRateLimitStore()), \
+                patch("app.xero.sync.apply_invoice_changes", AsyncMock(return_value={})) as invoices, \
+                patch("app.xero.sync.sync_contacts", new_callable=AsyncMock) as contacts:
+            result = await sync_xero_changes(db, "u1", invoice_ids=["inv_1"])
+
+        assert result["success"]
+        assert db.add.call_args.args[0].sync_type == "webhook"
+        assert connection.last_sync_at is None and connection.sync_error is None
+        invoices.assert_awaited_once()
+        contacts.assert_not_called()
+
+
+class TestProcessing:
+    """Tests for processing claimed webhook events."""
+
+    @pytest.mark.asyncio
+    async def test_changes_sync_once_per_user_with_scoped_detections(self):
+        db = make_db(
+            rows(claimed("inv_1"), claimed("inv_1b"), claimed("con_1", "CONTACT")),
+            rows(SimpleNamespace(tenant_id="tenant_1", user_id="u1")),
+            MagicMock(),
+        )
+        sync = AsyncMock(return_value={"success": True})
+        detect = AsyncMock(return_value={})
+
+        summary = await process_pending_events(db, sync=sync, detect=detect, batch_size=10, max_attempts=3)
+
+        assert summary["claimed"] == 3 and summary["done"] == 3
+        sync.assert_awaited_once_with(db, "u1", invoice_ids=["inv_1", "inv_1b"], contact_ids=["con_1"])
+        assert "FOR UPDATE SKIP LOCKED" in _sql(db.execute.await_args_list[0].args[0])
+
+        types = detect.await_args.kwargs["detection_types"]
+        assert DetectionType.CLIENT_CHURN in types and DetectionType.BUFFER_BREACH in types
+        assert DetectionType.STATUTORY_DEADLINE not in types
+        assert len(types) == len(set(types))
+
+    @pytest.mark.asyncio
+    async def test_budget_deferral_requeues_without_using_an_attempt(self):
+        db = make_db(
+            rows(claimed("inv_1", attempts=3)),
+            rows(SimpleNamespace(tenant_id="tenant_1", user_id="u1"), SimpleNamespace(tenant_id="tenant_1", user_id="u2")),
+            MagicMock(),
+            MagicMock(),
+        )
+        sync = AsyncMock(return_value={"success": False, "deferred": True, "message": "budget used up"})
+        detect = AsyncMock()
+
+        summary = await process_pending_events(db, sync=sync, detect=detect, batch_size=10, max_attempts=3)
+
+        assert (summary["deferred"], summary["requeued"], summary["failed"]) == (1, 1, 0)
+        sync.assert_awaited_once()  # u2 shares the tenant's budget
+        requeue = db.execute.await_args_list[3].args[0]
+        assert 2 in requeue.compile().params.values()
+        detect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_sync_requeues_events_with_attempts_left(self):
+        db = make_db(
+            rows(claimed("inv_1", attempts=1), claimed("inv_2", attempts=3)),
+            rows(SimpleNamespace(tenant_id="tenant_1", user_id="u1")),
+            MagicMock(),
+            MagicMock(),
+        )
+        sync = AsyncMock(return_value={"success": False, "message": "token expired"})
+        detect = AsyncMock()
+
+        summary = await process_pending_events(db, sync=sync, detect=detect, batch_size=10, max_attempts=3)
+
+        assert summary["failed"] == 2 and summary["requeued"] == 1
+        requeue = db.execute.await_args_list[3].args[0]
+        assert "ON CONFLICT" in _sql(requeue)
+        params = requeue.compile().params.values()
+        assert "inv_1" in params and "inv_2" not in params
+        detect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_claims_record_when_they_were_taken(self):
+        db = make_db(rows())
+
+        await process_pending_events(db, sync=AsyncMock(), detect=AsyncMock(), batch_size=10, max_attempts=3)
+
+        assert "claimed_at=" in _sql(db.execute.await_args_list[0].args[0])
+
+    @pytest.mark.asyncio
+    async def test_stale_claims_are_failed_and_requeued(self):
+        db = make_db(
+            rows(claimed("inv_1", attempts=1), claimed("inv_2", attempts=3)),
+            MagicMock(),
+            MagicMock(),
+        )
+
+        released = await release_stale_claims(db, timeout=timedelta(minutes=15), max_attempts=3)
+
+        assert released == 2
+        sql = _sql(db.execute.await_args_list[0].args[0])
+        assert "xero_webhook_events.status = %(status_1)s" in sql
+        assert "xero_webhook_events.claimed_at <" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "failed" in db.execute.await_args_list[1].args[0].compile().params.values()
+        requeue = db.execute.await_args_list[2].args[0]
+        assert "ON CONFLICT" in _sql(requeue)
+        params = requeue.compile().params.values()
+        assert "inv_1" in params and "inv_2" not in params
+        db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_no_stale_claims_writes_nothing(self):
+        db = make_db(rows())
+
+        assert await release_stale_claims(db, timeout=timedelta(minutes=15), max_attempts=3) == 0
+        assert db.execute.await_count == 1